@@ -0,0 +1,61 @@
+"""Benchmark for the structural dedup index: fingerprinting, building and mmap lookups.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_dedup [--entries 1000000] [--chunk 50000] [--lookups 20000]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.bench_memory import make_unit
+from core.structural import Fingerprint, StructuralIndex
+
+def random_fingerprint(rng: random.Random, permutations: int) -> Fingerprint:
+    return Fingerprint(rng.randbytes(16), tuple(rng.getrandbits(31) for _ in range(permutations)))
+
+def run(entries: int, chunk: int, lookups: int):
+    path = os.path.join(tempfile.mkdtemp(), "index")
+    index = StructuralIndex(path)
+    rng = random.Random(1)
+
+    codes = [make_unit(i, 4) for i in range(2000)]
+    start = time.perf_counter()
+    real = [index.fingerprint(code) for code in codes]
+    elapsed = time.perf_counter() - start
+    print(f"fingerprint          {len(codes) / elapsed:10,.0f} units/s")
+
+    # Synthetic entries stand in for a large monorepo; built in chunks so each save merges into the file
+    start = time.perf_counter()
+    stored = []
+    for done in range(0, entries, chunk):
+        for _ in range(min(chunk, entries - done)):
+            fingerprint = random_fingerprint(rng, index.permutations)
+            index.add(fingerprint, {"time_complexity": "O(n)"}, "0" * 64, "O(n)")
+            if len(stored) < lookups:
+                stored.append(fingerprint)
+        index.save()
+    elapsed = time.perf_counter() - start
+    print(f"build                {entries / elapsed:10,.0f} entries/s  {os.path.getsize(path) / 2**20:8.1f} MiB "
+          f"for {len(index):,} entries")
+
+    index = StructuralIndex(path)
+    for label, probes in [("lookup (exact hit)", stored),
+                          ("lookup (miss)", [random_fingerprint(rng, index.permutations) for _ in range(lookups)]),
+                          ("lookup (real code)", real)]:
+        start = time.perf_counter()
+        for fingerprint in probes:
+            index.lookup(fingerprint, "O(n)")
+        elapsed = time.perf_counter() - start
+        print(f"{label:20} {elapsed / len(probes) * 1e6:10.1f} µs each")
+    index.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=200000, help="Entries in the index")
+    parser.add_argument("--chunk", type=int, default=50000, help="Entries added between saves")
+    parser.add_argument("--lookups", type=int, default=20000, help="Lookups per measurement")
+    args = parser.parse_args()
+    run(args.entries, args.chunk, args.lookups)
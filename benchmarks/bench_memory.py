@@ -0,0 +1,68 @@
+"""Benchmark for memory retained by analysis results on a large corpus.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_memory [--units 5000] [--loops 8]
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from core.ast_parser import ASTParser
+from core.complexity_analyzer import ComplexityAnalyzer
+from core.serialization import dumps_json
+
+def make_unit(index: int, loops: int) -> str:
+    """A function with ``loops`` sibling loops and a nested pair, like typical repository code."""
+    body = "".join(
+        f"    for item_{k} in range(len(items)):\n"
+        f"        total += helper_{k}(item_{k})\n"
+        for k in range(loops)
+    )
+    return (
+        f"def function_{index}(items):\n"
+        f'    """Docstring for function {index}."""\n'
+        f"    total = 0\n"
+        f"{body}"
+        f"    for a in items:\n"
+        f"        for b in items:\n"
+        f"            total += compare(a, b)\n"
+        f"    return total\n"
+    )
+
+def measure(label: str, build):
+    """Time build() untraced, then run it again under tracemalloc to see what its result keeps alive."""
+    start = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    retained = build()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    count = len(retained)
+    print(f"{label:24} {count:7} results  {current / 2**20:7.1f} MiB retained "
+          f"({current / count:6.0f} B each)  peak {peak / 2**20:7.1f} MiB  {elapsed:6.2f} s")
+    return retained
+
+def run(units: int, loops: int):
+    codes = [make_unit(index, loops) for index in range(units)]
+    analyzer = ComplexityAnalyzer(offline=True)
+    parser = ASTParser()
+
+    measure("ASTAnalysis records", lambda: [parser.parse(code) for code in codes])
+    results = measure("analyze() results", lambda: [analyzer.analyze(code) for code in codes])
+
+    start = time.perf_counter()
+    size = sum(len(dumps_json(result)) for result in results)
+    print(f"{'JSON serialization':24} {size / 2**20:7.1f} MiB in {time.perf_counter() - start:.2f} s")
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--units', type=int, default=5_000)
+    arg_parser.add_argument('--loops', type=int, default=8)
+    args = arg_parser.parse_args()
+    run(args.units, args.loops)
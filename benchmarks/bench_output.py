@@ -0,0 +1,69 @@
+"""Benchmark for writing batch results: indented JSON vs NDJSON, with and without --fields.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_output [--units 5000]
+"""
+import argparse
+import io
+import time
+import tracemalloc
+
+from benchmarks.bench_memory import make_unit
+from core.complexity_analyzer import ComplexityAnalyzer
+from core.output import NDJSONWriter, SarifWriter, parse_fields
+from core.serialization import dumps_json
+
+FIELDS = parse_fields("file,name,final_analysis.time_complexity,final_analysis.confidence")
+
+def records(results):
+    for index, result in enumerate(results):
+        yield {'file': f'src/module_{index // 20}.py', 'name': f'function_{index}', 'line': 1, **result}
+
+def indented(results, stream):
+    # The old path: every record kept and dumped as one document at the end
+    stream.write(dumps_json(list(records(results)), indent=2))
+
+def streamed(writer):
+    def write(results, stream):
+        output = writer(stream)
+        for record in records(results):
+            output.write(record)
+        output.close()
+    return write
+
+def measure(label: str, write, results):
+    stream = io.StringIO()
+    start = time.perf_counter()
+    write(results, stream)
+    elapsed = time.perf_counter() - start
+    size = stream.tell()
+
+    tracemalloc.start()
+    write(results, _Discard())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    print(f"{label:22} {len(results) / elapsed:9,.0f} records/s  {size / 2**20:7.1f} MiB written  "
+          f"peak {peak / 2**20:7.1f} MiB")
+
+class _Discard(io.TextIOBase):
+    """A stream that drops what it is given, so peak memory is the writer's own."""
+
+    def write(self, text):
+        return len(text)
+
+def run(units: int):
+    analyzer = ComplexityAnalyzer(offline=True)
+    results = [analyzer.analyze(make_unit(index, 4)) for index in range(units)]
+
+    measure("json (indent=2)", indented, results)
+    measure("ndjson", streamed(NDJSONWriter), results)
+    measure("ndjson --fields", streamed(lambda stream: NDJSONWriter(stream, FIELDS)), results)
+    measure("sarif", streamed(SarifWriter), results)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--units", type=int, default=5000, help="Analysis results to write")
+    args = parser.parse_args()
+    run(args.units)
@@ -0,0 +1,54 @@
+"""Benchmark for parsing LLM responses, including pathological ones.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_response_parser [--size 1000000] [--repeat 3]
+"""
+import argparse
+import json
+import time
+
+from core.response_parser import ParseStats, parse_analysis
+
+ANSWER = json.dumps({
+    "time_complexity": "O(N log N)",
+    "space_complexity": "O(n)",
+    "confidence": 0.9,
+    "explanation": "Sorting dominates.",
+    "bottlenecks": ["sorted()"]
+})
+
+def scenarios(size: int):
+    """Responses of roughly ``size`` characters that stress different parts of the parser."""
+    filler = "The loop {runs} once per item. " * (size // 32)
+    return {
+        'fenced answer after prose': f"{filler}\n```json\n{ANSWER}\n```",
+        'several blocks': '{"time_complexity": "O(...)"} ' * (size // 30) + ANSWER,
+        'unbalanced braces': "{" * size,
+        'nested brackets': "[{" * (size // 2),
+        'unterminated string': '{"explanation": "' + "\\\"" * (size // 2),
+        'prose only': "The time complexity is O(n^2) and space complexity O(1). " * (size // 58),
+    }
+
+def run(size: int, repeat: int):
+    stats = ParseStats()
+    for name, text in scenarios(size).items():
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = parse_analysis(text, stats)
+            timings.append(time.perf_counter() - start)
+
+        best = min(timings)
+        verdict = result.get('error') or result['time_complexity']
+        print(f"{name:28} {len(text) / 1e6:5.2f} MB  best {best * 1000:8.1f} ms  "
+              f"{len(text) / best / 1e6:6.1f} MB/s  -> {verdict}")
+
+    print(f"outcomes: {stats.stats()}")
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--size', type=int, default=1_000_000)
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    args = arg_parser.parse_args()
+    run(args.size, args.repeat)
@@ -0,0 +1,77 @@
+"""Startup benchmark: import cost of the CLI and wall time of its fast paths.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_startup [--runs 7] [--budget-ms 100]
+
+Exits non-zero when the cumulative ``python -X importtime`` cost of ``main``
+exceeds the budget, so it can gate CI.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE = "def f(xs):\n    for x in xs:\n        print(x)\n"
+
+COMMANDS = {
+    'interpreter (python -c pass)': ['-c', 'pass'],
+    'main.py --help': ['main.py', '--help'],
+    'analyze --offline --format json': ['main.py', 'analyze', SAMPLE, '--offline', '--format', 'json'],
+    'analyze --offline --format plain': ['main.py', 'analyze', SAMPLE, '--offline', '--format', 'plain'],
+}
+
+def import_times(module: str = 'main'):
+    """Return (cumulative_us, [(self_us, name)]) from ``python -X importtime``."""
+    output = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    ).stderr
+    
+    modules = []
+    cumulative = 0
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules.append((int(self_us), name.strip()))
+        if name.rstrip() == f' {module}':
+            cumulative = int(cumulative_us)
+    return cumulative, modules
+
+def wall_time_ms(args, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=REPO_ROOT, capture_output=True,
+                       env={**os.environ, 'GEMINI_API_KEY': ''})
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+def run(runs: int, budget_ms: float) -> int:
+    cumulative, modules = import_times()
+    print(f"import main: {cumulative / 1000:.1f} ms cumulative (budget {budget_ms:.0f} ms)")
+    print("heaviest modules (self time):")
+    for self_us, name in sorted(modules, reverse=True)[:10]:
+        print(f"  {self_us / 1000:6.1f} ms  {name}")
+    
+    for heavy in ('rich', 'google.generativeai', 'asyncio', 'multiprocessing', 'sqlite3'):
+        if any(name == heavy for _, name in modules):
+            print(f"WARNING: {heavy} is imported at startup")
+    
+    print(f"\nwall time (median of {runs}):")
+    for label, args in COMMANDS.items():
+        print(f"  {wall_time_ms(args, runs):6.1f} ms  {label}")
+    
+    return 0 if cumulative / 1000 <= budget_ms else 1
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--runs', type=int, default=7)
+    arg_parser.add_argument('--budget-ms', type=float, default=100.0)
+    args = arg_parser.parse_args()
+    sys.exit(run(args.runs, args.budget_ms))
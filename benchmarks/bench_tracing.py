@@ -0,0 +1,51 @@
+"""Benchmark for tracing overhead, with spans disabled and enabled.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_tracing [--spans 200000] [--analyses 200]
+"""
+import argparse
+import time
+
+from core import tracing
+from core.complexity_analyzer import ComplexityAnalyzer
+from examples.sample_codes import SAMPLE_CODES
+
+def time_spans(count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        with tracing.span('stage', size=1) as stage:
+            stage.set(tokens=2)
+    return (time.perf_counter() - start) / count
+
+def time_analyses(count: int) -> float:
+    analyzer = ComplexityAnalyzer(offline=True)
+    codes = [sample['code'] for sample in SAMPLE_CODES.values()]
+    start = time.perf_counter()
+    for index in range(count):
+        analyzer.analyze(codes[index % len(codes)])
+    return (time.perf_counter() - start) / count
+
+def run(spans: int, analyses: int):
+    disabled_span = time_spans(spans)
+    disabled_analysis = time_analyses(analyses)
+
+    tracing.enable()
+    try:
+        enabled_span = time_spans(spans)
+        enabled_analysis = time_analyses(analyses)
+    finally:
+        tracing.disable()
+
+    print(f"span, disabled      {disabled_span * 1e9:8.0f} ns")
+    print(f"span, enabled       {enabled_span * 1e9:8.0f} ns")
+    print(f"analyze, disabled   {disabled_analysis * 1e6:8.1f} µs")
+    print(f"analyze, enabled    {enabled_analysis * 1e6:8.1f} µs  "
+          f"({enabled_analysis / disabled_analysis - 1:+.1%})")
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--spans', type=int, default=200_000)
+    arg_parser.add_argument('--analyses', type=int, default=200)
+    args = arg_parser.parse_args()
+    run(args.spans, args.analyses)
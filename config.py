@@ -1,15 +1,81 @@
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+def _find_dotenv() -> str:
+    """Locate a .env file the way python-dotenv's find_dotenv does from this file."""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        candidate = os.path.join(directory, ".env")
+        if os.path.isfile(candidate):
+            return candidate
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return ""
+        directory = parent
+
+# python-dotenv is only imported when there is a .env file to load
+_dotenv_path = _find_dotenv()
+if _dotenv_path:
+    from dotenv import load_dotenv
+    load_dotenv(_dotenv_path)
 
 class Config:
     
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
     GEMINI_MODEL = "gemini-2.5-flash"
     
-    MAX_CODE_LENGTH = 10000  
+    LLM_BACKEND = os.getenv("COMPLEXITY_LLM_BACKEND", "gemini")  # gemini, local, fake or a registered plugin
+    LOCAL_LLM_URL = os.getenv("LOCAL_LLM_URL", "http://localhost:8000/v1")  # OpenAI-compatible API root
+    LOCAL_LLM_MODEL = os.getenv("LOCAL_LLM_MODEL", "local-model")
+    LOCAL_LLM_API_KEY = os.getenv("LOCAL_LLM_API_KEY", "")
+    FAKE_LLM_LATENCY = float(os.getenv("FAKE_LLM_LATENCY", "0"))  # seconds per call of the fake backend
+    
+    MAX_CODE_LENGTH = 10000  # characters of code per analysis prompt; longer input is compacted or chunked
+    PROMPT_TOKEN_BUDGET = 4000  # estimated tokens per analysis prompt
     CONFIDENCE_THRESHOLD = 0.7  
     
+    CACHE_DIR = os.getenv(
+        "COMPLEXITY_CACHE_DIR",
+        os.path.join(os.path.expanduser("~"), ".cache", "complexity-analyzer")
+    )
+    CACHE_TTL = 7 * 24 * 60 * 60  # seconds
+    CACHE_MAX_MEMORY_ENTRIES = 1024
+    
+    LLM_CONCURRENCY = 4  # concurrent LLM requests in batch runs
+    LLM_RATE_LIMIT = 10.0  # requests per second
+    LLM_REQUEST_TIMEOUT = 60.0  # seconds
+    LLM_MAX_RETRIES = 4
+    LLM_RETRY_BASE_DELAY = 0.5  # seconds
+    LLM_RETRY_MAX_DELAY = 30.0  # seconds
+    
+    BATCH_TOKEN_BUDGET = 6000  # estimated prompt + response tokens per batched call
+    BATCH_MAX_ITEMS = 20  # snippets per batched prompt
+    
+    MEASURE_SIZES = [100, 200, 400, 800, 1600, 3200]
+    MEASURE_REPEATS = 5
+    MEASURE_TIMEOUT = 30.0  # seconds per input size
+    EMPIRICAL_MIN_R2 = 0.9  # fits below this are ignored when combining analyses
+    
+    HOTSPOT_BUDGET = 25  # profiled units analyzed per hotspots run, hottest first
+    HOTSPOT_MIN_SHARE = 0.001  # units with less of the profiled time are never analyzed
+    HOTSPOT_REFERENCE_SIZE = 1000  # input size at which estimated complexities are weighed
+    
+    DEDUP_INDEX_PATH = ".complexity-index"  # structural index of LLM results for --dedup runs
+    DEDUP_PERMUTATIONS = 64  # MinHash signature length
+    DEDUP_BANDS = 16  # LSH bands (of DEDUP_PERMUTATIONS / DEDUP_BANDS rows each)
+    DEDUP_NGRAM = 4  # tokens per AST shape shingle
+    DEDUP_SIMILARITY = 0.8  # estimated Jaccard similarity for a near duplicate to reuse a result
+    DEDUP_MAX_CANDIDATES = 64  # entries checked per LSH band
+    
+    MANIFEST_PATH = ".complexity-manifest.json"  # per-unit results for incremental runs
+    ALLOWLIST_PATH = ".complexity-allowlist"  # functions allowed to get slower in compare runs
+    REGRESSION_MIN_CONFIDENCE = 0.5  # both estimates must reach this for a slowdown to fail compare
+    BENCH_HISTORY_PATH = ".complexity-bench-history.json"  # one entry per bench run
+    BENCH_FAKE_ERROR_RATE = 0.15  # share of corpus snippets the offline fake model gets wrong
+    
+    SERVER_HOST = "127.0.0.1"
+    SERVER_PORT = 8765
+    SERVER_QUEUE_SIZE = 64  # pending analyses before requests are rejected with 503
+    SERVER_MAX_BODY = 1024 * 1024  # bytes
+    
     VERBOSE = os.getenv("VERBOSE", "false").lower() == "true"
     OUTPUT_FORMAT = os.getenv("OUTPUT_FORMAT", "rich")  # rich, json, plain 
\ No newline at end of file
@@ -1,5 +1,25 @@
-from .complexity_analyzer import ComplexityAnalyzer
-from .ast_parser import ASTParser
-from .llm_client import LLMClient
+import importlib
 
-__all__ = ['ComplexityAnalyzer', 'ASTParser', 'LLMClient'] 
\ No newline at end of file
+# Exports are resolved lazily so importing one submodule (or the CLI's fast
+# paths) doesn't pay for asyncio, multiprocessing or sqlite3 up front.
+_EXPORTS = {
+    'ComplexityAnalyzer': '.complexity_analyzer',
+    'ASTParser': '.ast_parser',
+    'LLMClient': '.llm_client',
+    'AsyncLLMClient': '.async_llm_client',
+    'ResultCache': '.cache',
+    'BatchAnalyzer': '.batch',
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,466 @@
+import ast
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, Union
+
+from .cost import CONSTANT, LINEAR, LINEARITHMIC, Cost, format_cost, multiply
+from .recurrence import _count_block, is_memoized
+
+@dataclass(slots=True)
+class Finding:
+    """One anti-pattern occurrence: where it is, what it costs and what to do instead."""
+    rule: str
+    line: int
+    message: str
+    # Cost of one occurrence, and with every enclosing loop taken as O(n) iterations
+    cost: str
+    total: str
+    suggestion: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'rule': self.rule, 'line': self.line, 'message': self.message, 'cost': self.cost,
+                'total': self.total, 'suggestion': self.suggestion}
+
+class Rule:
+    """Base class for anti-pattern rules.
+
+    The detector walks each tree once and calls ``visit(node, context)`` for
+    every node whose type is in ``node_types``; for loops and functions it
+    also calls ``leave(node, context)`` once their bodies have been visited.
+    Rules report through ``context.report``. A fresh instance is made for
+    every scan, so rules may keep per-scan bookkeeping on ``self``.
+    """
+
+    name = ''
+    node_types: Tuple[Type[ast.AST], ...] = ()
+
+    def visit(self, node: ast.AST, context: 'ScanContext'):
+        pass
+
+    def leave(self, node: ast.AST, context: 'ScanContext'):
+        pass
+
+RULES: Dict[str, Type[Rule]] = {}
+
+def register_rule(rule: Type[Rule]) -> Type[Rule]:
+    """Class decorator adding a rule to those every detector runs by default."""
+    RULES[rule.name] = rule
+    return rule
+
+_LOOPS = (ast.For, ast.AsyncFor, ast.While)
+_COMPREHENSIONS = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+_FUNCTIONS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)
+
+class _Scope:
+    __slots__ = ('function', 'parent', 'kinds')
+
+    def __init__(self, function: Optional[ast.AST], parent: Optional['_Scope']):
+        self.function = function
+        self.parent = parent
+        # Variable name -> 'list', 'str', 'set', 'dict' or 'deque', as last assigned
+        self.kinds: Dict[str, str] = {}
+
+class _Leave:
+    __slots__ = ('node',)
+
+    def __init__(self, node: ast.AST):
+        self.node = node
+
+class ScanContext:
+    """Where the node being visited sits: enclosing loops, function and known variable kinds."""
+
+    __slots__ = ('loops', 'scope', 'findings')
+
+    def __init__(self):
+        # Loops (and comprehensions) that run the current node once per iteration
+        self.loops: Tuple[ast.AST, ...] = ()
+        self.scope = _Scope(None, None)
+        self.findings: List[Finding] = []
+
+    @property
+    def in_loop(self) -> bool:
+        return bool(self.loops)
+
+    @property
+    def function(self) -> Optional[ast.AST]:
+        return self.scope.function
+
+    def kind(self, name: str) -> Optional[str]:
+        scope = self.scope
+        while scope is not None:
+            if name in scope.kinds:
+                return scope.kinds[name]
+            scope = scope.parent
+        return None
+
+    def report(self, rule: Rule, node: ast.AST, message: str, cost: Cost, suggestion: str,
+               loops: Optional[int] = None):
+        depth = len(self.loops) if loops is None else loops
+        self.findings.append(Finding(
+            rule=rule.name,
+            line=getattr(node, 'lineno', 0),
+            message=message,
+            cost=format_cost(cost),
+            total=format_cost(multiply(cost, Cost(poly=depth))),
+            suggestion=suggestion
+        ))
+
+class AntiPatternDetector:
+    """Run a set of rules over a tree in a single traversal.
+
+    ``rules`` are registered rule names or Rule subclasses (default: all
+    registered rules). The detector keeps no state between scans.
+    """
+
+    def __init__(self, rules: Optional[Iterable[Union[str, Type[Rule]]]] = None):
+        selected = RULES.values() if rules is None else rules
+        self.rules: List[Type[Rule]] = []
+        for rule in selected:
+            if isinstance(rule, str):
+                if rule not in RULES:
+                    raise ValueError(f"Unknown anti-pattern rule: {rule}")
+                rule = RULES[rule]
+            self.rules.append(rule)
+
+    def scan(self, tree: ast.AST) -> List[Finding]:
+        context = ScanContext()
+        dispatch: Dict[type, List[Rule]] = {}
+        for rule_class in self.rules:
+            rule = rule_class()
+            for node_type in rule.node_types:
+                dispatch.setdefault(node_type, []).append(rule)
+
+        stack: List[tuple] = [(tree, (), context.scope)]
+        while stack:
+            node, loops, scope = stack.pop()
+            context.loops, context.scope = loops, scope
+
+            if isinstance(node, _Leave):
+                for rule in dispatch.get(type(node.node), ()):
+                    rule.leave(node.node, context)
+                continue
+
+            for rule in dispatch.get(type(node), ()):
+                rule.visit(node, context)
+            _record_kinds(node, scope)
+
+            children = _child_frames(node, loops, scope)
+            if isinstance(node, _LOOPS + _FUNCTIONS + _COMPREHENSIONS) and type(node) in dispatch:
+                children.append((_Leave(node), loops, scope))
+            # Reversed so children are popped in source order
+            stack.extend(reversed(children))
+
+        # Repeated constructs on one line (xs[:i] + xs[i + 1:]) are one finding
+        unique = {(finding.line, finding.rule, finding.message): finding for finding in context.findings}
+        return sorted(unique.values(), key=lambda finding: finding.line)
+
+def _child_frames(node: ast.AST, loops: tuple, scope: _Scope) -> List[tuple]:
+    """Stack frames for node's children, with the loops that repeat each of them."""
+    if isinstance(node, (ast.For, ast.AsyncFor)):
+        inner = loops + (node,)
+        return ([(node.target, inner, scope), (node.iter, loops, scope)]
+                + [(child, inner, scope) for child in node.body]
+                + [(child, loops, scope) for child in node.orelse])
+
+    if isinstance(node, ast.While):
+        inner = loops + (node,)
+        return ([(node.test, inner, scope)] + [(child, inner, scope) for child in node.body]
+                + [(child, loops, scope) for child in node.orelse])
+
+    if isinstance(node, _FUNCTIONS):
+        # Decorators and defaults run where the function is defined, the body on every call
+        body_scope = _Scope(node, scope)
+        for argument in node.args.posonlyargs + node.args.args + node.args.kwonlyargs:
+            kind = _annotation_kind(argument.annotation)
+            if kind is not None:
+                body_scope.kinds[argument.arg] = kind
+        outer = getattr(node, 'decorator_list', []) + node.args.defaults + [
+            default for default in node.args.kw_defaults if default is not None
+        ]
+        body = node.body if isinstance(node.body, list) else [node.body]
+        return [(child, loops, scope) for child in outer] + [(child, (), body_scope) for child in body]
+
+    if isinstance(node, _COMPREHENSIONS):
+        # Only the first iterable is evaluated once; everything else runs per item
+        inner = loops + (node,)
+        frames = []
+        for index, generator in enumerate(node.generators):
+            frames.append((generator.iter, loops if index == 0 else inner, scope))
+            frames.append((generator.target, inner, scope))
+            frames.extend((condition, inner, scope) for condition in generator.ifs)
+        elements = [node.key, node.value] if isinstance(node, ast.DictComp) else [node.elt]
+        return frames + [(element, inner, scope) for element in elements]
+
+    return [(child, loops, scope) for child in ast.iter_child_nodes(node)]
+
+_KIND_CONSTRUCTORS = {
+    'list': 'list', 'sorted': 'list', 'set': 'set', 'frozenset': 'set', 'dict': 'dict',
+    'defaultdict': 'dict', 'Counter': 'dict', 'OrderedDict': 'dict', 'str': 'str', 'deque': 'deque'
+}
+_ANNOTATION_KINDS = {
+    'list': 'list', 'List': 'list', 'set': 'set', 'Set': 'set', 'dict': 'dict', 'Dict': 'dict',
+    'str': 'str', 'deque': 'deque', 'Deque': 'deque'
+}
+
+def _value_kind(value: ast.AST, scope: _Scope) -> Optional[str]:
+    if isinstance(value, (ast.List, ast.ListComp)):
+        return 'list'
+    if isinstance(value, (ast.Set, ast.SetComp)):
+        return 'set'
+    if isinstance(value, (ast.Dict, ast.DictComp)):
+        return 'dict'
+    if isinstance(value, ast.JoinedStr) or (isinstance(value, ast.Constant) and isinstance(value.value, str)):
+        return 'str'
+    if isinstance(value, ast.Call):
+        func = value.func
+        name = func.id if isinstance(func, ast.Name) else func.attr if isinstance(func, ast.Attribute) else None
+        return _KIND_CONSTRUCTORS.get(name)
+    if isinstance(value, ast.Name):
+        return scope.kinds.get(value.id)
+    return None
+
+def _annotation_kind(annotation: Optional[ast.AST]) -> Optional[str]:
+    if isinstance(annotation, ast.Subscript):
+        annotation = annotation.value
+    if isinstance(annotation, ast.Attribute):
+        return _ANNOTATION_KINDS.get(annotation.attr)
+    if isinstance(annotation, ast.Name):
+        return _ANNOTATION_KINDS.get(annotation.id)
+    return None
+
+def _record_kinds(node: ast.AST, scope: _Scope):
+    """Track what kind of container or string each simple variable currently holds."""
+    if isinstance(node, ast.Assign):
+        kind = _value_kind(node.value, scope)
+        targets = [target.id for target in node.targets if isinstance(target, ast.Name)]
+    elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+        kind = _annotation_kind(node.annotation)
+        if kind is None and node.value is not None:
+            kind = _value_kind(node.value, scope)
+        targets = [node.target.id]
+    else:
+        return
+    for target in targets:
+        if kind is None:
+            scope.kinds.pop(target, None)
+        else:
+            scope.kinds[target] = kind
+
+def _dotted(node: ast.AST) -> Optional[str]:
+    """'a.b.c' for an attribute chain on a plain name, else None."""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return '.'.join(reversed(parts))
+
+def _assigned_names(target: ast.AST) -> Iterable[str]:
+    for node in ast.walk(target):
+        if isinstance(node, ast.Name):
+            yield node.id
+
+def _is_fixed_slice(window: ast.Slice) -> bool:
+    """Slices whose length doesn't grow with the input: xs[:3], xs[-2:], xs[i:i + 4]."""
+    lower, upper = window.lower, window.upper
+    if lower is None or upper is None:
+        bound = upper if lower is None else lower
+        # xs[:k] and xs[-k:] are short; xs[k:] copies almost everything
+        return (isinstance(bound, ast.Constant) and lower is None) or (
+            isinstance(bound, ast.UnaryOp) and isinstance(bound.op, ast.USub) and upper is None)
+    if isinstance(lower, ast.Constant) and isinstance(upper, ast.Constant):
+        return True
+    return (isinstance(upper, ast.BinOp) and isinstance(upper.op, ast.Add)
+            and isinstance(upper.right, ast.Constant) and ast.dump(upper.left) == ast.dump(lower))
+
+@register_rule
+class ListMembershipRule(Rule):
+    name = 'list-membership'
+    node_types = (ast.Compare,)
+
+    def visit(self, node: ast.Compare, context: ScanContext):
+        if not context.in_loop:
+            return
+        for op, comparator in zip(node.ops, node.comparators):
+            if (isinstance(op, (ast.In, ast.NotIn)) and isinstance(comparator, ast.Name)
+                    and context.kind(comparator.id) == 'list'):
+                context.report(self, node, f"membership test on list '{comparator.id}' inside a loop",
+                               LINEAR, f"Build a set from '{comparator.id}' once before the loop.")
+
+@register_rule
+class ListFrontRule(Rule):
+    name = 'list-front'
+    node_types = (ast.Call,)
+
+    def visit(self, node: ast.Call, context: ScanContext):
+        func = node.func
+        if not (context.in_loop and isinstance(func, ast.Attribute) and func.attr in ('pop', 'insert')):
+            return
+        first = node.args[0] if node.args else None
+        if not (isinstance(first, ast.Constant) and first.value == 0 and not isinstance(first.value, bool)):
+            return
+        if func.attr == 'pop' and len(node.args) != 1:
+            return
+        receiver = _dotted(func.value) or 'list'
+        if isinstance(func.value, ast.Name) and context.kind(func.value.id) not in (None, 'list'):
+            return
+        context.report(self, node, f"{receiver}.{func.attr}(0{', ...' if func.attr == 'insert' else ''}) "
+                       "shifts every element", LINEAR,
+                       "Use collections.deque with popleft()/appendleft().")
+
+@register_rule
+class StringConcatRule(Rule):
+    name = 'string-concat'
+    node_types = (ast.AugAssign,)
+
+    def visit(self, node: ast.AugAssign, context: ScanContext):
+        if (context.in_loop and isinstance(node.op, ast.Add) and isinstance(node.target, ast.Name)
+                and context.kind(node.target.id) == 'str'):
+            context.report(self, node, f"string '{node.target.id}' built with += inside a loop", LINEAR,
+                           "Collect the pieces in a list and ''.join() them after the loop.")
+
+@register_rule
+class SliceCopyRule(Rule):
+    name = 'slice-copy'
+    node_types = (ast.Subscript,)
+
+    def visit(self, node: ast.Subscript, context: ScanContext):
+        if (context.in_loop and isinstance(node.ctx, ast.Load) and isinstance(node.slice, ast.Slice)
+                and not _is_fixed_slice(node.slice)):
+            target = _dotted(node.value) or 'a sequence'
+            context.report(self, node, f"slice of {target} copies it on every iteration", LINEAR,
+                           "Iterate over indices, or use itertools.islice or memoryview.")
+
+@register_rule
+class SortInLoopRule(Rule):
+    name = 'sort-in-loop'
+    node_types = (ast.Call,)
+
+    def visit(self, node: ast.Call, context: ScanContext):
+        if not context.in_loop:
+            return
+        func = node.func
+        if isinstance(func, ast.Name) and func.id == 'sorted':
+            message = "sorted() called inside a loop"
+        elif isinstance(func, ast.Attribute) and func.attr == 'sort' and not node.args:
+            message = f"{_dotted(func.value) or 'list'}.sort() called inside a loop"
+        else:
+            return
+        context.report(self, node, message, LINEARITHMIC,
+                       "Sort once outside the loop, or keep the data ordered with bisect or heapq.")
+
+# Calls that change a container, so len() of it is not loop-invariant
+_MUTATING_METHODS = {
+    'append', 'appendleft', 'extend', 'extendleft', 'insert', 'pop', 'popleft', 'popitem',
+    'remove', 'discard', 'add', 'clear', 'update', 'setdefault'
+}
+
+@register_rule
+class LoopInvariantLookupRule(Rule):
+    """len() of an unchanged container, or a repeated a.b.c lookup, evaluated every iteration."""
+
+    name = 'loop-invariant-lookup'
+    node_types = (ast.For, ast.AsyncFor, ast.While, ast.Call, ast.Attribute,
+                  ast.Assign, ast.AugAssign, ast.AnnAssign, ast.NamedExpr, ast.Delete)
+
+    def __init__(self):
+        # Per loop: len() calls and attribute chains seen, and names it changes
+        self.lengths: Dict[int, Dict[str, ast.AST]] = {}
+        self.chains: Dict[int, Dict[str, List[ast.AST]]] = {}
+        self.changed: Dict[int, set] = {}
+
+    def visit(self, node: ast.AST, context: ScanContext):
+        if isinstance(node, (ast.For, ast.AsyncFor)):
+            self.changed.setdefault(id(node), set()).update(_assigned_names(node.target))
+            return
+        if isinstance(node, ast.While) or not context.in_loop:
+            return
+        loop = id(context.loops[-1])
+
+        if isinstance(node, ast.Call):
+            func = node.func
+            if (isinstance(func, ast.Name) and func.id == 'len' and len(node.args) == 1
+                    and isinstance(node.args[0], ast.Name)):
+                self.lengths.setdefault(loop, {}).setdefault(node.args[0].id, node)
+            elif isinstance(func, ast.Attribute) and func.attr in _MUTATING_METHODS:
+                self._change(context, _dotted(func.value))
+        elif isinstance(node, ast.Attribute):
+            chain = _dotted(node)
+            if isinstance(node.ctx, ast.Load) and chain is not None and chain.count('.') >= 2:
+                self.chains.setdefault(loop, {}).setdefault(chain, []).append(node)
+        elif isinstance(node, ast.Assign):
+            for target in node.targets:
+                self._change_target(context, target)
+        elif isinstance(node, ast.Delete):
+            for target in node.targets:
+                self._change_target(context, target)
+        else:
+            self._change_target(context, node.target)
+
+    def _change_target(self, context: ScanContext, target: ast.AST):
+        # x = ..., x[i] = ... and x.y = ... all count as changing x
+        while isinstance(target, (ast.Subscript, ast.Attribute)):
+            target = target.value
+        for name in _assigned_names(target):
+            self._change(context, name)
+
+    def _change(self, context: ScanContext, name: Optional[str]):
+        if name is None:
+            return
+        for loop in context.loops:
+            self.changed.setdefault(id(loop), set()).add(name.split('.')[0])
+
+    def leave(self, node: ast.AST, context: ScanContext):
+        changed = self.changed.pop(id(node), set())
+        depth = len(context.loops) + 1
+        for name, call in self.lengths.pop(id(node), {}).items():
+            if name not in changed:
+                context.report(self, call, f"len({name}) recomputed on every iteration although "
+                               f"'{name}' does not change in the loop", CONSTANT,
+                               f"Store len({name}) in a local before the loop.", loops=depth)
+
+        chains = self.chains.pop(id(node), {})
+        for chain, nodes in chains.items():
+            longer = any(other.startswith(chain + '.') for other in chains)
+            if len(nodes) >= 2 and not longer and chain.split('.')[0] not in changed:
+                context.report(self, nodes[0], f"'{chain}' looked up {len(nodes)} times per iteration",
+                               CONSTANT, f"Bind {chain} to a local before the loop.", loops=depth)
+
+@register_rule
+class UnmemoizedRecursionRule(Rule):
+    """Functions whose self-calls overlap, like fib(n - 1) + fib(n - 2), with nothing caching the results.
+
+    Only calls whose arguments do arithmetic on a parameter count: recursing
+    into node.left and node.right visits each node once and needs no memo.
+    Calls are counted along a single path, so one call in each branch of an
+    if is one call.
+    """
+
+    name = 'unmemoized-recursion'
+    node_types = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+    def leave(self, node: ast.AST, context: ScanContext):
+        def is_self_call(call: ast.Call) -> bool:
+            func = call.func
+            name = func.id if isinstance(func, ast.Name) else (
+                func.attr if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name)
+                and func.value.id in ('self', 'cls') else None)
+            return name == node.name and self._steps_parameter(call, node)
+
+        calls = _count_block(node.body, is_self_call)
+        if calls is None or calls < 2 or is_memoized(node, is_self_call):
+            return
+        context.report(self, node, f"'{node.name}' calls itself {calls} times on overlapping inputs "
+                       "without memoization", Cost(exp=2),
+                       "Cache results with functools.lru_cache, or rewrite it bottom-up.", loops=0)
+
+    @staticmethod
+    def _steps_parameter(call: ast.Call, function: ast.AST) -> bool:
+        parameters = {argument.arg for argument in function.args.posonlyargs + function.args.args}
+        for argument in call.args + [keyword.value for keyword in call.keywords]:
+            if (isinstance(argument, ast.BinOp) and isinstance(argument.op, (ast.Add, ast.Sub))
+                    and any(isinstance(operand, ast.Name) and operand.id in parameters
+                            for operand in (argument.left, argument.right))):
+                return True
+        return False
@@ -1,23 +1,41 @@
 import ast
+import sys
 from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
-@dataclass
+from .antipatterns import AntiPatternDetector, Finding
+from .call_graph import CallGraph
+
+# Records are slotted (no per-instance __dict__) and their names interned, since
+# repository-wide runs keep millions of them alive. to_dict() builds the JSON
+# shape directly; dataclasses.asdict deep-copies every field and is much slower.
+
+@dataclass(slots=True)
 class LoopInfo:
     type: str 
     line: int
     nested_level: int
     iterator_type: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {'type': self.type, 'line': self.line, 'nested_level': self.nested_level,
+                'iterator_type': self.iterator_type}
 
-@dataclass
+@dataclass(slots=True)
 class FunctionInfo:
     name: str
     line: int
     args_count: int
     has_recursion: bool = False
     calls_other_functions: List[str] = None
+    end_line: Optional[int] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {'name': self.name, 'line': self.line, 'args_count': self.args_count,
+                'has_recursion': self.has_recursion, 'calls_other_functions': list(self.calls_other_functions or []),
+                'end_line': self.end_line}
 
-@dataclass
+@dataclass(slots=True)
 class ASTAnalysis:
     loops: List[LoopInfo]
     functions: List[FunctionInfo]
@@ -25,132 +43,195 @@ class ASTAnalysis:
     recursive_calls: List[str]
     builtin_calls: List[str]
     data_structures: List[str]
+    findings: List[Finding] = field(default_factory=list)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """The analysis as plain JSON-compatible data (same shape as dataclasses.asdict)."""
+        return {
+            'loops': [loop.to_dict() for loop in self.loops],
+            'functions': [function.to_dict() for function in self.functions],
+            'max_nesting_level': self.max_nesting_level,
+            'recursive_calls': list(self.recursive_calls),
+            'builtin_calls': list(self.builtin_calls),
+            'data_structures': list(self.data_structures),
+            'findings': [finding.to_dict() for finding in self.findings]
+        }
 
-class ASTParser:    
-    def __init__(self):
-        self.current_nesting = 0
-        self.max_nesting = 0
-        self.loops = []
-        self.functions = []
-        self.recursive_calls = []
-        self.builtin_calls = []
-        self.data_structures = []
-        self.current_function = None
+class ASTParser:
+    """Extract loops, functions and calls from code.
+    
+    The parser holds no state between calls: each parse gets its own
+    _ParseState, so one instance can be shared by threads and asyncio tasks.
+    ``detector`` finds performance anti-patterns (default: all registered rules).
+    """
+    
+    def __init__(self, detector: Optional[AntiPatternDetector] = None):
+        self.detector = detector or AntiPatternDetector()
     
     def parse(self, code: str) -> ASTAnalysis:
-        self._reset()
-        
         try:
             tree = ast.parse(code)
-            self._analyze_node(tree)
-            
-            return ASTAnalysis(
-                loops=self.loops,
-                functions=self.functions,
-                max_nesting_level=self.max_nesting,
-                recursive_calls=self.recursive_calls,
-                builtin_calls=list(set(self.builtin_calls)),
-                data_structures=list(set(self.data_structures))
-            )
         except SyntaxError as e:
             raise ValueError(f"Invalid Python syntax: {e}")
+        
+        return self.analyze_tree(tree)
     
-    def _reset(self):
-        """Reset parserstat"""
-        self.current_nesting = 0
-        self.max_nesting = 0
-        self.loops = []
-        self.functions = []
-        self.recursive_calls = []
-        self.builtin_calls = []
-        self.data_structures = []
-        self.current_function = None
-    
-    def _analyze_node(self, node: ast.AST):
-        """Recursively analyze AST nodes"""
-        if isinstance(node, ast.For):
-            self._handle_for_loop(node)
-        elif isinstance(node, ast.While):
-            self._handle_while_loop(node)
-        elif isinstance(node, ast.FunctionDef):
-            self._handle_function_def(node)
-        elif isinstance(node, ast.Call):
-            self._handle_function_call(node)
-        elif isinstance(node, (ast.List, ast.Dict, ast.Set)):
-            self._handle_data_structure(node)
+    def analyze_tree(self, tree: ast.AST) -> ASTAnalysis:
+        """Analyze an already-parsed tree."""
+        state = _ParseState()
+        self._analyze_node(tree, state)
+        self._mark_mutual_recursion(tree, state)
         
-        for child in ast.iter_child_nodes(node):
-            self._analyze_node(child)
+        return ASTAnalysis(
+            loops=state.loops,
+            functions=state.functions,
+            max_nesting_level=state.max_nesting,
+            recursive_calls=state.recursive_calls,
+            builtin_calls=list(set(state.builtin_calls)),
+            data_structures=list(set(state.data_structures)),
+            findings=self.detector.scan(tree)
+        )
+    
+    def _mark_mutual_recursion(self, tree: ast.AST, state: '_ParseState'):
+        """Flag functions that reach themselves through other functions.
+
+        Functions are matched by qualified name, so same-named methods of
+        different classes don't merge into one cycle.
+        """
+        if len(state.functions) < 2:
+            return
+        graph = CallGraph(tree)
+        cyclic = {graph.functions[qualname].lineno
+                  for component in graph.components() if len(component) > 1 for qualname in component}
+        for function in state.functions:
+            if function.line in cyclic and not function.has_recursion:
+                function.has_recursion = True
+                state.recursive_calls.append(function.name)
     
-    def _handle_for_loop(self, node: ast.For):
-        self.current_nesting += 1
-        self.max_nesting = max(self.max_nesting, self.current_nesting)
+    def _analyze_node(self, root: ast.AST, state: '_ParseState'):
+        """Walk the tree with an explicit stack, visiting every node exactly once.
+        
+        Each stack entry is ``(node, nesting, function)`` where ``function`` is the
+        FunctionInfo of the enclosing function (or None), so traversal context
+        lives on the stack instead of in Python call frames.
+        """
+        stack = [(root, 0, None)]
+        
+        while stack:
+            node, nesting, function = stack.pop()
+            
+            if isinstance(node, FunctionInfo):
+                # Exit marker pushed under a function body: record it post-order
+                state.functions.append(node)
+                continue
+            
+            if isinstance(node, ast.For):
+                children = self._handle_for_loop(node, nesting, function, state)
+            elif isinstance(node, ast.While):
+                children = self._handle_while_loop(node, nesting, function, state)
+            elif isinstance(node, ast.FunctionDef):
+                children = self._handle_function_def(node, nesting, function)
+            else:
+                if isinstance(node, ast.Call):
+                    self._handle_function_call(node, function, state)
+                elif isinstance(node, (ast.List, ast.Dict, ast.Set)):
+                    self._handle_data_structure(node, state)
+                children = [(child, nesting, function) for child in ast.iter_child_nodes(node)]
+            
+            # Reversed so children are popped in source order
+            stack.extend(reversed(children))
+    
+    def _child_frames(self, node: ast.AST, body_nesting: int, body_function, nesting: int, function) -> list:
+        """Build stack frames for node's children, giving its body a separate context."""
+        body = {id(child) for child in node.body}
+        return [
+            (child, body_nesting, body_function) if id(child) in body else (child, nesting, function)
+            for child in ast.iter_child_nodes(node)
+        ]
+    
+    def _handle_for_loop(self, node: ast.For, nesting: int, function, state: '_ParseState') -> list:
+        body_nesting = nesting + 1
+        state.max_nesting = max(state.max_nesting, body_nesting)
         
         iterator_type = None
         if isinstance(node.iter, ast.Call) and isinstance(node.iter.func, ast.Name):
-            iterator_type = node.iter.func.id
+            iterator_type = sys.intern(node.iter.func.id)
         
-        self.loops.append(LoopInfo(
+        state.loops.append(LoopInfo(
             type='for',
             line=node.lineno,
-            nested_level=self.current_nesting,
+            nested_level=body_nesting,
             iterator_type=iterator_type
         ))
         
-        for child in node.body:
-            self._analyze_node(child)
-        
-        self.current_nesting -= 1
+        # Target, iterable and else-clause run once per loop, not per iteration
+        return self._child_frames(node, body_nesting, function, nesting, function)
     
-    def _handle_while_loop(self, node: ast.While):
-        self.current_nesting += 1
-        self.max_nesting = max(self.max_nesting, self.current_nesting)
+    def _handle_while_loop(self, node: ast.While, nesting: int, function, state: '_ParseState') -> list:
+        body_nesting = nesting + 1
+        state.max_nesting = max(state.max_nesting, body_nesting)
         
-        self.loops.append(LoopInfo(
+        state.loops.append(LoopInfo(
             type='while',
             line=node.lineno,
-            nested_level=self.current_nesting
+            nested_level=body_nesting
         ))
         
-        for child in node.body:
-            self._analyze_node(child)
-        
-        self.current_nesting -= 1
+        return self._child_frames(node, body_nesting, function, nesting, function)
     
-    def _handle_function_def(self, node: ast.FunctionDef):
-        prev_function = self.current_function
-        self.current_function = node.name
-        
+    def _handle_function_def(self, node: ast.FunctionDef, nesting: int, function) -> list:
         function_info = FunctionInfo(
-            name=node.name,
+            name=sys.intern(node.name),
             line=node.lineno,
             args_count=len(node.args.args),
-            calls_other_functions=[]
+            calls_other_functions=[],
+            end_line=node.end_lineno
         )
         
-        for child in node.body:
-            self._analyze_node(child)
-        
-        self.functions.append(function_info)
-        self.current_function = prev_function
+        # Decorators, defaults and annotations belong to the enclosing scope
+        children = self._child_frames(node, nesting, function_info, nesting, function)
+        children.append((function_info, nesting, function))
+        return children
     
-    def _handle_function_call(self, node: ast.Call):
+    def _handle_function_call(self, node: ast.Call, function, state: '_ParseState'):
+        # Method calls on self/cls are recorded by method name
+        if (function is not None and isinstance(node.func, ast.Attribute)
+                and isinstance(node.func.value, ast.Name) and node.func.value.id in ('self', 'cls')
+                and node.func.attr not in function.calls_other_functions):
+            function.calls_other_functions.append(sys.intern(node.func.attr))
+        
         if isinstance(node.func, ast.Name):
-            func_name = node.func.id
+            func_name = sys.intern(node.func.id)
             
-            # Check forrecursion
-            if self.current_function and func_name == self.current_function:
-                self.recursive_calls.append(func_name)
+            # Check for recursion
+            if function is not None and func_name == function.name:
+                function.has_recursion = True
+                state.recursive_calls.append(func_name)
+            elif function is not None and func_name not in function.calls_other_functions:
+                function.calls_other_functions.append(func_name)
             
             # Track common builtin functions that affect complexity
             if func_name in ['sorted', 'max', 'min', 'sum', 'len', 'range']:
-                self.builtin_calls.append(func_name)
+                state.builtin_calls.append(func_name)
     
-    def _handle_data_structure(self, node: ast.AST):
+    def _handle_data_structure(self, node: ast.AST, state: '_ParseState'):
         """Handle data structure creation."""
         if isinstance(node, ast.List):
-            self.data_structures.append('list')
+            state.data_structures.append('list')
         elif isinstance(node, ast.Dict):
-            self.data_structures.append('dict')
+            state.data_structures.append('dict')
         elif isinstance(node, ast.Set):
-            self.data_structures.append('set') 
\ No newline at end of file
+            state.data_structures.append('set')
+
+class _ParseState:
+    """Mutable bookkeeping while analyzing one tree."""
+    
+    __slots__ = ('max_nesting', 'loops', 'functions', 'recursive_calls', 'builtin_calls', 'data_structures')
+    
+    def __init__(self):
+        self.max_nesting = 0
+        self.loops: List[LoopInfo] = []
+        self.functions: List[FunctionInfo] = []
+        self.recursive_calls: List[str] = []
+        self.builtin_calls: List[str] = []
+        self.data_structures: List[str] = []
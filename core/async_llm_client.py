@@ -0,0 +1,78 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import Config
+from .llm_client import LLMClient
+from .prompt_builder import merge_chunk_results
+from .rate_limit import RetryPolicy, TokenBucket, is_retryable_error
+from .tracing import span
+
+class AsyncLLMClient(LLMClient):
+    """LLMClient with coroutine variants built on the backend's async generation API.
+
+    The ``*_async`` methods are capped by a semaphore, paced by a token
+    bucket, retried with jittered exponential backoff on transient errors and
+    bounded by a per-request timeout. The inherited blocking methods keep
+    working as in LLMClient.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, max_concurrency: Optional[int] = None,
+                 rate_limit: Optional[float] = None, timeout: Optional[float] = None,
+                 retry_policy: Optional[RetryPolicy] = None, model: Optional[Any] = None,
+                 backend: Optional[str] = None):
+        super().__init__(api_key, model, backend, retry_policy)
+
+        self.timeout = timeout or Config.LLM_REQUEST_TIMEOUT
+        self._semaphore = asyncio.Semaphore(max_concurrency or Config.LLM_CONCURRENCY)
+        self._bucket = TokenBucket(rate_limit or Config.LLM_RATE_LIMIT)
+
+        self.retries = 0
+
+    async def analyze_complexity_async(self, code: str, ast_analysis: Dict[str, Any]) -> Dict[str, Any]:
+
+        with span('llm.analyze'):
+            chunks = self._plan(code, ast_analysis)
+            results = await asyncio.gather(*(self._analyze_prompt_async(self._render_chunk(chunk)) for chunk in chunks))
+            return results[0] if len(results) == 1 else merge_chunk_results(chunks, list(results))
+
+    async def _analyze_prompt_async(self, prompt: str) -> Dict[str, Any]:
+
+        with span('llm.call') as stage:
+            attempt = 0
+            while True:
+                try:
+                    text = await self._generate(prompt)
+                    stage.set(retries=attempt)
+                    return self._parse_llm_response(text)
+                except Exception as e:
+                    if attempt >= self.retry_policy.max_retries or not is_retryable_error(e):
+                        stage.set(retries=attempt, error=type(e).__name__)
+                        return {
+                            'error': f'LLM analysis failed after {attempt + 1} attempt(s): {str(e) or type(e).__name__}',
+                            'time_complexity': 'Unknown',
+                            'space_complexity': 'Unknown',
+                            'confidence': 0.0
+                        }
+
+                # Back off outside the semaphore so waiting requests don't hold a slot
+                with span('llm.backoff', attempt=attempt):
+                    await asyncio.sleep(self.retry_policy.delay(attempt))
+                attempt += 1
+                self.retries += 1
+
+    async def analyze_many(self, requests: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Analyze several (code, ast_analysis) pairs concurrently, preserving order."""
+        return await asyncio.gather(*(self.analyze_complexity_async(code, ast) for code, ast in requests))
+
+    async def _generate(self, prompt: str) -> str:
+        async with self._semaphore:
+            with span('llm.rate_limit'):
+                await self._bucket.acquire()
+            with span('llm.generate', prompt_chars=len(prompt)) as stage:
+                response = await asyncio.wait_for(
+                    self.model.generate_content_async(prompt),
+                    timeout=self.timeout
+                )
+                text = response.text
+                stage.set(response_chars=len(text), **self._record_usage(prompt, response, text))
+            return text
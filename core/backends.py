@@ -0,0 +1,217 @@
+import importlib
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from config import Config
+
+class Backend(ABC):
+    """Interface between LLMClient and a model provider.
+
+    It mirrors the part of the Gemini SDK's GenerativeModel the clients use:
+    ``generate_content(prompt)`` returns a response with ``text`` and
+    optionally ``usage_metadata``; with ``stream=True`` the response iterates
+    over chunks with ``text``. Retries, caching, batching and prompt
+    budgeting live in the clients and the analyzer, so a backend only has
+    to turn one prompt into one response.
+    """
+
+    name = ''
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    @classmethod
+    @abstractmethod
+    def from_config(cls, api_key: Optional[str] = None) -> 'Backend':
+        """The backend as configured in Config, with ``api_key`` overriding the configured key."""
+
+    @classmethod
+    @abstractmethod
+    def configured_model(cls) -> str:
+        """Model name the backend would use per Config; part of result cache keys."""
+
+    @abstractmethod
+    def generate_content(self, prompt: str, stream: bool = False) -> Any:
+        """Turn one prompt into one response."""
+
+    async def generate_content_async(self, prompt: str) -> Any:
+        # Blocking backends run in a worker thread; the async client still caps concurrency
+        import asyncio
+        return await asyncio.to_thread(self.generate_content, prompt)
+
+# Backends are named by import path and loaded on first use, so choosing
+# one never imports another's SDK.
+_BACKENDS: Dict[str, Union[str, type]] = {
+    'gemini': '.backends:GeminiBackend',
+    'local': '.backends:LocalHTTPBackend',
+    'fake': '.fake_model:FakeModel',
+}
+
+def register_backend(name: str, backend: Union[str, type]):
+    """Make a Backend subclass, or a ``module:Class`` path to one, selectable as ``name``."""
+    _BACKENDS[name] = backend
+
+def available_backends() -> List[str]:
+    return sorted(_BACKENDS)
+
+def backend_class(name: Optional[str] = None) -> type:
+    name = name or Config.LLM_BACKEND
+    backend = _BACKENDS.get(name)
+    if backend is None:
+        raise ValueError(f"Unknown LLM backend: {name} (available: {', '.join(available_backends())})")
+    if isinstance(backend, str):
+        module, _, attribute = backend.partition(':')
+        backend = _BACKENDS[name] = getattr(importlib.import_module(module, __package__), attribute)
+    return backend
+
+def create_backend(name: Optional[str] = None, api_key: Optional[str] = None) -> Backend:
+    return backend_class(name).from_config(api_key)
+
+def backend_model_id(name: Optional[str] = None) -> str:
+    """Identify the configured model of a backend without creating it."""
+    return backend_class(name).configured_model()
+
+class GeminiBackend(Backend):
+    """Google Gemini through the google-generativeai SDK."""
+
+    name = 'gemini'
+
+    def __init__(self, api_key: str, model_name: Optional[str] = None):
+        super().__init__(model_name or Config.GEMINI_MODEL)
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY is required")
+
+        # Imported here so static-only and offline runs never load the SDK
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self._model = genai.GenerativeModel(self.model_name)
+
+    @classmethod
+    def from_config(cls, api_key: Optional[str] = None) -> 'GeminiBackend':
+        return cls(api_key or Config.GEMINI_API_KEY)
+
+    @classmethod
+    def configured_model(cls) -> str:
+        return Config.GEMINI_MODEL
+
+    def generate_content(self, prompt: str, stream: bool = False) -> Any:
+        return self._model.generate_content(prompt, stream=stream)
+
+    async def generate_content_async(self, prompt: str) -> Any:
+        return await self._model.generate_content_async(prompt)
+
+class HTTPStatusError(Exception):
+    """Non-2xx answer from an HTTP backend; ``code`` lets the retry policy classify it."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(f"HTTP {code}: {message}")
+        self.code = code
+
+class _Usage:
+    __slots__ = ('prompt_token_count', 'candidates_token_count')
+
+    def __init__(self, usage: Optional[Dict[str, Any]]):
+        usage = usage or {}
+        self.prompt_token_count = usage.get('prompt_tokens', 0)
+        self.candidates_token_count = usage.get('completion_tokens', 0)
+
+class _Completion:
+    __slots__ = ('text', 'usage_metadata')
+
+    def __init__(self, text: str, usage_metadata: _Usage):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+class _EventStream:
+    """A streamed chat completion, read as server-sent events."""
+
+    def __init__(self, response):
+        self._response = response
+        self.usage_metadata = None
+
+    def __iter__(self) -> Iterator[_Completion]:
+        try:
+            for line in self._response:
+                line = line.strip()
+                if not line.startswith(b'data:'):
+                    continue
+                data = line[5:].strip()
+                if data == b'[DONE]':
+                    break
+                event = json.loads(data)
+                if event.get('usage'):
+                    self.usage_metadata = _Usage(event['usage'])
+                for choice in event.get('choices', []):
+                    text = (choice.get('delta') or {}).get('content')
+                    if text:
+                        yield _Completion(text, None)
+        finally:
+            self._response.close()
+
+    @property
+    def _iterator(self):
+        # LLMClient stops fast-verdict streams through response._iterator.cancel()
+        return self
+
+    def cancel(self):
+        self._response.close()
+
+class LocalHTTPBackend(Backend):
+    """A self-hosted server speaking the OpenAI chat completions API (vLLM, llama.cpp, Ollama, ...).
+
+    ``base_url`` is the API root, e.g. ``http://localhost:8000/v1``.
+    """
+
+    name = 'local'
+
+    def __init__(self, base_url: str, model_name: str, api_key: Optional[str] = None,
+                 timeout: Optional[float] = None):
+        super().__init__(model_name)
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.timeout = timeout or Config.LLM_REQUEST_TIMEOUT
+
+    @classmethod
+    def from_config(cls, api_key: Optional[str] = None) -> 'LocalHTTPBackend':
+        return cls(Config.LOCAL_LLM_URL, Config.LOCAL_LLM_MODEL, api_key or Config.LOCAL_LLM_API_KEY)
+
+    @classmethod
+    def configured_model(cls) -> str:
+        return f"local/{Config.LOCAL_LLM_MODEL}"
+
+    def generate_content(self, prompt: str, stream: bool = False) -> Any:
+        response = self._post({
+            'model': self.model_name,
+            'messages': [{'role': 'user', 'content': prompt}],
+            'temperature': 0,
+            'stream': stream
+        })
+        if stream:
+            return _EventStream(response)
+
+        with response:
+            body = json.loads(response.read())
+        choices = body.get('choices') or [{}]
+        text = (choices[0].get('message') or {}).get('content') or ''
+        return _Completion(text, _Usage(body.get('usage')))
+
+    def _post(self, payload: Dict[str, Any]):
+        from urllib.error import HTTPError, URLError
+        from urllib.request import Request, urlopen
+
+        headers = {'Content-Type': 'application/json'}
+        if self.api_key:
+            headers['Authorization'] = f"Bearer {self.api_key}"
+        request = Request(f"{self.base_url}/chat/completions", data=json.dumps(payload).encode('utf-8'),
+                          headers=headers, method='POST')
+        try:
+            return urlopen(request, timeout=self.timeout)
+        except HTTPError as e:
+            raise HTTPStatusError(e.code, e.read().decode('utf-8', 'replace')[:200] or e.reason)
+        except URLError as e:
+            # Unreachable servers are transient as far as the retry policy is concerned
+            if isinstance(e.reason, TimeoutError):
+                raise e.reason
+            raise ConnectionError(f"Cannot reach {self.base_url}: {e.reason}")
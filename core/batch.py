@@ -0,0 +1,268 @@
+import ast
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from config import Config
+from .ast_parser import ASTParser, ASTAnalysis
+from .cache import ast_fingerprint
+from .static_estimator import StaticEstimator
+
+EXCLUDED_DIRS = {
+    '__pycache__', '.git', '.hg', '.svn', '.tox', '.nox', '.venv', 'venv',
+    'node_modules', 'build', 'dist', '.mypy_cache', '.pytest_cache', '.ruff_cache'
+}
+
+@dataclass
+class AnalysisUnit:
+    path: str
+    name: str
+    line: int
+    end_line: int
+    code: str
+    ast_analysis: Optional[ASTAnalysis] = None
+    static_analysis: Optional[Dict[str, Any]] = None
+    fingerprint: Optional[str] = None
+
+    @property
+    def callees(self) -> List[str]:
+        """Names of the functions and self/cls methods this unit calls."""
+        names = []
+        for function in self.ast_analysis.functions if self.ast_analysis else []:
+            names.extend(n for n in function.calls_other_functions or [] if n not in names)
+        return names
+
+def discover_python_files(paths: Iterable[str]) -> List[str]:
+    """Expand files and directories into a sorted list of .py files."""
+
+    files = []
+    for path in paths:
+        if os.path.isfile(path):
+            if path.endswith('.py'):
+                files.append(path)
+            continue
+
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames[:] = sorted(
+                d for d in dirnames
+                if d not in EXCLUDED_DIRS and not d.startswith('.') and not d.endswith('.egg-info')
+            )
+            files.extend(os.path.join(dirpath, f) for f in sorted(filenames) if f.endswith('.py'))
+
+    return files
+
+def split_units(path: str, source: str) -> List[AnalysisUnit]:
+    """Split a module into one unit per top-level function or method.
+
+    Nested functions stay part of their enclosing unit. A module without any
+    functions becomes a single ``<module>`` unit.
+    """
+
+    tree = ast.parse(source, filename=path)
+    parser = ASTParser()
+    estimator = StaticEstimator()
+    functions = sorted(parser.analyze_tree(tree).functions, key=lambda f: f.line)
+    # Costed once per module so calls between units resolve to their callee's cost
+    summaries = estimator.summarize(tree)
+
+    class_ranges = [
+        (node.lineno, node.end_lineno, node.name)
+        for node in tree.body if isinstance(node, ast.ClassDef)
+    ]
+    nodes = {node.lineno: node for node in ast.walk(tree) if isinstance(node, ast.FunctionDef)}
+    lines = source.splitlines(keepends=True)
+
+    units = []
+    last_end = 0
+    for function in functions:
+        if function.line <= last_end:
+            continue
+        last_end = function.end_line
+
+        name, prefix = function.name, ''
+        for start, end, class_name in class_ranges:
+            if start <= function.line <= end:
+                name, prefix = f"{class_name}.{function.name}", class_name
+                break
+
+        node = nodes[function.line]
+        units.append(AnalysisUnit(
+            path=path,
+            name=name,
+            line=function.line,
+            end_line=function.end_line,
+            code=_outdent(lines[function.line - 1:function.end_line], node.col_offset),
+            # Analyze the subtree directly: method source is not always
+            # parseable on its own (e.g. multi-line strings at column 0)
+            ast_analysis=parser.analyze_tree(node),
+            static_analysis=estimator.estimate(node, summaries, prefix),
+            fingerprint=ast_fingerprint(node)
+        ))
+
+    if not units and source.strip():
+        units.append(AnalysisUnit(
+            path=path,
+            name='<module>',
+            line=1,
+            end_line=len(lines),
+            code=source,
+            ast_analysis=parser.analyze_tree(tree),
+            static_analysis=estimator.estimate(tree, summaries),
+            fingerprint=ast_fingerprint(tree)
+        ))
+
+    return units
+
+def numbered_names(units: Iterable[AnalysisUnit]) -> Dict[int, str]:
+    """Unit names that are unique within their file, keyed by ``id(unit)``.
+
+    Redefinitions (e.g. property setters) get a numbered name: ``name#2``,
+    ``name#3`` in source order.
+    """
+
+    taken = set()
+    names = {}
+    for unit in sorted(units, key=lambda unit: (unit.path, unit.line)):
+        name = unit.name
+        suffix = 2
+        while (unit.path, name) in taken:
+            name = f'{unit.name}#{suffix}'
+            suffix += 1
+        taken.add((unit.path, name))
+        names[id(unit)] = name
+    return names
+
+def _outdent(lines: List[str], width: int) -> str:
+    """Strip up to ``width`` columns of leading whitespace from every line."""
+
+    return ''.join(
+        line[min(width, len(line) - len(line.lstrip(' \t'))):] for line in lines
+    )
+
+def extract_units(path: str) -> List[AnalysisUnit]:
+    """Read and split a file. Runs inside the parsing worker processes."""
+
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    return split_units(path, source)
+
+class BatchAnalyzer:
+    """Analyze many files, parsing across processes and calling the LLM from a bounded thread pool."""
+
+    def __init__(self, analyzer, jobs: Optional[int] = None, llm_concurrency: Optional[int] = None,
+                 batch_size: Optional[int] = None, progress: Optional[Callable[[int, int], None]] = None):
+        self.analyzer = analyzer
+        self.jobs = jobs or os.cpu_count() or 1
+        self.llm_concurrency = llm_concurrency or Config.LLM_CONCURRENCY
+        self.batch_size = batch_size or Config.BATCH_MAX_ITEMS
+        self.progress = progress
+
+        self.total_units = 0
+        self.completed_units = 0
+        self.failed_units = 0
+
+    def run(self, paths: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """Yield one result record per unit as soon as its analysis finishes.
+
+        Units from different files are packed into groups of ``batch_size``
+        that share one batched LLM prompt. Failures (unreadable files, syntax
+        errors, LLM errors) are yielded as records with an ``error`` key
+        instead of aborting the batch.
+        """
+
+        files = discover_python_files(paths)
+
+        with ProcessPoolExecutor(max_workers=self.jobs) as parse_pool, \
+                ThreadPoolExecutor(max_workers=self.llm_concurrency) as llm_pool:
+            pending = {parse_pool.submit(extract_units, path): path for path in files}
+            parsing = len(pending)
+            ready: List[AnalysisUnit] = []
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    item = pending.pop(future)
+
+                    if isinstance(item, list):
+                        yield from self._finish_group(item, future)
+                        continue
+
+                    parsing -= 1
+                    try:
+                        units = future.result()
+                    except Exception as e:
+                        self.total_units += 1
+                        yield self._record_failure(item, None, f'Parsing failed: {e}')
+                        continue
+
+                    self.total_units += len(units)
+                    self._report_progress()
+                    ready.extend(units)
+
+                # Submit full groups right away; flush the remainder once parsing is done
+                while len(ready) >= self.batch_size or (ready and not parsing):
+                    group, ready = ready[:self.batch_size], ready[self.batch_size:]
+                    pending[self._submit_group(llm_pool, group)] = group
+
+    def analyze_units(self, units: List[AnalysisUnit]) -> Iterator[Dict[str, Any]]:
+        """Yield one result record per already-parsed unit as its analysis finishes."""
+
+        with ThreadPoolExecutor(max_workers=self.llm_concurrency) as llm_pool:
+            pending = {}
+            for start in range(0, len(units), self.batch_size):
+                group = units[start:start + self.batch_size]
+                pending[self._submit_group(llm_pool, group)] = group
+
+            for future in as_completed(pending):
+                yield from self._finish_group(pending[future], future)
+
+    def _submit_group(self, llm_pool: ThreadPoolExecutor, group: List[AnalysisUnit]):
+        if len(group) == 1:
+            unit = group[0]
+            return llm_pool.submit(self.analyzer.analyze, unit.code, unit.ast_analysis, unit.static_analysis)
+        return llm_pool.submit(
+            self.analyzer.analyze_many,
+            [unit.code for unit in group],
+            [unit.ast_analysis for unit in group],
+            [unit.static_analysis for unit in group]
+        )
+
+    def _finish_group(self, group: List[AnalysisUnit], future) -> Iterator[Dict[str, Any]]:
+        try:
+            results = future.result()
+        except Exception as e:
+            for unit in group:
+                yield self._record_failure(unit.path, unit, f'Analysis failed: {e}')
+            return
+
+        if len(group) == 1:
+            results = [results]
+
+        for unit, result in zip(group, results):
+            if result.get('error'):
+                yield self._record_failure(unit.path, unit, result['error'])
+                continue
+
+            self.completed_units += 1
+            self._report_progress()
+            yield {**self._unit_fields(unit.path, unit), **result}
+
+    def _record_failure(self, path: str, unit: Optional[AnalysisUnit], error: str) -> Dict[str, Any]:
+        self.completed_units += 1
+        self.failed_units += 1
+        self._report_progress()
+        return {**self._unit_fields(path, unit), 'error': error}
+
+    def _unit_fields(self, path: str, unit: Optional[AnalysisUnit]) -> Dict[str, Any]:
+        return {
+            'file': path,
+            'name': unit.name if unit else None,
+            'line': unit.line if unit else None,
+            'end_line': unit.end_line if unit else None
+        }
+
+    def _report_progress(self):
+        if self.progress is not None:
+            self.progress(self.completed_units, self.total_units)
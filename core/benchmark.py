@@ -0,0 +1,222 @@
+import json
+import os
+import subprocess
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from config import Config
+from .bigo import equivalent
+from .complexity_analyzer import ComplexityAnalyzer
+
+# ast: static estimate only; llm: the model on its own; combined: the full
+# analyzer with its confidence gate, result cache and combination rules
+PATHS = ('ast', 'llm', 'combined')
+
+@dataclass
+class CaseResult:
+    name: str
+    category: str
+    expected: str
+    actual: Optional[str]
+    correct: bool
+    latency: float  # seconds
+    error: Optional[str] = None
+
+class AccuracyBenchmark:
+    """Measure accuracy and speed of each analysis path on a labeled corpus.
+
+    ``corpus`` maps names to SAMPLE_CODES-style entries with a ``category``.
+    ``make_client`` returns a fresh LLMClient; each LLM path gets its own so
+    calls and tokens are counted per path. The combined path runs ``passes``
+    times over a result cache (a throwaway one unless ``cache_dir`` is
+    given), so later passes show warm-cache latency and the hit rate.
+    """
+
+    def __init__(self, corpus: Dict[str, Dict[str, str]], make_client: Optional[Callable[[], Any]] = None,
+                 model_name: str = 'fake', cache_dir: Optional[str] = None, passes: int = 2):
+        self.corpus = corpus
+        self.make_client = make_client
+        self.model_name = model_name
+        self.cache_dir = cache_dir
+        self.passes = max(1, passes)
+
+    def run(self, paths=PATHS) -> Dict[str, Any]:
+        unknown = set(paths) - set(PATHS)
+        if unknown:
+            raise ValueError(f"Unknown benchmark path(s): {', '.join(sorted(unknown))}")
+        if self.make_client is None and set(paths) & {'llm', 'combined'}:
+            raise ValueError("The llm and combined paths need a model")
+
+        from .llm_client import PROMPT_VERSION
+
+        report = {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': _current_commit(),
+            'model': self.model_name,
+            'prompt_version': PROMPT_VERSION,
+            'corpus_size': len(self.corpus),
+            'paths': {}
+        }
+        for path in PATHS:
+            if path in paths:
+                report['paths'][path] = getattr(self, f'_run_{path}')()
+        return report
+
+    def _run_ast(self) -> Dict[str, Any]:
+        analyzer = ComplexityAnalyzer(offline=True)
+        results = [self._timed(name, sample, lambda code: _final_time(analyzer.analyze(code)))
+                   for name, sample in self.corpus.items()]
+        return _summarize(results)
+
+    def _run_llm(self) -> Dict[str, Any]:
+        client = self.make_client()
+        parser = ComplexityAnalyzer(offline=True).ast_parser
+
+        def analyze(code):
+            # Parse outside the timed call so only the model round trip is measured
+            ast_dict = parser.parse(code).to_dict()
+            start = time.perf_counter()
+            llm_analysis = client.analyze_complexity(code, ast_dict)
+            return llm_analysis.get('time_complexity'), llm_analysis.get('error'), time.perf_counter() - start
+
+        results = []
+        for name, sample in self.corpus.items():
+            actual, error, latency = analyze(sample['code'])
+            results.append(_case(name, sample, actual, latency, error))
+        return dict(_summarize(results), **_usage(client))
+
+    def _run_combined(self) -> Dict[str, Any]:
+        from .cache import ResultCache
+        from .llm_client import PROMPT_VERSION
+
+        with tempfile.TemporaryDirectory(prefix='complexity-bench-') as scratch:
+            # Keyed by model name so fake answers never land in the real cache
+            cache = ResultCache(self.cache_dir or scratch, model=self.model_name, prompt_version=PROMPT_VERSION)
+            client = self.make_client()
+            analyzer = ComplexityAnalyzer(cache=cache, llm_client=client)
+
+            passes = []
+            for _ in range(self.passes):
+                passes.append([self._timed(name, sample, lambda code: _final_time(analyzer.analyze(code)))
+                               for name, sample in self.corpus.items()])
+            cache_stats = cache.stats()
+            cache.close()
+
+        summary = dict(_summarize(passes[0]), **_usage(client))
+        summary['cache_hit_rate'] = cache_stats['hit_rate']
+        if len(passes) > 1:
+            summary['warm_latency_ms'] = _latency_summary([r.latency for run in passes[1:] for r in run])
+        return summary
+
+    def _timed(self, name: str, sample: Dict[str, str], analyze) -> CaseResult:
+        start = time.perf_counter()
+        try:
+            actual, error = analyze(sample['code'])
+        except Exception as e:
+            actual, error = None, str(e)
+        return _case(name, sample, actual, time.perf_counter() - start, error)
+
+def _final_time(result: Dict[str, Any]):
+    final = result.get('final_analysis') or {}
+    return final.get('time_complexity'), result.get('error')
+
+def _case(name: str, sample: Dict[str, str], actual: Optional[str], latency: float,
+          error: Optional[str]) -> CaseResult:
+    expected = sample['expected_complexity']
+    correct = actual is not None and error is None and equivalent(actual, expected)
+    return CaseResult(name, sample.get('category', 'other'), expected, actual, correct, latency, error)
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of values (q in 0..100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+def _latency_summary(latencies: List[float]) -> Dict[str, float]:
+    return {
+        'p50': round(percentile(latencies, 50) * 1000, 3),
+        'p90': round(percentile(latencies, 90) * 1000, 3),
+        'p99': round(percentile(latencies, 99) * 1000, 3),
+        'mean': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0
+    }
+
+def _summarize(results: List[CaseResult]) -> Dict[str, Any]:
+    by_category = defaultdict(list)
+    for result in results:
+        by_category[result.category].append(result.correct)
+
+    correct = sum(result.correct for result in results)
+    return {
+        'cases': len(results),
+        'correct': correct,
+        'accuracy': round(correct / len(results), 4) if results else 0.0,
+        'by_category': {
+            category: round(sum(hits) / len(hits), 4) for category, hits in sorted(by_category.items())
+        },
+        'errors': sum(result.error is not None for result in results),
+        'latency_ms': _latency_summary([result.latency for result in results]),
+        'misses': [
+            {'name': result.name, 'expected': result.expected, 'actual': result.actual, 'error': result.error}
+            for result in results if not result.correct
+        ]
+    }
+
+def _usage(client) -> Dict[str, int]:
+    usage = client.usage()
+    return {
+        'llm_calls': usage['calls'],
+        'prompt_tokens': usage['prompt_tokens'],
+        'response_tokens': usage['response_tokens']
+    }
+
+def _current_commit() -> Optional[str]:
+    try:
+        completed = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.decode('utf-8', 'replace').strip() or None
+
+def load_history(path: Optional[str] = None) -> List[Dict[str, Any]]:
+    path = path or Config.BENCH_HISTORY_PATH
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def append_history(report: Dict[str, Any], path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Add a run to the history file and return the previous run with the same model, if any."""
+    path = path or Config.BENCH_HISTORY_PATH
+    history = load_history(path)
+    previous = next((run for run in reversed(history) if run.get('model') == report['model']), None)
+
+    history.append(report)
+    temporary = f"{path}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=1, ensure_ascii=False)
+    os.replace(temporary, path)
+    return previous
+
+def compare_runs(previous: Optional[Dict[str, Any]], current: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Per path: accuracy change since previous, and which cases started or stopped failing."""
+    if previous is None:
+        return {}
+
+    deltas = {}
+    for path, metrics in current['paths'].items():
+        before = previous.get('paths', {}).get(path)
+        if before is None:
+            continue
+        missed_before = {miss['name'] for miss in before.get('misses', [])}
+        missed_now = {miss['name'] for miss in metrics['misses']}
+        deltas[path] = {
+            'accuracy_delta': round(metrics['accuracy'] - before['accuracy'], 4),
+            'new_misses': sorted(missed_now - missed_before),
+            'fixed': sorted(missed_before - missed_now)
+        }
+    return deltas
@@ -0,0 +1,447 @@
+import math
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+from .cost import SUPERSCRIPTS, Cost
+
+class Growth(NamedTuple):
+    """Growth in one variable: (n!)^fact * exp^n * n^poly * log(n)^log.
+
+    Like Cost, exp 0 means no exponential factor and tuple order matches
+    asymptotic order.
+    """
+    fact: float = 0
+    exp: float = 0
+    poly: float = 0
+    log: float = 0
+
+NO_GROWTH = Growth()
+
+# A product of per-variable growths, as sorted (variable, Growth) pairs
+Term = Tuple[Tuple[str, Growth], ...]
+
+SUPERSCRIPT_DIGITS = str.maketrans('⁰¹²³⁴⁵⁶⁷⁸⁹', '0123456789')
+TOKEN = re.compile(r'\s*(?:(\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)|([A-Za-z_][A-Za-z_0-9]*)|(\^[⁰¹²³⁴⁵⁶⁷⁸⁹]+|[⁰¹²³⁴⁵⁶⁷⁸⁹]+)|(\*\*|[-+*/^()!√]))')
+# log, lg, ln and logarithms with a base (log2, log_2) differ only by a constant
+LOG_NAME = re.compile(r'(?:log|lg|ln)(?:_?\d+)?')
+GLUED_LOG = re.compile(r'^([a-z]?)log([a-z]?)$')
+# Single-letter size variables that are often written without a separator, as in O(mn) or O(VE)
+GLUED_SIZES = re.compile(r'[nmkveNMKVE]{2,}')
+
+# Larger constants are clamped, which keeps floats finite and O(constant) = O(1);
+# growing terms with a larger base or exponent are rejected
+MAX_CONSTANT = 1e100
+# 170! is the largest factorial a float can hold
+MAX_FACTORIAL = 170
+
+def _term_key(term: Term) -> tuple:
+    """Sort key putting the fastest-growing terms first."""
+    return sorted((growth for _, growth in term), reverse=True), term
+
+def _term_le(a: Term, b: Term) -> bool:
+    """Whether term a is O(term b) as every variable grows independently."""
+    b_growth = dict(b)
+    a_growth = dict(a)
+    return all(a_growth.get(variable, NO_GROWTH) <= b_growth.get(variable, NO_GROWTH)
+               for variable in set(a_growth) | set(b_growth))
+
+def _reduce(terms: Iterable[Term]) -> FrozenSet[Term]:
+    """Drop terms dominated by another term; the constant term only survives alone."""
+    unique = sorted(set(terms), key=_term_key, reverse=True)
+    kept: List[Term] = []
+    for term in unique:
+        if not any(_term_le(term, other) for other in kept):
+            kept.append(term)
+    return frozenset(kept)
+
+def _multiply_terms(a: Term, b: Term) -> Term:
+    growth: Dict[str, Growth] = dict(a)
+    for variable, other in b:
+        mine = growth.get(variable, NO_GROWTH)
+        exp = _tidy((mine.exp or 1) * (other.exp or 1)) if mine.exp or other.exp else 0
+        growth[variable] = Growth(mine.fact + other.fact, exp, mine.poly + other.poly, mine.log + other.log)
+    return tuple(sorted((variable, g) for variable, g in growth.items() if g != NO_GROWTH))
+
+def _power_term(term: Term, power: float) -> Term:
+    if power < 0:
+        raise ValueError('Negative powers are not supported')
+    result = []
+    for variable, growth in term:
+        if growth.fact:
+            raise ValueError('Powers of factorials are not supported')
+        try:
+            exp = growth.exp ** power if growth.exp else 0
+        except OverflowError:
+            raise ValueError('Complexity exponent out of range') from None
+        result.append((variable, Growth(0, _tidy(exp), _tidy(growth.poly * power), _tidy(growth.log * power))))
+    return tuple(result)
+
+def _cap(value: float) -> float:
+    return min(value, MAX_CONSTANT)
+
+def _cap_power(base: float, power: float) -> float:
+    try:
+        value = base ** power
+    except OverflowError:
+        return MAX_CONSTANT
+    if isinstance(value, complex):
+        raise ValueError('Fractional powers of negative constants are not supported')
+    return _cap(value)
+
+def _tidy(value: float) -> float:
+    if not math.isfinite(value) or abs(value) >= MAX_CONSTANT:
+        raise ValueError('Complexity exponent out of range')
+    return float(round(value)) if math.isclose(value, round(value), abs_tol=1e-9) else round(value, 4)
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else f'{value:.2f}'
+
+def _format_growth(variable: str, growth: Growth) -> List[str]:
+    parts = []
+    if growth.poly == 1:
+        parts.append(variable)
+    elif float(growth.poly).is_integer() and growth.poly > 1:
+        parts.append(f"{variable}{SUPERSCRIPTS.get(int(growth.poly), f'^{int(growth.poly)}')}")
+    elif growth.poly > 0:
+        parts.append(f'{variable}^{_number(growth.poly)}')
+    if growth.log == 1:
+        parts.append(f'log {variable}')
+    elif growth.log > 0:
+        parts.append(f'log^{_number(growth.log)} {variable}')
+    if growth.exp:
+        parts.append(f'{_number(growth.exp)}^{variable}')
+    if growth.fact == 1:
+        parts.append(f'{variable}!')
+    elif growth.fact:
+        parts.append(f'({variable}!)^{_number(growth.fact)}')
+    return parts
+
+class BigO:
+    """A Big-O class as a canonical sum of products of per-variable growths.
+
+    Coefficients and dominated terms are dropped, so ``O(3n² + n log n)``
+    and ``O(n^2)`` are the same value. With several variables, terms that
+    don't dominate each other are kept: ``O(V + E)``, ``O(n m + n²)``.
+
+    ``a <= b`` means a is in O(b). This is a partial order: ``O(n)`` and
+    ``O(m)`` are incomparable, so neither ``<=`` holds (see ``compare``).
+    """
+
+    __slots__ = ('terms',)
+
+    def __init__(self, terms: Iterable[Term] = ((),)):
+        self.terms: FrozenSet[Term] = _reduce(terms) or frozenset([()])
+
+    @classmethod
+    def variable(cls, name: str, growth: Growth = Growth(poly=1)) -> 'BigO':
+        return cls([((name, growth),)])
+
+    @classmethod
+    def from_cost(cls, cost: Cost, variable: str = 'n') -> 'BigO':
+        """Convert a static-estimator Cost to a BigO in one variable."""
+        growth = Growth(0, cost.exp, cost.poly, cost.log)
+        return cls([((variable, growth),) if growth != NO_GROWTH else ()])
+
+    @property
+    def variables(self) -> FrozenSet[str]:
+        return frozenset(variable for term in self.terms for variable, _ in term)
+
+    def __add__(self, other: 'BigO') -> 'BigO':
+        return BigO(self.terms | other.terms)
+
+    def __mul__(self, other: 'BigO') -> 'BigO':
+        return BigO(_multiply_terms(a, b) for a in self.terms for b in other.terms)
+
+    def __pow__(self, power: float) -> 'BigO':
+        # (a + b)^k is Θ(a^k + b^k) for constant k
+        return BigO(_power_term(term, power) for term in self.terms)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, BigO) and self.terms == other.terms
+
+    def __hash__(self) -> int:
+        return hash(self.terms)
+
+    def __le__(self, other: 'BigO') -> bool:
+        return all(any(_term_le(term, bound) for bound in other.terms) for term in self.terms)
+
+    def __lt__(self, other: 'BigO') -> bool:
+        return self <= other and self != other
+
+    def __ge__(self, other: 'BigO') -> bool:
+        return other <= self
+
+    def __gt__(self, other: 'BigO') -> bool:
+        return other < self
+
+    def __str__(self) -> str:
+        terms = sorted(self.terms, key=_term_key, reverse=True)
+        rendered = [' '.join(part for variable, growth in term for part in _format_growth(variable, growth))
+                    for term in terms]
+        return f"O({' + '.join(part or '1' for part in rendered)})"
+
+    def __repr__(self) -> str:
+        return f'BigO({str(self)!r})'
+
+CONSTANT = BigO()
+
+def compare(a: BigO, b: BigO) -> Optional[int]:
+    """-1, 0 or 1 as a grows slower than, like or faster than b; None if incomparable."""
+    if a == b:
+        return 0
+    if a <= b:
+        return -1
+    if b <= a:
+        return 1
+    return None
+
+def sort_key(value: BigO) -> list:
+    """A total order consistent with dominance, for sorting (incomparable values tie-break arbitrarily)."""
+    return sorted((_term_key(term) for term in value.terms), reverse=True)
+
+def log2_size(value: BigO, n: float) -> float:
+    """log2 of the value's largest term with every variable set to n (n > 1), ignoring constants."""
+    log2_n = math.log2(n)
+    sizes = []
+    for term in value.terms:
+        size = 0.0
+        for _, growth in term:
+            size += growth.poly * log2_n + growth.log * math.log2(log2_n)
+            if growth.exp:
+                size += n * math.log2(growth.exp)
+            if growth.fact:
+                size += growth.fact * math.lgamma(n + 1) / math.log(2)
+        sizes.append(size)
+    return max(sizes)
+
+def dominant(values: Iterable[BigO]) -> BigO:
+    """The cost of doing all of values in sequence (their sum)."""
+    total = CONSTANT
+    for value in values:
+        total = total + value
+    return total
+
+@lru_cache(maxsize=4096)
+def parse(text: str) -> BigO:
+    """Parse 'O(n log n)', 'Θ(V + E)', 'O(2^n)', 'O(n!)' and similar.
+
+    Memoized: equal strings parse once. Raises ValueError for anything that
+    isn't a recognizable Big-O expression.
+    """
+    match = re.fullmatch(r'\s*[OΘΩθ]\s*\((.*)\)\s*', text, re.DOTALL)
+    if match is None:
+        raise ValueError(f'Not a complexity: {text!r}')
+    return _Parser(match.group(1)).parse()
+
+def try_parse(text: str) -> Optional[BigO]:
+    if not isinstance(text, str):
+        return None
+    try:
+        return parse(text)
+    except (ValueError, OverflowError):
+        return None
+
+def equivalent(a: str, b: str) -> bool:
+    """Whether two complexity strings denote the same class, comparing the strings if either can't be parsed."""
+    parsed_a, parsed_b = try_parse(a), try_parse(b)
+    if parsed_a is None or parsed_b is None:
+        return a.strip() == b.strip()
+    return parsed_a == parsed_b
+
+def canonical(text: str) -> Optional[str]:
+    """The canonical spelling of a complexity string, or None if it can't be parsed."""
+    parsed = try_parse(text)
+    return None if parsed is None else str(parsed)
+
+class _Parser:
+    """Recursive descent over:  sum := product (('+'|'-') product)*
+    product := power (('*'|'/')? power)*    power := postfix ('^' power)?
+    postfix := atom '!'*    atom := number | variable | function atom | '(' sum ')'
+    """
+
+    def __init__(self, text: str):
+        self.tokens = self._tokenize(text.translate({ord('·'): '*', ord('×'): '*', ord('−'): '-'}))
+        self.position = 0
+
+    @staticmethod
+    def _tokenize(text: str) -> List[Tuple[str, str]]:
+        tokens = []
+        position = 0
+        text = text.rstrip()
+        while position < len(text):
+            match = TOKEN.match(text, position)
+            if match is None:
+                raise ValueError(f'Unexpected {text[position:].strip()[:10]!r} in complexity')
+            number, name, superscript, symbol = match.groups()
+            if number is not None:
+                tokens.append(('number', number))
+            elif name is not None:
+                tokens.extend(_split_name(name))
+            elif superscript is not None:
+                tokens.append(('symbol', '^'))
+                tokens.append(('number', superscript.lstrip('^').translate(SUPERSCRIPT_DIGITS)))
+            else:
+                tokens.append(('symbol', '^' if symbol == '**' else symbol))
+            position = match.end()
+        if not tokens:
+            raise ValueError('Empty complexity')
+        return tokens
+
+    def _peek(self) -> Optional[Tuple[str, str]]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _accept(self, symbol: str) -> bool:
+        if self._peek() == ('symbol', symbol):
+            self.position += 1
+            return True
+        return False
+
+    def parse(self) -> BigO:
+        result, _ = self._sum()
+        if self._peek() is not None:
+            raise ValueError(f'Unexpected {self._peek()[1]!r} in complexity')
+        return result
+
+    # Each rule returns (BigO, constant value or None) so constants can act as exponent bases
+
+    def _sum(self):
+        value, constant = self._product()
+        while self._peek() in (('symbol', '+'), ('symbol', '-')):
+            self.position += 1
+            other, other_constant = self._product()
+            value = value + other
+            constant = None if constant is None or other_constant is None else _cap(constant + other_constant)
+        return value, constant
+
+    def _product(self):
+        value, constant = self._power()
+        while True:
+            token = self._peek()
+            if token in (('symbol', '*'), ('symbol', '/')):
+                self.position += 1
+                other, other_constant = self._power()
+                if token[1] == '/':
+                    if other_constant is None:
+                        raise ValueError('Division by a growing term is not supported')
+                    if constant is not None and other_constant:
+                        constant /= other_constant
+                    continue
+            elif token is not None and (token[0] != 'symbol' or token[1] in ('(', '√')):
+                # Juxtaposition: "n log n", "2n"
+                other, other_constant = self._power()
+            else:
+                return value, constant
+            value = value * other
+            constant = None if constant is None or other_constant is None else _cap(constant * other_constant)
+
+    def _power(self):
+        base, base_constant = self._postfix()
+        if not self._accept('^'):
+            return base, base_constant
+
+        exponent, exponent_constant = self._power()
+        if exponent_constant is not None:
+            if base_constant is not None:
+                return CONSTANT, _cap_power(base_constant, exponent_constant)
+            return base ** exponent_constant, None
+
+        if base_constant is None or base_constant <= 1:
+            raise ValueError('Only constant bases can have growing exponents')
+        # c^(n) with a plain linear exponent is exponential in that variable
+        if len(exponent.terms) != 1:
+            raise ValueError('Unsupported exponent')
+        (term,) = exponent.terms
+        if len(term) != 1 or term[0][1] != Growth(poly=1):
+            raise ValueError('Unsupported exponent')
+        return BigO.variable(term[0][0], Growth(exp=_tidy(base_constant))), None
+
+    def _postfix(self):
+        value, constant = self._atom()
+        while self._accept('!'):
+            if constant is not None:
+                if constant > MAX_FACTORIAL:
+                    raise ValueError('Factorial of a large constant')
+                constant = float(math.factorial(int(constant)))
+                continue
+            if len(value.terms) != 1 or len(next(iter(value.terms))) != 1:
+                raise ValueError('Factorials of compound expressions are not supported')
+            ((variable, growth),) = next(iter(value.terms))
+            if growth != Growth(poly=1):
+                raise ValueError('Factorials of compound expressions are not supported')
+            value = BigO.variable(variable, Growth(fact=1))
+        return value, constant
+
+    def _atom(self):
+        token = self._peek()
+        if token is None:
+            raise ValueError('Unexpected end of complexity')
+        self.position += 1
+        kind, text = token
+
+        if kind == 'number':
+            return CONSTANT, _cap(float(text))
+        if kind == 'name':
+            return BigO.variable(text), None
+        if kind == 'function':
+            if text == 'sqrt':
+                argument, constant = self._power_argument()
+                return (CONSTANT, math.sqrt(constant)) if constant is not None else (argument ** 0.5, None)
+            return self._log()
+        if text == '√':
+            argument, constant = self._postfix()
+            return (CONSTANT, math.sqrt(constant)) if constant is not None else (argument ** 0.5, None)
+        if text == '(':
+            value = self._sum()
+            if not self._accept(')'):
+                raise ValueError('Unbalanced parentheses in complexity')
+            return value
+        raise ValueError(f'Unexpected {text!r} in complexity')
+
+    def _power_argument(self):
+        if self._peek() == ('symbol', '('):
+            return self._atom()
+        return self._postfix()
+
+    def _log(self):
+        # log^2 n, log(n), log n; a log's base only changes the constant
+        power = 1.0
+        if self._accept('^'):
+            _, power = self._atom()
+            if power is None:
+                raise ValueError('Unsupported power of log')
+        argument, constant = self._power_argument()
+        if constant is not None:
+            return CONSTANT, max(math.log(constant), 0.0) if constant > 0 else 0.0
+
+        # log(product) = sum of logs; log of a sum is dominated by the log of its largest term
+        logs = CONSTANT
+        for term in argument.terms:
+            for variable, growth in term:
+                if growth.fact or growth.exp:
+                    # log(n!) = Θ(n log n), log(c^n) = Θ(n)
+                    piece = Growth(poly=1, log=1 if growth.fact else 0)
+                elif growth.poly > 0:
+                    piece = Growth(log=1)
+                else:
+                    raise ValueError('Iterated logarithms are not supported')
+                logs = logs + BigO.variable(variable, piece)
+        return logs ** power if power != 1 else logs, None
+
+def _split_name(name: str) -> List[Tuple[str, str]]:
+    """Tokens for an identifier: functions, 'N' as n, and glued forms like 'nlogn' and 'mn'."""
+    lowered = name.lower()
+    if lowered == 'sqrt':
+        return [('function', 'sqrt')]
+    if LOG_NAME.fullmatch(lowered):
+        return [('function', 'log')]
+    glued = GLUED_LOG.match(lowered)
+    if glued and (glued.group(1) or glued.group(2)):
+        tokens = [('name', glued.group(1))] if glued.group(1) else []
+        tokens.append(('function', 'log'))
+        if glued.group(2):
+            tokens.append(('name', glued.group(2)))
+        return tokens
+    if GLUED_SIZES.fullmatch(name):
+        return [('name', 'n' if letter == 'N' else letter) for letter in name]
+    return [('name', 'n' if name == 'N' else name)]
@@ -0,0 +1,150 @@
+import ast
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from config import Config
+from .backends import backend_model_id
+
+
+def normalized_code_hash(code: str) -> str:
+    """Hash code by its AST dump so whitespace and comment edits map to the same key."""
+    try:
+        return ast_fingerprint(ast.parse(code))
+    except SyntaxError:
+        return hashlib.sha256(code.strip().encode('utf-8')).hexdigest()
+
+
+def ast_fingerprint(node: ast.AST) -> str:
+    """Hash an AST subtree. Positions are not part of the dump, so moving code keeps its hash."""
+    return hashlib.sha256(ast.dump(node).encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """Two-level cache for LLM analyses: an in-memory LRU in front of a SQLite store.
+
+    Both levels hold the serialized JSON with its creation time, so every hit
+    returns a fresh copy and expires with the same TTL.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, model: Optional[str] = None,
+                 prompt_version: int = 1, max_memory_entries: Optional[int] = None,
+                 ttl: Optional[float] = None):
+        self.cache_dir = cache_dir or Config.CACHE_DIR
+        self.model = model or backend_model_id()
+        self.prompt_version = prompt_version
+        self.max_memory_entries = max_memory_entries or Config.CACHE_MAX_MEMORY_ENTRIES
+        self.ttl = ttl if ttl is not None else Config.CACHE_TTL
+
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+
+        self._memory: 'OrderedDict[str, Tuple[str, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._db = sqlite3.connect(
+            os.path.join(self.cache_dir, 'results.sqlite3'),
+            check_same_thread=False
+        )
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS results ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)'
+        )
+        self._db.commit()
+        self.evict_expired()
+
+    def key(self, code: str) -> str:
+        """Build the cache key from the normalized code, model name and prompt version."""
+        raw = f"{self.model}\0{self.prompt_version}\0{normalized_code_hash(code)}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, code: str) -> Optional[Dict[str, Any]]:
+        key = self.key(code)
+
+        with self._lock:
+            if key in self._memory:
+                value, created = self._memory[key]
+                if not self._is_expired(created):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    self.memory_hits += 1
+                    return json.loads(value)
+                del self._memory[key]
+
+            row = self._db.execute(
+                'SELECT value, created FROM results WHERE key = ?', (key,)
+            ).fetchone()
+
+            if row is None or self._is_expired(row[1]):
+                if row is not None:
+                    self._db.execute('DELETE FROM results WHERE key = ?', (key,))
+                    self._db.commit()
+                self.misses += 1
+                return None
+
+            self._remember(key, row[0], row[1])
+            self.hits += 1
+            self.disk_hits += 1
+            return json.loads(row[0])
+
+    def set(self, code: str, value: Dict[str, Any]):
+        key = self.key(code)
+        serialized, created = json.dumps(value), time.time()
+
+        with self._lock:
+            self._remember(key, serialized, created)
+            self._db.execute(
+                'INSERT OR REPLACE INTO results (key, value, created) VALUES (?, ?, ?)',
+                (key, serialized, created)
+            )
+            self._db.commit()
+
+    def evict_expired(self) -> int:
+        """Drop on-disk entries older than the TTL. Returns the number removed."""
+        if self.ttl <= 0:
+            return 0
+
+        with self._lock:
+            cursor = self._db.execute(
+                'DELETE FROM results WHERE created < ?', (time.time() - self.ttl,)
+            )
+            self._db.commit()
+            return cursor.rowcount
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._db.execute('DELETE FROM results')
+            self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'memory_entries': len(self._memory)
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _remember(self, key: str, value: str, created: float):
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _is_expired(self, created: float) -> bool:
+        return self.ttl > 0 and time.time() - created > self.ttl
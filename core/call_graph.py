@@ -0,0 +1,148 @@
+import ast
+from typing import Dict, Iterable, List, Optional
+
+FUNCTION_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef)
+SCOPE_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)
+
+def strongly_connected_components(edges: Dict[str, Iterable[str]]) -> List[List[str]]:
+    """Tarjan's algorithm with an explicit stack.
+
+    Components are returned callees-first: every component comes after all
+    components it has edges into. Edges to unknown nodes are ignored.
+    """
+
+    index: Dict[str, int] = {}
+    low: Dict[str, int] = {}
+    stack: List[str] = []
+    on_stack = set()
+    components = []
+
+    for root in edges:
+        if root in index:
+            continue
+
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(edges[root]))]
+
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in edges:
+                    continue
+                if child not in index:
+                    index[child] = low[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(edges[child])))
+                    break
+                if child in on_stack:
+                    low[node] = min(low[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+
+    return components
+
+def walk_scope(nodes: Iterable[ast.AST]):
+    """Walk nodes without descending into nested functions, classes or lambdas."""
+    stack = list(nodes)
+    while stack:
+        node = stack.pop()
+        yield node
+        if not isinstance(node, SCOPE_TYPES):
+            stack.extend(ast.iter_child_nodes(node))
+
+class CallGraph:
+    """Calls between the functions defined in one module (or one unit of it).
+
+    Functions are keyed by qualified name (``Class.method``, ``outer.inner``).
+    ``prefix`` is the qualified name of the scope containing ``tree`` when it
+    is not a whole module, and ``known`` holds qualified names defined outside
+    ``tree`` that calls may still resolve to.
+    """
+
+    def __init__(self, tree: ast.AST, prefix: str = '', known: Iterable[str] = ()):
+        self.functions: Dict[str, ast.AST] = {}
+        self.classes = {prefix} if prefix else set()
+        self._owner: Dict[str, Optional[str]] = {}
+        self._collect(tree, prefix, prefix or None)
+
+        self.known = set(known) | set(self.functions)
+        self.calls: Dict[str, List[str]] = {}
+        for qualname, node in self.functions.items():
+            callees = []
+            for child in walk_scope(node.body):
+                if isinstance(child, ast.Call):
+                    callee = self.resolve(qualname, child)
+                    if callee is not None and callee not in callees:
+                        callees.append(callee)
+            self.calls[qualname] = callees
+
+    def _collect(self, tree: ast.AST, prefix: str, owner: Optional[str]):
+        """Record every function under tree with its qualified name and owning class."""
+        if isinstance(tree, FUNCTION_TYPES + (ast.ClassDef,)):
+            nodes = [tree]
+        else:
+            nodes = list(ast.iter_child_nodes(tree))
+
+        stack = [(node, prefix, owner) for node in reversed(nodes)]
+        while stack:
+            node, scope, owner = stack.pop()
+            if not isinstance(node, FUNCTION_TYPES + (ast.ClassDef,)):
+                stack.extend((child, scope, owner) for child in reversed(list(ast.iter_child_nodes(node))))
+                continue
+
+            qualname = f'{scope}.{node.name}' if scope else node.name
+            if isinstance(node, ast.ClassDef):
+                self.classes.add(qualname)
+                stack.extend((child, qualname, qualname) for child in reversed(node.body))
+            else:
+                self.functions[qualname] = node
+                self._owner[qualname] = owner
+                # self inside a nested function still refers to the method's instance
+                stack.extend((child, qualname, owner) for child in reversed(node.body))
+
+    def resolve(self, caller: str, call: ast.Call) -> Optional[str]:
+        """The qualified name a call inside ``caller`` refers to, if it is a known function."""
+        func = call.func
+
+        if isinstance(func, ast.Name):
+            scope = caller
+            while True:
+                # Class bodies are not enclosing scopes for the functions inside them
+                if scope not in self.classes:
+                    candidate = f'{scope}.{func.id}' if scope else func.id
+                    if candidate in self.known:
+                        return candidate
+                if not scope:
+                    return None
+                scope = scope.rpartition('.')[0]
+
+        if (isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name)
+                and func.value.id in ('self', 'cls')):
+            owner = self._owner.get(caller)
+            if owner:
+                candidate = f'{owner}.{func.attr}'
+                if candidate in self.known:
+                    return candidate
+        return None
+
+    def components(self) -> List[List[str]]:
+        """Groups of mutually recursive functions, callees before callers."""
+        return strongly_connected_components(self.calls)
+
+    def is_recursive(self, component: List[str]) -> bool:
+        return len(component) > 1 or component[0] in self.calls[component[0]]
@@ -1,77 +1,411 @@
-from typing import Dict, Any, Optional
-from dataclasses import asdict
+from typing import TYPE_CHECKING, Callable, Dict, Any, List, Optional
+import ast
+import hashlib
 import json
+import threading
 
-from .ast_parser import ASTParser
-from .llm_client import LLMClient
+from config import Config
+from .ast_parser import ASTParser, ASTAnalysis
+from .bigo import compare, equivalent, parse, sort_key, try_parse
+from .static_estimator import StaticEstimator
+from .tracing import span
+
+if TYPE_CHECKING:
+    from .cache import ResultCache
+    from .llm_client import LLMClient
+    from .structural import StructuralIndex
 
 class ComplexityAnalyzer:
-    """Main analyzer that combines AST parsing with LLM analysis."""
+    """Main analyzer that combines AST parsing with LLM analysis.
+    
+    Analyses keep their state in per-call objects, so one analyzer (and its
+    cache and LLM client) can be shared by threads and asyncio tasks.
+    """
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, cache: Optional['ResultCache'] = None,
+                 offline: bool = False, confidence_threshold: Optional[float] = None,
+                 llm_client: Optional['LLMClient'] = None, backend: Optional[str] = None,
+                 dedup_index: Optional['StructuralIndex'] = None):
         self.ast_parser = ASTParser()
-        self.llm_client = LLMClient(api_key)
+        self.static_estimator = StaticEstimator()
+        self.cache = cache
+        # Reuses LLM results across code that differs only in names and constants
+        self.dedup_index = dedup_index
+        self.offline = offline
+        self.confidence_threshold = (
+            Config.CONFIDENCE_THRESHOLD if confidence_threshold is None else confidence_threshold
+        )
+        
+        self.backend = backend or Config.LLM_BACKEND
+        self.api_key = api_key or (Config.GEMINI_API_KEY if self.backend == 'gemini' else None)
+        if not offline and not self.api_key and llm_client is None and self.backend == 'gemini':
+            raise ValueError("GEMINI_API_KEY is required")
+        self._llm_client = llm_client
+        self._llm_client_lock = threading.Lock()
+    
+    @property
+    def llm_client(self) -> 'LLMClient':
+        """The LLM client, created on first use so static-only runs never load the SDK."""
+        if self._llm_client is None:
+            if self.offline:
+                raise RuntimeError("LLM analysis is disabled in offline mode")
+            from .llm_client import LLMClient
+            with self._llm_client_lock:
+                # Concurrent first calls must not each build (and later use) a client of their own
+                if self._llm_client is None:
+                    self._llm_client = LLMClient(self.api_key, backend=self.backend)
+        return self._llm_client
     
-    def analyze(self, code: str) -> Dict[str, Any]:
-        """Perform complete complexity analysis."""
+    @llm_client.setter
+    def llm_client(self, client):
+        self._llm_client = client
+    
+    def parse_stats(self) -> Optional[Dict[str, Any]]:
+        """How the LLM's responses were parsed, or None if no LLM client has been used."""
+        stats = getattr(self._llm_client, 'parse_stats', None)
+        return stats.stats() if stats is not None else None
+    
+    def analyze(self, code: str, ast_analysis: Optional[ASTAnalysis] = None,
+                static_analysis: Optional[Dict[str, Any]] = None,
+                empirical_analysis: Optional[Dict[str, Any]] = None,
+                on_field: Optional[Callable[[str, Any], None]] = None,
+                fast_verdict: bool = False) -> Dict[str, Any]:
+        """Perform complete complexity analysis.
+        
+        ``ast_analysis`` and ``static_analysis`` may be supplied when the code
+        was already parsed elsewhere (e.g. in a batch worker process).
+        ``empirical_analysis`` is an EmpiricalProfiler.measure result used as
+        a third source of evidence.
+        
+        ``on_field`` and ``fast_verdict`` switch the LLM call to streaming (see
+        LLMClient.analyze_complexity_stream); neither applies to cache hits.
+        """
         
         if not code or not code.strip():
             raise ValueError("Code cannot be empty")
         
-        try:
-            ast_analysis = self.ast_parser.parse(code)
-        except Exception as e:
-            return {
-                'error': f'AST parsing failed: {str(e)}',
-                'ast_analysis': None,
-                'llm_analysis': None,
-                'final_analysis': None
-            }
+        with span('analyze', code_chars=len(code)) as stage:
+            ast_analysis, static_analysis, error = self._parse_code(code, ast_analysis, static_analysis)
+            if error is not None:
+                stage.set(outcome='error')
+                return error
+            
+            if self._is_conclusive(static_analysis):
+                stage.set(outcome='static')
+                return self._build_result(code, ast_analysis, None, False,
+                                          static_analysis, empirical_analysis)
+            
+            llm_analysis, cached = self._analyze_with_llm(code, ast_analysis.to_dict(), on_field, fast_verdict,
+                                                          static_analysis)
+            stage.set(outcome='cached' if cached else 'llm')
+            
+            return self._build_result(code, ast_analysis, llm_analysis, cached,
+                                      static_analysis, empirical_analysis)
+    
+    def analyze_many(self, codes: List[str],
+                     ast_analyses: Optional[List[Optional[ASTAnalysis]]] = None,
+                     static_analyses: Optional[List[Optional[Dict[str, Any]]]] = None) -> List[Dict[str, Any]]:
+        """Analyze several snippets, packing cache misses into batched LLM prompts.
+        
+        Returns one result per snippet, in order. Unlike ``analyze``, empty or
+        unparsable snippets yield error results instead of raising.
+        """
+        
+        ast_analyses = ast_analyses or [None] * len(codes)
+        static_analyses = static_analyses or [None] * len(codes)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(codes)
+        prepared = {}
+        # Structural copies within the batch share their first occurrence's LLM call
+        leaders: Dict[bytes, str] = {}
+        copies = []
+        
+        for index, code in enumerate(codes):
+            if not code or not code.strip():
+                results[index] = self._error_result('Code cannot be empty')
+                continue
+            
+            ast_analysis, static_analysis, error = self._parse_code(
+                code, ast_analyses[index], static_analyses[index]
+            )
+            if error is not None:
+                results[index] = error
+                continue
+            
+            if self._is_conclusive(static_analysis):
+                results[index] = self._build_result(code, ast_analysis, None, False, static_analysis)
+                continue
+            
+            cached = self.cache.get(code) if self.cache is not None else None
+            fingerprint = None
+            if cached is None:
+                cached, fingerprint = self._find_duplicate(code, static_analysis)
+            if cached is not None:
+                results[index] = self._build_result(code, ast_analysis, cached, True, static_analysis)
+            elif fingerprint is not None and fingerprint.digest in leaders:
+                copies.append((index, leaders[fingerprint.digest], code, ast_analysis, static_analysis))
+            else:
+                prepared[str(index)] = (code, ast_analysis, static_analysis, fingerprint)
+                if fingerprint is not None:
+                    leaders[fingerprint.digest] = str(index)
+        
+        if prepared:
+            llm_results = self.llm_client.analyze_batch([
+                (item_id, code, ast_analysis.to_dict()) for item_id, (code, ast_analysis, *_) in prepared.items()
+            ])
+            
+            for item_id, (code, ast_analysis, static_analysis, fingerprint) in prepared.items():
+                llm_analysis = llm_results[item_id]
+                if self.cache is not None and 'error' not in llm_analysis:
+                    self.cache.set(code, llm_analysis)
+                self._remember_duplicate(fingerprint, code, llm_analysis, static_analysis)
+                results[int(item_id)] = self._build_result(
+                    code, ast_analysis, llm_analysis, False, static_analysis
+                )
+            
+            for index, leader, code, ast_analysis, static_analysis in copies:
+                llm_analysis = llm_results[leader]
+                if 'error' not in llm_analysis:
+                    # Lazy, like the other optional modules: only batches with copies need it
+                    from .structural import Match
+                    entry = {'llm_analysis': llm_analysis, 'code_hash': results[int(leader)]['code_hash']}
+                    llm_analysis = Match('exact', 1.0, entry).llm_analysis()
+                results[index] = self._build_result(code, ast_analysis, llm_analysis, True, static_analysis)
         
-        ast_dict = asdict(ast_analysis)
-        llm_analysis = self.llm_client.analyze_complexity(code, ast_dict)
+        return results
+    
+    def _parse_code(self, code: str, ast_analysis: Optional[ASTAnalysis],
+                    static_analysis: Optional[Dict[str, Any]]):
+        """Return (ast_analysis, static_analysis, None), or (None, None, error_result)."""
+        
+        tree = None
+        if ast_analysis is None or static_analysis is None:
+            try:
+                with span('ast.parse', code_chars=len(code)):
+                    tree = ast.parse(code)
+            except SyntaxError as e:
+                if ast_analysis is None:
+                    return None, None, self._error_result(f'AST parsing failed: Invalid Python syntax: {e}')
         
-        final_analysis = self._combine_analyses(ast_analysis, llm_analysis)
+        if ast_analysis is None:
+            with span('ast.analyze'):
+                ast_analysis = self.ast_parser.analyze_tree(tree)
+        if static_analysis is None and tree is not None:
+            with span('static.estimate'):
+                static_analysis = self.static_estimator.estimate(tree)
         
+        if self.offline and static_analysis is None:
+            return None, None, self._error_result('Offline analysis requires code that parses on its own')
+        
+        return ast_analysis, static_analysis, None
+    
+    def _is_conclusive(self, static_analysis: Optional[Dict[str, Any]]) -> bool:
+        """Whether the static estimate is good enough to skip the LLM."""
+        if static_analysis is None:
+            return False
+        return self.offline or static_analysis['confidence'] >= self.confidence_threshold
+    
+    def _error_result(self, message: str) -> Dict[str, Any]:
         return {
-            'ast_analysis': ast_dict,
+            'error': message,
+            'ast_analysis': None,
+            'llm_analysis': None,
+            'final_analysis': None
+        }
+    
+    def _build_result(self, code: str, ast_analysis: ASTAnalysis,
+                      llm_analysis: Optional[Dict[str, Any]], cached: bool,
+                      static_analysis: Optional[Dict[str, Any]] = None,
+                      empirical_analysis: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        
+        with span('combine'):
+            final_analysis = self._combine_analyses(ast_analysis, llm_analysis, static_analysis)
+            if empirical_analysis is not None and 'time_fit' in empirical_analysis:
+                final_analysis = self._apply_empirical(final_analysis, empirical_analysis)
+        
+        # The ASTAnalysis record itself (serialized through its to_dict), and
+        # the code by hash: callers already hold the code they passed in
+        result = {
+            'ast_analysis': ast_analysis,
+            'static_analysis': static_analysis,
             'llm_analysis': llm_analysis,
             'final_analysis': final_analysis,
-            'code': code
+            'cached': cached,
+            'code_hash': hashlib.sha256(code.encode('utf-8')).hexdigest()
         }
+        if empirical_analysis is not None:
+            result['empirical_analysis'] = empirical_analysis
+        return result
     
-    def _combine_analyses(self, ast_analysis, llm_analysis: Dict[str, Any]) -> Dict[str, Any]:
+    def _analyze_with_llm(self, code: str, ast_dict: Dict[str, Any],
+                          on_field: Optional[Callable[[str, Any], None]] = None,
+                          fast_verdict: bool = False, static_analysis: Optional[Dict[str, Any]] = None):
+        """Return the LLM analysis for code, consulting the result cache and dedup index first."""
+        
+        if self.cache is not None:
+            with span('cache.get') as stage:
+                cached = self.cache.get(code)
+                stage.set(hit=cached is not None)
+            if cached is not None:
+                return cached, True
+        
+        duplicate, fingerprint = self._find_duplicate(code, static_analysis)
+        if duplicate is not None:
+            return duplicate, True
+        
+        if on_field is not None or fast_verdict:
+            llm_analysis = self.llm_client.analyze_complexity_stream(code, ast_dict, on_field, fast_verdict)
+        else:
+            llm_analysis = self.llm_client.analyze_complexity(code, ast_dict)
+        
+        # Failed calls are not cached so they get retried on the next run, and
+        # truncated ones so a full run can still fill in the explanation
+        if self.cache is not None and 'error' not in llm_analysis and not llm_analysis.get('truncated'):
+            self.cache.set(code, llm_analysis)
+        self._remember_duplicate(fingerprint, code, llm_analysis, static_analysis)
+        
+        return llm_analysis, False
+    
+    def _find_duplicate(self, code: str, static_analysis: Optional[Dict[str, Any]]):
+        """Return (llm_analysis of a structural duplicate or None, fingerprint to index the new result under)."""
+        
+        if self.dedup_index is None:
+            return None, None
+        with span('dedup.lookup') as stage:
+            fingerprint = self.dedup_index.fingerprint(code)
+            match = None
+            if fingerprint is not None:
+                match = self.dedup_index.lookup(fingerprint, _static_time(static_analysis))
+            stage.set(hit=match.kind if match is not None else None)
+        return (match.llm_analysis() if match is not None else None), fingerprint
+    
+    def _remember_duplicate(self, fingerprint, code: str, llm_analysis: Dict[str, Any],
+                            static_analysis: Optional[Dict[str, Any]]):
+        if fingerprint is None or 'error' in llm_analysis or llm_analysis.get('truncated'):
+            return
+        self.dedup_index.add(fingerprint, llm_analysis, hashlib.sha256(code.encode('utf-8')).hexdigest(),
+                             _static_time(static_analysis))
+    
+    def _combine_analyses(self, ast_analysis, llm_analysis: Optional[Dict[str, Any]],
+                          static_analysis: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Combine AST and LLM analyses for final result."""
         
+        if llm_analysis is None:
+            # Static fast path: the LLM was skipped
+            if static_analysis['confidence'] >= self.confidence_threshold:
+                analysis_method = 'Static analysis (high confidence)'
+            else:
+                analysis_method = 'Static analysis (offline)'
+            return self._final_analysis(
+                ast_analysis, {},
+                time_complexity=static_analysis['time_complexity'],
+                space_complexity=static_analysis['space_complexity'],
+                confidence=static_analysis['confidence'],
+                analysis_method=analysis_method,
+                explanation=static_analysis['explanation']
+            )
+        
         # Extract key metrics
-        loop_complexity = self._estimate_loop_complexity(ast_analysis.loops)
-        has_recursion = len(ast_analysis.recursive_calls) > 0
+        if static_analysis is not None and static_analysis['time_complexity'] != 'O(?)':
+            loop_complexity = static_analysis['time_complexity']
+        else:
+            loop_complexity = self._estimate_loop_complexity(ast_analysis.loops)
         
         llm_time = llm_analysis.get('time_complexity', 'O(?)')
         llm_confidence = llm_analysis.get('confidence', 0.5)
+        static_confidence = static_analysis['confidence'] if static_analysis is not None else None
+        confidence = llm_confidence
+        explanation = llm_analysis.get('explanation', 'No detailed explanation available')
+        
+        # Compare the classes, not the spellings: 'O(n^2)' agrees with 'O(n²)'
+        agrees = loop_complexity is not None and equivalent(llm_time, loop_complexity)
+        conflicts = (
+            loop_complexity is not None and not agrees
+            and try_parse(llm_time) is not None and try_parse(loop_complexity) is not None
+        )
         
-        if llm_confidence > 0.8:
+        if agrees and llm_confidence > 0.5:
             final_complexity = llm_time
-            analysis_method = 'LLM (high confidence)'
-        elif loop_complexity and llm_confidence > 0.5:
+            analysis_method = 'LLM + AST agreement'
+            confidence = min(1.0, max(llm_confidence, static_confidence or 0.0) + 0.1)
+        elif llm_confidence > 0.8 or (
+                loop_complexity and llm_confidence > 0.5
+                and (static_confidence is None or llm_confidence >= static_confidence)):
             final_complexity = llm_time
-            analysis_method = 'LLM + AST validation'
+            analysis_method = 'LLM (high confidence)' if llm_confidence > 0.8 else 'LLM + AST validation'
+            if conflicts:
+                relation = {-1: 'lower than', 1: 'higher than'}.get(
+                    compare(try_parse(loop_complexity), try_parse(llm_time)), 'incomparable with'
+                )
+                explanation = (
+                    f"{explanation} Note: static analysis estimates {loop_complexity}, "
+                    f"which is {relation} this estimate."
+                )
         else:
             final_complexity = loop_complexity or 'O(1)'
             analysis_method = 'AST-based estimation'
+            if static_confidence is not None:
+                confidence = static_confidence
+        
+        space_fallback = static_analysis['space_complexity'] if static_analysis else 'O(1)'
+        
+        return self._final_analysis(
+            ast_analysis, llm_analysis,
+            time_complexity=final_complexity,
+            space_complexity=llm_analysis.get('space_complexity', space_fallback),
+            confidence=confidence,
+            analysis_method=analysis_method,
+            explanation=explanation
+        )
+    
+    def _apply_empirical(self, final: Dict[str, Any], empirical_analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Confirm or override the combined estimate with a measured curve fit."""
+        
+        fit = empirical_analysis['time_fit']
+        final = dict(final)
+        final['empirical'] = {
+            'time_complexity': fit['complexity'],
+            'space_complexity': empirical_analysis['space_fit']['complexity'],
+            'r_squared': fit['r_squared']
+        }
+        
+        # R² is undefined for a flat curve, so judge O(1) by its relative error
+        if fit['complexity'] == 'O(1)':
+            fit_quality = 1 - fit['relative_error']
+        else:
+            fit_quality = fit['r_squared']
+        if fit_quality < Config.EMPIRICAL_MIN_R2:
+            return final
+        
+        if equivalent(fit['complexity'], final['time_complexity']):
+            final['confidence'] = min(1.0, final['confidence'] + 0.1)
+            final['analysis_method'] += ' + empirical confirmation'
+        elif final['confidence'] < self.confidence_threshold:
+            final['time_complexity'] = fit['complexity']
+            final['confidence'] = round(0.9 * fit_quality, 2)
+            final['analysis_method'] = 'Empirical measurement'
+        else:
+            final['explanation'] = (
+                f"{final['explanation']} Note: runtime measurements fit {fit['complexity']} "
+                f"(R² = {fit['r_squared']:.3f}), which disagrees with this estimate."
+            )
+        return final
+    
+    def _final_analysis(self, ast_analysis, llm_analysis: Dict[str, Any], time_complexity: str,
+                        space_complexity: str, confidence: float, analysis_method: str,
+                        explanation: str) -> Dict[str, Any]:
         
         return {
-            'time_complexity': final_complexity,
-            'space_complexity': llm_analysis.get('space_complexity', 'O(1)'),
-            'confidence': llm_confidence,
+            'time_complexity': time_complexity,
+            'space_complexity': space_complexity,
+            'confidence': confidence,
             'analysis_method': analysis_method,
             'key_factors': {
                 'loops': len(ast_analysis.loops),
                 'max_nesting': ast_analysis.max_nesting_level,
-                'recursion': has_recursion,
+                'recursion': len(ast_analysis.recursive_calls) > 0,
                 'builtin_calls': ast_analysis.builtin_calls
             },
-            'explanation': llm_analysis.get('explanation', 'No detailed explanation available'),
+            'explanation': explanation,
             'bottlenecks': llm_analysis.get('bottlenecks', []),
             'recommendations': self._generate_recommendations(ast_analysis, llm_analysis)
         }
@@ -94,7 +428,13 @@ class ComplexityAnalyzer:
     
     def _generate_recommendations(self, ast_analysis, llm_analysis: Dict[str, Any]) -> list:
         
-        recommendations = []
+        # Concrete anti-patterns first, most expensive first
+        findings = sorted(ast_analysis.findings, key=lambda f: (sort_key(parse(f.total)), -f.line), reverse=True)
+        recommendations = [
+            f"Line {finding.line}: {finding.message} ({finding.cost} each, {finding.total} overall). "
+            f"{finding.suggestion}"
+            for finding in findings
+        ]
         
         # Check for nested loops
         if ast_analysis.max_nesting_level > 2:
@@ -103,17 +443,7 @@ class ComplexityAnalyzer:
                 "Look for opportunities to reduce nesting or use more efficient algorithms."
             )
         
-        # Check for inefficient built-ins
-        if 'sorted' in ast_analysis.builtin_calls:
-            recommendations.append(
-                "Consider if sorting is necessary or if a more efficient approach exists."
-            )
-        
-        # Check for recursion
-        if ast_analysis.recursive_calls:
-            recommendations.append(
-                "Recursive functions detected. Consider memoization or iterative approaches "
-                "for better performance."
-            )
-        
-        return recommendations 
\ No newline at end of file
+        return recommendations 
+
+def _static_time(static_analysis: Optional[Dict[str, Any]]) -> Optional[str]:
+    return static_analysis['time_complexity'] if static_analysis is not None else None
@@ -0,0 +1,45 @@
+from typing import NamedTuple
+
+class Cost(NamedTuple):
+    """Single-variable cost exp^n * n^poly * log(n)^log, with exp 0 meaning no exponential factor.
+
+    Tuple order matches asymptotic order.
+    """
+    exp: float = 0
+    poly: float = 0
+    log: int = 0
+
+CONSTANT = Cost()
+LOGARITHMIC = Cost(log=1)
+SQUARE_ROOT = Cost(poly=0.5)
+LINEAR = Cost(poly=1)
+LINEARITHMIC = Cost(poly=1, log=1)
+
+SUPERSCRIPTS = {2: '²', 3: '³'}
+
+def multiply(a: Cost, b: Cost) -> Cost:
+    exp = (a.exp or 1) * (b.exp or 1) if a.exp or b.exp else 0
+    return Cost(exp, a.poly + b.poly, a.log + b.log)
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else f'{value:.2f}'
+
+def format_cost(cost: Cost) -> str:
+    """Render a cost using the same notation as _estimate_loop_complexity."""
+    if cost == CONSTANT:
+        return 'O(1)'
+
+    parts = []
+    if cost.poly == 1:
+        parts.append('n')
+    elif float(cost.poly).is_integer() and cost.poly > 1:
+        parts.append(f"n{SUPERSCRIPTS.get(int(cost.poly), f'^{int(cost.poly)}')}")
+    elif cost.poly > 0:
+        parts.append(f'n^{_number(cost.poly)}')
+    if cost.log == 1:
+        parts.append('log n')
+    elif cost.log > 1:
+        parts.append(f'log^{cost.log} n')
+    if cost.exp:
+        parts.append(f'{_number(cost.exp)}^n')
+    return f"O({' '.join(parts)})"
@@ -0,0 +1,196 @@
+import json
+import math
+import os
+import subprocess
+import sys
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from config import Config
+
+# Candidate growth models, ordered from slowest to fastest growing
+COMPLEXITY_MODELS = ['O(1)', 'O(log n)', 'O(n)', 'O(n log n)', 'O(n²)', 'O(n³)', 'O(2^n)']
+
+# Among models whose RMSE is within this fraction of the mean measurement of
+# the best model's, the slowest-growing one wins
+FIT_TOLERANCE = 0.01
+
+# Peak memory jitters by a few hundred bytes between interpreter runs; curves
+# that vary less than this are reported as O(1) instead of fitted
+SPACE_NOISE_BYTES = 1024
+
+# Executed in a fresh interpreter for every input size so measurements of one
+# size can't be skewed by caches, garbage or memory left over from another.
+RUNNER = r'''
+import json, os, sys, time, tracemalloc
+
+request = json.load(sys.stdin)
+# Anything the measured code prints is discarded so it can't corrupt the result
+result = sys.stdout
+sys.stdout = open(os.devnull, 'w')
+sys.path.insert(0, request['directory'])
+namespace = {'__name__': '__measured__'}
+exec(compile(request['source'], request['filename'], 'exec'), namespace)
+
+func = namespace[request['function']]
+generator = eval(request['generator'], namespace)
+
+def make_args():
+    value = generator(request['n'])
+    return value if isinstance(value, tuple) else (value,)
+
+best = float('inf')
+for _ in range(request['repeats']):
+    args = make_args()
+    start = time.perf_counter()
+    func(*args)
+    best = min(best, time.perf_counter() - start)
+
+args = make_args()
+tracemalloc.start()
+func(*args)
+peak = tracemalloc.get_traced_memory()[1]
+tracemalloc.stop()
+
+json.dump({'seconds': best, 'peak_bytes': peak}, result)
+'''
+
+@dataclass
+class Measurement:
+    n: int
+    seconds: float
+    peak_bytes: int
+
+def _model_matrix(np, sizes):
+    """Evaluate every model in COMPLEXITY_MODELS at each size: shape (models, sizes)."""
+    n = sizes.astype(float)
+    log_n = np.log2(n)
+    with np.errstate(over='ignore'):
+        return np.stack([np.ones_like(n), log_n, n, n * log_n, n ** 2, n ** 3, np.exp2(n)])
+
+def fit_complexity(sizes: Sequence[int], values: Sequence[float], noise_floor: float = 0.0) -> Dict[str, Any]:
+    """Fit ``values ≈ a * g(n) + b`` for every growth model g and pick the best.
+
+    All models are solved at once with a stacked pseudo-inverse. A model is
+    rejected if it overflows or needs a negative slope. Models are ranked by
+    RMSE relative to the mean measurement (R² is undefined for O(1)), ties go
+    to the slower-growing model, and the R² of every candidate is reported.
+    Values spanning no more than ``noise_floor`` are treated as constant.
+    """
+    import numpy as np
+
+    sizes = np.asarray(sizes)
+    y = np.asarray(values, dtype=float)
+    if len(sizes) < 3:
+        raise ValueError("At least three input sizes are needed to fit a complexity model")
+
+    if np.ptp(y) <= noise_floor:
+        return {'complexity': 'O(1)', 'r_squared': 1.0, 'relative_error': 0.0, 'scores': {}}
+
+    g = _model_matrix(np, sizes)
+    finite = np.isfinite(g).all(axis=1)
+    g = np.where(np.isfinite(g), g, 0.0)
+    # Scale each model to [0, 1] so fast-growing models stay well conditioned
+    scale = np.abs(g).max(axis=1, keepdims=True)
+    g = g / np.where(scale > 0, scale, 1.0)
+
+    design = np.stack([g, np.ones_like(g)], axis=2)          # (models, sizes, 2)
+    coefficients = np.linalg.pinv(design) @ y                 # (models, 2)
+    predictions = (design @ coefficients[:, :, None])[:, :, 0]
+
+    residual = ((y - predictions) ** 2).sum(axis=1)
+    total = ((y - y.mean()) ** 2).sum()
+    r_squared = 1 - residual / total if total > 0 else np.ones(len(COMPLEXITY_MODELS))
+    relative_error = np.sqrt(residual / len(y)) / max(abs(y.mean()), np.finfo(float).tiny)
+
+    valid = finite & ((coefficients[:, 0] >= 0) | (np.arange(len(COMPLEXITY_MODELS)) == 0))
+    relative_error = np.where(valid, relative_error, np.inf)
+
+    best_error = relative_error.min()
+    best = next(i for i, error in enumerate(relative_error) if error <= best_error + FIT_TOLERANCE)
+
+    return {
+        'complexity': COMPLEXITY_MODELS[best],
+        'r_squared': round(float(r_squared[best]), 4),
+        'relative_error': round(float(relative_error[best]), 4),
+        'scores': {
+            name: round(float(score), 4) if ok else None
+            for name, score, ok in zip(COMPLEXITY_MODELS, r_squared, valid)
+        }
+    }
+
+class EmpiricalProfiler:
+    """Measure a function's runtime and peak memory at increasing input sizes."""
+
+    def __init__(self, timeout: Optional[float] = None, repeats: Optional[int] = None):
+        self.timeout = timeout or Config.MEASURE_TIMEOUT
+        self.repeats = repeats or Config.MEASURE_REPEATS
+
+    def measure(self, source: str, function_name: str, input_generator: str,
+                sizes: Optional[Sequence[int]] = None, filename: str = '<measured>',
+                on_measurement: Optional[Callable[[Measurement], None]] = None) -> Dict[str, Any]:
+        """Run ``function_name`` from ``source`` on ``input_generator(n)`` for each size.
+
+        ``input_generator`` is a Python expression evaluated in the module's
+        namespace, e.g. ``"lambda n: list(range(n))"``. A returned tuple is
+        unpacked into positional arguments. Sizes are measured in increasing
+        order; the first timeout or failure ends the run.
+        """
+
+        sizes = sorted(sizes or Config.MEASURE_SIZES)
+        measurements: List[Measurement] = []
+        stopped = None
+
+        for n in sizes:
+            try:
+                measurement = self._run_size(source, function_name, input_generator, n, filename)
+            except subprocess.TimeoutExpired:
+                stopped = f'timed out after {self.timeout}s at n={n}'
+                break
+            except (RuntimeError, ValueError) as e:
+                stopped = f'failed at n={n}: {e}'
+                break
+
+            measurements.append(measurement)
+            if on_measurement is not None:
+                on_measurement(measurement)
+
+        result = {
+            'function': function_name,
+            'input_generator': input_generator,
+            'measurements': [asdict(m) for m in measurements],
+            'stopped': stopped
+        }
+
+        if len(measurements) < 3:
+            result['error'] = f'Not enough measurements to fit a model ({stopped or "too few sizes"})'
+            return result
+
+        observed = [m.n for m in measurements]
+        result['time_fit'] = fit_complexity(observed, [m.seconds for m in measurements])
+        result['space_fit'] = fit_complexity(observed, [m.peak_bytes for m in measurements],
+                                             noise_floor=SPACE_NOISE_BYTES)
+        return result
+
+    def _run_size(self, source: str, function_name: str, input_generator: str,
+                  n: int, filename: str) -> Measurement:
+        request = {
+            'source': source,
+            'filename': filename,
+            'directory': os.path.dirname(os.path.abspath(filename)),
+            'function': function_name,
+            'generator': input_generator,
+            'n': n,
+            'repeats': self.repeats
+        }
+
+        completed = subprocess.run(
+            [sys.executable, '-c', RUNNER],
+            input=json.dumps(request), capture_output=True, text=True, timeout=self.timeout
+        )
+        if completed.returncode != 0:
+            message = completed.stderr.strip().splitlines()
+            raise RuntimeError(message[-1] if message else f'exit code {completed.returncode}')
+
+        output = json.loads(completed.stdout)
+        return Measurement(n=n, seconds=output['seconds'], peak_bytes=output['peak_bytes'])
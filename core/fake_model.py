@@ -0,0 +1,147 @@
+import asyncio
+import json
+import re
+import time
+from typing import Dict, Iterator, Optional
+
+from config import Config
+from .backends import Backend
+from .bigo import equivalent
+from .cache import normalized_code_hash
+from .llm_client import estimate_tokens
+
+# Complexity classes a wrong answer is drawn from, slowest-growing first
+LADDER = ('O(1)', 'O(log n)', 'O(n)', 'O(n log n)', 'O(n²)', 'O(n³)', 'O(2^n)')
+
+SNIPPET_HEADER = re.compile(r'^### SNIPPET (\S+)$', re.MULTILINE)
+CODE_BLOCK = re.compile(r'```python\n(.*?)\n```', re.DOTALL)
+
+class FakeUsage:
+    __slots__ = ('prompt_token_count', 'candidates_token_count')
+
+    def __init__(self, prompt_token_count: int, candidates_token_count: int):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+
+class FakeChunk:
+    __slots__ = ('text',)
+
+    def __init__(self, text: str):
+        self.text = text
+
+class FakeResponse:
+    """Mimics the parts of a GenerateContentResponse the clients use."""
+
+    def __init__(self, text: str, usage_metadata: FakeUsage, chunk_size: int = 64):
+        self.text = text
+        self.usage_metadata = usage_metadata
+        self._chunk_size = chunk_size
+        self.cancelled = False
+
+    def __iter__(self) -> Iterator[FakeChunk]:
+        for start in range(0, len(self.text), self._chunk_size):
+            if self.cancelled:
+                return
+            yield FakeChunk(self.text[start:start + self._chunk_size])
+
+    @property
+    def _iterator(self):
+        # _cancel_stream looks for a cancellable iterator here, like the SDK's grpc stream
+        return self
+
+    def cancel(self):
+        self.cancelled = True
+
+class FakeModel(Backend):
+    """Deterministic stand-in for the Gemini model, for offline benchmarks and tests.
+
+    ``answers`` maps normalized_code_hash(code) to the complexity to report.
+    A fixed, hash-selected fraction ``error_rate`` of known snippets gets a
+    neighbouring complexity class instead, with lower confidence, so accuracy
+    numbers are stable from run to run without being trivially perfect.
+    Unknown snippets are answered with O(n) at low confidence. ``latency``
+    seconds are spent on every call, for load tests.
+    """
+
+    name = 'fake'
+
+    def __init__(self, answers: Optional[Dict[str, str]] = None, error_rate: float = 0.15,
+                 latency: float = 0.0):
+        super().__init__('fake')
+        self.answers = dict(answers or {})
+        self.error_rate = error_rate
+        self.latency = latency
+
+    @classmethod
+    def from_corpus(cls, corpus: Dict[str, Dict[str, str]], **kwargs) -> 'FakeModel':
+        answers = {normalized_code_hash(sample['code']): sample['expected_complexity'] for sample in corpus.values()}
+        return cls(answers, **kwargs)
+
+    @classmethod
+    def from_config(cls, api_key: Optional[str] = None) -> 'FakeModel':
+        return cls(error_rate=Config.BENCH_FAKE_ERROR_RATE, latency=Config.FAKE_LLM_LATENCY)
+
+    @classmethod
+    def configured_model(cls) -> str:
+        return 'fake'
+
+    def generate_content(self, prompt: str, stream: bool = False) -> FakeResponse:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._respond(prompt)
+
+    async def generate_content_async(self, prompt: str) -> FakeResponse:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._respond(prompt)
+
+    def answer(self, code: str) -> Dict[str, object]:
+        """The analysis this model gives for one snippet."""
+        key = normalized_code_hash(code)
+        expected = self.answers.get(key)
+        if expected is None:
+            return self._analysis('O(n)', 0.4, 'Unrecognized snippet; assuming a single pass.')
+
+        # The same snippet is always right or always wrong
+        if int(key[:8], 16) / 0xFFFFFFFF < self.error_rate:
+            wrong = _neighbour(expected, key)
+            return self._analysis(wrong, 0.6, f'Looks like {wrong} at a glance.')
+        return self._analysis(expected, 0.85, f'The dominant cost is {expected}.')
+
+    def _respond(self, prompt: str) -> FakeResponse:
+        headers = list(SNIPPET_HEADER.finditer(prompt))
+        if headers:
+            items = []
+            for index, header in enumerate(headers):
+                end = headers[index + 1].start() if index + 1 < len(headers) else len(prompt)
+                block = CODE_BLOCK.search(prompt, header.end(), end)
+                item = self.answer(block.group(1) if block else '')
+                items.append(dict(id=header.group(1), **item))
+            text = '```json\n' + json.dumps(items, indent=2, ensure_ascii=False) + '\n```'
+        else:
+            block = CODE_BLOCK.search(prompt)
+            text = json.dumps(self.answer(block.group(1) if block else ''), indent=2, ensure_ascii=False)
+
+        return FakeResponse(text, FakeUsage(estimate_tokens(prompt), estimate_tokens(text)))
+
+    @staticmethod
+    def _analysis(time_complexity: str, confidence: float, explanation: str) -> Dict[str, object]:
+        # Key order matches the prompt schema so fast verdicts work on streams
+        return {
+            'time_complexity': time_complexity,
+            'space_complexity': 'O(1)',
+            'confidence': confidence,
+            'explanation': explanation,
+            'bottlenecks': [],
+        }
+
+def _neighbour(expected: str, key: str) -> str:
+    """A complexity class next to expected on the LADDER, chosen by key."""
+    positions = [index for index, value in enumerate(LADDER) if equivalent(value, expected)]
+    if not positions:
+        return 'O(n²)'
+    index = positions[0]
+    step = 1 if int(key[8:10], 16) % 2 else -1
+    if not 0 <= index + step < len(LADDER):
+        step = -step
+    return LADDER[index + step]
@@ -0,0 +1,265 @@
+import heapq
+import math
+import os
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from config import Config
+from .batch import AnalysisUnit, BatchAnalyzer, discover_python_files, split_units
+from .bigo import CONSTANT, log2_size, try_parse
+
+# A profiled function: (file, line, name). pstats lines are the first line of
+# the code object; collapsed stacks usually carry the executing line instead.
+Frame = Tuple[str, int, str]
+
+# py-spy / speedscope style frame: "name (path/to/file.py:42)"
+COLLAPSED_FRAME = re.compile(r'^(?P<name>.*?) \((?P<file>.+?):(?P<line>\d+)\)$')
+
+@dataclass(slots=True)
+class ProfileWeight:
+    """How much of the profiled time a unit accounts for."""
+    cumulative: float
+    self_time: float
+    calls: Optional[int]
+    share: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'cumulative': self.cumulative, 'self': self.self_time, 'calls': self.calls,
+                'time_share': self.share}
+
+class Profile:
+    """Timings loaded from a cProfile/pstats dump or a collapsed-stack file.
+
+    pstats timings are seconds; collapsed stacks (``frame;frame;frame count``,
+    as written by py-spy and flamegraph tools) are sample counts.
+    """
+
+    def __init__(self, functions: List[Tuple[Frame, int, float, float]],
+                 stacks: List[Tuple[Tuple[Frame, ...], int]], total: float, unit: str):
+        self.functions = functions
+        self.stacks = stacks
+        self.total = total
+        self.unit = unit
+
+    @classmethod
+    def load(cls, path: str) -> 'Profile':
+        import pstats
+
+        try:
+            stats = pstats.Stats(path)
+        except Exception:
+            # Not a marshalled pstats dump; try the text format
+            return cls.from_collapsed(path)
+
+        functions = [
+            ((file, line, name), calls, self_time, cumulative)
+            for (file, line, name), (_, calls, self_time, cumulative, _) in stats.stats.items()
+            if not file.startswith(('~', '<'))
+        ]
+        return cls(functions, [], stats.total_tt, 'seconds')
+
+    @classmethod
+    def from_collapsed(cls, path: str) -> 'Profile':
+        stacks = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for number, text in enumerate(f, 1):
+                text = text.strip()
+                if not text:
+                    continue
+                stack, _, count = text.rpartition(' ')
+                if not stack or not count.isdigit():
+                    raise ValueError(f"{path}:{number}: not a pstats dump or a collapsed stack line")
+                frames = []
+                for frame in stack.split(';'):
+                    match = COLLAPSED_FRAME.match(frame)
+                    # Frames without a location (native code, the process root) can't be mapped
+                    if match is not None:
+                        frames.append((match['file'], int(match['line']), match['name']))
+                stacks.append((tuple(frames), int(count)))
+        return cls([], stacks, sum(count for _, count in stacks), 'samples')
+
+    @property
+    def files(self) -> set:
+        files = {frame[0] for frame, *_ in self.functions}
+        files.update(frame[0] for frames, _ in self.stacks for frame in frames)
+        return files
+
+    def weigh(self, resolve) -> Dict[int, ProfileWeight]:
+        """Profile weight per unit, keyed by id(unit); ``resolve(frame)`` maps a frame to its unit or None.
+
+        A unit's cumulative time is that of its hottest function (nested
+        functions are already part of it); with stacks, each sample counts
+        once per unit however often the unit recurses.
+        """
+
+        cumulative: Dict[int, float] = defaultdict(float)
+        self_time: Dict[int, float] = defaultdict(float)
+        calls: Dict[int, Optional[int]] = {}
+
+        for frame, count, tt, ct in self.functions:
+            unit = resolve(frame)
+            if unit is None:
+                continue
+            key = id(unit)
+            self_time[key] += tt
+            if ct >= cumulative[key]:
+                cumulative[key], calls[key] = ct, count
+
+        for frames, count in self.stacks:
+            units = [resolve(frame) for frame in frames]
+            for key in {id(unit) for unit in units if unit is not None}:
+                cumulative[key] += count
+                calls.setdefault(key, None)
+            if units and units[-1] is not None:
+                self_time[id(units[-1])] += count
+
+        total = self.total or 1
+        return {key: ProfileWeight(cumulative[key], self_time[key], calls[key], min(cumulative[key] / total, 1.0))
+                for key in cumulative}
+
+class UnitIndex:
+    """Find the unit a profiled frame belongs to, matching files by path and functions by line."""
+
+    def __init__(self, files: Iterable[str]):
+        self.by_name: Dict[str, List[str]] = defaultdict(list)
+        self.by_real: Dict[str, str] = {}
+        for path in files:
+            self.by_name[os.path.basename(path)].append(path)
+            self.by_real[os.path.realpath(path)] = path
+        self.units: Dict[str, List[AnalysisUnit]] = {}
+        self._files: Dict[str, Optional[str]] = {}
+        # Stack files repeat the same frames on thousands of lines
+        self._frames: Dict[Frame, Optional[AnalysisUnit]] = {}
+
+    def match_file(self, profiled: str) -> Optional[str]:
+        """The analyzed file a profiled path refers to.
+
+        Profiles are often recorded on another machine or checkout, so when
+        the path doesn't exist here the file sharing the longest run of
+        trailing path components is used.
+        """
+        if profiled not in self._files:
+            path = self.by_real.get(os.path.realpath(profiled))
+            if path is None:
+                parts = _components(profiled)
+                candidates = [(_common_suffix(parts, _components(candidate)), candidate)
+                              for candidate in self.by_name.get(os.path.basename(profiled), ())]
+                if candidates:
+                    path = max(candidates)[1]
+            self._files[profiled] = path
+        return self._files[profiled]
+
+    def add(self, path: str, units: List[AnalysisUnit]):
+        self.units[path] = units
+
+    def resolve(self, frame: Frame) -> Optional[AnalysisUnit]:
+        if frame not in self._frames:
+            self._frames[frame] = self._find(frame)
+        return self._frames[frame]
+
+    def _find(self, frame: Frame) -> Optional[AnalysisUnit]:
+        file, line, name = frame
+        path = self.match_file(file)
+        units = self.units.get(path, ()) if path is not None else ()
+        for unit in units:
+            if unit.line <= line <= unit.end_line:
+                return unit
+        # Decorated functions start at the first decorator, above the def line
+        for unit in units:
+            if unit.line > line:
+                return unit if unit.name.rsplit('.', 1)[-1] == name else None
+        return None
+
+def _components(path: str) -> List[str]:
+    return os.path.normpath(path).replace('\\', '/').split('/')
+
+def _common_suffix(a: List[str], b: List[str]) -> int:
+    count = 0
+    while count < min(len(a), len(b)) and a[-1 - count] == b[-1 - count]:
+        count += 1
+    return count
+
+def cost_weight(complexity: Optional[str], findings: Iterable[Any], reference_size: float) -> float:
+    """The estimated cost at ``reference_size`` relative to O(n): O(n) is 1, O(n²) is reference_size.
+
+    Anti-pattern findings count too, since their totals (an O(n) list search
+    in a loop is O(n²)) are often worse than the loop-based estimate.
+    """
+    values = [try_parse(text) or CONSTANT for text in [complexity, *(finding.total for finding in findings)]]
+    size = max(log2_size(value, reference_size) for value in values)
+    # Capped so exponential estimates stay finite floats
+    return 2.0 ** (min(size, 1000.0) - math.log2(reference_size))
+
+class HotspotAnalyzer:
+    """Spend the analysis budget on the functions that are hot in a profile.
+
+    Profiled units are ranked by time share × estimated cost and taken from a
+    priority queue until ``budget`` units are chosen or the next one has less
+    than ``min_share`` of the time; only those are analyzed. Each record gets
+    a ``profile`` entry with its measured weight and priority, and the report
+    is re-ranked with the final complexity.
+    """
+
+    def __init__(self, analyzer, budget: Optional[int] = None, min_share: Optional[float] = None,
+                 reference_size: Optional[float] = None, **batch_options):
+        self.analyzer = analyzer
+        self.budget = Config.HOTSPOT_BUDGET if budget is None else budget
+        self.min_share = Config.HOTSPOT_MIN_SHARE if min_share is None else min_share
+        self.reference_size = reference_size or Config.HOTSPOT_REFERENCE_SIZE
+        self.batch = BatchAnalyzer(analyzer, **batch_options)
+
+        self.profiled_units = 0
+        self.skipped_units = 0
+
+    def run(self, profile_path: str, paths: Iterable[str]) -> List[Dict[str, Any]]:
+        """Return the analyzed hot units, highest priority first."""
+
+        profile = Profile.load(profile_path)
+        index = UnitIndex(discover_python_files(paths))
+        # Only files that show up in the profile are parsed
+        for path in sorted({index.match_file(file) for file in profile.files} - {None}):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    index.add(path, split_units(path, f.read()))
+            except (OSError, SyntaxError, ValueError):
+                continue
+
+        units = {id(unit): unit for file_units in index.units.values() for unit in file_units}
+        weights = profile.weigh(index.resolve)
+        self.profiled_units = len(weights)
+
+        queue = []
+        for order, (key, weight) in enumerate(weights.items()):
+            unit = units[key]
+            priority = weight.share * cost_weight(unit.static_analysis['time_complexity'],
+                                                  unit.ast_analysis.findings, self.reference_size)
+            heapq.heappush(queue, (-priority, order, unit, weight))
+
+        chosen = {}
+        while queue and len(chosen) < self.budget:
+            _, _, unit, weight = heapq.heappop(queue)
+            if weight.share < self.min_share:
+                continue
+            chosen[id(unit)] = weight
+        self.skipped_units = self.profiled_units - len(chosen)
+
+        records = []
+        for record, unit in self._analyze([units[key] for key in chosen]):
+            weight = chosen[id(unit)]
+            complexity = record.get('final_analysis', unit.static_analysis)['time_complexity']
+            record['profile'] = dict(weight.to_dict(), unit=profile.unit,
+                                     priority=weight.share * cost_weight(complexity, unit.ast_analysis.findings,
+                                                                         self.reference_size))
+            records.append(record)
+
+        records.sort(key=lambda record: -record['profile']['priority'])
+        for rank, record in enumerate(records, 1):
+            record['profile']['rank'] = rank
+        return records
+
+    def _analyze(self, units: List[AnalysisUnit]) -> Iterator[Tuple[Dict[str, Any], AnalysisUnit]]:
+        by_position = {(unit.path, unit.line): unit for unit in units}
+        for record in self.batch.analyze_units(units):
+            yield record, by_position[(record['file'], record['line'])]
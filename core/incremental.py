@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from config import Config
+from .batch import AnalysisUnit, BatchAnalyzer, discover_python_files, extract_units, numbered_names
+
+MANIFEST_VERSION = 2
+
+def dependency_keys(units: List[AnalysisUnit]) -> Dict[int, str]:
+    """Key every unit by its own fingerprint plus those of everything it calls.
+
+    Callees are resolved by name within the caller's module: a method's calls
+    go to methods of its own class first, then to module-level functions.
+    Calls into other files aren't resolved, so editing an imported helper
+    doesn't change its callers' keys.
+    Dependencies are followed transitively, so editing a helper invalidates
+    its callers. Returns a mapping from ``id(unit)`` to the key.
+    """
+
+    scopes = defaultdict(list)
+    for unit in units:
+        owner, _, name = unit.name.rpartition('.')
+        scopes[unit.path, owner, name].append(unit)
+
+    def callees(unit):
+        owner = unit.name.rpartition('.')[0]
+        for name in unit.callees:
+            # self.load() and a bare load() are both recorded as 'load'
+            found = scopes.get((unit.path, owner, name)) if owner else None
+            yield from found or scopes.get((unit.path, '', name), ())
+
+    keys = {}
+    for unit in units:
+        reachable = {id(unit): unit}
+        frontier = [unit]
+        while frontier:
+            for callee in callees(frontier.pop()):
+                if id(callee) not in reachable:
+                    reachable[id(callee)] = callee
+                    frontier.append(callee)
+
+        callee_prints = sorted(u.fingerprint for key, u in reachable.items() if key != id(unit))
+        digest = hashlib.sha256(unit.fingerprint.encode('utf-8'))
+        for fingerprint in callee_prints:
+            digest.update(fingerprint.encode('utf-8'))
+        keys[id(unit)] = digest.hexdigest()
+
+    return keys
+
+class Manifest:
+    """Per-unit results from previous runs, stored as JSON next to the project.
+
+    Entries are keyed by ``<relative path>::<unit name>`` (redefinitions
+    numbered as in ``numbered_names``) and only trusted
+    when their dependency key matches and they were produced by the same
+    analyzer configuration.
+    """
+
+    def __init__(self, path: Optional[str] = None, analyzer_key: str = ''):
+        self.path = path or Config.MANIFEST_PATH
+        self.root = os.path.dirname(os.path.abspath(self.path))
+        self.analyzer_key = analyzer_key
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            # Missing or corrupt manifest: everything is re-analyzed
+            return
+
+        if data.get('version') == MANIFEST_VERSION and data.get('analyzer') == self.analyzer_key:
+            self.entries = data.get('units', {})
+
+    def unit_id(self, path: str, name: str) -> str:
+        relative = os.path.relpath(os.path.abspath(path), self.root)
+        return f"{relative.replace(os.sep, '/')}::{name}"
+
+    def lookup(self, unit_id: str, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(unit_id)
+        if entry is None or entry['key'] != key:
+            return None
+        return entry['result']
+
+    def update(self, unit_id: str, key: str, record: Dict[str, Any]):
+        # The AST analysis is cheap to redo and comes from the current parse on reuse
+        result = {k: v for k, v in record.items() if k not in ('ast_analysis', 'reused')}
+        self.entries[unit_id] = {'key': key, 'result': result}
+
+    def prune(self, files: Iterable[str], unit_ids: Iterable[str]):
+        """Drop entries of parsed files whose units no longer exist.
+
+        Entries for other files are kept, so analyzing a subset of the
+        project (or a file that currently fails to parse) forgets nothing.
+        """
+
+        prefixes = {self.unit_id(path, '') for path in files}
+        keep = set(unit_ids)
+        self.entries = {
+            unit_id: entry for unit_id, entry in self.entries.items()
+            if unit_id in keep or unit_id.rsplit('::', 1)[0] + '::' not in prefixes
+        }
+
+    def save(self):
+        data = {'version': MANIFEST_VERSION, 'analyzer': self.analyzer_key, 'units': self.entries}
+        temporary = f"{self.path}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(data, f, sort_keys=True)
+        os.replace(temporary, self.path)
+
+def analyzer_key(analyzer) -> str:
+    """Identify the settings a manifest's results depend on."""
+    from .backends import backend_model_id
+    from .llm_client import PROMPT_VERSION
+    mode = 'offline' if analyzer.offline else 'llm'
+    model = backend_model_id(getattr(analyzer, 'backend', None))
+    return f"{model}/{PROMPT_VERSION}/{mode}/{analyzer.confidence_threshold}"
+
+class IncrementalBatchAnalyzer(BatchAnalyzer):
+    """BatchAnalyzer that only re-analyzes units changed since the last run.
+
+    All files are parsed first so that call dependencies are known; units whose dependency key matches the manifest are
+    yielded from it (with ``reused: True``) and the rest go to the LLM.
+    """
+
+    def __init__(self, analyzer, manifest_path: Optional[str] = None, **kwargs):
+        super().__init__(analyzer, **kwargs)
+        self.manifest = Manifest(manifest_path, analyzer_key(analyzer))
+        self.reused_units = 0
+
+    def run(self, paths: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        files = discover_python_files(paths)
+        parsed = []
+        units: List[AnalysisUnit] = []
+
+        with ProcessPoolExecutor(max_workers=self.jobs) as parse_pool:
+            futures = {parse_pool.submit(extract_units, path): path for path in files}
+            for future in as_completed(futures):
+                try:
+                    file_units = future.result()
+                except Exception as e:
+                    self.total_units += 1
+                    yield self._record_failure(futures[future], None, f'Parsing failed: {e}')
+                    continue
+                self.total_units += len(file_units)
+                parsed.append(futures[future])
+                units.extend(file_units)
+
+        units.sort(key=lambda unit: (unit.path, unit.line))
+        keys = dependency_keys(units)
+        names = numbered_names(units)
+        unit_ids = {id(unit): self.manifest.unit_id(unit.path, names[id(unit)]) for unit in units}
+
+        try:
+            stale = []
+            for unit in units:
+                result = self.manifest.lookup(unit_ids[id(unit)], keys[id(unit)])
+                if result is None:
+                    stale.append(unit)
+                    continue
+
+                self.reused_units += 1
+                self.completed_units += 1
+                self._report_progress()
+                # Positions come from this run: unchanged code may have moved
+                yield {**result, **self._unit_fields(unit.path, unit), 'ast_analysis': unit.ast_analysis,
+                       'reused': True}
+
+            by_position = {(unit.path, unit.line): unit for unit in stale}
+            for record in self.analyze_units(stale):
+                unit = by_position.get((record['file'], record['line']))
+                if 'error' not in record and unit is not None:
+                    self.manifest.update(unit_ids[id(unit)], keys[id(unit)], record)
+                yield record
+        finally:
+            # Also runs when the consumer stops early, keeping finished results
+            self.manifest.prune(parsed, unit_ids.values())
+            self.manifest.save()
@@ -1,26 +1,95 @@
-import google.generativeai as genai
-from typing import Optional, Dict, Any
-import json
-import re
+import threading
+import time
+from typing import Callable, Optional, Dict, Any, List, Tuple
 from config import Config
+from .backends import create_backend
+from .prompt_builder import PromptBuilder, PromptChunk, estimate_tokens, merge_chunk_results
+from .rate_limit import RetryPolicy, is_retryable_error
+from .response_parser import ParseStats, parse_analysis, parse_batch, validate_analysis
+from .tracing import span
+
+# Bump whenever the prompt template or response schema changes so cached
+# analyses produced by an older prompt are not reused.
+PROMPT_VERSION = 2
+
+# Fields that make up the verdict; the prompt asks for them first so they can
+# be read off a streamed response before the explanation arrives
+VERDICT_FIELDS = ('time_complexity', 'space_complexity', 'confidence')
+
+# Rough output size of one item in a batched response, used when packing batches
+BATCH_RESPONSE_TOKENS_PER_ITEM = 120
+
+def _cancel_stream(response):
+    """Best effort: stop the server generating the rest of a streamed response."""
+    iterator = getattr(response, '_iterator', None)
+    cancel = getattr(iterator, 'cancel', None)
+    if callable(cancel):
+        cancel()
 
 class LLMClient:
     
-    def __init__(self, api_key: Optional[str] = None):
-        self.api_key = api_key or Config.GEMINI_API_KEY
-        if not self.api_key:
-            raise ValueError("GEMINI_API_KEY is required")
+    def __init__(self, api_key: Optional[str] = None, model: Optional[Any] = None,
+                 backend: Optional[str] = None, retry_policy: Optional[RetryPolicy] = None):
+        """Talk to the registered ``backend`` (default Config.LLM_BACKEND).
         
-        genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel(Config.GEMINI_MODEL)
+        ``model`` is a ready Backend instance to use instead, e.g. a FakeModel
+        built from a labeled corpus.
+        """
+        self.parse_stats = ParseStats()
+        self.prompt_builder = PromptBuilder()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self._usage = {'calls': 0, 'prompt_tokens': 0, 'response_tokens': 0}
+        self._usage_lock = threading.Lock()
+        
+        self.api_key = api_key
+        self.model = model if model is not None else create_backend(backend, api_key)
+    
+    def usage(self) -> Dict[str, int]:
+        """Model calls and tokens so far; estimated when the response carries no usage metadata."""
+        with self._usage_lock:
+            return dict(self._usage)
+    
+    def _record_usage(self, prompt: str, response: Any, text: str) -> Dict[str, int]:
+        metadata = getattr(response, 'usage_metadata', None)
+        prompt_tokens = getattr(metadata, 'prompt_token_count', 0) or estimate_tokens(prompt)
+        response_tokens = getattr(metadata, 'candidates_token_count', 0) or estimate_tokens(text)
+        with self._usage_lock:
+            self._usage['calls'] += 1
+            self._usage['prompt_tokens'] += prompt_tokens
+            self._usage['response_tokens'] += response_tokens
+        return {'prompt_tokens': prompt_tokens, 'response_tokens': response_tokens}
+    
+    def _generate_content(self, prompt: str) -> str:
+        """One blocking model call; returns the response text."""
+        with span('llm.generate', prompt_chars=len(prompt)) as stage:
+            response = self._call_with_retries(lambda: self.model.generate_content(prompt))
+            text = response.text
+            stage.set(response_chars=len(text), **self._record_usage(prompt, response, text))
+        return text
+    
+    def _call_with_retries(self, call: Callable[[], Any]) -> Any:
+        """Run one backend call, retrying transient failures (rate limits, 5xx, timeouts) with backoff."""
+        attempt = 0
+        while True:
+            try:
+                return call()
+            except Exception as e:
+                if attempt >= self.retry_policy.max_retries or not is_retryable_error(e):
+                    raise
+            with span('llm.backoff', attempt=attempt):
+                time.sleep(self.retry_policy.delay(attempt))
+            attempt += 1
     
     def analyze_complexity(self, code: str, ast_analysis: Dict[str, Any]) -> Dict[str, Any]:
         
-        prompt = self._build_analysis_prompt(code, ast_analysis)
-        
+        with span('llm.analyze'):
+            chunks = self._plan(code, ast_analysis)
+            results = [self._analyze_prompt(self._render_chunk(chunk)) for chunk in chunks]
+            return results[0] if len(results) == 1 else merge_chunk_results(chunks, results)
+    
+    def _analyze_prompt(self, prompt: str) -> Dict[str, Any]:
         try:
-            response = self.model.generate_content(prompt)
-            return self._parse_llm_response(response.text)
+            return self._parse_llm_response(self._generate_content(prompt))
         except Exception as e:
             return {
                 'error': f'LLM analysis failed: {str(e)}',
@@ -29,7 +98,174 @@ class LLMClient:
                 'confidence': 0.0
             }
     
-    def _build_analysis_prompt(self, code: str, ast_analysis: Dict[str, Any]) -> str:
+    def _plan(self, code: str, ast_analysis: Dict[str, Any]) -> List[PromptChunk]:
+        """Fit code into one or more prompts within the token budget (see PromptBuilder)."""
+        with span('llm.prompt', code_chars=len(code)) as stage:
+            chunks = self.prompt_builder.plan(code, ast_analysis, self._render_chunk)
+            stage.set(chunks=len(chunks), compacted=chunks[0].compacted,
+                      sent_chars=sum(len(chunk.code) for chunk in chunks))
+        return chunks
+    
+    def _render_chunk(self, chunk: PromptChunk) -> str:
+        return self._build_analysis_prompt(chunk.code, chunk.ast_analysis, chunk.context, chunk.compacted)
+    
+    def analyze_complexity_stream(self, code: str, ast_analysis: Dict[str, Any],
+                                  on_field: Optional[Callable[[str, Any], None]] = None,
+                                  fast_verdict: bool = False) -> Dict[str, Any]:
+        """Like analyze_complexity, but streams the response.
+        
+        ``on_field(key, value)`` is called for each top-level field as soon as
+        it is complete. With ``fast_verdict`` generation is abandoned once all
+        VERDICT_FIELDS are in; the result then has ``truncated: True`` and no
+        explanation beyond what had arrived. Code too big for one prompt is
+        analyzed in chunks without streaming, and the merged verdict reported
+        once at the end.
+        """
+        
+        with span('llm.analyze', stream=True):
+            chunks = self._plan(code, ast_analysis)
+            if len(chunks) > 1:
+                result = merge_chunk_results(
+                    chunks, [self._analyze_prompt(self._render_chunk(chunk)) for chunk in chunks]
+                )
+                for key in VERDICT_FIELDS:
+                    if on_field is not None and key in result:
+                        on_field(key, result[key])
+                return result
+            
+            try:
+                return self._stream_analysis(self._render_chunk(chunks[0]), on_field, fast_verdict)
+            except Exception as e:
+                return {
+                    'error': f'LLM analysis failed: {str(e)}',
+                    'time_complexity': 'Unknown',
+                    'space_complexity': 'Unknown',
+                    'confidence': 0.0
+                }
+    
+    def _stream_analysis(self, prompt: str, on_field, fast_verdict: bool) -> Dict[str, Any]:
+        from .streaming import JSONFieldStream
+        
+        stream = JSONFieldStream()
+        with span('llm.generate', prompt_chars=len(prompt), stream=True) as stage:
+            response = self._call_with_retries(lambda: self.model.generate_content(prompt, stream=True))
+            for chunk in response:
+                for key, value in stream.feed(chunk.text):
+                    if on_field is not None:
+                        on_field(key, value)
+                
+                if fast_verdict and all(field in stream.fields for field in VERDICT_FIELDS):
+                    # A malformed verdict isn't worth stopping for; read the rest instead
+                    fast_verdict = False
+                    result, problems = validate_analysis(stream.fields, require_space=True)
+                    if result is not None:
+                        _cancel_stream(response)
+                        stage.set(response_chars=len(stream.text), truncated=True,
+                                  **self._record_usage(prompt, None, stream.text))
+                        self.parse_stats.record('structured', problems)
+                        result['truncated'] = True
+                        return result
+            
+            stage.set(response_chars=len(stream.text), **self._record_usage(prompt, response, stream.text))
+        return self._parse_llm_response(stream.text)
+    
+    def analyze_batch(self, items: List[Tuple[str, str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+        """Analyze many (id, code, ast_analysis) items, packing several into each prompt.
+        
+        Items missing or invalid in a batched response are retried one at a time.
+        """
+        
+        results = {}
+        for batch in self._pack_batches(items):
+            if len(batch) == 1:
+                item_id, code, ast_analysis = batch[0]
+                results[item_id] = self.analyze_complexity(code, ast_analysis)
+                continue
+            
+            try:
+                with span('llm.prompt', items=len(batch)):
+                    prompt = self._build_batch_prompt(batch)
+                text = self._generate_content(prompt)
+                parsed = self._parse_batch_response(text, {item_id for item_id, _, _ in batch})
+            except Exception:
+                parsed = {}
+            
+            for item_id, code, ast_analysis in batch:
+                if item_id in parsed:
+                    results[item_id] = parsed[item_id]
+                else:
+                    results[item_id] = self.analyze_complexity(code, ast_analysis)
+        
+        return results
+    
+    def _pack_batches(self, items: List[Tuple[str, str, Dict[str, Any]]]) -> List[list]:
+        """Greedily group items so each batch prompt stays within the token budget."""
+        
+        budget = Config.BATCH_TOKEN_BUDGET - estimate_tokens(self._build_batch_prompt([]))
+        batches = []
+        current, used = [], 0
+        
+        for item in items:
+            cost = estimate_tokens(self._format_batch_item(*item)) + BATCH_RESPONSE_TOKENS_PER_ITEM
+            if current and (used + cost > budget or len(current) >= Config.BATCH_MAX_ITEMS):
+                batches.append(current)
+                current, used = [], 0
+            current.append(item)
+            used += cost
+        
+        if current:
+            batches.append(current)
+        return batches
+    
+    def _format_batch_item(self, item_id: str, code: str, ast_analysis: Dict[str, Any]) -> str:
+        
+        return f"""
+### SNIPPET {item_id}
+AST: nesting={ast_analysis.get('max_nesting_level', 0)}, loops={[loop['type'] for loop in ast_analysis.get('loops', [])]}, recursion={ast_analysis.get('recursive_calls', [])}, builtins={ast_analysis.get('builtin_calls', [])}
+```python
+{code}
+```
+"""
+    
+    def _build_batch_prompt(self, batch: List[Tuple[str, str, Dict[str, Any]]]) -> str:
+        
+        snippets = "".join(self._format_batch_item(*item) for item in batch)
+        return f"""
+You are an expert algorithm analyst. Analyze the time complexity of each independent Python snippet below.
+Each snippet is introduced by "### SNIPPET <id>" and a one-line structural summary from AST parsing.
+{snippets}
+Respond with ONLY a JSON array containing one object per snippet, in any order:
+[
+    {{
+        "id": "<snippet id>",
+        "time_complexity": "O(...)",
+        "space_complexity": "O(...)",
+        "explanation": "One or two sentences",
+        "bottlenecks": ["list", "of", "bottlenecks"],
+        "confidence": 0.0-1.0
+    }}
+]
+
+Analyze every snippet on its own; do not let one snippet influence another.
+"""
+    
+    def _parse_batch_response(self, response_text: str, expected_ids) -> Dict[str, Dict[str, Any]]:
+        """Split a batched response into per-snippet results, keeping only valid items."""
+        with span('llm.parse', response_chars=len(response_text), items=len(expected_ids)):
+            return parse_batch(response_text, expected_ids, self.parse_stats)
+    
+    def _build_analysis_prompt(self, code: str, ast_analysis: Dict[str, Any],
+                               context: List[str] = (), compacted: bool = False) -> str:
+        
+        notes = ""
+        if compacted:
+            notes += (
+                "\nDocstrings and comments were removed. A string starting with \"summary:\" "
+                "stands in for the body of a function without loops or calls.\n"
+            )
+        if context:
+            notes += "\nFUNCTIONS CALLED ABOVE BUT NOT SHOWN (summaries from static analysis):\n"
+            notes += "".join(f"- {line}\n" for line in context)
         
         return f"""
 You are an expert algorithm analyst. Analyze the following Python code snippet and provide a detailed time complexity analysis.
@@ -38,7 +274,7 @@ CODE TO ANALYZE:
 ```python
 {code}
 ```
-
+{notes}
 STRUCTURAL ANALYSIS (from AST parsing):
 - Maximum nesting level: {ast_analysis.get('max_nesting_level', 0)}
 - Number of loops: {len(ast_analysis.get('loops', []))}
@@ -51,9 +287,9 @@ Please provide your analysis in the following JSON format:
 {{
     "time_complexity": "O(...)",
     "space_complexity": "O(...)",
+    "confidence": 0.0-1.0,
     "explanation": "Detailed explanation of the complexity analysis",
     "bottlenecks": ["list", "of", "performance", "bottlenecks"],
-    "confidence": 0.0-1.0,
     "reasoning": "Step-by-step reasoning for the complexity determination"
 }}
 
@@ -69,39 +305,5 @@ Be precise and provide confidence score based on code clarity and complexity pat
     
     def _parse_llm_response(self, response_text: str) -> Dict[str, Any]:
         """Parse LLM response and extract structured data."""
-        
-        try:
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-                return json.loads(json_str)
-        except json.JSONDecodeError:
-            pass
-        
-        return self._extract_fallback_info(response_text)
-    
-    def _extract_fallback_info(self, text: str) -> Dict[str, Any]:
-        
-        time_complexity = self._extract_complexity(text, 'time')
-        space_complexity = self._extract_complexity(text, 'space')
-        
-        return {
-            'time_complexity': time_complexity,
-            'space_complexity': space_complexity,
-            'explanation': text[:500] + "..." if len(text) > 500 else text,
-            'bottlenecks': [],
-            'confidence': 0.5,
-            'reasoning': 'Fallback analysis due to parsing issues'
-        }
-    
-    def _extract_complexity(self, text: str, complexity_type: str) -> str:
-        
-        pattern = rf'{complexity_type}.*?complexity.*?O\([^)]+\)'
-        match = re.search(pattern, text, re.IGNORECASE)
-        
-        if match:
-            o_match = re.search(r'O\([^)]+\)', match.group(0))
-            if o_match:
-                return o_match.group(0)
-        
-        return 'O(?)' 
\ No newline at end of file
+        with span('llm.parse', response_chars=len(response_text)):
+            return parse_analysis(response_text, self.parse_stats)
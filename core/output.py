@@ -0,0 +1,156 @@
+import os
+from typing import Any, Dict, Iterable, List, Optional, TextIO
+
+from .serialization import dumps_compact
+
+# Writers for batch results. Records are written as soon as they arrive and
+# nothing but the (small) SARIF rule table and error list is kept, so memory
+# stays flat however many units a run covers.
+
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+TOOL_NAME = 'time-complexity-estimator'
+
+_MISSING = object()
+
+def parse_fields(spec: Optional[str]) -> Optional[List[str]]:
+    """Split a comma-separated ``--fields`` value into dotted paths."""
+    if not spec:
+        return None
+    return [field.strip() for field in spec.split(',') if field.strip()]
+
+def project(record: Dict[str, Any], fields: Iterable[str]) -> Dict[str, Any]:
+    """Keep only the given dotted paths of a record, e.g. ``final_analysis.time_complexity``.
+
+    Nested paths keep their nesting; paths missing from the record are left out.
+    Records such as ASTAnalysis are looked up by attribute, without converting
+    them to dicts first.
+    """
+
+    projected: Dict[str, Any] = {}
+    for field in fields:
+        keys = field.split('.')
+        value = record
+        for key in keys:
+            if isinstance(value, dict):
+                value = value.get(key, _MISSING)
+            else:
+                value = getattr(value, key, _MISSING)
+            if value is _MISSING:
+                break
+        if value is _MISSING:
+            continue
+
+        target = projected
+        for key in keys[:-1]:
+            target = target.setdefault(key, {})
+        target[keys[-1]] = value
+    return projected
+
+class NDJSONWriter:
+    """Write one compact JSON document per line, flushing after each record.
+
+    With ``fields`` only those paths are written, plus ``error`` for failed
+    units so a projection never hides a failure.
+    """
+
+    def __init__(self, stream: TextIO, fields: Optional[List[str]] = None):
+        self.stream = stream
+        self.fields = fields
+
+    def write(self, record: Dict[str, Any]):
+        if self.fields is not None:
+            projected = project(record, self.fields)
+            if 'error' in record:
+                projected['error'] = record['error']
+            record = projected
+        self.stream.write(dumps_compact(record) + '\n')
+        self.stream.flush()
+
+    def close(self):
+        pass
+
+class SarifWriter:
+    """Stream anti-pattern findings as a SARIF 2.1.0 log for code-review tools.
+
+    Results are written as they come in; the tool section, which lists only
+    the rules that fired, and errors from units that could not be analyzed
+    follow them at the end of the run object.
+    """
+
+    def __init__(self, stream: TextIO, base_dir: Optional[str] = None):
+        self.stream = stream
+        self.base_dir = os.path.abspath(base_dir or os.getcwd())
+        self.rules: Dict[str, int] = {}
+        self.notifications: List[Dict[str, Any]] = []
+        self.results = 0
+        self.stream.write(f'{{"$schema":"{SARIF_SCHEMA}","version":"2.1.0","runs":[{{"results":[')
+
+    def write(self, record: Dict[str, Any]):
+        """Add the findings of a batch record, or its error as a notification."""
+        if 'error' in record:
+            self.add_error(record['file'], record['error'], record.get('line'))
+            return
+        analysis = record.get('ast_analysis')
+        self.add_findings(record['file'], analysis.findings if analysis is not None else ())
+
+    def add_findings(self, path: str, findings: Iterable[Any]):
+        location = self._location(path)
+        for finding in findings:
+            result = {
+                'ruleId': finding.rule,
+                'ruleIndex': self.rules.setdefault(finding.rule, len(self.rules)),
+                'level': 'warning',
+                'message': {'text': f"{finding.message} ({finding.cost} each, {finding.total} overall). "
+                                    f"{finding.suggestion}"},
+                'locations': [{'physicalLocation': dict(location, region={'startLine': finding.line})}],
+                'properties': {'cost': finding.cost, 'total': finding.total}
+            }
+            self.stream.write((',' if self.results else '') + dumps_compact(result))
+            self.results += 1
+        self.stream.flush()
+
+    def add_error(self, path: str, error: str, line: Optional[int] = None):
+        location = self._location(path)
+        if line is not None:
+            location['region'] = {'startLine': line}
+        self.notifications.append({'level': 'error', 'message': {'text': error},
+                                   'locations': [{'physicalLocation': location}]})
+
+    def close(self):
+        from .antipatterns import RULES
+
+        rules = []
+        for rule_id in self.rules:
+            rule = {'id': rule_id}
+            doc = (RULES[rule_id].__doc__ or '').strip() if rule_id in RULES else ''
+            if doc:
+                rule['shortDescription'] = {'text': doc.splitlines()[0]}
+            rules.append(rule)
+        tool = {'driver': {'name': TOOL_NAME, 'rules': rules}}
+        invocation = {'executionSuccessful': not self.notifications,
+                      'toolExecutionNotifications': self.notifications}
+        self.stream.write(f'],"tool":{dumps_compact(tool)},"invocations":[{dumps_compact(invocation)}],'
+                          f'"originalUriBaseIds":{dumps_compact(self._base_uri())}}}]}}\n')
+        self.stream.flush()
+
+    def _location(self, path: str) -> Dict[str, Any]:
+        absolute = os.path.abspath(path)
+        relative = os.path.relpath(absolute, self.base_dir)
+        if relative.startswith(os.pardir):
+            return {'artifactLocation': {'uri': _file_uri(absolute)}}
+        return {'artifactLocation': {'uri': relative.replace(os.sep, '/'), 'uriBaseId': 'SRCROOT'}}
+
+    def _base_uri(self) -> Dict[str, Any]:
+        return {'SRCROOT': {'uri': _file_uri(self.base_dir) + '/'}}
+
+def _file_uri(path: str) -> str:
+    from pathlib import Path
+    return Path(path).as_uri()
+
+def create_writer(format: str, stream: TextIO, fields: Optional[List[str]] = None):
+    """The streaming writer for an output format: ``ndjson`` (``json``) or ``sarif``."""
+    if format in ('json', 'ndjson'):
+        return NDJSONWriter(stream, fields)
+    if format == 'sarif':
+        return SarifWriter(stream)
+    raise ValueError(f"No streaming writer for format: {format}")
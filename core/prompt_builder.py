@@ -0,0 +1,229 @@
+import ast
+import copy
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from config import Config
+from .bigo import dominant, try_parse
+
+@dataclass
+class PromptChunk:
+    """The code for one analysis prompt and what the prompt says about it."""
+    label: str
+    code: str
+    ast_analysis: Dict[str, Any]
+    # One-line summaries of functions this code calls but which are not included
+    context: List[str] = field(default_factory=list)
+    # Docstrings/comments removed and trivial function bodies summarized
+    compacted: bool = False
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) used for prompt budgeting."""
+    return len(text) // 4 + 1
+
+_LOOPS = (ast.For, ast.AsyncFor, ast.While, ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+_FUNCTIONS = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+def compact(tree: ast.AST, summarize_trivial: bool = True) -> str:
+    """Source for tree without docstrings or comments.
+
+    With ``summarize_trivial``, bodies of functions containing no loops and no
+    calls are replaced by a string summarizing them; such a body costs O(1)
+    whatever it does.
+    """
+    tree = copy.deepcopy(tree)
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.Module, ast.ClassDef) + _FUNCTIONS):
+            continue
+        if _has_docstring(node):
+            node.body = node.body[1:] or [ast.Pass()]
+        if summarize_trivial and isinstance(node, _FUNCTIONS) and _is_trivial(node):
+            lines = node.end_lineno - node.lineno
+            node.body = [ast.Expr(ast.Constant(f"summary: {lines} lines, no loops or calls, O(1)"))]
+    # unparse drops comments on its own
+    return ast.unparse(tree)
+
+def _has_docstring(node: ast.AST) -> bool:
+    first = node.body[0] if node.body else None
+    return (isinstance(first, ast.Expr) and isinstance(first.value, ast.Constant)
+            and isinstance(first.value.value, str))
+
+def _is_trivial(node: ast.AST) -> bool:
+    return not any(isinstance(child, _LOOPS + (ast.Call,)) for statement in node.body for child in ast.walk(statement))
+
+class PromptBuilder:
+    """Fit code into analysis prompts of at most ``token_budget`` estimated tokens.
+
+    Code is used verbatim when the prompt fits. Otherwise docstrings and
+    comments are stripped, then trivial function bodies summarized, and if
+    that is still too big the code is split by function into several chunks,
+    each carrying one-line AST/static summaries of the callees it doesn't
+    contain. No chunk inlines more than ``max_code_length`` characters of code.
+    """
+
+    def __init__(self, token_budget: Optional[int] = None, max_code_length: Optional[int] = None):
+        self.token_budget = token_budget or Config.PROMPT_TOKEN_BUDGET
+        self.max_code_length = max_code_length or Config.MAX_CODE_LENGTH
+
+    def plan(self, code: str, ast_analysis: Dict[str, Any],
+             render: Callable[[PromptChunk], str]) -> List[PromptChunk]:
+        """Chunks to analyze; ``render`` builds the full prompt for a chunk so it can be measured."""
+        whole = PromptChunk('<all>', code, ast_analysis)
+        if self._fits(whole, render):
+            return [whole]
+
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            return [self._truncate(whole, render)]
+
+        for summarize_trivial in (False, True):
+            compacted = PromptChunk('<all>', compact(tree, summarize_trivial), ast_analysis, compacted=True)
+            if self._fits(compacted, render):
+                return [compacted]
+
+        return self._split(code, render)
+
+    def _fits(self, chunk: PromptChunk, render) -> bool:
+        return len(chunk.code) <= self.max_code_length and estimate_tokens(render(chunk)) <= self.token_budget
+
+    def _split(self, code: str, render) -> List[PromptChunk]:
+        from .batch import split_units
+
+        units = split_units('<input>', code)
+        remainder = _module_remainder(code) if units and units[0].name != '<module>' else None
+        if remainder is not None:
+            units.append(remainder)
+
+        compacted = {}
+        for unit in units:
+            try:
+                compacted[id(unit)] = compact(ast.parse(unit.code))
+            except SyntaxError:
+                compacted[id(unit)] = unit.code
+
+        chunks, current = [], []
+        for unit in units:
+            candidate = self._chunk(current + [unit], units, compacted)
+            if current and not self._fits(candidate, render):
+                chunks.append(self._chunk(current, units, compacted))
+                current = []
+            current.append(unit)
+        if current:
+            chunks.append(self._chunk(current, units, compacted))
+
+        # A single function can still be too big on its own
+        return [chunk if self._fits(chunk, render) else self._truncate(chunk, render) for chunk in chunks]
+
+    def _chunk(self, members: list, units: list, compacted: Dict[int, str]) -> PromptChunk:
+        names = [unit.name for unit in members]
+        inside = set(names)
+        called = []
+        for unit in members:
+            called.extend(name for name in unit.callees if name not in called)
+
+        context = []
+        for unit in units:
+            if unit.name not in inside and unit.name.rsplit('.', 1)[-1] in called:
+                context.append(_summarize_unit(unit))
+
+        label = ', '.join(names) if len(names) <= 3 else f"{names[0]} … {names[-1]} ({len(names)} functions)"
+        return PromptChunk(
+            label=label,
+            code='\n\n'.join(compacted[id(unit)] for unit in members),
+            ast_analysis=_merge_ast([unit.ast_analysis.to_dict() for unit in members]),
+            context=context,
+            compacted=True
+        )
+
+    def _truncate(self, chunk: PromptChunk, render) -> PromptChunk:
+        """Keep as many leading lines as fit, noting how many were dropped."""
+        empty = PromptChunk(chunk.label, '', chunk.ast_analysis, chunk.context, chunk.compacted)
+        overhead = estimate_tokens(render(empty))
+        limit = min(self.max_code_length, max(0, (self.token_budget - overhead - 16) * 4))
+
+        lines = chunk.code.splitlines(keepends=True)
+        kept, size = [], 0
+        for line in lines:
+            if size + len(line) > limit:
+                break
+            kept.append(line)
+            size += len(line)
+        code = ''.join(kept) + f"\n# ... {len(lines) - len(kept)} more lines truncated\n"
+        return PromptChunk(chunk.label, code, chunk.ast_analysis, chunk.context, chunk.compacted)
+
+def _module_remainder(code: str):
+    """Module-level statements that do work (loops or calls) as a '<module>' unit, or None."""
+    from .ast_parser import ASTParser
+    from .batch import AnalysisUnit
+    from .static_estimator import StaticEstimator
+
+    tree = ast.parse(code)
+    body = [
+        node for node in tree.body
+        if not isinstance(node, _FUNCTIONS + (ast.ClassDef, ast.Import, ast.ImportFrom))
+        and any(isinstance(child, _LOOPS + (ast.Call,)) for child in ast.walk(node))
+    ]
+    if not body:
+        return None
+
+    module = ast.Module(body=body, type_ignores=[])
+    return AnalysisUnit(
+        path='<input>',
+        name='<module>',
+        line=body[0].lineno,
+        end_line=body[-1].end_lineno,
+        code=ast.unparse(module),
+        ast_analysis=ASTParser().analyze_tree(module),
+        static_analysis=StaticEstimator().estimate(module)
+    )
+
+def _summarize_unit(unit) -> str:
+    analysis = unit.ast_analysis
+    static = unit.static_analysis or {}
+    function = next((f for f in analysis.functions if f.line == unit.line), None)
+    arguments = f"{function.args_count} args" if function else "module code"
+    return (
+        f"{unit.name} ({arguments}, line {unit.line}): static estimate "
+        f"{static.get('time_complexity', 'O(?)')} time, {static.get('space_complexity', 'O(?)')} space; "
+        f"{len(analysis.loops)} loops, max nesting {analysis.max_nesting_level}, "
+        f"recursive: {'yes' if analysis.recursive_calls else 'no'}"
+    )
+
+def _merge_ast(analyses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    merged = {
+        'loops': [], 'functions': [], 'max_nesting_level': 0,
+        'recursive_calls': [], 'builtin_calls': [], 'data_structures': []
+    }
+    for analysis in analyses:
+        merged['loops'].extend(analysis['loops'])
+        merged['functions'].extend(analysis['functions'])
+        merged['max_nesting_level'] = max(merged['max_nesting_level'], analysis['max_nesting_level'])
+        for key in ('recursive_calls', 'builtin_calls', 'data_structures'):
+            merged[key].extend(value for value in analysis[key] if value not in merged[key])
+    return merged
+
+def merge_chunk_results(chunks: List[PromptChunk], results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Reduce per-chunk analyses into one: the dominant complexities, the weakest confidence."""
+    valid = [(chunk, result) for chunk, result in zip(chunks, results) if 'error' not in result]
+    if not valid:
+        return results[0]
+
+    merged = {
+        'time_complexity': _dominant([result.get('time_complexity') for _, result in valid]),
+        'space_complexity': _dominant([result.get('space_complexity') for _, result in valid]),
+        # Chunks that failed leave part of the code unanalyzed
+        'confidence': round(min(result.get('confidence', 0.5) for _, result in valid) * len(valid) / len(results), 2),
+        'explanation': ' '.join(f"[{chunk.label}] {result.get('explanation', '')}".strip() for chunk, result in valid),
+        'bottlenecks': [],
+        'chunks': len(results)
+    }
+    for _, result in valid:
+        merged['bottlenecks'].extend(b for b in result.get('bottlenecks', []) if b not in merged['bottlenecks'])
+    return merged
+
+def _dominant(values: List[Optional[str]]) -> str:
+    known = [parsed for parsed in map(try_parse, values) if parsed is not None]
+    if not known:
+        return next((value for value in values if value), 'Unknown')
+    return str(dominant(known))
@@ -0,0 +1,62 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from config import Config
+
+# HTTP statuses worth retrying: rate limiting and transient server failures
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# google.api_core exception names for the same conditions
+RETRYABLE_ERROR_NAMES = {
+    'ResourceExhausted', 'TooManyRequests', 'ServiceUnavailable',
+    'DeadlineExceeded', 'InternalServerError', 'GatewayTimeout'
+}
+
+def is_retryable_error(error: BaseException) -> bool:
+    """Whether an LLM call failure is transient and worth retrying."""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    if type(error).__name__ in RETRYABLE_ERROR_NAMES:
+        return True
+    return getattr(error, 'code', None) in RETRYABLE_STATUS_CODES
+
+@dataclass
+class RetryPolicy:
+    max_retries: int = Config.LLM_MAX_RETRIES
+    base_delay: float = Config.LLM_RETRY_BASE_DELAY
+    max_delay: float = Config.LLM_RETRY_MAX_DELAY
+
+    def delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter for the given retry attempt (0-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+class TokenBucket:
+    """Asyncio token bucket allowing ``rate`` acquisitions per second on average."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self._clock = clock
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = self._clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
@@ -0,0 +1,240 @@
+import ast
+import math
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from .call_graph import SCOPE_TYPES, walk_scope
+from .cost import CONSTANT, LINEAR, LOGARITHMIC, Cost, format_cost, multiply
+
+COMPREHENSION_TYPES = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+
+# Decorators that cache a function's results, e.g. functools.lru_cache
+MEMO_DECORATORS = {'cache', 'lru_cache', 'cached', 'memoize', 'memoized'}
+
+@dataclass
+class Recurrence:
+    """T(n) = calls * T(n / factor) + work  or  T(n) = calls * T(n - factor) + work."""
+    calls: int
+    kind: str  # 'divide' or 'subtract'
+    factor: float
+    work: Cost
+
+    def __str__(self) -> str:
+        calls = '' if self.calls == 1 else str(self.calls)
+        operator = '/' if self.kind == 'divide' else '-'
+        factor = int(self.factor) if float(self.factor).is_integer() else self.factor
+        return f"T(n) = {calls}T(n{operator}{factor}) + {format_cost(self.work)}"
+
+    def solve(self) -> Optional[Cost]:
+        """Closed form via the Master theorem, or by unrolling subtractive recurrences."""
+        if self.kind == 'subtract':
+            if self.calls == 1:
+                return multiply(LINEAR, self.work)
+            # a^(n/b) subproblems; the polynomial work per call is dominated
+            return Cost(exp=_tidy(self.calls ** (1 / self.factor)))
+
+        if self.work.exp:
+            return None
+
+        critical = _tidy(math.log(self.calls) / math.log(self.factor))
+        if math.isclose(self.work.poly, critical, abs_tol=1e-9):
+            return Cost(poly=self.work.poly, log=self.work.log + 1)
+        if self.work.poly > critical:
+            return self.work
+        return Cost(poly=critical)
+
+    def depth(self) -> Cost:
+        """Height of the recursion tree, which bounds the call stack."""
+        return LINEAR if self.kind == 'subtract' else LOGARITHMIC
+
+def _tidy(value: float) -> float:
+    """Snap floating-point noise to the nearest integer and round the rest."""
+    return float(round(value)) if math.isclose(value, round(value), abs_tol=1e-9) else round(value, 2)
+
+def extract_recurrence(node: ast.AST, is_self_call: Callable[[ast.Call], bool],
+                       work: Cost) -> Optional[Recurrence]:
+    """Derive the recurrence of a directly recursive function.
+
+    The number of recursive calls is counted along the most expensive path
+    through the body (exclusive branches don't add up), and each call's
+    arguments are compared with the parameters to see how the input shrinks.
+    Returns None when the calls sit in a loop or comprehension, the argument
+    change isn't recognized, or calls shrink the input in different ways.
+    """
+
+    calls = _count_block(node.body, is_self_call)
+    if not calls:
+        return None
+
+    params = [arg.arg for arg in node.args.posonlyargs + node.args.args]
+    midpoints = {
+        child.targets[0].id for child in walk_scope(node.body)
+        if isinstance(child, ast.Assign) and len(child.targets) == 1
+        and isinstance(child.targets[0], ast.Name) and is_midpoint(child.value)
+    }
+
+    shrinks = []
+    for child in walk_scope(node.body):
+        if isinstance(child, ast.Call) and is_self_call(child):
+            shrinks.append(_call_shrink(child, params, midpoints))
+
+    if None in shrinks or len({kind for kind, _ in shrinks}) != 1:
+        return None
+
+    kind = shrinks[0][0]
+    # The largest subproblem bounds the cost, e.g. fib(n-1) + fib(n-2) ≤ 2T(n-1)
+    factor = min(factor for _, factor in shrinks)
+    return Recurrence(calls=calls, kind=kind, factor=factor, work=work)
+
+def _count_block(statements: List[ast.stmt], is_self_call) -> Optional[int]:
+    """Maximum number of recursive calls made along any path through a block."""
+
+    total = 0
+    for index, statement in enumerate(statements):
+        if isinstance(statement, ast.If):
+            test = _count_expression(statement.test, is_self_call)
+            body = _count_block(statement.body, is_self_call)
+            if _terminates(statement.body):
+                # Code after an if that returns only runs when the branch isn't taken
+                rest = _count_block(statement.orelse + statements[index + 1:], is_self_call)
+                if None in (test, body, rest):
+                    return None
+                return total + test + max(body, rest)
+            orelse = _count_block(statement.orelse, is_self_call)
+            if None in (test, body, orelse):
+                return None
+            total += test + max(body, orelse)
+        elif isinstance(statement, (ast.For, ast.AsyncFor, ast.While)):
+            if any(isinstance(child, ast.Call) and is_self_call(child) for child in walk_scope([statement])):
+                return None
+        elif isinstance(statement, SCOPE_TYPES):
+            continue
+        else:
+            count = _count_expression(statement, is_self_call)
+            if count is None:
+                return None
+            total += count
+    return total
+
+def _count_expression(node: ast.AST, is_self_call) -> Optional[int]:
+    if isinstance(node, SCOPE_TYPES):
+        return 0
+
+    if isinstance(node, COMPREHENSION_TYPES + (ast.For, ast.AsyncFor, ast.While)):
+        repeated = any(isinstance(child, ast.Call) and is_self_call(child) for child in walk_scope([node]))
+        return None if repeated else 0
+
+    if isinstance(node, ast.IfExp):
+        parts = [_count_expression(part, is_self_call) for part in (node.test, node.body, node.orelse)]
+        if None in parts:
+            return None
+        return parts[0] + max(parts[1], parts[2])
+
+    total = 1 if isinstance(node, ast.Call) and is_self_call(node) else 0
+    for child in ast.iter_child_nodes(node):
+        count = _count_expression(child, is_self_call)
+        if count is None:
+            return None
+        total += count
+    return total
+
+def _terminates(statements: List[ast.stmt]) -> bool:
+    return bool(statements) and isinstance(statements[-1], (ast.Return, ast.Raise))
+
+def _call_shrink(call: ast.Call, params: List[str], midpoints: set) -> Optional[Tuple[str, float]]:
+    """How a recursive call shrinks its input: ('divide', b), ('subtract', c) or None."""
+
+    # self.method(...) passes the instance implicitly
+    if isinstance(call.func, ast.Attribute) and params and params[0] in ('self', 'cls'):
+        params = params[1:]
+
+    pairs = list(zip(params, call.args))
+    pairs.extend((keyword.arg, keyword.value) for keyword in call.keywords if keyword.arg in params)
+
+    best = None
+    for param, argument in pairs:
+        shrink = _argument_shrink(param, argument, midpoints)
+        if shrink is not None and (best is None or shrink[0] == 'divide'):
+            best = shrink
+    return best
+
+def _argument_shrink(param: str, argument: ast.expr, midpoints: set) -> Optional[Tuple[str, float]]:
+    def is_param(node):
+        return isinstance(node, ast.Name) and node.id == param
+
+    def splits(node):
+        return node is not None and (
+            (isinstance(node, ast.Name) and node.id in midpoints) or is_midpoint(node)
+        )
+
+    def constant(node):
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and node.value > 0:
+            return node.value
+        return None
+
+    if isinstance(argument, ast.BinOp):
+        amount = constant(argument.right)
+        if is_param(argument.left) and amount is not None:
+            if isinstance(argument.op, (ast.FloorDiv, ast.Div)) and amount > 1:
+                return ('divide', amount)
+            if isinstance(argument.op, ast.RShift):
+                return ('divide', 2 ** amount)
+            if isinstance(argument.op, ast.Sub):
+                return ('subtract', amount)
+        if splits(argument.left) and isinstance(argument.op, (ast.Add, ast.Sub)):
+            return ('divide', 2)
+
+    if splits(argument):
+        # Passing the midpoint as one of the search bounds
+        return ('divide', 2)
+
+    if isinstance(argument, ast.Subscript) and is_param(argument.value) and isinstance(argument.slice, ast.Slice):
+        lower, upper = argument.slice.lower, argument.slice.upper
+        if splits(lower) or splits(upper):
+            return ('divide', 2)
+        if upper is None and constant(lower) is not None:
+            return ('subtract', lower.value)
+        if (lower is None and isinstance(upper, ast.UnaryOp) and isinstance(upper.op, ast.USub)
+                and constant(upper.operand) is not None):
+            return ('subtract', upper.operand.value)
+
+    return None
+
+def is_memoized(node: ast.AST, is_self_call: Callable[[ast.Call], bool]) -> bool:
+    """Whether a recursive function caches its results, so each distinct call runs once.
+
+    Recognizes memoizing decorators and a memo dict that is checked (``in``,
+    ``.get``) and filled with the result of a recursive call.
+    """
+
+    for decorator in node.decorator_list:
+        target = decorator.func if isinstance(decorator, ast.Call) else decorator
+        name = target.attr if isinstance(target, ast.Attribute) else getattr(target, 'id', None)
+        if name in MEMO_DECORATORS:
+            return True
+
+    def recurses(value):
+        return any(isinstance(child, ast.Call) and is_self_call(child) for child in walk_scope([value]))
+
+    checked, filled = set(), set()
+    for child in walk_scope(node.body):
+        if isinstance(child, ast.Compare):
+            checked.update(ast.dump(comparator) for op, comparator in zip(child.ops, child.comparators)
+                           if isinstance(op, (ast.In, ast.NotIn)))
+        elif isinstance(child, ast.Call) and isinstance(child.func, ast.Attribute):
+            if child.func.attr == 'get':
+                checked.add(ast.dump(child.func.value))
+            elif child.func.attr == 'setdefault' and recurses(child):
+                checked.add(ast.dump(child.func.value))
+                filled.add(ast.dump(child.func.value))
+        elif isinstance(child, ast.Assign) and recurses(child.value):
+            filled.update(ast.dump(target.value) for target in child.targets if isinstance(target, ast.Subscript))
+    return bool(checked & filled)
+
+def is_midpoint(value: ast.expr) -> bool:
+    """Match (lo + hi) // 2, lo + (hi - lo) // 2 and len(xs) // 2."""
+    if isinstance(value, ast.BinOp) and isinstance(value.op, (ast.FloorDiv, ast.RShift)):
+        return isinstance(value.right, ast.Constant)
+    if isinstance(value, ast.BinOp) and isinstance(value.op, ast.Add):
+        return is_midpoint(value.right) or is_midpoint(value.left)
+    return False
@@ -0,0 +1,241 @@
+import fnmatch
+import os
+import subprocess
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import Config
+from .batch import EXCLUDED_DIRS, AnalysisUnit, BatchAnalyzer, numbered_names, split_units
+from .bigo import BigO, compare, sort_key, try_parse
+from .incremental import dependency_keys
+
+# Report order: regressions first, then what needs a human look, then the rest.
+# 'same' is an edited function whose complexity class did not change.
+STATUS_ORDER = ('worse', 'incomparable', 'unknown', 'better', 'added', 'removed', 'same')
+
+@dataclass
+class FunctionChange:
+    file: str
+    name: str
+    line: int
+    status: str  # one of STATUS_ORDER
+    base_time: Optional[str] = None
+    head_time: Optional[str] = None
+    base_confidence: Optional[float] = None
+    head_confidence: Optional[float] = None
+    allowed: bool = False
+    confident: bool = True
+    error: Optional[str] = None
+
+    @property
+    def is_regression(self) -> bool:
+        return self.status == 'worse' and self.confident and not self.allowed
+
+class Allowlist:
+    """Functions that may get asymptotically slower without failing the gate.
+
+    One entry per line: ``<path glob>::<function glob>``, optionally followed
+    by a bound such as ``O(n²)`` that the new complexity must stay within.
+    Blank lines and ``#`` comments are ignored.
+    """
+
+    def __init__(self, entries: List[Tuple[str, str, Optional[BigO]]] = ()):
+        self.entries = list(entries)
+
+    @classmethod
+    def load(cls, path: Optional[str]) -> 'Allowlist':
+        path = path or Config.ALLOWLIST_PATH
+        if not os.path.exists(path):
+            return cls()
+
+        entries = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for number, line in enumerate(f, 1):
+                line = line.split('#', 1)[0].strip()
+                if not line:
+                    continue
+                pattern, _, bound = line.partition(' ')
+                file_pattern, separator, name_pattern = pattern.partition('::')
+                parsed_bound = try_parse(bound.strip()) if bound.strip() else None
+                if not separator or (bound.strip() and parsed_bound is None):
+                    raise ValueError(f"{path}:{number}: expected '<path>::<function> [O(...)]'")
+                entries.append((file_pattern, name_pattern, parsed_bound))
+        return cls(entries)
+
+    def allows(self, change: FunctionChange) -> bool:
+        head = try_parse(change.head_time)
+        for file_pattern, name_pattern, bound in self.entries:
+            if fnmatch.fnmatchcase(change.file, file_pattern) and fnmatch.fnmatchcase(change.name, name_pattern):
+                if bound is None or (head is not None and head <= bound):
+                    return True
+        return False
+
+class Git:
+    """Read files at a revision with plain git commands, without touching the work tree."""
+
+    def __init__(self, repo: str = '.'):
+        self.root = self._run(['rev-parse', '--show-toplevel'], cwd=repo).strip()
+
+    def _run(self, args: List[str], cwd: Optional[str] = None) -> str:
+        try:
+            completed = subprocess.run(
+                ['git', *args], cwd=cwd or self.root, capture_output=True, check=True
+            )
+        except FileNotFoundError:
+            raise ValueError('git is not installed')
+        except subprocess.CalledProcessError as e:
+            raise ValueError(f"git {' '.join(args)} failed: {e.stderr.decode('utf-8', 'replace').strip()}")
+        return completed.stdout.decode('utf-8', 'replace')
+
+    def python_files(self, revision: str, paths: List[str]) -> Dict[str, str]:
+        """{repo-relative path: blob id} for the .py files under paths at revision."""
+        relative = [os.path.relpath(os.path.abspath(path), self.root) for path in paths] or ['.']
+        output = self._run(['ls-tree', '-r', '--full-tree', revision, '--', *relative])
+
+        files = {}
+        for line in output.splitlines():
+            meta, _, path = line.partition('\t')
+            parts = path.split('/')
+            if not path.endswith('.py') or any(part in EXCLUDED_DIRS for part in parts[:-1]):
+                continue
+            files[path] = meta.split()[2]
+        return files
+
+    def show(self, revision: str, path: str) -> str:
+        return self._run(['show', f'{revision}:{path}'])
+
+class RegressionGate:
+    """Compare per-function time complexity between two revisions.
+
+    Only files whose blob differs are read, and within them only functions
+    whose code or same-file callees changed are analyzed, at both revisions,
+    through the shared ComplexityAnalyzer (so its result cache applies).
+    A slowdown counts as a regression when neither estimate's confidence is
+    below ``min_confidence`` and the allowlist doesn't cover it.
+    """
+
+    def __init__(self, analyzer, repo: str = '.', allowlist: Optional[Allowlist] = None,
+                 batch: Optional[BatchAnalyzer] = None, min_confidence: Optional[float] = None):
+        self.analyzer = analyzer
+        self.git = Git(repo)
+        self.allowlist = allowlist or Allowlist()
+        self.batch = batch or BatchAnalyzer(analyzer)
+        self.min_confidence = Config.REGRESSION_MIN_CONFIDENCE if min_confidence is None else min_confidence
+
+    def compare(self, base: str, head: str, paths: List[str] = ()) -> Dict[str, Any]:
+        base_files = self.git.python_files(base, list(paths))
+        head_files = self.git.python_files(head, list(paths))
+        changed_files = sorted(
+            path for path in set(base_files) | set(head_files)
+            if base_files.get(path) != head_files.get(path)
+        )
+
+        changes: List[FunctionChange] = []
+        pending: List[Tuple[FunctionChange, Optional[AnalysisUnit], Optional[AnalysisUnit]]] = []
+        unchanged = 0
+        for path in changed_files:
+            base_units, base_error = self._units(base, path, path in base_files)
+            head_units, head_error = self._units(head, path, path in head_files)
+            if base_error or head_error:
+                changes.append(FunctionChange(path, '<module>', 1, 'unknown', error=base_error or head_error))
+                continue
+
+            base_keys = _keys_by_name(base_units)
+            head_keys = _keys_by_name(head_units)
+            for name in sorted(set(base_units) | set(head_units), key=lambda n: _line(base_units, head_units, n)):
+                if name in base_units and name in head_units and base_keys[name] == head_keys[name]:
+                    unchanged += 1
+                    continue
+                change = FunctionChange(path, name, _line(base_units, head_units, name), 'unknown')
+                pending.append((change, base_units.get(name), head_units.get(name)))
+
+        changes.extend(self._analyze(pending))
+        for change in changes:
+            if change.status == 'worse':
+                change.allowed = self.allowlist.allows(change)
+                # A guess on either side isn't enough to fail a build
+                change.confident = min(change.base_confidence or 0.0, change.head_confidence or 0.0) >= self.min_confidence
+        changes.sort(key=_change_order)
+
+        counts = {status: 0 for status in STATUS_ORDER}
+        for change in changes:
+            counts[change.status] += 1
+        regressions = sum(change.is_regression for change in changes)
+        return {
+            'base': base,
+            'head': head,
+            'files_changed': len(changed_files),
+            'functions_unchanged': unchanged,
+            'counts': counts,
+            'regressions': regressions,
+            'passed': regressions == 0,
+            'changes': [asdict(change) for change in changes]
+        }
+
+    def _units(self, revision: str, path: str, exists: bool) -> Tuple[Dict[str, AnalysisUnit], Optional[str]]:
+        if not exists:
+            return {}, None
+        try:
+            # rev:path labels keep both versions of a unit apart in batch records
+            units = split_units(f'{revision}:{path}', self.git.show(revision, path))
+        except SyntaxError as e:
+            return {}, f'{revision}:{path} does not parse: {e}'
+
+        names = numbered_names(units)
+        return {names[id(unit)]: unit for unit in units}, None
+
+    def _analyze(self, pending) -> List[FunctionChange]:
+        units = [unit for _, base_unit, head_unit in pending for unit in (base_unit, head_unit) if unit]
+        records = {(record['file'], record['line']): record for record in self.batch.analyze_units(units)}
+
+        def verdict(unit):
+            if unit is None:
+                return None, None, None
+            record = records.get((unit.path, unit.line), {})
+            final = record.get('final_analysis') or {}
+            return final.get('time_complexity'), final.get('confidence'), record.get('error')
+
+        for change, base_unit, head_unit in pending:
+            change.base_time, change.base_confidence, base_error = verdict(base_unit)
+            change.head_time, change.head_confidence, head_error = verdict(head_unit)
+            change.error = base_error or head_error
+
+            if base_unit is None:
+                change.status = 'added'
+            elif head_unit is None:
+                change.status = 'removed'
+            else:
+                base_value, head_value = try_parse(change.base_time), try_parse(change.head_time)
+                if base_value is not None and head_value is not None:
+                    change.status = {1: 'worse', -1: 'better', 0: 'same', None: 'incomparable'}[
+                        compare(head_value, base_value)
+                    ]
+        return [change for change, _, _ in pending]
+
+def _keys_by_name(units: Dict[str, AnalysisUnit]) -> Dict[str, str]:
+    keys = dependency_keys(list(units.values()))
+    return {name: keys[id(unit)] for name, unit in units.items()}
+
+def _line(base_units, head_units, name) -> int:
+    unit = head_units.get(name) or base_units.get(name)
+    return unit.line
+
+def _change_order(change: FunctionChange):
+    worst = try_parse(change.head_time) or try_parse(change.base_time)
+    # Within a status, the fastest-growing complexities come first
+    key = sort_key(worst) if worst is not None else []
+    return STATUS_ORDER.index(change.status), _Descending(key), change.file, change.line
+
+class _Descending:
+    """Invert the ordering of a sort key component."""
+
+    __slots__ = ('key',)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+    def __eq__(self, other):
+        return self.key == other.key
@@ -0,0 +1,304 @@
+import json
+import re
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .bigo import try_parse
+
+# Characters that can change the scanner state outside / inside a string
+OUTSIDE_SPECIAL = re.compile(r'[{}\[\]"]')
+OPENERS_ONLY = re.compile(r'[{\[]')
+OPENER_RUN = re.compile(r'[{\[]+')
+# The rest of a JSON string after its opening quote (unrolled so it can't backtrack)
+STRING_REST = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+CLOSERS = {'}': '{', ']': '['}
+# Deeper nesting than this is never an analysis, and json.loads would overflow the stack
+MAX_NESTING = 256
+
+# A Big-O expression with at most one level of nested parentheses, e.g. O(n log(n))
+BIG_O = re.compile(r'[OΘΩθ]\((?:[^()\n]|\([^()\n]*\)){1,60}\)')
+CONFIDENCE_IN_PROSE = re.compile(r'confidence\W{0,10}(0(?:\.\d+)?|1(?:\.0+)?)\b', re.IGNORECASE)
+# How far before a Big-O expression to look for "time" or "space"
+LABEL_WINDOW = 80
+
+# Prose answers carry no structured confidence, so they are trusted less than JSON ones
+FALLBACK_CONFIDENCE = 0.3
+
+SUPERSCRIPTS = {'2': '²', '3': '³'}
+
+def json_spans(text: str) -> List[Tuple[int, int]]:
+    """Spans of the outermost balanced {...} / [...] blocks in text, in order.
+
+    A single left-to-right pass that jumps between brackets and quotes, so it
+    is linear even for megabytes of unbalanced braces. Strings are only
+    tracked inside a block, which keeps quotes in surrounding prose from
+    derailing it, and an unclosed bracket in prose doesn't hide the blocks
+    after it. Code fences and other surrounding text are simply skipped.
+    """
+
+    spans: List[Tuple[int, int]] = []
+    stack: List[Tuple[str, int]] = []
+    position = 0
+    length = len(text)
+
+    while position < length:
+        pattern = OUTSIDE_SPECIAL if stack else OPENERS_ONLY
+        match = pattern.search(text, position)
+        if match is None:
+            break
+        position = match.start()
+        char = text[position]
+
+        if char == '"':
+            position = _skip_string(text, position + 1)
+            continue
+
+        if char in '{[':
+            # Push a whole run of openers at once; only the innermost can still form a block
+            run_end = OPENER_RUN.match(text, position).end()
+            run_start = max(position, run_end - MAX_NESTING)
+            if len(stack) + run_end - run_start > MAX_NESTING:
+                stack.clear()
+            stack.extend(zip(text[run_start:run_end], range(run_start, run_end)))
+            position = run_end
+            continue
+        elif stack and stack[-1][0] == CLOSERS[char]:
+            start = stack.pop()[1]
+            # Blocks closed earlier inside this one are no longer outermost
+            while spans and spans[-1][0] > start:
+                spans.pop()
+            spans.append((start, position + 1))
+        else:
+            # A mismatched closer: whatever is open is not JSON
+            stack.clear()
+        position += 1
+
+    return spans
+
+def _skip_string(text: str, position: int) -> int:
+    """Index just past the closing quote of a string starting at position."""
+    match = STRING_REST.match(text, position)
+    return match.end() if match else len(text)
+
+def iter_json_values(text: str) -> Iterator[Any]:
+    """Decode every outermost JSON object or array embedded in text."""
+    for start, end in json_spans(text):
+        # Cheap rejection of {prose in braces}: an object starts with a key or is empty
+        if text[start] == '{' and text[start + 1:end].lstrip()[:1] not in ('"', '}'):
+            continue
+        try:
+            yield json.loads(text[start:end])
+        except (ValueError, RecursionError):
+            continue
+
+def normalize_complexity(value: str) -> Optional[str]:
+    """Canonical spelling of a Big-O string, or None if it isn't one.
+
+    ``O(N^2)``, ``O(n**2)`` and ``O(n*n)`` all become ``O(n²)``; ``O(N log N)``,
+    ``O(nlogn)`` and ``Θ(n log(n))`` become ``O(n log n)``, and dominated
+    terms are dropped (see core.bigo). Multi-variable expressions keep their
+    variables, e.g. ``O(V + E)``.
+    """
+
+    if not isinstance(value, str):
+        return None
+    match = BIG_O.search(value)
+    if match is None:
+        return None
+
+    parsed = try_parse(match.group(0))
+    if parsed is not None:
+        return str(parsed)
+
+    # Spellings the algebra can't parse (e.g. O(log log n)) still get tidied up
+    body = match.group(0)[2:-1].strip()
+    if not body or '...' in body or body == '?':
+        return None
+
+    body = body.replace('**', '^').replace('·', '*').replace('×', '*')
+    body = re.sub(r'\s+', ' ', body)
+    # N and LOG are the same variables as n and log
+    body = re.sub(r'\bN\b', 'n', body)
+    body = re.sub(r'(?i)\b(?:log|lg)\b', 'log', body)
+    body = re.sub(r'(?i)log(?=n\b)', 'log ', body)
+    body = re.sub(r'\bnlog\b', 'n log', body)
+    # log(n) -> log n, (log n)^2 -> log^2 n
+    body = re.sub(r'log\s*\(\s*(\w+)\s*\)', r'log \1', body)
+    body = re.sub(r'\(\s*log (\w+)\s*\)\s*\^\s*(\d+)', r'log^\2 \1', body)
+    # n * n * n -> n^3, n * log n -> n log n
+    body = re.sub(r'\b(\w)(?:\s*\*\s*\1\b)+', lambda m: f"{m.group(1)}^{m.group(0).count('*') + 1}", body)
+    body = re.sub(r'\s*\*\s*(?=log\b)', ' ', body)
+    body = re.sub(r'(?<!log)\^\s*\(?\s*([23])\s*\)?(?![\d.])', lambda m: SUPERSCRIPTS[m.group(1)], body)
+    body = re.sub(r'\s*([+*/])\s*', r' \1 ', body).replace(' * ', '*')
+    return f'O({body.strip()})'
+
+def validate_analysis(data: Any, require_space: bool = False) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+    """Check and normalize one analysis object.
+
+    Returns ``(result, problems)``: result is None when the object lacks a
+    usable time complexity or confidence; problems lists fields that were
+    missing or malformed and got a default.
+    """
+
+    if not isinstance(data, dict):
+        return None, ['not an object']
+
+    time_complexity = normalize_complexity(data.get('time_complexity'))
+    if time_complexity is None:
+        return None, ['time_complexity']
+
+    confidence = data.get('confidence')
+    if isinstance(confidence, str):
+        try:
+            confidence = float(confidence.strip().rstrip('%')) / (100 if confidence.strip().endswith('%') else 1)
+        except ValueError:
+            confidence = None
+    if isinstance(confidence, bool) or not isinstance(confidence, (int, float)):
+        return None, ['confidence']
+
+    problems = []
+    result = dict(data)
+    result['time_complexity'] = time_complexity
+    result['confidence'] = min(max(float(confidence), 0.0), 1.0)
+
+    space_complexity = normalize_complexity(data.get('space_complexity'))
+    if space_complexity is None:
+        if require_space:
+            return None, ['space_complexity']
+        problems.append('space_complexity')
+        space_complexity = 'O(?)'
+    result['space_complexity'] = space_complexity
+
+    bottlenecks = data.get('bottlenecks', [])
+    if not isinstance(bottlenecks, list):
+        problems.append('bottlenecks')
+        bottlenecks = [bottlenecks] if isinstance(bottlenecks, str) else []
+    result['bottlenecks'] = [str(item) for item in bottlenecks]
+
+    for key in ('explanation', 'reasoning'):
+        if key in data and not isinstance(data[key], str):
+            problems.append(key)
+            result[key] = '' if data[key] is None else json.dumps(data[key])
+    result.setdefault('explanation', '')
+    return result, problems
+
+def extract_from_prose(text: str) -> Optional[Dict[str, Any]]:
+    """Last resort for answers without usable JSON: pick Big-O terms out of the prose.
+
+    Each Big-O expression is attributed to time or space by the nearest
+    preceding label within a short window; an unlabelled first one is taken
+    as the time complexity. Returns None if the text has no Big-O at all.
+    """
+
+    found = {}
+    first = None
+    for match in BIG_O.finditer(text):
+        complexity = normalize_complexity(match.group(0))
+        if complexity is None:
+            continue
+        first = first or complexity
+        window = text[max(0, match.start() - LABEL_WINDOW):match.start()].lower()
+        time_at, space_at = window.rfind('time'), window.rfind('space')
+        if time_at < 0 and space_at < 0:
+            continue
+        found.setdefault('time' if time_at > space_at else 'space', complexity)
+        if len(found) == 2:
+            break
+
+    time_complexity = found.get('time', first)
+    if time_complexity is None:
+        return None
+
+    confidence = CONFIDENCE_IN_PROSE.search(text)
+    return {
+        'time_complexity': time_complexity,
+        'space_complexity': found.get('space', 'O(?)'),
+        'explanation': text[:500] + "..." if len(text) > 500 else text,
+        'bottlenecks': [],
+        'confidence': float(confidence.group(1)) if confidence else FALLBACK_CONFIDENCE,
+        'reasoning': 'Fallback analysis due to parsing issues'
+    }
+
+class ParseStats:
+    """Thread-safe counters of how LLM responses were parsed.
+
+    ``structured``: a valid JSON object was found; ``repaired``: it was found
+    but some fields needed defaults; ``fallback``: only prose was usable;
+    ``failed``: nothing usable.
+    """
+
+    OUTCOMES = ('structured', 'repaired', 'fallback', 'failed')
+
+    def __init__(self):
+        self.counts = dict.fromkeys(self.OUTCOMES, 0)
+        self.invalid_fields: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, outcome: str, problems: List[str] = ()):
+        with self._lock:
+            self.counts[outcome] += 1
+            for field in problems:
+                self.invalid_fields[field] = self.invalid_fields.get(field, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = sum(self.counts.values())
+            return {
+                'responses': total,
+                **self.counts,
+                'failure_rate': (self.counts['fallback'] + self.counts['failed']) / total if total else 0.0,
+                'invalid_fields': dict(self.invalid_fields)
+            }
+
+def parse_analysis(text: str, stats: Optional[ParseStats] = None) -> Dict[str, Any]:
+    """Parse a single-analysis LLM response.
+
+    The first embedded JSON object that validates wins; otherwise the prose is
+    mined for Big-O terms. Unparsable responses yield an error result.
+    """
+
+    outcome, problems, result = 'failed', [], None
+    for value in iter_json_values(text):
+        result, problems = validate_analysis(value)
+        if result is not None:
+            outcome = 'repaired' if problems else 'structured'
+            break
+    else:
+        result = extract_from_prose(text)
+        if result is not None:
+            outcome = 'fallback'
+
+    if stats is not None:
+        stats.record(outcome, problems)
+    if result is None:
+        return {
+            'error': 'Could not parse LLM response',
+            'time_complexity': 'Unknown',
+            'space_complexity': 'Unknown',
+            'confidence': 0.0
+        }
+    return result
+
+def parse_batch(text: str, expected_ids, stats: Optional[ParseStats] = None) -> Dict[str, Dict[str, Any]]:
+    """Parse a batched response into {id: analysis}, keeping only valid items.
+
+    Items may come in one JSON array or as separate objects; the first valid
+    item for each expected id wins.
+    """
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for value in iter_json_values(text):
+        for item in value if isinstance(value, list) else [value]:
+            if not isinstance(item, dict) or str(item.get('id')) not in expected_ids:
+                continue
+            item_id = str(item['id'])
+            if item_id in results:
+                continue
+
+            result, problems = validate_analysis(item)
+            if stats is not None:
+                stats.record('failed' if result is None else 'repaired' if problems else 'structured', problems)
+            if result is not None:
+                result.pop('id', None)
+                results[item_id] = result
+    return results
@@ -0,0 +1,40 @@
+import json
+from typing import Any
+
+# Results hold slotted records (ASTAnalysis and friends) rather than nested
+# dicts; these encoders turn them into plain data with their to_dict()
+# methods as they are written out, so no intermediate copy is built.
+
+def to_plain(value: Any) -> Any:
+    """Encoder hook: the plain-data form of a record with a to_dict() method."""
+    to_dict = getattr(value, 'to_dict', None)
+    if to_dict is None:
+        raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+    return to_dict()
+
+def dumps_json(value: Any, **kwargs) -> str:
+    return json.dumps(value, default=to_plain, **kwargs)
+
+_fast_dumps = None
+
+def dumps_compact(value: Any) -> str:
+    """One-line JSON without spaces, using ``orjson`` when it is installed."""
+    global _fast_dumps
+    if _fast_dumps is None:
+        try:
+            import orjson
+        except ImportError:
+            _fast_dumps = lambda v: json.dumps(v, default=to_plain, separators=(',', ':'), ensure_ascii=False)
+        else:
+            # Records go through to_dict() rather than orjson's own dataclass encoding
+            options = orjson.OPT_PASSTHROUGH_DATACLASS
+            _fast_dumps = lambda v: orjson.dumps(v, default=to_plain, option=options).decode()
+    return _fast_dumps(value)
+
+def dumps_msgpack(value: Any) -> bytes:
+    """MessagePack encoding; needs the optional ``msgpack`` package."""
+    try:
+        import msgpack
+    except ImportError:
+        raise RuntimeError("msgpack output requires the msgpack package (pip install msgpack)")
+    return msgpack.packb(value, default=to_plain, use_bin_type=True)
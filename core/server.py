@@ -0,0 +1,244 @@
+import asyncio
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Any, Dict, Optional, Tuple
+
+from config import Config
+from .backends import backend_model_id
+from .cache import normalized_code_hash
+from .serialization import dumps_json
+
+class AnalysisServer:
+    """Serve ComplexityAnalyzer.analyze over HTTP/JSON on TCP or a Unix socket.
+
+    One analyzer (and so one warm LLM client and cache) is shared by all
+    requests. Concurrent requests for the same code, up to formatting, share
+    a single in-flight analysis. Work waits in a bounded queue drained by
+    ``workers`` threads; when the queue is full, requests get 503 instead of
+    piling up.
+
+    Endpoints: ``POST /analyze`` with ``{"code": ...}`` and ``GET /health``.
+    """
+
+    def __init__(self, analyzer, workers: Optional[int] = None, queue_size: Optional[int] = None):
+        self.analyzer = analyzer
+        self.workers = workers or Config.LLM_CONCURRENCY
+        self.queue_size = queue_size or Config.SERVER_QUEUE_SIZE
+
+        self.requests = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.completed = 0
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._worker_tasks = []
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._started = None
+
+    async def start(self, host: Optional[str] = None, port: Optional[int] = None,
+                    socket_path: Optional[str] = None):
+        """Start listening. Use port 0 to pick a free port (see ``address``)."""
+
+        if not self.analyzer.offline:
+            # Build the model client now rather than on the first request
+            self.analyzer.llm_client
+
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='analysis')
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+        if socket_path:
+            self._server = await asyncio.start_unix_server(self._handle_connection, path=socket_path)
+        else:
+            self._server = await asyncio.start_server(
+                self._handle_connection,
+                host or Config.SERVER_HOST,
+                Config.SERVER_PORT if port is None else port
+            )
+        self._started = time.monotonic()
+
+    @property
+    def address(self):
+        return self._server.sockets[0].getsockname()
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+        # Queued and running analyses will never finish; answer whoever waits on them
+        for future in list(self._in_flight.values()):
+            if not future.done():
+                future.set_result({'error': 'Server shut down before the analysis finished',
+                                   'final_analysis': None})
+
+    async def analyze(self, code: str) -> Tuple[int, Dict[str, Any]]:
+        """Analyze code through the shared queue, returning (HTTP status, payload)."""
+
+        self.requests += 1
+        if not isinstance(code, str) or not code.strip():
+            return HTTPStatus.BAD_REQUEST, {'error': 'Request body needs a non-empty "code" string'}
+
+        key = normalized_code_hash(code)
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            try:
+                self._queue.put_nowait((code, future))
+            except asyncio.QueueFull:
+                self.rejected += 1
+                return HTTPStatus.SERVICE_UNAVAILABLE, {'error': 'Server is busy, retry later'}
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+
+        # Shielded so one client disconnecting doesn't cancel work others wait on
+        result = await asyncio.shield(future)
+        if result.get('error'):
+            return HTTPStatus.UNPROCESSABLE_ENTITY, result
+        if 'code_hash' in result:
+            # Coalesced callers may differ in formatting, so each gets the hash of its own code
+            result = dict(result, code_hash=hashlib.sha256(code.encode('utf-8')).hexdigest())
+        return HTTPStatus.OK, result
+
+    def health(self) -> Dict[str, Any]:
+        payload = {
+            'status': 'ok',
+            'model': backend_model_id(getattr(self.analyzer, 'backend', None)),
+            'offline': self.analyzer.offline,
+            'uptime': round(time.monotonic() - self._started, 3),
+            'workers': self.workers,
+            'queued': self._queue.qsize(),
+            'queue_capacity': self.queue_size,
+            'in_flight': len(self._in_flight),
+            'requests': self.requests,
+            'completed': self.completed,
+            'coalesced': self.coalesced,
+            'rejected': self.rejected
+        }
+        if self.analyzer.cache is not None:
+            payload['cache'] = self.analyzer.cache.stats()
+        parse_stats = self.analyzer.parse_stats()
+        if parse_stats is not None:
+            payload['llm_parsing'] = parse_stats
+        return payload
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            code, future = await self._queue.get()
+            try:
+                result = await loop.run_in_executor(self._executor, self.analyzer.analyze, code)
+            except Exception as e:
+                result = {'error': f'Analysis failed: {e}', 'final_analysis': None}
+            finally:
+                self._queue.task_done()
+
+            self.completed += 1
+            if not future.done():
+                future.set_result(result)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+
+                method, path, headers, body = request
+                status, payload = await self._route(method, path, body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except _BadRequest as e:
+            self._write_response(writer, e.status, {'error': str(e)}, False)
+            await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        """Read one HTTP/1.1 request, or return None when the client closed the connection."""
+
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+
+        parts = request_line.decode('latin-1').split()
+        if len(parts) != 3:
+            raise _BadRequest(HTTPStatus.BAD_REQUEST, 'Malformed request line')
+        method, path, _ = parts
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise _BadRequest(HTTPStatus.BAD_REQUEST, 'Invalid Content-Length')
+        if length < 0:
+            raise _BadRequest(HTTPStatus.BAD_REQUEST, 'Invalid Content-Length')
+        if length > Config.SERVER_MAX_BODY:
+            raise _BadRequest(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, 'Request body too large')
+
+        body = await reader.readexactly(length) if length else b''
+        return method, path.split('?', 1)[0], headers, body
+
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        if path == '/health':
+            if method != 'GET':
+                return HTTPStatus.METHOD_NOT_ALLOWED, {'error': 'Use GET'}
+            return HTTPStatus.OK, self.health()
+
+        if path == '/analyze':
+            if method != 'POST':
+                return HTTPStatus.METHOD_NOT_ALLOWED, {'error': 'Use POST'}
+            try:
+                request = json.loads(body or b'{}')
+            except ValueError:
+                return HTTPStatus.BAD_REQUEST, {'error': 'Request body must be JSON'}
+            if not isinstance(request, dict):
+                return HTTPStatus.BAD_REQUEST, {'error': 'Request body must be a JSON object'}
+            return await self.analyze(request.get('code'))
+
+        return HTTPStatus.NOT_FOUND, {'error': f'No route for {path}'}
+
+    def _write_response(self, writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any],
+                        keep_alive: bool):
+        status = HTTPStatus(status)
+        body = dumps_json(payload).encode('utf-8')
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        )
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            head += "Retry-After: 1\r\n"
+        writer.write(head.encode('latin-1') + b"\r\n" + body)
+
+class _BadRequest(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
@@ -0,0 +1,973 @@
+import ast
+from dataclasses import dataclass, field
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .call_graph import CallGraph, walk_scope
+from .cost import CONSTANT, LINEAR, LINEARITHMIC, LOGARITHMIC, Cost, format_cost, multiply
+from .recurrence import extract_recurrence, is_memoized, is_midpoint
+
+# Builtins whose cost does not depend on user code
+BUILTIN_COSTS = {
+    'sorted': LINEARITHMIC,
+    'sum': LINEAR, 'max': LINEAR, 'min': LINEAR, 'any': LINEAR, 'all': LINEAR,
+    'list': LINEAR, 'tuple': LINEAR, 'set': LINEAR, 'dict': LINEAR, 'frozenset': LINEAR,
+    'len': CONSTANT, 'range': CONSTANT, 'enumerate': CONSTANT, 'zip': CONSTANT,
+    'map': CONSTANT, 'filter': CONSTANT, 'reversed': CONSTANT, 'iter': CONSTANT, 'next': CONSTANT,
+    'print': CONSTANT, 'input': CONSTANT, 'int': CONSTANT, 'float': CONSTANT, 'str': CONSTANT,
+    'bool': CONSTANT, 'abs': CONSTANT, 'round': CONSTANT, 'divmod': CONSTANT, 'pow': CONSTANT,
+    'isinstance': CONSTANT, 'ord': CONSTANT, 'chr': CONSTANT, 'hash': CONSTANT, 'id': CONSTANT,
+    'type': CONSTANT
+}
+
+# Builtins that materialize a new collection from their argument
+ALLOCATING_BUILTINS = {'sorted', 'list', 'tuple', 'set', 'dict', 'frozenset'}
+
+# Builtins that scan one iterable; max(a, b) and friends compare their arguments in O(1)
+ITERABLE_BUILTINS = {'sorted', 'sum', 'max', 'min', 'any', 'all'}
+
+# heapq, bisect and collections functions, called by name or through their module
+LIBRARY_COSTS = {
+    'heappush': LOGARITHMIC, 'heappop': LOGARITHMIC, 'heappushpop': LOGARITHMIC,
+    'heapreplace': LOGARITHMIC, 'heapify': LINEAR, 'nlargest': LINEARITHMIC, 'nsmallest': LINEARITHMIC,
+    'bisect': LOGARITHMIC, 'bisect_left': LOGARITHMIC, 'bisect_right': LOGARITHMIC,
+    'insort': LINEAR, 'insort_left': LINEAR, 'insort_right': LINEAR,
+    'deque': LINEAR, 'Counter': LINEAR, 'OrderedDict': LINEAR, 'defaultdict': CONSTANT
+}
+
+# Common container/str methods, assuming the receiver holds O(n) items
+METHOD_COSTS = {
+    'append': CONSTANT, 'add': CONSTANT, 'get': CONSTANT, 'pop': CONSTANT, 'popleft': CONSTANT,
+    'appendleft': CONSTANT, 'setdefault': CONSTANT, 'discard': CONSTANT, 'items': CONSTANT,
+    'keys': CONSTANT, 'values': CONSTANT,
+    'sort': LINEARITHMIC,
+    'extend': LINEAR, 'insert': LINEAR, 'remove': LINEAR, 'index': LINEAR, 'count': LINEAR,
+    'copy': LINEAR, 'update': LINEAR, 'join': LINEAR, 'split': LINEAR, 'strip': LINEAR,
+    'replace': LINEAR, 'lower': LINEAR, 'upper': LINEAR
+}
+
+GROWING_METHODS = {'append', 'add', 'appendleft', 'extend', 'insert', 'setdefault', 'update'}
+
+# Kinds inferred from assignments: membership and removal scan sequences, and
+# 'number' tells arithmetic apart from sequence repetition
+SEQUENCE_KINDS = {'list', 'tuple', 'str', 'deque'}
+HASHED_KINDS = {'set', 'dict'}
+KIND_CONSTRUCTORS = {
+    'list': 'list', 'sorted': 'list', 'split': 'list', 'tuple': 'tuple', 'str': 'str', 'join': 'str',
+    'set': 'set', 'frozenset': 'set', 'dict': 'dict', 'defaultdict': 'dict', 'Counter': 'dict',
+    'OrderedDict': 'dict', 'deque': 'deque', 'len': 'number', 'int': 'number', 'float': 'number',
+    'abs': 'number', 'round': 'number', 'ord': 'number'
+}
+ANNOTATION_KINDS = {
+    'list': 'list', 'List': 'list', 'Sequence': 'list', 'tuple': 'tuple', 'Tuple': 'tuple', 'str': 'str',
+    'set': 'set', 'Set': 'set', 'frozenset': 'set', 'FrozenSet': 'set', 'dict': 'dict', 'Dict': 'dict',
+    'Mapping': 'dict', 'deque': 'deque', 'Deque': 'deque', 'int': 'number', 'float': 'number'
+}
+
+BASE_CONFIDENCE = 0.95
+RECURSION_CONFIDENCE = 0.2
+# Stands in for the value bound to a range() loop target
+RANGE_ITEM = ast.Constant(0)
+
+# Weight of one construct that can't be costed; on its own it takes
+# BASE_CONFIDENCE below the default Config.CONFIDENCE_THRESHOLD (0.7)
+UNKNOWN_WEIGHT = 0.3
+
+@dataclass
+class FunctionSummary:
+    """Cost of one call to a function, in terms of its input size."""
+    time: Optional[Cost]  # None when recursion could not be resolved
+    space: Cost = CONSTANT
+    evidence: List[str] = field(default_factory=list)
+    uncertainties: Dict[str, float] = field(default_factory=dict)
+    recurrence: Optional[str] = None
+
+class StaticEstimator:
+    """Rule-based complexity estimate that reports how much it trusts itself.
+
+    Extends the loop-nesting heuristic of ComplexityAnalyzer with loop bounds
+    (``range(len(x))`` vs. constant ranges), halving while-loops and the known
+    cost of builtins. Every construct it cannot resolve lowers the confidence,
+    so callers can decide when an LLM second opinion is worth paying for.
+    """
+
+    def estimate(self, tree: ast.AST, summaries: Optional[Dict[str, FunctionSummary]] = None,
+                 prefix: str = '') -> Dict[str, Any]:
+        """Estimate the complexity of a module or a single function.
+
+        ``summaries`` are costs of functions defined elsewhere in the module
+        (see summarize()) so calls to them can be resolved, and ``prefix`` is
+        the class containing ``tree`` when it is a method.
+        """
+        graph = CallGraph(tree, prefix, known=summaries or ())
+        summaries = self._summarize(graph, dict(summaries or {}))
+
+        state = _EstimateState(graph, summaries, prefix, self._body(tree))
+        time_cost = self._block_cost(self._body(tree), state, CONSTANT)
+
+        unresolved = []
+        for qualname in graph.functions:
+            summary = summaries[qualname]
+            state.evidence.extend(summary.evidence)
+            for reason, weight in summary.uncertainties.items():
+                state.uncertain(reason, weight)
+            state.space = max(state.space, summary.space)
+            if summary.time is None:
+                unresolved.append(qualname)
+            else:
+                time_cost = max(time_cost, summary.time)
+
+        if unresolved:
+            return {
+                'time_complexity': 'O(?)',
+                'space_complexity': 'O(?)',
+                'confidence': RECURSION_CONFIDENCE,
+                'explanation': (
+                    f"Recursive function(s) {unresolved} need a recurrence analysis "
+                    f"that could not be derived; other work is {format_cost(time_cost)}."
+                ),
+                'uncertainties': ['recursion'] + list(state.uncertainties),
+                'method': 'static'
+            }
+
+        confidence = BASE_CONFIDENCE
+        for weight in state.uncertainties.values():
+            confidence *= 1 - weight
+
+        return {
+            'time_complexity': format_cost(time_cost),
+            'space_complexity': format_cost(state.space),
+            'confidence': round(confidence, 2),
+            'explanation': '; '.join(state.evidence) or 'No loops or costly calls found.',
+            'uncertainties': list(state.uncertainties),
+            'method': 'static'
+        }
+
+    def summarize(self, tree: ast.AST, summaries: Optional[Dict[str, FunctionSummary]] = None,
+                  prefix: str = '') -> Dict[str, FunctionSummary]:
+        """Cost every function under ``tree``, keyed by qualified name.
+
+        Computing this once per module lets estimate() cost calls between
+        units of the same module.
+        """
+        graph = CallGraph(tree, prefix, known=summaries or ())
+        return self._summarize(graph, dict(summaries or {}))
+
+    def _summarize(self, graph: CallGraph, summaries: Dict[str, FunctionSummary]) -> Dict[str, FunctionSummary]:
+        """Summarize functions bottom-up so callees are costed before their callers."""
+
+        for component in graph.components():
+            if all(qualname in summaries for qualname in component):
+                continue
+
+            if len(component) > 1:
+                names = sorted(component)
+                for qualname in component:
+                    summaries[qualname] = FunctionSummary(
+                        time=None,
+                        uncertainties={f"mutual recursion between {', '.join(names)}": 0.8}
+                    )
+                continue
+
+            summaries[component[0]] = self._summarize_function(graph, component[0], summaries)
+
+        return summaries
+
+    def _summarize_function(self, graph: CallGraph, qualname: str,
+                            summaries: Dict[str, FunctionSummary]) -> FunctionSummary:
+        node = graph.functions[qualname]
+        state = _EstimateState(graph, summaries, qualname, node.body, node.args)
+        work = self._block_cost(node.body, state, CONSTANT)
+
+        summary = FunctionSummary(time=work, space=state.space, evidence=state.evidence,
+                                  uncertainties=state.uncertainties)
+        if not state.recursive:
+            return summary
+
+        is_self_call = lambda call: graph.resolve(qualname, call) == qualname
+        recurrence = extract_recurrence(node, is_self_call, work)
+        time = recurrence.solve() if recurrence else None
+        if time is not None and is_memoized(node, is_self_call):
+            # Counting calls overestimates a cached function: each distinct argument runs once
+            if recurrence.kind != 'subtract':
+                time = None
+            else:
+                time = multiply(LINEAR, work)
+                summary.uncertainties[f"{node.name}() is memoized; its cost depends on how many "
+                                      "distinct arguments it sees"] = 0.4
+        if time is None:
+            summary.time = None
+            return summary
+
+        summary.time = time
+        summary.recurrence = str(recurrence)
+        # Each pending call holds a frame, so the recursion depth is space too
+        summary.space = max(summary.space, recurrence.depth())
+        summary.evidence.append(f"{node.name}() recurses as {recurrence}: {format_cost(time)}")
+        summary.uncertainties[f"recurrence of {node.name}() inferred from its arguments"] = 0.1
+        return summary
+
+    def _body(self, tree: ast.AST) -> List[ast.stmt]:
+        """Top-level statements, leaving function bodies to be costed separately."""
+        if isinstance(tree, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            return []
+
+        body = getattr(tree, 'body', [])
+        statements = []
+        for node in body if isinstance(body, list) else [tree]:
+            if isinstance(node, ast.ClassDef):
+                statements.extend(self._body(node))
+            elif not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                statements.append(node)
+        return statements
+
+    def _block_cost(self, statements: List[ast.stmt], state: '_EstimateState', multiplier: Cost) -> Cost:
+        cost = CONSTANT
+        for statement in statements:
+            cost = max(cost, self._statement_cost(statement, state, multiplier))
+        return cost
+
+    def _statement_cost(self, node: ast.stmt, state: '_EstimateState', multiplier: Cost) -> Cost:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            return CONSTANT
+
+        if isinstance(node, ast.For):
+            iterations = self._for_iterations(node, state)
+            setup = max(self._expression_cost(node.iter, state, multiplier),
+                        self._block_cost(node.orelse, state, multiplier))
+            self._enter_loop(node.target, node.iter, iterations, state, node.lineno)
+            inner = multiply(multiplier, iterations)
+            body = self._block_cost(node.body, state, inner)
+            self._leave_loop(state)
+            return max(setup, multiply(iterations, body))
+
+        if isinstance(node, ast.While):
+            iterations = self._while_iterations(node, state, multiplier)
+            inner = multiply(multiplier, iterations)
+            per_iteration = max(self._expression_cost(node.test, state, inner),
+                                self._block_cost(node.body, state, inner))
+            return max(multiply(iterations, per_iteration),
+                       self._block_cost(node.orelse, state, multiplier))
+
+        if isinstance(node, ast.AugAssign):
+            cost = max(self._expression_cost(node.target, state, multiplier),
+                       self._expression_cost(node.value, state, multiplier))
+            kind = state.kinds.get(node.target.id) if isinstance(node.target, ast.Name) else None
+            if isinstance(node.op, ast.Add) and kind == 'str':
+                # Strings are immutable, so += copies everything built so far
+                state.evidence.append(f"String += at line {node.lineno} copies the string: O(n)")
+                state.allocate(LINEAR)
+                return max(cost, LINEAR)
+            if isinstance(node.op, ast.Add) and kind == 'list' and not _is_display(node.value):
+                return max(cost, LINEAR)
+            return cost
+
+        cost = CONSTANT
+        for field, value in ast.iter_fields(node):
+            if isinstance(value, list) and value and isinstance(value[0], ast.stmt):
+                cost = max(cost, self._block_cost(value, state, multiplier))
+            elif isinstance(value, list):
+                for item in value:
+                    if isinstance(item, ast.AST):
+                        cost = max(cost, self._node_cost(item, state, multiplier))
+            elif isinstance(value, ast.AST):
+                cost = max(cost, self._node_cost(value, state, multiplier))
+        return cost
+
+    def _node_cost(self, node: ast.AST, state: '_EstimateState', multiplier: Cost) -> Cost:
+        if isinstance(node, ast.expr):
+            return self._expression_cost(node, state, multiplier)
+        if isinstance(node, ast.stmt):
+            return self._statement_cost(node, state, multiplier)
+
+        cost = CONSTANT
+        for child in ast.iter_child_nodes(node):
+            cost = max(cost, self._node_cost(child, state, multiplier))
+        return cost
+
+    def _expression_cost(self, node: ast.expr, state: '_EstimateState', multiplier: Cost) -> Cost:
+        if isinstance(node, ast.Lambda):
+            return CONSTANT
+
+        if isinstance(node, (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)):
+            return self._comprehension_cost(node, state, multiplier)
+
+        cost = CONSTANT
+        for child in ast.iter_child_nodes(node):
+            cost = max(cost, self._node_cost(child, state, multiplier))
+
+        if isinstance(node, ast.Call):
+            cost = max(cost, self._call_cost(node, state, multiplier))
+        elif isinstance(node, ast.Compare):
+            for op, comparator in zip(node.ops, node.comparators):
+                if isinstance(op, (ast.In, ast.NotIn)):
+                    cost = max(cost, self._membership_cost(comparator, state, node.lineno))
+        elif isinstance(node, ast.Subscript) and isinstance(node.slice, ast.Slice):
+            if not _is_fixed_window(node.slice):
+                # Slicing copies the selected range
+                state.allocate(LINEAR)
+                cost = max(cost, LINEAR)
+        elif isinstance(node, ast.BinOp) and isinstance(node.op, ast.Mult):
+            cost = max(cost, self._repetition_cost(node, state))
+        elif isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add) and any(
+                _value_kind(operand, state.kinds) in SEQUENCE_KINDS and not _is_display(operand)
+                for operand in (node.left, node.right)):
+            # Concatenation copies both operands into a new sequence
+            state.allocate(LINEAR)
+            cost = max(cost, LINEAR)
+        return cost
+
+    def _repetition_cost(self, node: ast.BinOp, state: '_EstimateState') -> Cost:
+        """Cost of a product that may repeat a sequence: [0] * n, s * n and n * 'ab' are O(n)."""
+
+        for sequence, count in ((node.left, node.right), (node.right, node.left)):
+            literal = _is_display(sequence) or (isinstance(sequence, ast.Constant)
+                                                and isinstance(sequence.value, (str, bytes)))
+            if not literal and _value_kind(sequence, state.kinds) not in SEQUENCE_KINDS:
+                continue
+            if literal and isinstance(count, ast.Constant):
+                return CONSTANT
+            state.allocate(LINEAR)
+            self._check_data_bound(count, state, node.lineno)
+            return LINEAR
+
+        # Two distinct plain variables of unknown kind may be a sequence and its count
+        operands = (node.left, node.right)
+        opaque = (all(isinstance(operand, (ast.Name, ast.Attribute)) for operand in operands)
+                  and ast.dump(node.left) != ast.dump(node.right))
+        if opaque and all(_value_kind(operand, state.kinds) is None for operand in operands):
+            state.uncertain(f"{ast.unparse(node)} at line {node.lineno} may repeat a sequence", UNKNOWN_WEIGHT)
+        return CONSTANT
+
+    def _comprehension_cost(self, node: ast.expr, state: '_EstimateState', multiplier: Cost) -> Cost:
+        iterations = CONSTANT
+        setup = CONSTANT
+        for generator in node.generators:
+            setup = max(setup, self._expression_cost(generator.iter, state, multiplier))
+            count = self._iteration_count(generator.iter, state, node.lineno)
+            iterations = multiply(iterations, count)
+            self._enter_loop(generator.target, generator.iter, count, state, node.lineno)
+
+        if not isinstance(node, ast.GeneratorExp):
+            state.allocate(iterations)
+
+        # Elements are kept in the result, so their allocations scale with it
+        outer_retained = state.retained
+        if not isinstance(node, ast.GeneratorExp):
+            state.retained = multiply(outer_retained, iterations)
+
+        inner = multiply(multiplier, iterations)
+        elements = [node.key, node.value] if isinstance(node, ast.DictComp) else [node.elt]
+        element_cost = CONSTANT
+        for element in elements:
+            element_cost = max(element_cost, self._expression_cost(element, state, inner))
+
+        state.retained = outer_retained
+        for _ in node.generators:
+            self._leave_loop(state)
+        return max(setup, multiply(iterations, element_cost))
+
+    def _call_cost(self, node: ast.Call, state: '_EstimateState', multiplier: Cost) -> Cost:
+        func = node.func
+
+        callee = state.graph.resolve(state.caller, node)
+        if callee is not None and callee == state.caller:
+            state.recursive = True
+            return CONSTANT
+        if callee is not None and callee in state.summaries:
+            return self._helper_cost(node, callee, state)
+
+        if isinstance(func, ast.Name):
+            name = func.id
+            if name in BUILTIN_COSTS:
+                return self._builtin_cost(node, name, state)
+            if name in LIBRARY_COSTS and callee is None:
+                return self._library_cost(node, name, state)
+            if callee is not None:
+                state.uncertain(f"call to helper {name}()", UNKNOWN_WEIGHT)
+            else:
+                state.uncertain(f"call to unknown function {name}()", UNKNOWN_WEIGHT)
+            return CONSTANT
+
+        if isinstance(func, ast.Attribute):
+            if func.attr in LIBRARY_COSTS:
+                return self._library_cost(node, func.attr, state)
+            if func.attr in METHOD_COSTS:
+                if func.attr in GROWING_METHODS:
+                    # Growth accumulates across every iteration that runs it
+                    state.space = max(state.space, multiplier)
+                return self._method_cost(node, func, state)
+            state.uncertain(f"call to unknown method .{func.attr}()", UNKNOWN_WEIGHT)
+            return CONSTANT
+
+        state.uncertain("call through a computed expression", UNKNOWN_WEIGHT)
+        return CONSTANT
+
+    def _builtin_cost(self, node: ast.Call, name: str, state: '_EstimateState') -> Cost:
+        cost = BUILTIN_COSTS[name]
+        if not node.args:
+            cost = CONSTANT
+        elif (name in ITERABLE_BUILTINS and len(node.args) > 1
+              and not any(isinstance(arg, ast.Starred) for arg in node.args)):
+            # max(a, b) compares its arguments instead of scanning an iterable
+            cost = CONSTANT
+        elif len(node.args) == 1 and _is_display(node.args[0]):
+            cost = CONSTANT
+
+        if name in ALLOCATING_BUILTINS and cost != CONSTANT:
+            state.allocate(LINEAR)
+        if cost != CONSTANT:
+            state.evidence.append(f"{name}() at line {node.lineno} costs {format_cost(cost)}")
+        return cost
+
+    def _library_cost(self, node: ast.Call, name: str, state: '_EstimateState') -> Cost:
+        cost = LIBRARY_COSTS[name] if node.args else CONSTANT
+        if name in KIND_CONSTRUCTORS and cost != CONSTANT:
+            state.allocate(LINEAR)
+        if cost != CONSTANT:
+            state.evidence.append(f"{name}() at line {node.lineno} costs {format_cost(cost)}")
+        return cost
+
+    def _method_cost(self, node: ast.Call, func: ast.Attribute, state: '_EstimateState') -> Cost:
+        """Cost of a container method, refined by the receiver's kind where it matters."""
+
+        kind = _value_kind(func.value, state.kinds)
+        if func.attr == 'remove' and kind in HASHED_KINDS:
+            return CONSTANT
+        if func.attr != 'pop' or not node.args or kind in HASHED_KINDS:
+            return METHOD_COSTS[func.attr]
+
+        index = node.args[0]
+        if (isinstance(index, ast.UnaryOp) and isinstance(index.op, ast.USub)
+                and isinstance(index.operand, ast.Constant) and index.operand.value == 1):
+            return CONSTANT
+        if kind in SEQUENCE_KINDS or (isinstance(index, ast.Constant) and index.value == 0):
+            # Popping anywhere but the end shifts the items after it
+            state.evidence.append(f"pop({ast.unparse(index)}) at line {node.lineno} shifts the list: O(n)")
+            return LINEAR
+        state.uncertain(f"pop() with a key on {ast.unparse(func.value)} of unknown type", UNKNOWN_WEIGHT)
+        return CONSTANT
+
+    def _membership_cost(self, container: ast.expr, state: '_EstimateState', line: int) -> Cost:
+        if _is_display(container) or isinstance(container, ast.Constant):
+            return CONSTANT
+        if isinstance(container, ast.Call) and _callee_name(container) in ('range', 'keys'):
+            # range() tests membership arithmetically, dict views by hashing
+            return CONSTANT
+
+        kind = _value_kind(container, state.kinds)
+        if kind in HASHED_KINDS:
+            return CONSTANT
+        if kind in SEQUENCE_KINDS:
+            state.evidence.append(f"Membership test at line {line} scans {ast.unparse(container)}: O(n)")
+            return LINEAR
+        state.uncertain(f"membership test on {ast.unparse(container)} of unknown type", UNKNOWN_WEIGHT)
+        return CONSTANT
+
+    def _helper_cost(self, node: ast.Call, callee: str, state: '_EstimateState') -> Cost:
+        """Cost of calling a function of the same module, assuming it sees the same n."""
+
+        summary = state.summaries[callee]
+        name = callee.rpartition('.')[2]
+        if summary.time is None:
+            state.uncertain(f"call to unresolved recursive function {name}()", 0.5)
+            return CONSTANT
+
+        for reason, weight in summary.uncertainties.items():
+            state.uncertain(reason, weight)
+        state.space = max(state.space, summary.space)
+        if summary.time != CONSTANT:
+            state.evidence.append(f"Call to {name}() at line {node.lineno} costs {format_cost(summary.time)}")
+        return summary.time
+
+    def _for_iterations(self, node: ast.For, state: '_EstimateState') -> Cost:
+        if any(isinstance(statement, (ast.Return, ast.Raise, ast.Break)) for statement in node.body):
+            # An unconditional exit means the body runs at most once
+            state.uncertain(f"loop at line {node.lineno} exits during its first iteration", UNKNOWN_WEIGHT)
+            state.evidence.append(f"Loop at line {node.lineno} exits in its first iteration: O(1)")
+            return CONSTANT
+        return self._iteration_count(node.iter, state, node.lineno)
+
+    def _iteration_count(self, iterable: ast.expr, state: '_EstimateState', line: int) -> Cost:
+        if isinstance(iterable, (ast.List, ast.Tuple, ast.Set, ast.Dict, ast.Constant)):
+            return CONSTANT
+
+        if ((isinstance(iterable, ast.Name) and iterable.id in state.recursive_results)
+                or (isinstance(iterable, ast.Call) and state.graph.resolve(state.caller, iterable) == state.caller)):
+            # The size of a recursive call's result is part of the recurrence being solved
+            state.uncertain(f"loop at line {line} iterates over the result of a recursive call", UNKNOWN_WEIGHT)
+
+        if isinstance(iterable, ast.Call) and isinstance(iterable.func, ast.Name):
+            name = iterable.func.id
+            if name == 'range':
+                if iterable.args and all(isinstance(arg, ast.Constant) for arg in iterable.args):
+                    # Literal bounds in snippets are often placeholders for n
+                    state.uncertain("loop over a constant range", 0.35)
+                    state.evidence.append(f"Loop at line {line} has a constant bound: O(1)")
+                    return CONSTANT
+                for arg in iterable.args:
+                    self._check_data_bound(arg, state, line)
+                return self._range_iterations(iterable, state, line)
+            # zip() runs as long as its arguments, map() and filter() as their iterables
+            if name == 'zip' and iterable.args:
+                return max(self._iteration_count(arg, state, line) for arg in iterable.args)
+            if name in ('map', 'filter') and len(iterable.args) > 1:
+                return max(self._iteration_count(arg, state, line) for arg in iterable.args[1:])
+            if name in ('enumerate', 'reversed', 'sorted', 'list', 'iter', 'set', 'tuple'):
+                if iterable.args:
+                    return self._iteration_count(iterable.args[0], state, line)
+
+        state.evidence.append(f"Loop at line {line} iterates over {ast.unparse(iterable)}: O(n)")
+        return LINEAR
+
+    def _range_iterations(self, iterable: ast.Call, state: '_EstimateState', line: int) -> Cost:
+        bounds, step = iterable.args[:2], iterable.args[2:]
+        sizes = [self._bound_size(bound, state) for bound in bounds]
+        if None in sizes or any(not isinstance(arg, (ast.Constant, ast.UnaryOp)) for arg in step):
+            state.uncertain(f"loop bound {ast.unparse(iterable)} at line {line} is not understood", UNKNOWN_WEIGHT)
+            state.evidence.append(f"Loop at line {line} iterates over {ast.unparse(iterable)}: assumed O(n)")
+            return LINEAR
+
+        iterations = max(sizes)
+        state.evidence.append(f"Loop at line {line} iterates over {ast.unparse(iterable)}: {format_cost(iterations)}")
+        return iterations
+
+    def _bound_size(self, node: ast.expr, state: '_EstimateState') -> Optional[Cost]:
+        """How a numeric bound grows: n and len(xs) are O(n), n * n is O(n²), 2 ** n is O(2^n).
+
+        Returns None when the expression isn't understood.
+        """
+
+        if isinstance(node, ast.Constant):
+            return CONSTANT if isinstance(node.value, (int, float)) else None
+        if isinstance(node, (ast.Name, ast.Attribute, ast.Subscript)):
+            return LINEAR
+        if isinstance(node, ast.UnaryOp):
+            return self._bound_size(node.operand, state)
+
+        if isinstance(node, ast.Call):
+            name = _callee_name(node)
+            sizes = [self._bound_size(arg, state) for arg in node.args]
+            if name == 'len':
+                return LINEAR
+            if not sizes or None in sizes:
+                return None
+            if name in ('int', 'abs', 'round', 'ceil', 'floor', 'max', 'min'):
+                return max(sizes)
+            if name in ('sqrt', 'isqrt'):
+                return _root(sizes[0], 2)
+            return None
+
+        if not isinstance(node, ast.BinOp):
+            return None
+        left, right = self._bound_size(node.left, state), self._bound_size(node.right, state)
+        if left is None or right is None:
+            return None
+        if isinstance(node.op, (ast.Add, ast.Sub)):
+            return max(left, right)
+        if isinstance(node.op, ast.Mult):
+            return multiply(left, right)
+        if isinstance(node.op, (ast.FloorDiv, ast.Div, ast.RShift)) and right == CONSTANT:
+            return left
+        if isinstance(node.op, ast.Mod):
+            return right
+        if isinstance(node.op, ast.Pow) and right == CONSTANT and isinstance(node.right, ast.Constant):
+            power = node.right.value
+            if left.log and not float(power).is_integer():
+                return None
+            return Cost(left.exp ** power if left.exp else 0, left.poly * power, int(left.log * power))
+        if isinstance(node.op, ast.Pow) and left == CONSTANT and right == LINEAR:
+            base = node.left.value if isinstance(node.left, ast.Constant) else None
+            return Cost(exp=base) if base is not None and base > 1 else None
+        if isinstance(node.op, ast.LShift) and left == CONSTANT and right == LINEAR:
+            return Cost(exp=2)
+        if isinstance(node.op, ast.LShift) and right == CONSTANT:
+            return left
+        return None
+
+    def _enter_loop(self, target: ast.expr, iterable: ast.expr, iterations: Cost,
+                    state: '_EstimateState', line: int):
+        """Relate a loop to the loops around it before costing its body.
+
+        Loops over unrelated inputs (``for a in xs: for b in ys``) multiply
+        two different sizes, and loops over part of an outer loop's item add
+        up to the item sizes rather than multiply; both are only assumed to be n.
+        """
+
+        targets = {n.id for n in ast.walk(target) if isinstance(n, ast.Name)}
+        inputs = state.resolve(_operand_names(iterable))
+        loop = _Loop(line, inputs | targets, targets, _item_targets(target, iterable))
+
+        source = _unwrap_iterable(iterable)
+        outer_items = set().union(*(outer.items for outer in state.loops))
+        outer_targets = set().union(*(outer.targets for outer in state.loops))
+        if ((isinstance(source, ast.Name) and source.id in outer_items)
+                or (isinstance(source, ast.Attribute) and _operand_names(source) & outer_items)
+                or (isinstance(source, ast.Subscript) and _operand_names(source.slice) & outer_targets)):
+            state.uncertain(f"loop at line {line} iterates over part of an outer loop's item", UNKNOWN_WEIGHT)
+        elif iterations != CONSTANT and inputs:
+            related = [index for index, outer in enumerate(state.loops) if outer.inputs & inputs]
+            if related:
+                # Ranging back over an outer loop's input ties the loops in between to it (square matrices)
+                for outer in state.loops[related[-1] + 1:]:
+                    outer.separate = None
+            elif any(outer.inputs for outer in state.loops):
+                loop.separate = [outer for outer in state.loops if outer.inputs][-1].line
+
+        state.loops.append(loop)
+
+    def _leave_loop(self, state: '_EstimateState'):
+        loop = state.loops.pop()
+        if loop.separate is not None:
+            state.uncertain(f"nested loops at lines {loop.separate} and {loop.line} range over different inputs",
+                            UNKNOWN_WEIGHT)
+
+    def _check_data_bound(self, size: ast.expr, state: '_EstimateState', line: int):
+        """Flag sizes taken from the items being iterated, e.g. ``range(count)`` for a counted value."""
+        items = set().union(*(loop.items for loop in state.loops))
+        if _operand_names(size) & items:
+            state.uncertain(f"size at line {line} is a value read from the data", UNKNOWN_WEIGHT)
+
+    def _while_iterations(self, node: ast.While, state: '_EstimateState', multiplier: Cost) -> Cost:
+        if isinstance(node.test, ast.Constant):
+            state.uncertain(f"while loop at line {node.lineno} with a constant condition", 0.5)
+            return LINEAR
+
+        condition_names = {n.id for n in ast.walk(node.test) if isinstance(n, ast.Name)}
+        kind, counters = self._loop_variable_update(node.body, condition_names)
+
+        if kind == 'log':
+            state.evidence.append(f"While loop at line {node.lineno} shrinks its range geometrically: O(log n)")
+            return LOGARITHMIC
+        if kind == 'linear':
+            return self._stepped_iterations(node.test, counters, state, node.lineno)
+        if kind == 'drain':
+            refilled = any(
+                isinstance(child, ast.Call) and isinstance(child.func, ast.Attribute)
+                and child.func.attr in GROWING_METHODS and isinstance(child.func.value, ast.Name)
+                and child.func.value.id in condition_names
+                for child in self._walk_loop_body(node.body)
+            )
+            if refilled:
+                # Worklist loops run once per item ever added, which the body decides
+                state.uncertain(f"while loop at line {node.lineno} drains a collection it also refills",
+                                UNKNOWN_WEIGHT)
+            elif multiplier != CONSTANT:
+                # Amortized over the outer loop rather than O(n) on every pass
+                state.uncertain(f"while loop at line {node.lineno} drains a collection inside another loop",
+                                UNKNOWN_WEIGHT)
+            else:
+                state.uncertain(f"while loop at line {node.lineno} drains a collection", 0.1)
+            state.evidence.append(f"While loop at line {node.lineno} drains a collection: O(n)")
+            return LINEAR
+
+        state.uncertain(f"unrecognized while-loop bound at line {node.lineno}", 0.4)
+        return LINEAR
+
+    def _stepped_iterations(self, test: ast.expr, counters: Set[str], state: '_EstimateState',
+                            line: int) -> Cost:
+        """Iterations of a while loop whose counter moves by a constant step towards its bound."""
+
+        comparison = _counter_comparison(test, counters)
+        if comparison is None:
+            # Two pointers moving towards each other, or a compound condition
+            state.evidence.append(f"While loop at line {line} steps its bound by a constant: O(n)")
+            return LINEAR
+
+        power, bound = comparison
+        size = self._bound_size(bound, state)
+        if size == CONSTANT:
+            # Counting down to a fixed end takes as many steps as the counter starts at
+            size = LINEAR
+        iterations = _root(size, power) if size is not None else None
+        if iterations is None:
+            state.uncertain(f"while-loop bound {ast.unparse(bound)} at line {line} is not understood", UNKNOWN_WEIGHT)
+            state.evidence.append(f"While loop at line {line} steps its bound by a constant: assumed O(n)")
+            return LINEAR
+
+        if power == 1:
+            state.evidence.append(f"While loop at line {line} steps its counter by a constant up to "
+                                  f"{ast.unparse(bound)}: {format_cost(iterations)}")
+        else:
+            state.evidence.append(f"While loop at line {line} stops when its counter to the power {power} "
+                                  f"reaches {ast.unparse(bound)}: {format_cost(iterations)}")
+        return iterations
+
+    def _loop_variable_update(self, body: List[ast.stmt], condition_names: set) -> Tuple[Optional[str], Set[str]]:
+        """Classify how the loop body updates the variables in its condition.
+
+        Returns the kind of update and the condition variables updated that way.
+        """
+
+        nodes = list(self._walk_loop_body(body))
+        midpoints = {
+            node.targets[0].id for node in nodes
+            if isinstance(node, ast.Assign) and len(node.targets) == 1
+            and isinstance(node.targets[0], ast.Name) and is_midpoint(node.value)
+        }
+        kinds = defaultdict(set)
+
+        for node in nodes:
+            if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+                target, value = node.targets[0].id, node.value
+                if target in condition_names:
+                    kinds[_classify_assignment(target, value, midpoints)].add(target)
+            elif isinstance(node, ast.AugAssign) and isinstance(node.target, ast.Name):
+                if node.target.id in condition_names:
+                    kinds[_classify_step(node.op, node.value)].add(node.target.id)
+            elif (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                  and node.func.attr in ('pop', 'popleft', 'popitem')
+                  and isinstance(node.func.value, ast.Name) and node.func.value.id in condition_names):
+                kinds['drain'].add(node.func.value.id)
+
+        for kind in ('log', 'linear', 'drain'):
+            if kind in kinds:
+                return kind, kinds[kind]
+        return None, set()
+
+    def _walk_loop_body(self, body: List[ast.stmt]):
+        stack = list(body)
+        while stack:
+            node = stack.pop()
+            yield node
+            if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)):
+                stack.extend(ast.iter_child_nodes(node))
+
+class _EstimateState:
+    """Mutable bookkeeping while costing one function (or a module's top-level code)."""
+
+    def __init__(self, graph: CallGraph, summaries: Dict[str, FunctionSummary], caller: str,
+                 statements: List[ast.stmt] = (), arguments: Optional[ast.arguments] = None):
+        self.graph = graph
+        self.summaries = summaries
+        self.caller = caller
+        self.recursive = False
+        self.space = CONSTANT
+        self.retained = CONSTANT
+        self.evidence: List[str] = []
+        self.uncertainties: Dict[str, float] = {}
+        self.loops: List[_Loop] = []
+        self.kinds, self.sources = _collect_bindings(statements, arguments)
+        self.recursive_results = {
+            target.id for node in walk_scope(statements)
+            if isinstance(node, ast.Assign) and isinstance(node.value, ast.Call)
+            and caller in graph.functions and graph.resolve(caller, node.value) == caller
+            for target in node.targets if isinstance(target, ast.Name)
+        }
+
+    def allocate(self, size: Cost):
+        """Record a new collection of the given size."""
+        self.space = max(self.space, multiply(self.retained, size))
+
+    def uncertain(self, reason: str, weight: float):
+        self.uncertainties[reason] = max(weight, self.uncertainties.get(reason, 0.0))
+
+    def resolve(self, names: Set[str]) -> Set[str]:
+        """Names plus everything they were computed from, e.g. n = len(xs) adds xs."""
+        resolved, pending = set(), list(names)
+        while pending:
+            name = pending.pop()
+            if name not in resolved:
+                resolved.add(name)
+                pending.extend(self.sources.get(name, ()))
+        return resolved
+
+class _Loop:
+    """A loop whose body is being costed, as seen by the loops nested in it."""
+
+    def __init__(self, line: int, inputs: Set[str], targets: Set[str], items: Set[str]):
+        self.line = line
+        self.inputs = inputs    # names its bound derives from, and its targets
+        self.targets = targets
+        self.items = items      # targets bound to items of the data rather than positions
+        self.separate: Optional[int] = None  # line of an enclosing loop over another input
+
+def _collect_bindings(statements: List[ast.stmt],
+                      arguments: Optional[ast.arguments]) -> Tuple[Dict[str, str], Dict[str, Set[str]]]:
+    """Flow-insensitive facts about the names a scope binds.
+
+    Returns the collection kind of every name whose assignments agree on one
+    (``None`` placeholders aside), and the names each name's values were
+    computed from.
+    """
+
+    kinds: Dict[str, Optional[str]] = {}
+    sources: Dict[str, Set[str]] = defaultdict(set)
+    if arguments is not None:
+        for argument in arguments.posonlyargs + arguments.args + arguments.kwonlyargs:
+            if argument.annotation is not None:
+                kinds[argument.arg] = _annotation_kind(argument.annotation)
+
+    bindings = []
+    for node in walk_scope(statements):
+        if isinstance(node, ast.Assign):
+            for target in node.targets:
+                bindings.extend(_pair_targets(target, node.value))
+        elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+            kinds.setdefault(node.target.id, _annotation_kind(node.annotation))
+            if node.value is not None:
+                bindings.append((node.target, node.value))
+        elif (isinstance(node, (ast.For, ast.AsyncFor, ast.comprehension)) and isinstance(node.iter, ast.Call)
+              and _callee_name(node.iter) == 'range'):
+            bindings.extend((name, RANGE_ITEM) for name in ast.walk(node.target) if isinstance(name, ast.Name))
+        elif isinstance(node, (ast.For, ast.AsyncFor, ast.comprehension, ast.withitem)):
+            target = node.optional_vars if isinstance(node, ast.withitem) else node.target
+            bindings.extend((name, None) for name in ast.walk(target) if isinstance(name, ast.Name))
+        elif isinstance(node, ast.NamedExpr):
+            bindings.append((node.target, node.value))
+
+    for target, value in sorted(bindings, key=lambda pair: (pair[0].lineno, pair[0].col_offset)):
+        name = target.id
+        if value is not None:
+            sources[name].update(_operand_names(value))
+        if isinstance(value, ast.Constant) and value.value is None:
+            continue
+        kind = _value_kind(value, kinds) if value is not None else None
+        if name not in kinds:
+            kinds[name] = kind
+        elif kinds[name] != kind:
+            kinds[name] = None
+
+    return {name: kind for name, kind in kinds.items() if kind is not None}, sources
+
+def _pair_targets(target: ast.expr, value: Optional[ast.expr]) -> List[Tuple[ast.Name, Optional[ast.expr]]]:
+    """Match assignment targets with their values, element-wise for tuple unpacking."""
+    if isinstance(target, ast.Name):
+        return [(target, value)]
+    if isinstance(target, (ast.Tuple, ast.List)):
+        if isinstance(value, (ast.Tuple, ast.List)) and len(value.elts) == len(target.elts):
+            return [pair for element, item in zip(target.elts, value.elts) for pair in _pair_targets(element, item)]
+        return [pair for element in target.elts for pair in _pair_targets(element, None)]
+    if isinstance(target, ast.Starred):
+        return _pair_targets(target.value, None)
+    return []
+
+def _value_kind(value: ast.expr, kinds: Dict[str, str]) -> Optional[str]:
+    """Collection kind an expression evaluates to, if it is evident."""
+    if isinstance(value, (ast.List, ast.ListComp)):
+        return 'list'
+    if isinstance(value, ast.Tuple):
+        return 'tuple'
+    if isinstance(value, (ast.Set, ast.SetComp)):
+        return 'set'
+    if isinstance(value, (ast.Dict, ast.DictComp)):
+        return 'dict'
+    if isinstance(value, ast.JoinedStr) or (isinstance(value, ast.Constant) and isinstance(value.value, str)):
+        return 'str'
+    if (isinstance(value, ast.Constant) and isinstance(value.value, (int, float))
+            and not isinstance(value.value, bool)):
+        return 'number'
+    if isinstance(value, ast.Call):
+        return KIND_CONSTRUCTORS.get(_callee_name(value))
+    if isinstance(value, ast.UnaryOp) and isinstance(value.op, (ast.USub, ast.UAdd)):
+        return 'number' if _value_kind(value.operand, kinds) == 'number' else None
+    if isinstance(value, ast.BinOp):
+        operands = [_value_kind(operand, kinds) for operand in (value.left, value.right)]
+        if isinstance(value.op, (ast.Add, ast.Mult)):
+            # xs + [x], [0] * n and text + word keep their sequence kind
+            for kind in operands:
+                if kind in SEQUENCE_KINDS:
+                    return kind
+        return 'number' if operands == ['number', 'number'] else None
+    if isinstance(value, ast.Name):
+        return kinds.get(value.id)
+    return None
+
+def _annotation_kind(annotation: ast.expr) -> Optional[str]:
+    if isinstance(annotation, ast.Subscript):
+        annotation = annotation.value
+    name = annotation.attr if isinstance(annotation, ast.Attribute) else getattr(annotation, 'id', None)
+    return ANNOTATION_KINDS.get(name)
+
+def _callee_name(call: ast.Call) -> Optional[str]:
+    func = call.func
+    return func.attr if isinstance(func, ast.Attribute) else getattr(func, 'id', None)
+
+def _operand_names(node: ast.AST) -> Set[str]:
+    """Names an expression reads, leaving out the functions it calls."""
+    called = {id(child.func) for child in ast.walk(node) if isinstance(child, ast.Call)}
+    return {child.id for child in ast.walk(node) if isinstance(child, ast.Name) and id(child) not in called}
+
+def _unwrap_iterable(iterable: ast.expr) -> ast.expr:
+    """The data behind enumerate(xs), reversed(xs), sorted(xs) and the like."""
+    while (isinstance(iterable, ast.Call) and iterable.args
+           and _callee_name(iterable) in ('enumerate', 'reversed', 'sorted', 'list', 'iter', 'set', 'tuple')):
+        iterable = iterable.args[0]
+    return iterable
+
+def _item_targets(target: ast.expr, iterable: ast.expr) -> Set[str]:
+    """Loop targets bound to data items, as opposed to range() indices and enumerate() positions."""
+    if isinstance(iterable, ast.Call) and _callee_name(iterable) == 'range':
+        return set()
+    if (isinstance(iterable, ast.Call) and _callee_name(iterable) == 'enumerate'
+            and isinstance(target, ast.Tuple) and len(target.elts) == 2):
+        target = target.elts[1]
+    return {n.id for n in ast.walk(target) if isinstance(n, ast.Name)}
+
+def _is_display(node: ast.expr) -> bool:
+    """A literal list/tuple/set/dict of fixed size."""
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        return not any(isinstance(element, ast.Starred) for element in node.elts)
+    return isinstance(node, ast.Dict) and None not in node.keys
+
+def _counter_comparison(test: ast.expr, counters: Set[str]) -> Optional[Tuple[float, ast.expr]]:
+    """Match i < bound, i * i <= bound and i ** k < bound for a loop counter i.
+
+    Returns the power the counter is raised to and the bound, or None when
+    the condition doesn't compare a counter with an expression free of counters.
+    """
+
+    if not isinstance(test, ast.Compare) or len(test.comparators) != 1:
+        return None
+    sides = (test.left, test.comparators[0])
+    for counter, bound in (sides, sides[::-1]):
+        power = _counter_power(counter, counters)
+        if power is not None and not _operand_names(bound) & counters:
+            return power, bound
+    return None
+
+def _counter_power(node: ast.expr, counters: Set[str]) -> Optional[float]:
+    def is_counter(operand):
+        return isinstance(operand, ast.Name) and operand.id in counters
+
+    if is_counter(node):
+        return 1
+    if (isinstance(node, ast.BinOp) and isinstance(node.op, ast.Mult) and is_counter(node.left)
+            and ast.dump(node.left) == ast.dump(node.right)):
+        return 2
+    if (isinstance(node, ast.BinOp) and isinstance(node.op, ast.Pow) and is_counter(node.left)
+            and isinstance(node.right, ast.Constant) and isinstance(node.right.value, (int, float))
+            and node.right.value > 0):
+        return node.right.value
+    return None
+
+def _root(size: Optional[Cost], power: float) -> Optional[Cost]:
+    """The k-th root of a size, e.g. the steps until i * i passes n; None if it has no simple form."""
+    if size is None or power == 1:
+        return size
+    if size.log:
+        return None
+    return Cost(size.exp ** (1 / power) if size.exp else 0, size.poly / power)
+
+def _is_fixed_window(window: ast.Slice) -> bool:
+    """Match xs[i:i + k] with a constant k, whose copy doesn't grow with n."""
+    lower, upper = window.lower, window.upper
+    return (lower is not None and isinstance(upper, ast.BinOp) and isinstance(upper.op, ast.Add)
+            and isinstance(upper.right, ast.Constant) and ast.dump(upper.left) == ast.dump(lower))
+
+def _classify_assignment(target: str, value: ast.expr, midpoints: set) -> Optional[str]:
+    names = {n.id for n in ast.walk(value) if isinstance(n, ast.Name)}
+    if names & midpoints or is_midpoint(value):
+        return 'log'
+    if isinstance(value, ast.BinOp) and isinstance(value.left, ast.Name) and value.left.id == target:
+        return _classify_step(value.op, value.right)
+    return None
+
+def _classify_step(op: ast.operator, amount: ast.expr) -> Optional[str]:
+    if not isinstance(amount, ast.Constant) or not isinstance(amount.value, (int, float)):
+        return None
+    if isinstance(op, (ast.FloorDiv, ast.Div, ast.RShift, ast.Mult, ast.LShift)):
+        return 'log'
+    if isinstance(op, (ast.Add, ast.Sub)):
+        return 'linear'
+    return None
@@ -0,0 +1,148 @@
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+WHITESPACE = ' \t\r\n'
+
+# Characters that can change the scanner state inside a string / a nested value
+STRING_SPECIAL = re.compile(r'["\\]')
+NESTED_SPECIAL = re.compile(r'["{}\[\]]')
+
+class JSONFieldStream:
+    """Extract the top-level fields of the first JSON object in a streamed text.
+
+    Text is fed in arbitrary chunks; every field is reported as soon as its
+    value is complete, so a verdict at the start of a long response is
+    available before the rest arrives. The scan is a single linear pass that
+    jumps between structural characters, and anything before the first
+    ``{`` (prose, code fences) is skipped.
+    """
+
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+
+        self._chunks: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._expect = 'key'  # key, colon, value or comma at the top level
+        self._key: Optional[str] = None
+        self._token_parts: Optional[List[str]] = None  # pieces of an open key/value token
+        self._scalar = False
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        return ''.join(self._chunks)
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Consume a chunk and return the (key, value) pairs it completed."""
+
+        self._chunks.append(chunk)
+        completed = []
+        position = 0
+        # Where the open token starts within this chunk
+        start = 0 if self._token_parts is not None else None
+
+        while position < len(chunk) and not self.done:
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                    position += 1
+                    continue
+                match = STRING_SPECIAL.search(chunk, position)
+                if match is None:
+                    position = len(chunk)
+                    break
+                position = match.start()
+                if chunk[position] == '\\':
+                    self._escaped = True
+                else:
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._finish_token(chunk, start, position + 1, completed)
+                        start = None
+                position += 1
+                continue
+
+            if self._depth == 0:
+                position = chunk.find('{', position)
+                if position < 0:
+                    break
+                self._depth = 1
+                position += 1
+                continue
+
+            if self._depth > 1:
+                match = NESTED_SPECIAL.search(chunk, position)
+                if match is None:
+                    position = len(chunk)
+                    break
+                position = match.start()
+                char = chunk[position]
+                if char == '"':
+                    self._in_string = True
+                elif char in '{[':
+                    self._depth += 1
+                else:
+                    self._depth -= 1
+                    if self._depth == 1:
+                        self._finish_token(chunk, start, position + 1, completed)
+                        start = None
+                position += 1
+                continue
+
+            char = chunk[position]
+            if self._scalar and (char in WHITESPACE or char in ',}'):
+                self._finish_token(chunk, start, position, completed)
+                start = None
+
+            if char == '"':
+                self._in_string = True
+                start = self._open_token(position)
+            elif char == ':':
+                self._expect = 'value'
+            elif char == ',':
+                self._expect = 'key'
+            elif char == '}':
+                self._depth = 0
+                self.done = True
+            elif char in '{[' and self._expect == 'value':
+                start = self._open_token(position)
+                self._depth += 1
+            elif char not in WHITESPACE and self._expect == 'value' and not self._scalar:
+                # Numbers, true, false and null end at the next delimiter
+                start = self._open_token(position)
+                self._scalar = True
+            position += 1
+
+        if self._token_parts is not None and start is not None:
+            self._token_parts.append(chunk[start:])
+        return completed
+
+    def _open_token(self, position: int) -> int:
+        self._token_parts = []
+        return position
+
+    def _finish_token(self, chunk: str, start: Optional[int], end: int, completed: List[Tuple[str, Any]]):
+        self._token_parts.append(chunk[start or 0:end])
+        token = ''.join(self._token_parts)
+        self._token_parts = None
+        self._scalar = False
+
+        try:
+            value = json.loads(token)
+        except ValueError:
+            if self._expect == 'key':
+                return
+            value = None
+
+        if self._expect == 'key':
+            self._key = value
+            self._expect = 'colon'
+        elif self._expect == 'value':
+            if isinstance(self._key, str):
+                self.fields[self._key] = value
+                completed.append((self._key, value))
+            self._expect = 'comma'
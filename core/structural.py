@@ -0,0 +1,384 @@
+import ast
+import hashlib
+import heapq
+import json
+import mmap
+import os
+import random
+import struct
+import threading
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from config import Config
+
+# Structural fingerprints: a token stream of the tree with the names bound in
+# the code alpha-renamed (v0, v1, ... in order of appearance), constants
+# reduced to their type and docstrings dropped. Free names (builtins, helpers,
+# modules) and attribute names are kept, since sorted() and len() or .pop()
+# and .append() cost different amounts.
+
+_PRIME = (1 << 31) - 1
+_SKIPPED_FIELDS = {'ctx', 'type_comment', 'type_ignores', 'kind'}
+_BINDING_FIELDS = {'id', 'arg', 'name', 'names', 'rest'}
+
+def _bound_names(tree: ast.AST) -> Set[str]:
+    """Names the code binds itself: parameters, assignment targets, defs and handlers.
+
+    Imported names are left alone so ``heapq`` and ``bisect`` stay distinct.
+    """
+    bound = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load):
+            bound.add(node.id)
+        elif isinstance(node, ast.arg):
+            bound.add(node.arg)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            bound.add(node.name)
+        elif isinstance(node, (ast.ExceptHandler, ast.MatchAs, ast.MatchStar)) and node.name:
+            bound.add(node.name)
+        elif isinstance(node, ast.MatchMapping) and node.rest:
+            bound.add(node.rest)
+    return bound
+
+def _is_docstring(statement: ast.AST) -> bool:
+    return (isinstance(statement, ast.Expr) and isinstance(statement.value, ast.Constant)
+            and isinstance(statement.value.value, str))
+
+def structural_tokens(tree: ast.AST) -> List[str]:
+    """The normalized pre-order token stream of a tree; ``)`` closes each node with children."""
+
+    bound = _bound_names(tree)
+    renamed: Dict[str, str] = {}
+    tokens: List[str] = []
+    stack: List[Any] = [tree]
+
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            tokens.append(item)
+            continue
+
+        tokens.append(type(item).__name__)
+        if isinstance(item, ast.Constant):
+            tokens.append(type(item.value).__name__)
+            continue
+
+        children: List[Any] = []
+        for field, value in ast.iter_fields(item):
+            if field in _SKIPPED_FIELDS or value is None:
+                continue
+            if field == 'body' and isinstance(item, (ast.Module, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                value = value[1:] if value and _is_docstring(value[0]) else value
+            for child in value if isinstance(value, list) else [value]:
+                if isinstance(child, ast.AST):
+                    children.append(child)
+                elif (isinstance(child, str) and field in _BINDING_FIELDS and child in bound
+                      and not isinstance(item, (ast.keyword, ast.alias))):
+                    children.append(renamed.setdefault(child, f'v{len(renamed)}'))
+                else:
+                    children.append(str(child))
+        if children:
+            children.append(')')
+            stack.extend(reversed(children))
+
+    return tokens
+
+@dataclass(slots=True)
+class Fingerprint:
+    """Exact structural hash plus a MinHash signature over token n-grams."""
+    digest: bytes
+    signature: Tuple[int, ...]
+
+def _permutations(count: int):
+    """The (a, b) coefficients of the hash functions a·x + b mod p, as uint64 column vectors."""
+    import numpy as np
+
+    # Fixed seed: signatures must be comparable across runs and machines
+    rng = random.Random(0x5eed)
+    pairs = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(count)]
+    return (np.array([a for a, _ in pairs], dtype=np.uint64)[:, None],
+            np.array([b for _, b in pairs], dtype=np.uint64)[:, None])
+
+def shingles(tokens: List[str], size: int) -> Set[int]:
+    """32-bit hashes of the token n-grams; short streams are one shingle."""
+    if len(tokens) <= size:
+        return {zlib.crc32('\x1f'.join(tokens).encode('utf-8')) % _PRIME}
+    return {zlib.crc32('\x1f'.join(tokens[start:start + size]).encode('utf-8')) % _PRIME
+            for start in range(len(tokens) - size + 1)}
+
+def fingerprint_tree(tree: ast.AST, permutations, ngram: Optional[int] = None) -> Fingerprint:
+    import numpy as np
+
+    tokens = structural_tokens(tree)
+    digest = hashlib.sha256('\x1f'.join(tokens).encode('utf-8')).digest()[:16]
+    values = shingles(tokens, ngram or Config.DEDUP_NGRAM)
+    a, b = permutations
+    # Every hash function over every shingle at once; a·x + b < 2^63, so uint64 doesn't overflow
+    x = np.fromiter(values, dtype=np.uint64, count=len(values))[None, :]
+    signature = ((a * x + b) % np.uint64(_PRIME)).min(axis=1)
+    return Fingerprint(digest, tuple(signature.tolist()))
+
+def structural_hash(code: str) -> str:
+    """Hash of the normalized structure: equal for code that differs only in names, constants and docstrings."""
+    return hashlib.sha256('\x1f'.join(structural_tokens(ast.parse(code))).encode('utf-8')).hexdigest()[:32]
+
+def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+@dataclass(slots=True)
+class Match:
+    """An indexed analysis that can stand in for new code."""
+    kind: str  # 'exact' or 'similar'
+    similarity: float
+    entry: Dict[str, Any]
+
+    def llm_analysis(self) -> Dict[str, Any]:
+        """The stored LLM analysis, marked with where it came from."""
+        return dict(self.entry['llm_analysis'], duplicate_of={
+            'code_hash': self.entry['code_hash'], 'kind': self.kind, 'similarity': round(self.similarity, 3)
+        })
+
+# On-disk layout, little-endian, every table fixed-size so lookups are binary
+# searches over the memory-mapped file and never load it:
+#   header     magic, version, permutations, bands, entries
+#   signatures entries × permutations × u32, in entry order
+#   results    entries × (offset u64, length u32) into the blob section
+#   exact      entries × (digest 16 bytes, entry u32), sorted by digest
+#   bands      entries × bands × (key 8 bytes, entry u32), sorted by key
+#   blobs      the entries' JSON
+_MAGIC = b'TCXDEDUP'
+_VERSION = 1
+_HEADER = struct.Struct('<8sIHHQ')
+_RESULT = struct.Struct('<QI')
+_EXACT = struct.Struct('<16sI')
+_BAND = struct.Struct('<8sI')
+
+class StructuralIndex:
+    """Persistent exact + near-duplicate index of LLM analyses, keyed by code structure.
+
+    Lookups first try the exact structural hash, then MinHash/LSH candidates
+    whose estimated similarity reaches ``threshold``. A near duplicate is only
+    reused when its static estimate matches, so an extra nested loop is never
+    papered over. New entries are kept in memory until ``save()`` merges them
+    into the file. Safe to share across threads.
+    """
+
+    def __init__(self, path: Optional[str] = None, permutations: Optional[int] = None,
+                 bands: Optional[int] = None, threshold: Optional[float] = None):
+        self.path = path or Config.DEDUP_INDEX_PATH
+        self.permutations = permutations or Config.DEDUP_PERMUTATIONS
+        self.bands = bands or Config.DEDUP_BANDS
+        self.threshold = Config.DEDUP_SIMILARITY if threshold is None else threshold
+        if self.permutations % self.bands:
+            raise ValueError("permutations must be a multiple of bands")
+        self.rows = self.permutations // self.bands
+        self._permutations = _permutations(self.permutations)
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._count = 0
+        # Section offsets in the mapped file, set by _open
+        self._results = self._exact = self._band_table = self._blobs = 0
+        self._pending: List[Tuple[Fingerprint, bytes]] = []
+        self._pending_exact: Dict[bytes, int] = {}
+        self._pending_bands: Dict[bytes, List[int]] = {}
+        self._open()
+
+    def __len__(self) -> int:
+        return self._count + len(self._pending)
+
+    def fingerprint(self, code: str) -> Optional[Fingerprint]:
+        """The code's fingerprint, or None when it doesn't parse on its own."""
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            return None
+        return fingerprint_tree(tree, self._permutations)
+
+    def lookup(self, fingerprint: Fingerprint, static_time: Optional[str] = None) -> Optional[Match]:
+        def compatible(stored):
+            # A result from code the static pass sizes differently is not reused
+            return static_time is None or stored.get('static_time') in (None, static_time)
+
+        with self._lock:
+            entry = self._pending_exact.get(fingerprint.digest)
+            if entry is not None:
+                stored = json.loads(self._pending[entry][1])
+                if compatible(stored):
+                    return Match('exact', 1.0, stored)
+            entry = self._find_exact(fingerprint.digest)
+            if entry is not None:
+                stored = self._blob(entry)
+                if compatible(stored):
+                    return Match('exact', 1.0, stored)
+
+            candidates = []
+            for key in self._band_keys(fingerprint.signature):
+                for entry in self._pending_bands.get(key, ()):
+                    score = similarity(fingerprint.signature, self._pending[entry][0].signature)
+                    candidates.append((score, -1 - entry))
+                for entry in self._find_band(key):
+                    candidates.append((similarity(fingerprint.signature, self._signature(entry)), entry))
+
+            for score, entry in sorted(set(candidates), reverse=True):
+                if score < self.threshold:
+                    break
+                stored = json.loads(self._pending[-1 - entry][1]) if entry < 0 else self._blob(entry)
+                if compatible(stored):
+                    return Match('similar', score, stored)
+            return None
+
+    def add(self, fingerprint: Fingerprint, llm_analysis: Dict[str, Any], code_hash: str,
+            static_time: Optional[str] = None):
+        blob = json.dumps({'llm_analysis': llm_analysis, 'code_hash': code_hash, 'static_time': static_time},
+                          separators=(',', ':')).encode('utf-8')
+        with self._lock:
+            if fingerprint.digest in self._pending_exact or self._find_exact(fingerprint.digest) is not None:
+                return
+            entry = len(self._pending)
+            self._pending.append((fingerprint, blob))
+            self._pending_exact[fingerprint.digest] = entry
+            for key in self._band_keys(fingerprint.signature):
+                self._pending_bands.setdefault(key, []).append(entry)
+
+    def save(self):
+        """Merge new entries into the index file (written to a temporary file, then swapped in)."""
+        with self._lock:
+            if not self._pending:
+                return
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            temporary = f"{self.path}.tmp"
+            with open(temporary, 'wb') as out:
+                self._write(out)
+            self._close()
+            os.replace(temporary, self.path)
+            self._pending, self._pending_exact, self._pending_bands = [], {}, {}
+            self._open()
+
+    def close(self):
+        self.save()
+        with self._lock:
+            self._close()
+
+    # -- file access --------------------------------------------------------
+
+    def _open(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < _HEADER.size:
+            return
+        self._file = open(self.path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, permutations, bands, count = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or version != _VERSION or (permutations, bands) != (self.permutations, self.bands):
+            self._close()
+            raise ValueError(f"{self.path} is not a compatible structural index "
+                             f"(built with {permutations} permutations and {bands} bands)")
+        self._count = count
+        signatures = _HEADER.size
+        self._results = signatures + count * self.permutations * 4
+        self._exact = self._results + count * _RESULT.size
+        self._band_table = self._exact + count * _EXACT.size
+        self._blobs = self._band_table + count * self.bands * _BAND.size
+
+    def _close(self):
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+        self._map = self._file = None
+        self._count = 0
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> List[bytes]:
+        rows = self.rows
+        return [hashlib.blake2b(struct.pack(f'<H{rows}I', band, *signature[band * rows:(band + 1) * rows]),
+                                digest_size=8).digest()
+                for band in range(self.bands)]
+
+    def _signature(self, entry: int) -> Tuple[int, ...]:
+        return struct.unpack_from(f'<{self.permutations}I', self._map, _HEADER.size + entry * self.permutations * 4)
+
+    def _blob(self, entry: int) -> Dict[str, Any]:
+        offset, length = _RESULT.unpack_from(self._map, self._results + entry * _RESULT.size)
+        start = self._blobs + offset
+        return json.loads(self._map[start:start + length])
+
+    def _lower_bound(self, table: int, count: int, size: int, key: bytes) -> int:
+        low, high, width = 0, count, len(key)
+        while low < high:
+            middle = (low + high) // 2
+            start = table + middle * size
+            if self._map[start:start + width] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _find_exact(self, digest: bytes) -> Optional[int]:
+        if self._map is None:
+            return None
+        position = self._lower_bound(self._exact, self._count, _EXACT.size, digest)
+        if position < self._count:
+            found, entry = _EXACT.unpack_from(self._map, self._exact + position * _EXACT.size)
+            if found == digest:
+                return entry
+        return None
+
+    def _find_band(self, key: bytes) -> Iterator[int]:
+        if self._map is None:
+            return
+        rows = self._count * self.bands
+        position = self._lower_bound(self._band_table, rows, _BAND.size, key)
+        # Very common bands (tiny functions) are capped; the exact table covers true copies
+        for position in range(position, min(position + Config.DEDUP_MAX_CANDIDATES, rows)):
+            found, entry = _BAND.unpack_from(self._map, self._band_table + position * _BAND.size)
+            if found != key:
+                return
+            yield entry
+
+    def _write(self, out):
+        old, new = self._count, len(self._pending)
+        count = old + new
+        out.write(_HEADER.pack(_MAGIC, _VERSION, self.permutations, self.bands, count))
+
+        # Existing sections are copied as they are; new entries get ids old, old + 1, ...
+        if old:
+            out.write(self._map[_HEADER.size:self._results])
+        for fingerprint, _ in self._pending:
+            out.write(struct.pack(f'<{self.permutations}I', *fingerprint.signature))
+
+        blob_size = 0
+        if old:
+            out.write(self._map[self._results:self._exact])
+            last_offset, last_length = _RESULT.unpack_from(self._map, self._exact - _RESULT.size)
+            blob_size = last_offset + last_length
+        offset = blob_size
+        for _, blob in self._pending:
+            out.write(_RESULT.pack(offset, len(blob)))
+            offset += len(blob)
+
+        exact = sorted(_EXACT.pack(fingerprint.digest, old + entry)
+                       for entry, (fingerprint, _) in enumerate(self._pending))
+        for record in heapq.merge(self._records(self._exact, old, _EXACT.size), exact):
+            out.write(record)
+
+        bands = sorted(_BAND.pack(key, old + entry)
+                       for entry, (fingerprint, _) in enumerate(self._pending)
+                       for key in self._band_keys(fingerprint.signature))
+        for record in heapq.merge(self._records(self._band_table, old * self.bands, _BAND.size), bands):
+            out.write(record)
+
+        if old:
+            out.write(self._map[self._blobs:self._blobs + blob_size])
+        for _, blob in self._pending:
+            out.write(blob)
+
+    def _records(self, table: int, count: int, size: int) -> Iterator[bytes]:
+        # Streamed in chunks so merging never holds a whole table in memory
+        chunk = 4096
+        for start in range(0, count, chunk):
+            data = self._map[table + start * size:table + min(start + chunk, count) * size]
+            for offset in range(0, len(data), size):
+                yield data[offset:offset + size]
@@ -0,0 +1,180 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from typing import IO, Any, Dict, List, Optional
+
+# Spans are off unless a Tracer is installed; span() then returns a shared
+# no-op object, so instrumented code pays one global lookup per stage.
+_tracer: Optional['Tracer'] = None
+_current: contextvars.ContextVar[Optional['Span']] = contextvars.ContextVar('current_span', default=None)
+
+class Span:
+    """One timed stage. Attributes hold sizes, token counts, retries and the like."""
+
+    __slots__ = ('tracer', 'name', 'trace_id', 'span_id', 'parent_id', 'start_ns', 'end_ns',
+                 'attributes', 'status', '_token', '_perf_start')
+
+    def __init__(self, tracer: 'Tracer', name: str, attributes: Dict[str, Any]):
+        parent = _current.get()
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes = attributes
+        self.status = 'OK'
+        self.start_ns = self.end_ns = self._perf_start = 0
+        self._token = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def __enter__(self) -> 'Span':
+        self._token = _current.set(self)
+        self.start_ns = time.time_ns()
+        self._perf_start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Wall-clock start for export, monotonic clock for the duration
+        self.end_ns = self.start_ns + time.perf_counter_ns() - self._perf_start
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.status = 'ERROR'
+            self.attributes.setdefault('error', exc_type.__name__)
+        self.tracer._finish(self)
+        return False
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Flat JSON-lines record."""
+        return {
+            'name': self.name,
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start_ns': self.start_ns,
+            'duration_ms': round(self.duration_ms, 3),
+            'status': self.status,
+            'attributes': self.attributes
+        }
+
+    def to_otel(self) -> Dict[str, Any]:
+        """Record in the OTLP/JSON span layout, for OpenTelemetry collectors."""
+        return {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'parentSpanId': self.parent_id or '',
+            'name': self.name,
+            'kind': 1,  # SPAN_KIND_INTERNAL
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns),
+            'attributes': [{'key': key, 'value': _otel_value(value)} for key, value in self.attributes.items()],
+            'status': {'code': 1 if self.status == 'OK' else 2}
+        }
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, **attributes):
+        pass
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NOOP = _NoopSpan()
+
+class Tracer:
+    """Collects finished spans into per-stage totals and optionally streams them to a file.
+
+    ``output`` receives one JSON object per line, either flat records
+    (``format='jsonl'``) or OTLP/JSON spans (``format='otel'``).
+    """
+
+    def __init__(self, output: Optional[IO[str]] = None, format: str = 'jsonl'):
+        if format not in ('jsonl', 'otel'):
+            raise ValueError(f"Unknown trace format: {format}")
+        self.output = output
+        self.format = format
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _finish(self, span: Span):
+        duration = span.end_ns - span.start_ns
+        with self._lock:
+            stage = self._stages.get(span.name)
+            if stage is None:
+                stage = self._stages[span.name] = {'calls': 0, 'total_ns': 0, 'max_ns': 0, 'root_ns': 0,
+                                                   'errors': 0, 'totals': {}}
+            stage['calls'] += 1
+            stage['total_ns'] += duration
+            stage['max_ns'] = max(stage['max_ns'], duration)
+            if span.parent_id is None:
+                stage['root_ns'] += duration
+            if span.status != 'OK':
+                stage['errors'] += 1
+            for key, value in span.attributes.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    stage['totals'][key] = stage['totals'].get(key, 0) + value
+
+            if self.output is not None:
+                record = span.to_otel() if self.format == 'otel' else span.to_dict()
+                self.output.write(json.dumps(record, default=str) + '\n')
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Per-stage breakdown, slowest total first. ``share`` is relative to all top-level spans."""
+        with self._lock:
+            stages = {name: dict(stage, totals=dict(stage['totals'])) for name, stage in self._stages.items()}
+
+        wall = sum(stage['root_ns'] for stage in stages.values())
+        rows = []
+        for name, stage in sorted(stages.items(), key=lambda item: -item[1]['total_ns']):
+            rows.append({
+                'stage': name,
+                'calls': stage['calls'],
+                'total_ms': round(stage['total_ns'] / 1e6, 3),
+                'mean_ms': round(stage['total_ns'] / stage['calls'] / 1e6, 3),
+                'max_ms': round(stage['max_ns'] / 1e6, 3),
+                'share': round(stage['total_ns'] / wall, 4) if wall else 0.0,
+                'errors': stage['errors'],
+                'totals': stage['totals']
+            })
+        return rows
+
+def span(name: str, **attributes) -> Any:
+    """Context manager timing one stage; a no-op unless tracing is enabled."""
+    tracer = _tracer
+    if tracer is None:
+        return _NOOP
+    return Span(tracer, name, attributes)
+
+def enable(output: Optional[IO[str]] = None, format: str = 'jsonl') -> Tracer:
+    global _tracer
+    _tracer = Tracer(output, format)
+    return _tracer
+
+def disable() -> Optional[Tracer]:
+    """Stop tracing and return the tracer that was active, for its summary."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+def enabled() -> bool:
+    return _tracer is not None
+
+def _otel_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
@@ -0,0 +1,628 @@
+"""Labeled snippets for the `bench` command.
+
+Entries follow the SAMPLE_CODES layout plus a category. Labels use n for the
+input size; graph snippets use V and E, and two-sequence DP uses n and m.
+"""
+from examples.sample_codes import SAMPLE_CODES
+
+_SAMPLE_CATEGORIES = {
+    'linear_search': 'searching',
+    'bubble_sort': 'sorting',
+    'binary_search': 'searching',
+    'fibonacci_recursive': 'recursion',
+    'matrix_multiplication': 'math',
+}
+
+BENCHMARK_CORPUS = {
+    name: dict(sample, category=_SAMPLE_CATEGORIES[name])
+    for name, sample in SAMPLE_CODES.items()
+}
+
+BENCHMARK_CORPUS.update({
+    # Sorting
+    'insertion_sort': {
+        'category': 'sorting',
+        'code': '''
+def insertion_sort(arr):
+    for i in range(1, len(arr)):
+        key = arr[i]
+        j = i - 1
+        while j >= 0 and arr[j] > key:
+            arr[j + 1] = arr[j]
+            j -= 1
+        arr[j + 1] = key
+    return arr
+''',
+        'expected_complexity': 'O(n²)'
+    },
+
+    'selection_sort': {
+        'category': 'sorting',
+        'code': '''
+def selection_sort(arr):
+    n = len(arr)
+    for i in range(n):
+        smallest = i
+        for j in range(i + 1, n):
+            if arr[j] < arr[smallest]:
+                smallest = j
+        arr[i], arr[smallest] = arr[smallest], arr[i]
+    return arr
+''',
+        'expected_complexity': 'O(n²)'
+    },
+
+    'merge_sort': {
+        'category': 'sorting',
+        'code': '''
+def merge_sort(arr):
+    if len(arr) <= 1:
+        return arr
+    mid = len(arr) // 2
+    left = merge_sort(arr[:mid])
+    right = merge_sort(arr[mid:])
+    merged, i, j = [], 0, 0
+    while i < len(left) and j < len(right):
+        if left[i] <= right[j]:
+            merged.append(left[i])
+            i += 1
+        else:
+            merged.append(right[j])
+            j += 1
+    merged.extend(left[i:])
+    merged.extend(right[j:])
+    return merged
+''',
+        'expected_complexity': 'O(n log n)'
+    },
+
+    'quick_sort': {
+        'category': 'sorting',
+        'code': '''
+def quick_sort(arr):
+    if len(arr) <= 1:
+        return arr
+    pivot = arr[len(arr) // 2]
+    smaller = [x for x in arr if x < pivot]
+    equal = [x for x in arr if x == pivot]
+    larger = [x for x in arr if x > pivot]
+    return quick_sort(smaller) + equal + quick_sort(larger)
+''',
+        # Worst case, as the prompt asks for
+        'expected_complexity': 'O(n²)'
+    },
+
+    'heap_sort': {
+        'category': 'sorting',
+        'code': '''
+import heapq
+
+def heap_sort(arr):
+    heap = list(arr)
+    heapq.heapify(heap)
+    return [heapq.heappop(heap) for _ in range(len(heap))]
+''',
+        'expected_complexity': 'O(n log n)'
+    },
+
+    'counting_sort': {
+        'category': 'sorting',
+        'code': '''
+def counting_sort(arr, max_value):
+    counts = [0] * (max_value + 1)
+    for x in arr:
+        counts[x] += 1
+    result = []
+    for value, count in enumerate(counts):
+        result.extend([value] * count)
+    return result
+''',
+        # With max_value bounded by a constant
+        'expected_complexity': 'O(n)'
+    },
+
+    'sort_builtin': {
+        'category': 'sorting',
+        'code': '''
+def sort_by_length(words):
+    return sorted(words, key=len)
+''',
+        'expected_complexity': 'O(n log n)'
+    },
+
+    # Searching
+    'binary_search_recursive': {
+        'category': 'searching',
+        'code': '''
+def binary_search(arr, target, lo=0, hi=None):
+    if hi is None:
+        hi = len(arr) - 1
+    if lo > hi:
+        return -1
+    mid = (lo + hi) // 2
+    if arr[mid] == target:
+        return mid
+    if arr[mid] < target:
+        return binary_search(arr, target, mid + 1, hi)
+    return binary_search(arr, target, lo, mid - 1)
+''',
+        'expected_complexity': 'O(log n)'
+    },
+
+    'two_sum_sorted': {
+        'category': 'searching',
+        'code': '''
+def two_sum_sorted(arr, target):
+    i, j = 0, len(arr) - 1
+    while i < j:
+        total = arr[i] + arr[j]
+        if total == target:
+            return i, j
+        if total < target:
+            i += 1
+        else:
+            j -= 1
+    return None
+''',
+        'expected_complexity': 'O(n)'
+    },
+
+    'two_sum_hash': {
+        'category': 'searching',
+        'code': '''
+def two_sum(nums, target):
+    seen = {}
+    for i, x in enumerate(nums):
+        if target - x in seen:
+            return seen[target - x], i
+        seen[x] = i
+    return None
+''',
+        'expected_complexity': 'O(n)'
+    },
+
+    'find_max': {
+        'category': 'searching',
+        'code': '''
+def find_max(arr):
+    best = arr[0]
+    for x in arr:
+        if x > best:
+            best = x
+    return best
+''',
+        'expected_complexity': 'O(n)'
+    },
+
+    'has_duplicates_pairs': {
+        'category': 'searching',
+        'code': '''
+def has_duplicates(arr):
+    for i in range(len(arr)):
+        for j in range(i + 1, len(arr)):
+            if arr[i] == arr[j]:
+                return True
+    return False
+''',
+        'expected_complexity': 'O(n²)'
+    },
+
+    # Dynamic programming
+    'fibonacci_memo': {
+        'category': 'dp',
+        'code': '''
+def fibonacci(n, memo=None):
+    if memo is None:
+        memo = {}
+    if n <= 1:
+        return n
+    if n not in memo:
+        memo[n] = fibonacci(n - 1, memo) + fibonacci(n - 2, memo)
+    return memo[n]
+''',
+        'expected_complexity': 'O(n)'
+    },
+
+    'fibonacci_iterative': {
+        'category': 'dp',
+        'code': '''
+def fibonacci(n):
+    a, b = 0, 1
+    for _ in range(n):
+        a, b = b, a + b
+    return a
+''',
+        'expected_complexity': 'O(n)'
+    },
+
+    'longest_common_subsequence': {
+        'category': 'dp',
+        'code': '''
+def lcs(a, b):
+    n, m = len(a), len(b)
+    table = [[0] * (m + 1) for _ in range(n + 1)]
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            if a[i - 1] == b[j - 1]:
+                table[i][j] = table[i - 1][j - 1] + 1
+            else:
+                table[i][j] = max(table[i - 1][j], table[i][j - 1])
+    return table[n][m]
+''',
+        'expected_complexity': 'O(n m)'
+    },
+
+    'edit_distance': {
+        'category': 'dp',
+        'code': '''
+def edit_distance(a, b):
+    previous = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        current = [i]
+        for j, y in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (x != y)))
+        previous = current
+    return previous[-1]
+''',
+        'expected_complexity': 'O(n m)'
+    },
+
+    'longest_increasing_subsequence': {
+        'category': 'dp',
+        'code': '''
+def lis(arr):
+    best = [1] * len(arr)
+    for i in range(len(arr)):
+        for j in range(i):
+            if arr[j] < arr[i]:
+                best[i] = max(best[i], best[j] + 1)
+    return max(best, default=0)
+''',
+        'expected_complexity': 'O(n²)'
+    },
+
+    'max_subarray': {
+        'category': 'dp',
+        'code': '''
+def max_subarray(arr):
+    best = current = arr[0]
+    for x in arr[1:]:
+        current = max(x, current + x)
+        best = max(best, current)
+    return best
+''',
+        'expected_complexity': 'O(n)'
+    },
+
+    'climb_stairs_naive': {
+        'category': 'dp',
+        'code': '''
+def ways(n):
+    if n < 0:
+        return 0
+    if n == 0:
+        return 1
+    return ways(n - 1) + ways(n - 2) + ways(n - 3)
+''',
+        'expected_complexity': 'O(3^n)'
+    },
+
+    # Graphs
+    'bfs': {
+        'category': 'graph',
+        'code': '''
+from collections import deque
+
+def bfs(graph, start):
+    seen = {start}
+    queue = deque([start])
+    order = []
+    while queue:
+        node = queue.popleft()
+        order.append(node)
+        for neighbor in graph[node]:
+            if neighbor not in seen:
+                seen.add(neighbor)
+                queue.append(neighbor)
+    return order
+''',
+        'expected_complexity': 'O(V + E)'
+    },
+
+    'dfs_recursive': {
+        'category': 'graph',
+        'code': '''
+def dfs(graph, node, seen=None):
+    if seen is None:
+        seen = set()
+    seen.add(node)
+    for neighbor in graph[node]:
+        if neighbor not in seen:
+            dfs(graph, neighbor, seen)
+    return seen
+''',
+        'expected_complexity': 'O(V + E)'
+    },
+
+    'dijkstra': {
+        'category': 'graph',
+        'code': '''
+import heapq
+
+def dijkstra(graph, source):
+    dist = {source: 0}
+    heap = [(0, source)]
+    while heap:
+        d, node = heapq.heappop(heap)
+        if d > dist.get(node, float('inf')):
+            continue
+        for neighbor, weight in graph[node]:
+            candidate = d + weight
+            if candidate < dist.get(neighbor, float('inf')):
+                dist[neighbor] = candidate
+                heapq.heappush(heap, (candidate, neighbor))
+    return dist
+''',
+        'expected_complexity': 'O((V + E) log V)'
+    },
+
+    'floyd_warshall': {
+        'category': 'graph',
+        'code': '''
+def floyd_warshall(dist):
+    n = len(dist)
+    for k in range(n):
+        for i in range(n):
+            for j in range(n):
+                if dist[i][k] + dist[k][j] < dist[i][j]:
+                    dist[i][j] = dist[i][k] + dist[k][j]
+    return dist
+''',
+        'expected_complexity': 'O(n³)'
+    },
+
+    'topological_sort': {
+        'category': 'graph',
+        'code': '''
+def topological_sort(graph):
+    indegree = {node: 0 for node in graph}
+    for node in graph:
+        for neighbor in graph[node]:
+            indegree[neighbor] += 1
+    ready = [node for node, degree in indegree.items() if degree == 0]
+    order = []
+    while ready:
+        node = ready.pop()
+        order.append(node)
+        for neighbor in graph[node]:
+            indegree[neighbor] -= 1
+            if indegree[neighbor] == 0:
+                ready.append(neighbor)
+    return order
+''',
+        'expected_complexity': 'O(V + E)'
+    },
+
+    # Tricky cases: amortization, early exits, hidden costs, constant bounds
+    'amortized_append': {
+        'category': 'tricky',
+        'code': '''
+def squares(n):
+    result = []
+    for i in range(n):
+        result.append(i * i)
+    return result
+''',
+        'expected_complexity': 'O(n)'
+    },
+
+    'sliding_window': {
+        'category': 'tricky',
+        'code': '''
+def longest_unique_run(s):
+    seen = set()
+    best = left = 0
+    for right, ch in enumerate(s):
+        while ch in seen:
+            seen.remove(s[left])
+            left += 1
+        seen.add(ch)
+        best = max(best, right - left + 1)
+    return best
+''',
+        # The inner while moves `left` at most n times overall
+        'expected_complexity': 'O(n)'
+    },
+
+    'monotonic_stack': {
+        'category': 'tricky',
+        'code': '''
+def next_greater(arr):
+    result = [-1] * len(arr)
+    stack = []
+    for i, x in enumerate(arr):
+        while stack and arr[stack[-1]] < x:
+            result[stack.pop()] = x
+        stack.append(i)
+    return result
+''',
+        'expected_complexity': 'O(n)'
+    },
+
+    'early_exit_first_pair': {
+        'category': 'tricky',
+        'code': '''
+def first_two(arr):
+    for i in range(len(arr)):
+        for j in range(len(arr)):
+            return arr[i], arr[j]
+    return None
+''',
+        'expected_complexity': 'O(1)'
+    },
+
+    'constant_bound_loop': {
+        'category': 'tricky',
+        'code': '''
+def weekday_totals(sales):
+    totals = []
+    for day in range(7):
+        totals.append(sales[day] * 2)
+    return totals
+''',
+        'expected_complexity': 'O(1)'
+    },
+
+    'halving_loop': {
+        'category': 'tricky',
+        'code': '''
+def count_bits(n):
+    count = 0
+    while n > 0:
+        count += n & 1
+        n //= 2
+    return count
+''',
+        'expected_complexity': 'O(log n)'
+    },
+
+    'list_membership_in_loop': {
+        'category': 'tricky',
+        'code': '''
+def common(a, b):
+    result = []
+    for x in a:
+        if x in b:
+            result.append(x)
+    return result
+''',
+        # `b` is a list, so each membership test is linear
+        'expected_complexity': 'O(n²)'
+    },
+
+    'sort_in_loop': {
+        'category': 'tricky',
+        'code': '''
+def running_medians(arr):
+    medians = []
+    for i in range(1, len(arr) + 1):
+        window = sorted(arr[:i])
+        medians.append(window[i // 2])
+    return medians
+''',
+        'expected_complexity': 'O(n² log n)'
+    },
+
+    'doubling_inner_loop': {
+        'category': 'tricky',
+        'code': '''
+def doubling_pairs(n):
+    count = 0
+    for i in range(n):
+        j = 1
+        while j < n:
+            count += 1
+            j *= 2
+    return count
+''',
+        'expected_complexity': 'O(n log n)'
+    },
+
+    'string_concatenation': {
+        'category': 'tricky',
+        'code': '''
+def join_all(words):
+    text = ""
+    for word in words:
+        text = text + word
+    return text
+''',
+        # Each concatenation copies the text built so far
+        'expected_complexity': 'O(n²)'
+    },
+
+    'sequential_loops': {
+        'category': 'tricky',
+        'code': '''
+def normalize(arr):
+    total = 0
+    for x in arr:
+        total += x
+    result = []
+    for x in arr:
+        result.append(x / total)
+    return result
+''',
+        'expected_complexity': 'O(n)'
+    },
+
+    # Recursion and combinatorics
+    'power_set': {
+        'category': 'recursion',
+        'code': '''
+def subsets(items):
+    if not items:
+        return [[]]
+    rest = subsets(items[1:])
+    return rest + [[items[0]] + subset for subset in rest]
+''',
+        'expected_complexity': 'O(n 2^n)'
+    },
+
+    'permutations': {
+        'category': 'recursion',
+        'code': '''
+def permutations(items):
+    if len(items) <= 1:
+        return [items]
+    result = []
+    for i in range(len(items)):
+        for rest in permutations(items[:i] + items[i + 1:]):
+            result.append([items[i]] + rest)
+    return result
+''',
+        'expected_complexity': 'O(n n!)'
+    },
+
+    'fast_power': {
+        'category': 'recursion',
+        'code': '''
+def power(base, exponent):
+    if exponent == 0:
+        return 1
+    half = power(base, exponent // 2)
+    if exponent % 2:
+        return half * half * base
+    return half * half
+''',
+        'expected_complexity': 'O(log n)'
+    },
+
+    # Math
+    'gcd': {
+        'category': 'math',
+        'code': '''
+def gcd(a, b):
+    while b:
+        a, b = b, a % b
+    return a
+''',
+        'expected_complexity': 'O(log n)'
+    },
+
+    'is_prime_trial': {
+        'category': 'math',
+        'code': '''
+def is_prime(n):
+    if n < 2:
+        return False
+    i = 2
+    while i * i <= n:
+        if n % i == 0:
+            return False
+        i += 1
+    return True
+''',
+        'expected_complexity': 'O(n^0.50)'
+    },
+})
@@ -1,86 +1,610 @@
 import click
 import json
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich.text import Text
-from rich.syntax import Syntax
-
-from core import ComplexityAnalyzer
-from examples.sample_codes import SAMPLE_CODES
+import sys
+
+from core.backends import available_backends
+from core.complexity_analyzer import ComplexityAnalyzer
+from core.serialization import dumps_json
 from config import Config
 
-console = Console()
+# rich, the result cache and the batch machinery are imported where they are
+# used so that --help, --format json and --offline runs start quickly.
+_console = None
+
+def console():
+    """The shared rich console, created on first use."""
+    global _console
+    if _console is None:
+        from rich.console import Console
+        _console = Console()
+    return _console
+
+def _analyzer_options(command):
+    """Attach the shared --no-cache / --cache-dir / --offline options to a command."""
+    command = click.option('--offline', is_flag=True,
+                           help='Static analysis only: never call the LLM or load the Gemini SDK')(command)
+    command = click.option('--cache-dir', type=click.Path(file_okay=False),
+                           help=f'Directory for the result cache (default: {Config.CACHE_DIR})')(command)
+    command = click.option('--no-cache', is_flag=True, help='Always call the LLM, ignoring cached results')(command)
+    return command
+
+def _build_analyzer(api_key: str, no_cache: bool, cache_dir: str, offline: bool = False,
+                    dedup: bool = False, dedup_index: str = None) -> ComplexityAnalyzer:
+    cache = None
+    if not no_cache and not offline:
+        from core.cache import ResultCache
+        from core.llm_client import PROMPT_VERSION
+        cache = ResultCache(cache_dir, prompt_version=PROMPT_VERSION)
+    index = None
+    if dedup and not offline:
+        from core.structural import StructuralIndex
+        index = StructuralIndex(dedup_index)
+    return ComplexityAnalyzer(api_key, cache=cache, offline=offline, dedup_index=index)
+
+def _dedup_options(command):
+    """Attach the --dedup / --dedup-index options to a command."""
+    command = click.option('--dedup-index', type=click.Path(dir_okay=False),
+                           help=f'Structural index file for --dedup (default: {Config.DEDUP_INDEX_PATH})')(command)
+    command = click.option('--dedup', is_flag=True,
+                           help='Reuse LLM results of structurally identical or near-identical functions')(command)
+    return command
+
+def _save_dedup_index(analyzer: ComplexityAnalyzer):
+    if analyzer.dedup_index is None:
+        return
+    analyzer.dedup_index.close()
+    if Config.VERBOSE:
+        click.echo(f"Dedup index: {len(analyzer.dedup_index)} entries", err=True)
+
+def _report_cache_stats(analyzer: ComplexityAnalyzer):
+    if Config.VERBOSE and analyzer.cache is not None:
+        stats = analyzer.cache.stats()
+        click.echo(
+            f"Cache: {stats['hits']} hits, {stats['misses']} misses "
+            f"({stats['hit_rate']:.0%} hit rate)",
+            err=True
+        )
+    # Only report parsing when the LLM was actually used
+    stats = analyzer.parse_stats() if Config.VERBOSE else None
+    if stats is not None and stats['responses']:
+        click.echo(
+            f"LLM responses: {stats['structured']} structured, {stats['repaired']} repaired, "
+            f"{stats['fallback']} prose fallback, {stats['failed']} failed",
+            err=True
+        )
+
+def _streaming_options(command):
+    """Attach the --stream / --fast-verdict options to a command."""
+    command = click.option('--fast-verdict', is_flag=True,
+                           help='Stop the LLM once the complexity verdict is in, skipping the explanation')(command)
+    command = click.option('--stream', is_flag=True,
+                           help='Stream the LLM response, showing fields as they arrive')(command)
+    return command
+
+def _analyze_code(analyzer: ComplexityAnalyzer, code: str, format: str,
+                  stream: bool, fast_verdict: bool) -> dict:
+    """Run analyzer.analyze, with a live view of the streamed LLM fields for --stream."""
+    
+    if not stream:
+        return analyzer.analyze(code, fast_verdict=fast_verdict)
+    
+    if format != 'rich':
+        # Progress goes to stderr so json output stays machine-readable
+        def on_field(key, value):
+            if not isinstance(value, (list, dict)):
+                click.echo(f"{key}: {value}", err=True)
+        return analyzer.analyze(code, on_field=on_field, fast_verdict=fast_verdict)
+    
+    from rich.live import Live
+    from rich.table import Table
+    
+    fields = {}
+    
+    def render():
+        table = Table(title="LLM Response", show_header=False)
+        table.add_column("Field", style="cyan")
+        table.add_column("Value")
+        for key, value in fields.items():
+            if isinstance(value, list):
+                value = ', '.join(map(str, value))
+            table.add_row(key.replace('_', ' ').title(), str(value))
+        return table
+    
+    with Live(render(), console=console(), transient=True) as live:
+        def on_field(key, value):
+            fields[key] = value
+            live.update(render())
+        return analyzer.analyze(code, on_field=on_field, fast_verdict=fast_verdict)
+
+def _fields_option(command):
+    """Attach the --fields projection option to a command."""
+    return click.option('--fields', help='Comma-separated dotted fields to keep in json/ndjson output, '
+                                         'e.g. file,line,final_analysis.time_complexity')(command)
+
+def _output_fields(format: str, fields: str):
+    from core.output import parse_fields
+    
+    if fields and format not in ('json', 'ndjson'):
+        raise click.UsageError('--fields only applies to json and ndjson output')
+    return parse_fields(fields)
+
+def _print_result(result: dict, format: str, fields, code: str, filename: str = None):
+    if format == 'json':
+        from core.output import project
+        click.echo(dumps_json(project(result, fields) if fields else result, indent=2))
+    elif format == 'ndjson' or format == 'sarif' and filename:
+        from core.output import create_writer
+        writer = create_writer(format, sys.stdout, fields)
+        writer.write({'file': filename, **result} if filename else result)
+        writer.close()
+    elif format == 'plain':
+        _print_plain_result(result)
+    else:
+        _print_rich_result(result, code)
 
 @click.group()
-def cli():
+@click.option('--backend', type=click.Choice(available_backends()),
+              help=f'LLM backend (default: {Config.LLM_BACKEND}; env COMPLEXITY_LLM_BACKEND)')
+@click.option('--profile', is_flag=True, help='Print a per-stage timing breakdown to stderr when done')
+@click.option('--trace', 'trace_path', type=click.Path(dir_okay=False),
+              help='Write one JSON record per pipeline stage (span) to this file')
+@click.option('--trace-format', type=click.Choice(['jsonl', 'otel']), default='jsonl', show_default=True,
+              help='Span records as flat JSON lines or OpenTelemetry (OTLP/JSON) spans')
+@click.pass_context
+def cli(ctx, backend: str, profile: bool, trace_path: str, trace_format: str):
     """Time Complexity Analyzer - Analyze code complexity using LLM + AST parsing."""
-    pass
+    
+    if backend:
+        # Read by the analyzer, the result cache key and the incremental manifest alike
+        Config.LLM_BACKEND = backend
+    
+    if not profile and not trace_path:
+        return
+    
+    from core import tracing
+    
+    output = open(trace_path, 'w', encoding='utf-8') if trace_path else None
+    tracer = tracing.enable(output, trace_format)
+    
+    def finish():
+        tracing.disable()
+        if output is not None:
+            output.close()
+        if profile:
+            _print_profile(tracer.summary())
+    
+    ctx.call_on_close(finish)
 
 @cli.command()
 @click.argument('code', type=str)
-@click.option('--format', default='rich', help='Output format: rich, json, plain')
-@click.option('--api-key', help='Gemini API key (or set GEMINI_API_KEY env var)')
-def analyze(code: str, format: str, api_key: str):
+@click.option('--format', default='rich', help='Output format: rich, json, ndjson, plain')
+@click.option('--api-key', help='API key for the LLM backend (or set GEMINI_API_KEY / LOCAL_LLM_API_KEY)')
+@_fields_option
+@_streaming_options
+@_analyzer_options
+def analyze(code: str, format: str, api_key: str, fields: str, stream: bool, fast_verdict: bool,
+            no_cache: bool, cache_dir: str, offline: bool):
     """Analyze time complexity of given code."""
     
+    fields = _output_fields(format, fields)
     try:
-        analyzer = ComplexityAnalyzer(api_key)
-        result = analyzer.analyze(code)
-        
-        if format == 'json':
-            click.echo(json.dumps(result, indent=2))
-        elif format == 'plain':
-            _print_plain_result(result)
-        else:
-            _print_rich_result(result)
+        analyzer = _build_analyzer(api_key, no_cache, cache_dir, offline)
+        result = _analyze_code(analyzer, code, format, stream, fast_verdict)
+        _print_result(result, format, fields, code)
+        _report_cache_stats(analyzer)
             
     except Exception as e:
-        console.print(f"[red]Error: {e}[/red]")
+        console().print(f"[red]Error: {e}[/red]")
         raise click.Abort()
 
+def _incremental_options(command):
+    """Attach the --incremental / --manifest options to a command."""
+    command = click.option('--manifest', type=click.Path(dir_okay=False),
+                           help=f'Manifest of previous per-function results (default: {Config.MANIFEST_PATH})')(command)
+    command = click.option('--incremental', is_flag=True,
+                           help='Only re-analyze functions whose code or callees changed since the last run '
+                                '(callees in other files are not tracked)')(command)
+    return command
+
 @cli.command()
 @click.argument('filename', type=click.Path(exists=True))
-@click.option('--format', default='rich', help='Output format: rich, json, plain')
-@click.option('--api-key', help='Gemini API key (or set GEMINI_API_KEY env var)')
-def analyze_file(filename: str, format: str, api_key: str):
+@click.option('--format', default='rich', help='Output format: rich, json, ndjson, sarif, plain')
+@click.option('--api-key', help='API key for the LLM backend (or set GEMINI_API_KEY / LOCAL_LLM_API_KEY)')
+@_fields_option
+@_incremental_options
+@_dedup_options
+@_streaming_options
+@_analyzer_options
+def analyze_file(filename: str, format: str, api_key: str, fields: str, incremental: bool, manifest: str,
+                 dedup: bool, dedup_index: str, stream: bool, fast_verdict: bool,
+                 no_cache: bool, cache_dir: str, offline: bool):
     """Analyze time complexity of code in a file."""
     
+    fields = _output_fields(format, fields)
     try:
+        analyzer = _build_analyzer(api_key, no_cache, cache_dir, offline, dedup, dedup_index)
+        
+        if incremental:
+            # Per-function results, reusing the manifest for unchanged ones
+            _run_batch(_make_batch(analyzer, incremental, manifest), [filename], format, fields)
+            _save_dedup_index(analyzer)
+            return
+        
         with open(filename, 'r') as f:
             code = f.read()
         
-        analyzer = ComplexityAnalyzer(api_key)
-        result = analyzer.analyze(code)
+        result = _analyze_code(analyzer, code, format, stream, fast_verdict)
+        _print_result(result, format, fields, code, filename)
+        _report_cache_stats(analyzer)
+        _save_dedup_index(analyzer)
+            
+    except Exception as e:
+        console().print(f"[red]Error: {e}[/red]")
+        raise click.Abort()
+
+@cli.command()
+@click.argument('paths', nargs=-1, required=True, type=click.Path(exists=True))
+@click.option('--format', default='rich', help='Output format: rich, json, ndjson (one record per line), sarif, plain')
+@click.option('--jobs', '-j', type=int, help='Parallel parsing processes (default: CPU count)')
+@click.option('--llm-concurrency', type=int, default=Config.LLM_CONCURRENCY, show_default=True,
+              help='Maximum concurrent LLM requests')
+@click.option('--batch-size', type=int, default=Config.BATCH_MAX_ITEMS, show_default=True,
+              help='Functions packed into one LLM prompt (1 disables batching)')
+@click.option('--api-key', help='API key for the LLM backend (or set GEMINI_API_KEY / LOCAL_LLM_API_KEY)')
+@_fields_option
+@_incremental_options
+@_dedup_options
+@_analyzer_options
+def analyze_dir(paths, format: str, jobs: int, llm_concurrency: int, batch_size: int, api_key: str,
+                fields: str, incremental: bool, manifest: str, dedup: bool, dedup_index: str,
+                no_cache: bool, cache_dir: str, offline: bool):
+    """Analyze every function and method in the given files or directories."""
+    
+    fields = _output_fields(format, fields)
+    try:
+        analyzer = _build_analyzer(api_key, no_cache, cache_dir, offline, dedup, dedup_index)
+    except Exception as e:
+        console().print(f"[red]Error: {e}[/red]")
+        raise click.Abort()
+    
+    batch = _make_batch(analyzer, incremental, manifest,
+                        jobs=jobs, llm_concurrency=llm_concurrency, batch_size=batch_size)
+    _run_batch(batch, paths, format, fields)
+    _save_dedup_index(analyzer)
+
+def _make_batch(analyzer: ComplexityAnalyzer, incremental: bool, manifest: str, **options):
+    if incremental:
+        from core.incremental import IncrementalBatchAnalyzer
+        return IncrementalBatchAnalyzer(analyzer, manifest_path=manifest, **options)
+    
+    from core.batch import BatchAnalyzer
+    return BatchAnalyzer(analyzer, **options)
+
+def _run_batch(batch, paths, format: str, fields=None):
+    if format in ('json', 'ndjson', 'sarif'):
+        from core.output import create_writer
+        
+        # Records are written as they finish, so memory stays flat on large runs
+        writer = create_writer(format, sys.stdout, fields)
+        for record in batch.run(paths):
+            writer.write(record)
+        writer.close()
+        _report_cache_stats(batch.analyzer)
+        return
+    
+    if format == 'plain':
+        for record in batch.run(paths):
+            _print_plain_unit(record)
+        _report_cache_stats(batch.analyzer)
+        return
+    
+    from rich.progress import Progress
+    
+    with Progress(console=console()) as progress:
+        task = progress.add_task("Analyzing", total=None)
+        batch.progress = lambda done, total: progress.update(task, completed=done, total=total)
+        for record in batch.run(paths):
+            _print_rich_unit(record)
+    
+    reused = getattr(batch, 'reused_units', None)
+    console().print(
+        f"[bold]{batch.completed_units} units analyzed[/bold], "
+        + (f"[green]{reused} unchanged[/green], " if reused is not None else "")
+        + f"[red]{batch.failed_units} failed[/red]"
+    )
+    _report_cache_stats(batch.analyzer)
+
+@cli.command()
+@click.argument('filename', type=click.Path(exists=True, dir_okay=False))
+@click.argument('function')
+@click.option('--input', 'input_generator', required=True,
+              help='Expression building the argument(s) for size n, e.g. "lambda n: list(range(n))"')
+@click.option('--sizes', help='Comma-separated input sizes (default: %s)' % ','.join(map(str, Config.MEASURE_SIZES)))
+@click.option('--repeats', type=int, default=Config.MEASURE_REPEATS, show_default=True,
+              help='Timed runs per size; the fastest is kept')
+@click.option('--timeout', type=float, default=Config.MEASURE_TIMEOUT, show_default=True,
+              help='Seconds allowed per input size before measuring stops')
+@click.option('--analyze/--no-analyze', 'run_analysis', default=True,
+              help='Combine the measurements with static/LLM analysis of the function')
+@click.option('--format', default='rich', help='Output format: rich, json, plain')
+@click.option('--api-key', help='API key for the LLM backend (or set GEMINI_API_KEY / LOCAL_LLM_API_KEY)')
+@_analyzer_options
+def measure(filename: str, function: str, input_generator: str, sizes: str, repeats: int, timeout: float,
+            run_analysis: bool, format: str, api_key: str, no_cache: bool, cache_dir: str, offline: bool):
+    """Measure FUNCTION from FILENAME at growing input sizes and fit its complexity."""
+    
+    from core.empirical import EmpiricalProfiler
+    
+    try:
+        with open(filename, 'r') as f:
+            source = f.read()
+        size_list = [int(size) for size in sizes.split(',')] if sizes else None
+        
+        profiler = EmpiricalProfiler(timeout=timeout, repeats=repeats)
+        on_measurement = None
+        if format == 'rich':
+            on_measurement = lambda m: console().print(
+                f"[dim]n={m.n}: {m.seconds * 1000:.3f} ms, {m.peak_bytes} bytes peak[/dim]"
+            )
+        empirical = profiler.measure(source, function, input_generator, size_list,
+                                     filename=filename, on_measurement=on_measurement)
         
-        if format == 'json':
-            click.echo(json.dumps(result, indent=2))
-        elif format == 'plain':
+        result = empirical
+        if run_analysis and 'error' not in empirical:
+            result = _analyze_measured(filename, source, function, empirical,
+                                       api_key, no_cache, cache_dir, offline)
+    except Exception as e:
+        console().print(f"[red]Error: {e}[/red]")
+        raise click.Abort()
+    
+    if format == 'json':
+        click.echo(dumps_json(result, indent=2))
+    elif format == 'plain':
+        _print_plain_measurement(empirical)
+        if 'final_analysis' in result:
             _print_plain_result(result)
-        else:
+    else:
+        _print_rich_measurement(empirical)
+        if 'final_analysis' in result:
             _print_rich_result(result)
-            
+
+def _analyze_measured(filename: str, source: str, function: str, empirical: dict,
+                      api_key: str, no_cache: bool, cache_dir: str, offline: bool) -> dict:
+    """Run the regular analysis on the measured function with the fit as extra evidence."""
+    
+    from core.batch import split_units
+    
+    unit = next((u for u in split_units(filename, source) if u.name == function), None)
+    if unit is None:
+        return empirical
+    
+    analyzer = _build_analyzer(api_key, no_cache, cache_dir, offline)
+    result = analyzer.analyze(unit.code, unit.ast_analysis, unit.static_analysis, empirical)
+    _report_cache_stats(analyzer)
+    return result
+
+@cli.command()
+@click.argument('base')
+@click.argument('head')
+@click.argument('paths', nargs=-1, type=click.Path())
+@click.option('--allowlist', type=click.Path(dir_okay=False),
+              help=f'Functions allowed to get slower (default: {Config.ALLOWLIST_PATH} if present)')
+@click.option('--format', default='rich', help='Output format: rich, json, plain')
+@click.option('--all', 'show_all', is_flag=True, help='Also list edited functions whose complexity did not change')
+@click.option('--min-confidence', type=float, default=Config.REGRESSION_MIN_CONFIDENCE, show_default=True,
+              help='Confidence both estimates need for a slowdown to count as a regression')
+@click.option('--llm-concurrency', type=int, default=Config.LLM_CONCURRENCY, show_default=True,
+              help='Maximum concurrent LLM requests')
+@click.option('--batch-size', type=int, default=Config.BATCH_MAX_ITEMS, show_default=True,
+              help='Functions packed into one LLM prompt (1 disables batching)')
+@click.option('--api-key', help='API key for the LLM backend (or set GEMINI_API_KEY / LOCAL_LLM_API_KEY)')
+@_analyzer_options
+def compare(base: str, head: str, paths, allowlist: str, format: str, show_all: bool, min_confidence: float,
+            llm_concurrency: int, batch_size: int, api_key: str, no_cache: bool, cache_dir: str, offline: bool):
+    """Compare function complexities between git revisions BASE and HEAD.
+    
+    Exits with status 1 when a function gets asymptotically slower and is
+    not covered by the allowlist.
+    """
+    
+    from core.batch import BatchAnalyzer
+    from core.regression import Allowlist, RegressionGate
+    
+    try:
+        analyzer = _build_analyzer(api_key, no_cache, cache_dir, offline)
+        batch = BatchAnalyzer(analyzer, llm_concurrency=llm_concurrency, batch_size=batch_size)
+        gate = RegressionGate(analyzer, allowlist=Allowlist.load(allowlist), batch=batch,
+                              min_confidence=min_confidence)
+        report = gate.compare(base, head, list(paths))
     except Exception as e:
-        console.print(f"[red]Error: {e}[/red]")
+        console().print(f"[red]Error: {e}[/red]")
         raise click.Abort()
+    
+    if format == 'json':
+        click.echo(json.dumps(report, indent=2))
+    elif format == 'plain':
+        _print_plain_comparison(report, show_all)
+    else:
+        _print_rich_comparison(report, show_all)
+    _report_cache_stats(analyzer)
+    
+    if not report['passed']:
+        sys.exit(1)
 
 @cli.command()
-@click.option('--api-key', help='Gemini API key (or set GEMINI_API_KEY env var)')
-def demo(api_key: str):
+@click.argument('profile', type=click.Path(exists=True, dir_okay=False))
+@click.argument('paths', nargs=-1, required=True, type=click.Path(exists=True))
+@click.option('--budget', type=int, default=Config.HOTSPOT_BUDGET, show_default=True,
+              help='Most units to analyze, taken hottest first')
+@click.option('--min-share', type=float, default=Config.HOTSPOT_MIN_SHARE, show_default=True,
+              help='Skip units with less than this share of the profiled time')
+@click.option('--format', default='rich', help='Output format: rich, json (one record per line), ndjson, plain')
+@click.option('--llm-concurrency', type=int, default=Config.LLM_CONCURRENCY, show_default=True,
+              help='Maximum concurrent LLM requests')
+@click.option('--batch-size', type=int, default=Config.BATCH_MAX_ITEMS, show_default=True,
+              help='Functions packed into one LLM prompt (1 disables batching)')
+@click.option('--api-key', help='API key for the LLM backend (or set GEMINI_API_KEY / LOCAL_LLM_API_KEY)')
+@_fields_option
+@_analyzer_options
+def hotspots(profile: str, paths, budget: int, min_share: float, format: str, llm_concurrency: int,
+             batch_size: int, api_key: str, fields: str, no_cache: bool, cache_dir: str, offline: bool):
+    """Analyze the functions that are hot in PROFILE first and rank what to fix.
+    
+    PROFILE is a cProfile/pstats dump or a collapsed-stack file (py-spy
+    --format raw, flamegraph input). Units are ranked by their share of the
+    profiled time times their estimated cost, and only the top --budget of
+    them are analyzed.
+    """
+    
+    from core.hotspots import HotspotAnalyzer
+    
+    fields = _output_fields(format, fields)
+    try:
+        analyzer = _build_analyzer(api_key, no_cache, cache_dir, offline)
+        hot = HotspotAnalyzer(analyzer, budget=budget, min_share=min_share,
+                              llm_concurrency=llm_concurrency, batch_size=batch_size)
+        records = hot.run(profile, paths)
+    except Exception as e:
+        console().print(f"[red]Error: {e}[/red]")
+        raise click.Abort()
+    
+    if format in ('json', 'ndjson'):
+        from core.output import create_writer
+        writer = create_writer(format, sys.stdout, fields)
+        for record in records:
+            writer.write(record)
+        writer.close()
+    elif format == 'plain':
+        _print_plain_hotspots(records)
+    else:
+        _print_rich_hotspots(records, hot)
+    _report_cache_stats(analyzer)
+
+@cli.command()
+@click.argument('paths', nargs=-1, required=True, type=click.Path(exists=True))
+@click.option('--rule', 'rules', multiple=True, help='Only run this anti-pattern rule (repeatable; default: all)')
+@click.option('--format', default='rich', help='Output format: rich, json, sarif, plain')
+def lint(paths, rules, format: str):
+    """Report performance anti-patterns in PATHS with line numbers, without calling the LLM.
+    
+    Exits with status 1 when anything is found.
+    """
+    
+    import ast
+    from core.antipatterns import AntiPatternDetector
+    from core.batch import discover_python_files
+    
+    try:
+        detector = AntiPatternDetector(rules or None)
+    except ValueError as e:
+        console().print(f"[red]Error: {e}[/red]")
+        raise click.Abort()
+    
+    sarif = None
+    if format == 'sarif':
+        from core.output import SarifWriter
+        sarif = SarifWriter(sys.stdout)
+    
+    found = 0
+    for path in discover_python_files(paths):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                findings = detector.scan(ast.parse(f.read(), filename=path))
+        except (OSError, SyntaxError, ValueError) as e:
+            if sarif is not None:
+                sarif.add_error(path, str(e))
+            elif format == 'json':
+                click.echo(json.dumps({'file': path, 'error': str(e)}))
+            else:
+                click.echo(f"{path}: Error: {e}", err=True)
+            continue
+        
+        found += len(findings)
+        if sarif is not None:
+            sarif.add_findings(path, findings)
+            continue
+        for finding in findings:
+            if format == 'json':
+                click.echo(json.dumps({'file': path, **finding.to_dict()}))
+            elif format == 'plain':
+                print(f"{path}:{finding.line}: [{finding.rule}] {finding.message} ({finding.total}). "
+                      f"{finding.suggestion}")
+            else:
+                console().print(
+                    f"{path}:{finding.line}: [yellow]{finding.rule}[/yellow] {finding.message} "
+                    f"[magenta]{finding.total}[/magenta]\n  [dim]{finding.suggestion}[/dim]"
+                )
+    
+    if sarif is not None:
+        sarif.close()
+    elif format == 'rich':
+        console().print(f"[bold]{found} findings[/bold]")
+    if found:
+        sys.exit(1)
+
+@cli.command()
+@click.option('--host', default=Config.SERVER_HOST, show_default=True, help='Interface to listen on')
+@click.option('--port', type=int, default=Config.SERVER_PORT, show_default=True, help='TCP port to listen on')
+@click.option('--socket', 'socket_path', type=click.Path(dir_okay=False),
+              help='Listen on this Unix socket instead of TCP')
+@click.option('--workers', type=int, default=Config.LLM_CONCURRENCY, show_default=True,
+              help='Analyses running at once')
+@click.option('--queue-size', type=int, default=Config.SERVER_QUEUE_SIZE, show_default=True,
+              help='Pending analyses before new requests get 503')
+@click.option('--api-key', help='API key for the LLM backend (or set GEMINI_API_KEY / LOCAL_LLM_API_KEY)')
+@_analyzer_options
+def serve(host: str, port: int, socket_path: str, workers: int, queue_size: int, api_key: str,
+          no_cache: bool, cache_dir: str, offline: bool):
+    """Serve analyses over HTTP/JSON: POST /analyze, GET /health."""
+    
+    import asyncio
+    from core.server import AnalysisServer
+    
+    try:
+        analyzer = _build_analyzer(api_key, no_cache, cache_dir, offline)
+    except Exception as e:
+        console().print(f"[red]Error: {e}[/red]")
+        raise click.Abort()
+    
+    async def run():
+        server = AnalysisServer(analyzer, workers=workers, queue_size=queue_size)
+        await server.start(host, port, socket_path)
+        location = socket_path or 'http://%s:%s' % server.address[:2]
+        click.echo(f"Serving complexity analysis on {location}", err=True)
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+    
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+@cli.command()
+@click.option('--api-key', help='API key for the LLM backend (or set GEMINI_API_KEY / LOCAL_LLM_API_KEY)')
+@_analyzer_options
+def demo(api_key: str, no_cache: bool, cache_dir: str, offline: bool):
     """Run demo with sample code snippets."""
     
+    from rich.panel import Panel
+    from rich.syntax import Syntax
+    from rich.table import Table
+    from examples.sample_codes import SAMPLE_CODES
+    from core.bigo import equivalent
+    
     try:
-        analyzer = ComplexityAnalyzer(api_key)
+        analyzer = _build_analyzer(api_key, no_cache, cache_dir, offline)
         
-        console.print("[bold blue]Time Complexity Analyzer Demo[/bold blue]")
-        console.print("Analyzing sample code snippets...\n")
+        console().print("[bold blue]Time Complexity Analyzer Demo[/bold blue]")
+        console().print("Analyzing sample code snippets...\n")
         
         for name, sample in SAMPLE_CODES.items():
-            console.print(f"[yellow]Analyzing: {name}[/yellow]")
+            console().print(f"[yellow]Analyzing: {name}[/yellow]")
             
             # Show code
             syntax = Syntax(sample['code'], "python", theme="monokai", line_numbers=True)
-            console.print(Panel(syntax, title=f"Code: {name}"))
+            console().print(Panel(syntax, title=f"Code: {name}"))
             
             # Analyze
             result = analyzer.analyze(sample['code'])
@@ -94,8 +618,9 @@ def demo(api_key: str):
                 table.add_column("Value", style="magenta")
                 table.add_column("Expected", style="green")
                 
+                matches = equivalent(final['time_complexity'], sample['expected_complexity'])
                 table.add_row("Time Complexity", 
-                            final['time_complexity'], 
+                            final['time_complexity'] + (" ✓" if matches else " ✗"), 
                             sample['expected_complexity'])
                 table.add_row("Space Complexity", 
                             final['space_complexity'], 
@@ -104,25 +629,115 @@ def demo(api_key: str):
                             f"{final['confidence']:.2f}", 
                             "N/A")
                 
-                console.print(table)
-                console.print(f"[dim]Explanation: {final['explanation'][:100]}...[/dim]\n")
+                console().print(table)
+                console().print(f"[dim]Explanation: {final['explanation'][:100]}...[/dim]\n")
             
-            console.print("-" * 50)
+            console().print("-" * 50)
+        
+        _report_cache_stats(analyzer)
             
     except Exception as e:
-        console.print(f"[red]Error: {e}[/red]")
+        console().print(f"[red]Error: {e}[/red]")
         raise click.Abort()
 
-def _print_rich_result(result: dict):
+@cli.command()
+@click.option('--model', type=click.Choice(available_backends()), default='fake', show_default=True,
+              help='Backend to measure; fake answers offline from the corpus labels')
+@click.option('--path', 'paths', multiple=True, type=click.Choice(['ast', 'llm', 'combined']),
+              help='Analysis path to measure (repeatable; default: all)')
+@click.option('--category', 'categories', multiple=True, help='Only run corpus entries in this category (repeatable)')
+@click.option('--passes', type=int, default=2, show_default=True,
+              help='Runs of the combined path over one cache; later runs are warm')
+@click.option('--error-rate', type=float, default=Config.BENCH_FAKE_ERROR_RATE, show_default=True,
+              help='Share of snippets the fake model answers wrongly')
+@click.option('--history', type=click.Path(dir_okay=False), default=Config.BENCH_HISTORY_PATH, show_default=True,
+              help='JSON file each run is appended to')
+@click.option('--no-history', is_flag=True, help='Do not record this run')
+@click.option('--cache-dir', type=click.Path(file_okay=False),
+              help='Result cache for the combined path (default: a fresh temporary one)')
+@click.option('--format', default='rich', help='Output format: rich, json, plain')
+@click.option('--api-key', help='API key for the LLM backend (or set GEMINI_API_KEY / LOCAL_LLM_API_KEY)')
+def bench(model: str, paths, categories, passes: int, error_rate: float, history: str, no_history: bool,
+          cache_dir: str, format: str, api_key: str):
+    """Measure accuracy and speed of the AST, LLM and combined paths on a labeled corpus."""
+    
+    from core.backends import backend_model_id
+    from core.benchmark import PATHS, AccuracyBenchmark, append_history, compare_runs
+    from core.llm_client import LLMClient
+    from examples.benchmark_corpus import BENCHMARK_CORPUS
+    
+    corpus = {
+        name: sample for name, sample in BENCHMARK_CORPUS.items()
+        if not categories or sample['category'] in categories
+    }
+    
+    try:
+        if not corpus:
+            raise ValueError(f"No corpus entries in categories: {', '.join(categories)}")
+        if model == 'fake':
+            from core.fake_model import FakeModel
+            make_client = lambda: LLMClient(model=FakeModel.from_corpus(corpus, error_rate=error_rate))
+            model_name = 'fake'
+        else:
+            make_client = lambda: LLMClient(api_key, backend=model)
+            model_name = backend_model_id(model)
+        
+        benchmark = AccuracyBenchmark(corpus, make_client, model_name=model_name,
+                                      cache_dir=cache_dir, passes=passes)
+        report = benchmark.run(paths or PATHS)
+        previous = None if no_history else append_history(report, history)
+    except Exception as e:
+        console().print(f"[red]Error: {e}[/red]")
+        raise click.Abort()
+    
+    deltas = compare_runs(previous, report)
+    if format == 'json':
+        click.echo(json.dumps(dict(report, deltas=deltas), indent=2))
+    elif format == 'plain':
+        _print_plain_benchmark(report, deltas)
+    else:
+        _print_rich_benchmark(report, deltas)
+
+def _print_profile(stages: list):
+    if not stages:
+        click.echo("Profile: no stages recorded", err=True)
+        return
+    
+    width = max(len('Stage'), *(len(stage['stage']) for stage in stages))
+    click.echo(f"{'Stage':<{width}}  {'Calls':>6}  {'Total ms':>10}  {'Mean ms':>9}  {'Max ms':>9}  {'Share':>6}",
+               err=True)
+    totals = {}
+    for stage in stages:
+        click.echo(
+            f"{stage['stage']:<{width}}  {stage['calls']:>6}  {stage['total_ms']:>10.1f}  "
+            f"{stage['mean_ms']:>9.2f}  {stage['max_ms']:>9.2f}  {stage['share']:>6.0%}",
+            err=True
+        )
+        totals[stage['stage']] = stage['totals']
+    
+    generate = totals.get('llm.generate', {})
+    if generate:
+        click.echo(
+            f"LLM: {generate.get('prompt_tokens', 0)} prompt tokens, {generate.get('response_tokens', 0)} response "
+            f"tokens, {generate.get('prompt_chars', 0)} / {generate.get('response_chars', 0)} chars, "
+            f"{totals.get('llm.call', {}).get('retries', 0)} retries",
+            err=True
+        )
+
+def _print_rich_result(result: dict, code: str = None):
+    
+    from rich.panel import Panel
+    from rich.syntax import Syntax
+    from rich.table import Table
     
     if 'error' in result:
-        console.print(f"[red]Error: {result['error']}[/red]")
+        console().print(f"[red]Error: {result['error']}[/red]")
         return
     
     # Code panel
-    if 'code' in result:
-        syntax = Syntax(result['code'], "python", theme="monokai", line_numbers=True)
-        console.print(Panel(syntax, title="Analyzed Code"))
+    if code is not None:
+        syntax = Syntax(code, "python", theme="monokai", line_numbers=True)
+        console().print(Panel(syntax, title="Analyzed Code"))
     
     # Results table
     if 'final_analysis' in result:
@@ -137,14 +752,243 @@ def _print_rich_result(result: dict):
         table.add_row("Confidence", f"{final['confidence']:.2f}")
         table.add_row("Analysis Method", final['analysis_method'])
         
-        console.print(table)
+        console().print(table)
         
         if final.get('explanation'):
-            console.print(Panel(final['explanation'], title="Explanation"))
+            console().print(Panel(final['explanation'], title="Explanation"))
         
         if final.get('recommendations'):
             rec_text = "\n".join(f"• {rec}" for rec in final['recommendations'])
-            console.print(Panel(rec_text, title="Recommendations"))
+            console().print(Panel(rec_text, title="Recommendations"))
+
+STATUS_STYLES = {
+    'worse': 'red', 'better': 'green', 'incomparable': 'yellow', 'unknown': 'yellow',
+    'added': 'cyan', 'removed': 'dim', 'same': 'dim'
+}
+
+def _change_note(change: dict) -> str:
+    if change['allowed']:
+        return ' (allowed)'
+    if not change['confident']:
+        return ' (low confidence)'
+    return ''
+
+def _print_rich_comparison(report: dict, show_all: bool):
+    
+    from rich.table import Table
+    
+    table = Table(title=f"Complexity changes {report['base']} → {report['head']}")
+    table.add_column("Change")
+    table.add_column("Function", style="cyan")
+    table.add_column("Before", justify="right")
+    table.add_column("After", justify="right", style="magenta")
+    table.add_column("Confidence", justify="right")
+    
+    for change in report['changes']:
+        if change['status'] == 'same' and not show_all:
+            continue
+        status = change['status'] + _change_note(change)
+        confidence = change['head_confidence'] if change['head_confidence'] is not None else change['base_confidence']
+        table.add_row(
+            f"[{STATUS_STYLES[change['status']]}]{status}[/]",
+            f"{change['file']}:{change['line']} {change['name']}",
+            change['base_time'] or '-',
+            change['head_time'] or change['error'] or '-',
+            f"{confidence:.2f}" if confidence is not None else '-'
+        )
+    console().print(table)
+    
+    counts = report['counts']
+    console().print(
+        f"{report['files_changed']} files changed, {report['functions_unchanged']} functions unchanged, "
+        f"{counts['same']} edited with the same complexity"
+    )
+    if report['passed']:
+        console().print("[green]No complexity regressions[/green]")
+    else:
+        console().print(f"[red]{report['regressions']} complexity regression(s)[/red]")
+
+def _hotspot_fix(record: dict) -> str:
+    """What to do about a hot unit: its first recommendation, which is its worst finding if it has any."""
+    if 'error' in record:
+        return record['error']
+    recommendations = record['final_analysis'].get('recommendations') or ['']
+    return recommendations[0]
+
+def _print_rich_hotspots(records: list, hot):
+    
+    from rich.table import Table
+    
+    table = Table(title="Fix these first")
+    table.add_column("#", justify="right")
+    table.add_column("Function", style="cyan")
+    table.add_column("Time", justify="right")
+    table.add_column("Complexity", justify="right", style="magenta")
+    table.add_column("Priority", justify="right")
+    table.add_column("Fix")
+    
+    for record in records:
+        profile = record['profile']
+        final = record.get('final_analysis')
+        table.add_row(
+            str(profile['rank']),
+            _unit_label(record),
+            f"{profile['time_share']:.1%}",
+            final['time_complexity'] if final else '-',
+            f"{profile['priority']:.3g}",
+            _hotspot_fix(record)
+        )
+    console().print(table)
+    console().print(f"{hot.profiled_units} profiled units, [bold]{len(records)} analyzed[/bold], "
+                    f"{hot.skipped_units} below the budget or --min-share")
+
+def _print_plain_hotspots(records: list):
+    for record in records:
+        profile = record['profile']
+        final = record.get('final_analysis')
+        print(f"{profile['rank']}. {_unit_label(record)}: {final['time_complexity'] if final else 'error'}, "
+              f"{profile['time_share']:.1%} of time, priority {profile['priority']:.3g}")
+        fix = _hotspot_fix(record)
+        if fix:
+            print(f"   {fix}")
+
+def _print_plain_comparison(report: dict, show_all: bool):
+    for change in report['changes']:
+        if change['status'] == 'same' and not show_all:
+            continue
+        print(f"{change['status'].upper()}{_change_note(change)} {change['file']}::{change['name']}: "
+              f"{change['base_time'] or '-'} -> {change['head_time'] or change['error'] or '-'}")
+    print(f"Regressions: {report['regressions']}")
+
+def _accuracy_delta(deltas: dict, path: str) -> str:
+    if path not in deltas:
+        return ''
+    return f"{deltas[path]['accuracy_delta']:+.1%}"
+
+def _print_rich_benchmark(report: dict, deltas: dict):
+    
+    from rich.table import Table
+    
+    table = Table(title=f"Benchmark: {report['corpus_size']} snippets, model {report['model']}, "
+                        f"prompt v{report['prompt_version']}")
+    table.add_column("Path", style="cyan")
+    table.add_column("Accuracy", justify="right", style="magenta")
+    table.add_column("Δ", justify="right")
+    table.add_column("p50 / p90 / p99 ms", justify="right")
+    table.add_column("LLM calls", justify="right")
+    table.add_column("Tokens in / out", justify="right")
+    table.add_column("Cache hits", justify="right")
+    
+    for path, metrics in report['paths'].items():
+        latency = metrics['latency_ms']
+        table.add_row(
+            path,
+            f"{metrics['accuracy']:.1%} ({metrics['correct']}/{metrics['cases']})",
+            _accuracy_delta(deltas, path),
+            f"{latency['p50']:.1f} / {latency['p90']:.1f} / {latency['p99']:.1f}",
+            str(metrics.get('llm_calls', '-')),
+            f"{metrics['prompt_tokens']} / {metrics['response_tokens']}" if 'prompt_tokens' in metrics else '-',
+            f"{metrics['cache_hit_rate']:.0%}" if 'cache_hit_rate' in metrics else '-'
+        )
+    console().print(table)
+    
+    categories = sorted({category for metrics in report['paths'].values() for category in metrics['by_category']})
+    by_category = Table(title="Accuracy by category")
+    by_category.add_column("Category", style="cyan")
+    for path in report['paths']:
+        by_category.add_column(path, justify="right")
+    for category in categories:
+        by_category.add_row(category, *(
+            f"{metrics['by_category'][category]:.0%}" if category in metrics['by_category'] else '-'
+            for metrics in report['paths'].values()
+        ))
+    console().print(by_category)
+    
+    for path, delta in deltas.items():
+        if delta['new_misses']:
+            console().print(f"[red]{path}: newly wrong: {', '.join(delta['new_misses'])}[/red]")
+        if delta['fixed']:
+            console().print(f"[green]{path}: now right: {', '.join(delta['fixed'])}[/green]")
+
+def _print_plain_benchmark(report: dict, deltas: dict):
+    for path, metrics in report['paths'].items():
+        latency = metrics['latency_ms']
+        line = (f"{path}: accuracy {metrics['accuracy']:.1%} ({metrics['correct']}/{metrics['cases']})"
+                f" p50 {latency['p50']:.1f}ms p90 {latency['p90']:.1f}ms p99 {latency['p99']:.1f}ms")
+        if 'llm_calls' in metrics:
+            line += f" llm_calls {metrics['llm_calls']} tokens {metrics['prompt_tokens']}/{metrics['response_tokens']}"
+        if 'cache_hit_rate' in metrics:
+            line += f" cache_hits {metrics['cache_hit_rate']:.0%}"
+        if path in deltas:
+            line += f" delta {_accuracy_delta(deltas, path)}"
+        print(line)
+        for miss in metrics['misses']:
+            print(f"  MISS {miss['name']}: expected {miss['expected']}, got {miss['actual'] or miss['error']}")
+
+def _print_rich_measurement(empirical: dict):
+    
+    from rich.table import Table
+    
+    if empirical.get('stopped'):
+        console().print(f"[yellow]Measuring stopped: {empirical['stopped']}[/yellow]")
+    if 'error' in empirical:
+        console().print(f"[red]Error: {empirical['error']}[/red]")
+        return
+    
+    table = Table(title=f"Measurements of {empirical['function']}")
+    table.add_column("n", justify="right", style="cyan")
+    table.add_column("Time (ms)", justify="right", style="magenta")
+    table.add_column("Peak memory (bytes)", justify="right", style="magenta")
+    for m in empirical['measurements']:
+        table.add_row(str(m['n']), f"{m['seconds'] * 1000:.3f}", str(m['peak_bytes']))
+    console().print(table)
+    
+    time_fit, space_fit = empirical['time_fit'], empirical['space_fit']
+    console().print(
+        f"[bold]Measured time:[/bold] {time_fit['complexity']} (R² = {time_fit['r_squared']:.3f})  "
+        f"[bold]Measured space:[/bold] {space_fit['complexity']} (R² = {space_fit['r_squared']:.3f})"
+    )
+
+def _print_plain_measurement(empirical: dict):
+    if empirical.get('stopped'):
+        print(f"Measuring stopped: {empirical['stopped']}")
+    if 'error' in empirical:
+        print(f"Error: {empirical['error']}")
+        return
+    
+    for m in empirical['measurements']:
+        print(f"n={m['n']}: {m['seconds'] * 1000:.3f} ms, {m['peak_bytes']} bytes")
+    print(f"Measured Time Complexity: {empirical['time_fit']['complexity']} "
+          f"(R² = {empirical['time_fit']['r_squared']:.3f})")
+    print(f"Measured Space Complexity: {empirical['space_fit']['complexity']} "
+          f"(R² = {empirical['space_fit']['r_squared']:.3f})")
+
+def _unit_label(record: dict) -> str:
+    if record.get('line') is None:
+        return record['file']
+    return f"{record['file']}:{record['line']} {record['name']}"
+
+def _print_rich_unit(record: dict):
+    
+    if 'error' in record:
+        console().print(f"[red]✗[/red] {_unit_label(record)}: [red]{record['error']}[/red]")
+        return
+    
+    final = record['final_analysis']
+    console().print(
+        f"[green]✓[/green] {_unit_label(record)}: "
+        f"[magenta]{final['time_complexity']}[/magenta] "
+        f"[dim](confidence {final['confidence']:.2f}{', unchanged' if record.get('reused') else ''})[/dim]"
+    )
+
+def _print_plain_unit(record: dict):
+    
+    if 'error' in record:
+        print(f"{_unit_label(record)}: Error: {record['error']}")
+        return
+    
+    final = record['final_analysis']
+    print(f"{_unit_label(record)}: {final['time_complexity']} (confidence {final['confidence']:.2f})")
 
 def _print_plain_result(result: dict):
     
@@ -0,0 +1,91 @@
+import ast
+import pytest
+from core.antipatterns import RULES, AntiPatternDetector, Rule, register_rule
+from core.ast_parser import ASTParser
+from core.cost import CONSTANT
+from core.complexity_analyzer import ComplexityAnalyzer
+
+def scan(code, rules=None):
+    return [(f.rule, f.line) for f in AntiPatternDetector(rules).scan(ast.parse(code))]
+
+@pytest.mark.parametrize("rule,code,line", [
+    ("list-membership", "def f(xs):\n  seen = []\n  for x in xs:\n    if x not in seen:\n      seen.append(x)", 4),
+    ("list-membership", "def f(xs: list, ys):\n  return [y for y in ys if y in xs]", 2),
+    ("list-front", "def f(queue):\n  while queue:\n    queue.pop(0)", 3),
+    ("list-front", "def f(xs):\n  out = []\n  for x in xs:\n    out.insert(0, x)", 4),
+    ("string-concat", "def f(xs):\n  s = ''\n  for x in xs:\n    s += x", 4),
+    ("slice-copy", "def f(xs):\n  while xs:\n    xs = xs[1:]", 3),
+    ("sort-in-loop", "def f(xs):\n  for x in xs:\n    best = sorted(xs)[0]", 3),
+    ("sort-in-loop", "def f(xs, ys):\n  for y in ys:\n    xs.append(y)\n    xs.sort()", 4),
+    ("loop-invariant-lookup", "def f(xs):\n  i = 0\n  while i < len(xs):\n    i += 1", 3),
+    ("loop-invariant-lookup", "def f(self, xs):\n  for x in xs:\n    total += self.a.b.get(x)\n    total -= self.a.b.get(-x)", 3),
+    ("unmemoized-recursion", "def fib(n):\n  return n if n < 2 else fib(n - 1) + fib(n - 2)", 1),
+])
+def test_rule_flags_pattern(rule, code, line):
+    assert (rule, line) in scan(code, [rule])
+
+@pytest.mark.parametrize("code", [
+    # Sets, deques, fixed windows, hoisted work and memoized or tree recursion are fine
+    "def f(xs):\n  seen = set()\n  for x in xs:\n    if x in seen: pass",
+    "def f(xs):\n  q = deque(xs)\n  while q:\n    q.pop(0)",
+    "def f(xs):\n  for i in range(len(xs)):\n    w = xs[i:i + 3] + xs[:2]",
+    "def f(xs):\n  s = sorted(xs)\n  for x in xs:\n    if x in s[:1]: pass",
+    "def f(xs):\n  while len(xs) > 1:\n    xs.pop()",
+    "def f(xs, s):\n  for x in xs:\n    s += x",
+    "@lru_cache(None)\ndef fib(n):\n  return n if n < 2 else fib(n - 1) + fib(n - 2)",
+    "def size(node):\n  return 1 + size(node.left) + size(node.right) if node else 0",
+    "def f(n):\n  if n % 2:\n    return f(n - 1)\n  return f(n - 2)",
+    "memo = {}\ndef fib(n):\n  if n in memo:\n    return memo[n]\n  memo[n] = fib(n - 1) + fib(n - 2)\n  return memo[n]",
+    "def f(xs):\n  return [x for x in sorted(xs)]",
+])
+def test_rules_ignore_safe_code(code):
+    assert scan(code) == []
+
+def test_costs_multiply_by_enclosing_loops():
+    code = "def f(xs):\n  seen = []\n  for a in xs:\n    for b in xs:\n      if b in seen: pass"
+    finding, = AntiPatternDetector(["list-membership"]).scan(ast.parse(code))
+    assert (finding.cost, finding.total) == ("O(n)", "O(n³)")
+
+def test_custom_rules_share_the_single_traversal(monkeypatch):
+    monkeypatch.setattr("core.antipatterns.RULES", dict(RULES))
+    visits = []
+
+    @register_rule
+    class CountNames(Rule):
+        name = "count-names"
+        node_types = (ast.Name, ast.While)
+
+        def visit(self, node, context):
+            visits.append(node)
+
+        def leave(self, node, context):
+            context.report(self, node, "loop", CONSTANT, "none")
+
+    tree = ast.parse("while x:\n  y = z")
+    findings = AntiPatternDetector().scan(tree)
+    assert len(visits) == 4 and [f.rule for f in findings] == ["count-names"]
+    with pytest.raises(ValueError):
+        AntiPatternDetector(["missing-rule"])
+
+def test_findings_reach_ast_analysis_and_recommendations():
+    code = "def f(xs):\n  s = ''\n  for x in xs:\n    s += x\n  return s"
+    analysis = ASTParser().parse(code)
+    assert analysis.to_dict()["findings"][0]["rule"] == "string-concat"
+
+    result = ComplexityAnalyzer(offline=True).analyze(code)
+    assert result["final_analysis"]["recommendations"][0].startswith("Line 4: string 's' built with +=")
+
+def test_lint_command_reports_findings_and_exit_code(tmp_path):
+    import json
+    from click.testing import CliRunner
+    import main
+
+    (tmp_path / "slow.py").write_text("def f(queue):\n  while queue:\n    queue.pop(0)\n")
+    (tmp_path / "fine.py").write_text("def g(xs):\n  return set(xs)\n")
+    result = CliRunner().invoke(main.cli, ["lint", str(tmp_path), "--format", "json"])
+    findings = [json.loads(line) for line in result.output.splitlines()]
+    assert result.exit_code == 1
+    assert [(f["rule"], f["line"], f["file"].endswith("slow.py")) for f in findings] == [("list-front", 3, True)]
+
+    clean = CliRunner().invoke(main.cli, ["lint", str(tmp_path / "fine.py"), "--format", "plain"])
+    assert clean.exit_code == 0 and clean.output == ""
@@ -11,4 +11,52 @@ def test_ast_parser_loops_and_nesting(code, expected_loops, expected_nesting):
     parser = ASTParser()
     result = parser.parse(code)
     assert len(result.loops) == expected_loops
-    assert result.max_nesting_level == expected_nesting 
\ No newline at end of file
+    assert result.max_nesting_level == expected_nesting
+
+
+def test_ast_parser_visits_each_node_once():
+    code = (
+        "def outer(xs):\n"
+        "  def inner(y):\n"
+        "    return sorted(y)\n"
+        "  for x in xs:\n"
+        "    for y in x: pass\n"
+        "  else:\n"
+        "    while xs: xs.pop()\n"
+    )
+    result = ASTParser().parse(code)
+    assert [f.name for f in result.functions] == ["inner", "outer"]
+    assert [(l.type, l.nested_level) for l in result.loops] == [("for", 1), ("for", 2), ("while", 1)]
+    assert result.max_nesting_level == 2
+
+def test_ast_parser_marks_recursive_function():
+    result = ASTParser().parse("def fact(n):\n  return 1 if n < 2 else n * fact(n - 1)")
+    assert result.recursive_calls == ["fact"]
+    assert result.functions[0].has_recursion
+
+def test_ast_parser_marks_mutual_recursion_and_calls():
+    code = (
+        "def even(n):\n  return n == 0 or odd(n - 1)\n"
+        "def odd(n):\n  return n != 0 and even(n - 1)\n"
+        "def main(n):\n  print(even(n))\n"
+    )
+    result = ASTParser().parse(code)
+    assert sorted(result.recursive_calls) == ["even", "odd"]
+    assert {f.name: f.calls_other_functions for f in result.functions}["main"] == ["print", "even"]
+
+def test_ast_parser_keeps_same_named_methods_of_different_classes_apart():
+    code = (
+        "class A:\n  def run(self):\n    return self.step()\n  def step(self):\n    return 1\n"
+        "class B:\n  def step(self):\n    return self.run()\n  def run(self):\n    return 2\n"
+    )
+    result = ASTParser().parse(code)
+    assert result.recursive_calls == []
+    assert not any(f.has_recursion for f in result.functions)
+
+def test_ast_analysis_to_dict_matches_asdict_and_records_are_slotted():
+    import sys
+    from dataclasses import asdict
+    result = ASTParser().parse("def f(xs):\n  for x in range(len(xs)):\n    g(x)\n")
+    assert result.to_dict() == asdict(result)
+    assert not hasattr(result, "__dict__") and not hasattr(result.loops[0], "__dict__")
+    assert result.loops[0].iterator_type is sys.intern("range")
@@ -0,0 +1,90 @@
+import asyncio
+import pytest
+from core.async_llm_client import AsyncLLMClient
+from core.rate_limit import RetryPolicy, TokenBucket
+
+RESPONSE = '{"time_complexity": "O(n)", "space_complexity": "O(1)", "confidence": 0.9}'
+
+class RateLimited(Exception):
+    code = 429
+
+class FakeAsyncModel:
+    """Local stand-in for the Gemini model that injects latency and 429s."""
+
+    def __init__(self, latency=0.01, fail_every=0):
+        self.latency = latency
+        self.fail_every = fail_every
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate_content_async(self, prompt):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            if self.fail_every and self.calls % self.fail_every == 0:
+                raise RateLimited("429 Resource has been exhausted")
+
+            class Response:
+                text = RESPONSE
+            return Response()
+        finally:
+            self.in_flight -= 1
+
+def make_client(model, **kwargs):
+    kwargs.setdefault("retry_policy", RetryPolicy(max_retries=5, base_delay=0.001, max_delay=0.01))
+    kwargs.setdefault("rate_limit", 10_000)
+    return AsyncLLMClient(model=model, **kwargs)
+
+def test_async_client_caps_concurrency_and_retries_429s():
+    model = FakeAsyncModel(latency=0.005, fail_every=3)
+    client = make_client(model, max_concurrency=4)
+    results = asyncio.run(client.analyze_many([("def f(): pass", {})] * 30))
+    assert all(r["time_complexity"] == "O(n)" for r in results)
+    assert model.max_in_flight <= 4
+    assert client.retries > 0
+
+def test_async_client_gives_up_on_non_retryable_errors():
+    class BrokenModel:
+        calls = 0
+        async def generate_content_async(self, prompt):
+            self.calls += 1
+            raise ValueError("bad request")
+
+    model = BrokenModel()
+    result = asyncio.run(make_client(model).analyze_complexity_async("def f(): pass", {}))
+    assert model.calls == 1
+    assert result["confidence"] == 0.0
+    assert "bad request" in result["error"]
+
+def test_async_client_times_out_slow_requests():
+    model = FakeAsyncModel(latency=1.0)
+    client = make_client(model, timeout=0.01, retry_policy=RetryPolicy(max_retries=2, base_delay=0.001))
+    result = asyncio.run(client.analyze_complexity_async("def f(): pass", {}))
+    assert model.calls == 3
+    assert "after 3 attempt(s)" in result["error"]
+
+def test_async_client_keeps_the_blocking_api():
+    class SyncModel(FakeAsyncModel):
+        def generate_content(self, prompt, stream=False):
+            class Response:
+                text = RESPONSE
+            return Response()
+
+    client = make_client(SyncModel())
+    batch = client.analyze_batch([("a", "def a(): pass", {})])
+    assert batch["a"]["time_complexity"] == "O(n)"
+    assert client.analyze_complexity("def f(): pass", {})["confidence"] == 0.9
+
+def test_token_bucket_paces_acquisitions():
+    async def acquire_all():
+        bucket = TokenBucket(rate=100, capacity=1)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for _ in range(6):
+            await bucket.acquire()
+        return loop.time() - start
+
+    assert asyncio.run(acquire_all()) >= 0.045
@@ -0,0 +1,120 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from config import Config
+from core import backends
+from core.backends import Backend, LocalHTTPBackend, available_backends, backend_model_id, create_backend, register_backend
+from core.complexity_analyzer import ComplexityAnalyzer
+from core.fake_model import FakeModel
+from core.llm_client import LLMClient
+from core.rate_limit import RetryPolicy
+
+ANSWER = {"time_complexity": "O(n log n)", "space_complexity": "O(n)", "confidence": 0.9,
+          "explanation": "Sorting dominates.", "bottlenecks": ["sorted"]}
+
+class ChatServer(ThreadingHTTPServer):
+    """Minimal OpenAI-compatible chat completions endpoint; the first ``failures`` requests get a 429."""
+
+    def __init__(self, failures=0):
+        super().__init__(("127.0.0.1", 0), ChatHandler)
+        self.failures = failures
+        self.requests = []
+
+class ChatHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append((self.path, self.headers.get("Authorization"), payload))
+        if self.path != "/v1/chat/completions":
+            self.send_error(404)
+            return
+        if self.server.failures:
+            self.server.failures -= 1
+            self.send_response(429)
+            self.end_headers()
+            self.wfile.write(b"slow down")
+            return
+
+        text = json.dumps(ANSWER)
+        self.send_response(200)
+        if payload["stream"]:
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            for start in range(0, len(text), 16):
+                event = {"choices": [{"delta": {"content": text[start:start + 16]}}]}
+                self.wfile.write(f"data: {json.dumps(event)}\n\n".encode())
+            self.wfile.write(b"data: [DONE]\n\n")
+        else:
+            body = {"choices": [{"message": {"content": text}}],
+                    "usage": {"prompt_tokens": 123, "completion_tokens": 45}}
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(json.dumps(body).encode())
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def chat_server():
+    servers = []
+
+    def start(failures=0):
+        server = ChatServer(failures)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server, LocalHTTPBackend(f"http://127.0.0.1:{server.server_address[1]}/v1", "tiny", api_key="k")
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+def test_registry_resolves_lazily_and_accepts_plugins(monkeypatch):
+    monkeypatch.setattr(backends, "_BACKENDS", dict(backends._BACKENDS))
+    assert {"gemini", "local", "fake"} <= set(available_backends())
+    assert isinstance(create_backend("fake"), FakeModel)
+    assert backend_model_id("gemini") == Config.GEMINI_MODEL
+
+    register_backend("plugin", "core.fake_model:FakeModel")
+    assert backend_model_id("plugin") == "fake"
+    with pytest.raises(ValueError, match="Unknown LLM backend: nope"):
+        create_backend("nope")
+    # A backend missing part of the interface fails when it is made, not on first use
+    with pytest.raises(TypeError):
+        type("Partial", (Backend,), {"generate_content": lambda self, prompt, stream=False: None})("model")
+
+def test_local_backend_with_retries_usage_and_streaming(chat_server):
+    server, backend = chat_server(failures=2)
+    client = LLMClient(model=backend, retry_policy=RetryPolicy(max_retries=3, base_delay=0))
+
+    result = client.analyze_complexity("def f(xs):\n    return sorted(xs)", {})
+    assert result["time_complexity"] == "O(n log n)"
+    assert client.usage() == {"calls": 1, "prompt_tokens": 123, "response_tokens": 45}
+    path, authorization, payload = server.requests[-1]
+    assert len(server.requests) == 3 and path == "/v1/chat/completions"
+    assert authorization == "Bearer k" and payload["model"] == "tiny"
+
+    fields = []
+    streamed = client.analyze_complexity_stream("def f(xs):\n    return sorted(xs)", {},
+                                                on_field=lambda key, value: fields.append(key))
+    assert streamed["space_complexity"] == "O(n)"
+    assert fields[:3] == ["time_complexity", "space_complexity", "confidence"]
+
+def test_local_backend_does_not_retry_client_errors(chat_server):
+    server, backend = chat_server()
+    backend.base_url += "/missing"
+    client = LLMClient(model=backend, retry_policy=RetryPolicy(max_retries=3, base_delay=0))
+
+    result = client.analyze_complexity("x = 1", {})
+    assert "HTTP 404" in result["error"] and len(server.requests) == 1
+
+def test_analyzer_uses_configured_backend_without_api_key(monkeypatch):
+    monkeypatch.setattr(Config, "GEMINI_API_KEY", "")
+    analyzer = ComplexityAnalyzer(confidence_threshold=1.0, backend="fake")
+    result = analyzer.analyze("def f(xs):\n    return sorted(xs)")
+    assert isinstance(analyzer.llm_client.model, FakeModel)
+    assert result["llm_analysis"]["time_complexity"] == "O(n)"
+
+    with pytest.raises(ValueError, match="GEMINI_API_KEY"):
+        ComplexityAnalyzer(backend="gemini")
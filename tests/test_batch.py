@@ -0,0 +1,78 @@
+import pytest
+from core.batch import BatchAnalyzer, discover_python_files, split_units
+from core.complexity_analyzer import ComplexityAnalyzer
+
+class DummyLLM:
+    def analyze_complexity(self, code, ast):
+        if "explode" in code:
+            raise RuntimeError("boom")
+        return {"time_complexity": "O(n)", "space_complexity": "O(1)", "confidence": 0.9}
+
+SOURCE = '''
+class Stack:
+    def push(self, x):
+        self.items.append(x)
+
+    def drain(self):
+        def helper(i):
+            return i
+        while self.items:
+            helper(self.items.pop())
+
+def explode(xs):
+    for x in xs:
+        pass
+'''
+
+def test_split_units_one_per_function_or_method():
+    units = split_units("mod.py", SOURCE)
+    assert [(u.name, u.line, u.end_line) for u in units] == [
+        ("Stack.push", 3, 4), ("Stack.drain", 6, 10), ("explode", 12, 14)
+    ]
+    assert units[1].code.startswith("def drain(self):")
+    assert len(units[1].ast_analysis.loops) == 1
+
+def test_split_units_module_without_functions():
+    units = split_units("script.py", "for i in range(3):\n    print(i)\n")
+    assert [u.name for u in units] == ["<module>"]
+
+def test_batch_streams_results_and_isolates_failures(tmp_path):
+    (tmp_path / "good.py").write_text(SOURCE)
+    (tmp_path / "bad.py").write_text("def broken(:\n")
+    (tmp_path / "__pycache__").mkdir()
+    (tmp_path / "__pycache__" / "skip.py").write_text("x = 1\n")
+    assert len(discover_python_files([str(tmp_path)])) == 2
+
+    analyzer = ComplexityAnalyzer(api_key="dummy", confidence_threshold=1.0)
+    analyzer.llm_client = DummyLLM()
+    progress = []
+    batch = BatchAnalyzer(analyzer, jobs=2, llm_concurrency=2, batch_size=1,
+                          progress=lambda done, total: progress.append((done, total)))
+    records = list(batch.run([str(tmp_path)]))
+
+    by_name = {r["name"]: r for r in records}
+    assert set(by_name) == {None, "Stack.push", "Stack.drain", "explode"}
+    assert "Parsing failed" in by_name[None]["error"]
+    assert "boom" in by_name["explode"]["error"]
+    assert by_name["Stack.push"]["final_analysis"]["time_complexity"] == "O(n)"
+    assert batch.failed_units == 2
+    assert progress[-1] == (4, 4)
+
+def test_batch_packs_units_into_batched_prompts(tmp_path):
+    for i in range(3):
+        (tmp_path / f"m{i}.py").write_text(f"def f{i}(xs):\n    return sum(xs)\n\ndef g{i}():\n    return {i}\n")
+
+    class BatchingLLM:
+        def __init__(self):
+            self.batches = []
+
+        def analyze_batch(self, items):
+            self.batches.append(len(items))
+            return {item_id: {"time_complexity": "O(n)", "space_complexity": "O(1)", "confidence": 0.9}
+                    for item_id, _, _ in items}
+
+    analyzer = ComplexityAnalyzer(api_key="dummy", confidence_threshold=1.0)
+    analyzer.llm_client = llm = BatchingLLM()
+    records = list(BatchAnalyzer(analyzer, jobs=1, batch_size=4).run([str(tmp_path)]))
+    assert len(records) == 6 and not any("error" in r for r in records)
+    assert sorted(llm.batches) == [2, 4]
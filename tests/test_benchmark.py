@@ -0,0 +1,76 @@
+import pytest
+from core.benchmark import AccuracyBenchmark, append_history, compare_runs, load_history, percentile
+from core.bigo import try_parse
+from core.fake_model import FakeModel
+from core.llm_client import LLMClient
+from examples.benchmark_corpus import BENCHMARK_CORPUS
+from examples.sample_codes import SAMPLE_CODES
+
+SMALL = {name: BENCHMARK_CORPUS[name] for name in ("bubble_sort", "merge_sort", "bfs", "sliding_window")}
+
+def fake_client(corpus=SMALL, **kwargs):
+    return lambda: LLMClient(model=FakeModel.from_corpus(corpus, **kwargs))
+
+def test_corpus_labels_parse_and_cover_samples():
+    assert set(SAMPLE_CODES) <= set(BENCHMARK_CORPUS)
+    assert {"sorting", "searching", "dp", "graph", "tricky"} <= {s["category"] for s in BENCHMARK_CORPUS.values()}
+    for name, sample in BENCHMARK_CORPUS.items():
+        assert try_parse(sample["expected_complexity"]) is not None, name
+
+def test_fake_model_is_deterministic():
+    model = FakeModel.from_corpus(BENCHMARK_CORPUS, error_rate=0.3)
+    answers = [model.answer(sample["code"])["time_complexity"] for sample in BENCHMARK_CORPUS.values()]
+    assert answers == [model.answer(sample["code"])["time_complexity"] for sample in BENCHMARK_CORPUS.values()]
+    wrong = sum(a != s["expected_complexity"] for a, s in zip(answers, BENCHMARK_CORPUS.values()))
+    assert 0 < wrong < len(BENCHMARK_CORPUS) // 2
+    assert model.answer("def unknown(): pass")["confidence"] < 0.5
+
+def test_fake_model_answers_batches_and_streams():
+    client = LLMClient(model=FakeModel.from_corpus(SMALL, error_rate=0.0))
+    items = [(name, sample["code"], {}) for name, sample in SMALL.items()]
+    results = client.analyze_batch(items)
+    assert {name: r["time_complexity"] for name, r in results.items()} == {
+        name: sample["expected_complexity"] for name, sample in SMALL.items()
+    }
+    assert client.usage()["calls"] == 1
+
+    streamed = client.analyze_complexity_stream(SMALL["merge_sort"]["code"], {}, fast_verdict=True)
+    assert streamed["time_complexity"] == "O(n log n)" and streamed["truncated"]
+
+def test_paths_are_measured_separately():
+    report = AccuracyBenchmark(SMALL, fake_client(error_rate=0.0), passes=2).run()
+    llm, combined = report["paths"]["llm"], report["paths"]["combined"]
+
+    assert llm["accuracy"] == 1.0 and llm["llm_calls"] == len(SMALL)
+    assert llm["prompt_tokens"] > 0 and llm["response_tokens"] > 0
+    # Confident static estimates skip the model; the second pass is served from the cache
+    assert combined["llm_calls"] < len(SMALL)
+    assert combined["cache_hit_rate"] == 0.5
+    assert "warm_latency_ms" in combined
+    assert report["paths"]["ast"]["by_category"]["sorting"] == 1.0
+    assert "llm_calls" not in report["paths"]["ast"]
+
+def test_history_reports_new_misses(tmp_path):
+    history = str(tmp_path / "history.json")
+    good = AccuracyBenchmark(SMALL, fake_client(error_rate=0.0), passes=1).run(["llm"])
+    bad = AccuracyBenchmark(SMALL, fake_client(error_rate=1.0), passes=1).run(["llm"])
+
+    assert append_history(good, history) is None
+    previous = append_history(bad, history)
+    assert previous["paths"]["llm"]["accuracy"] == 1.0
+    assert len(load_history(history)) == 2
+
+    delta = compare_runs(previous, bad)["llm"]
+    assert delta["accuracy_delta"] == -1.0
+    assert delta["new_misses"] == sorted(SMALL)
+
+def test_llm_paths_need_a_model():
+    with pytest.raises(ValueError, match="model"):
+        AccuracyBenchmark(SMALL).run(["combined"])
+    assert AccuracyBenchmark(SMALL).run(["ast"])["paths"]["ast"]["cases"] == len(SMALL)
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert (percentile(values, 50), percentile(values, 90), percentile(values, 99)) == (50.0, 90.0, 99.0)
+    assert percentile([3.0], 99) == 3.0
+    assert percentile([], 50) == 0.0
@@ -0,0 +1,100 @@
+import pytest
+from core.bigo import BigO, compare, equivalent, log2_size, parse, try_parse
+from core.complexity_analyzer import ComplexityAnalyzer
+from core.cost import Cost, format_cost
+
+@pytest.mark.parametrize("text,canonical", [
+    ("O(n^2)", "O(n²)"),
+    ("O(n * n)", "O(n²)"),
+    ("O(N log N)", "O(n log n)"),
+    ("Θ(nlogn)", "O(n log n)"),
+    ("O(3n^2 + 5n log n + 7)", "O(n²)"),
+    ("O(log(n!))", "O(n log n)"),
+    ("O((V + E) log V)", "O(V log V + E log V)"),
+    ("O(n + m + n*m)", "O(m n)"),
+    ("O(mn)", "O(m n)"),
+    ("O(nm + k)", "O(m n + k)"),
+    ("O(VE)", "O(E V)"),
+    ("O(4^n + 2^n n^3)", "O(4^n)"),
+    ("O(sqrt(n))", "O(n^0.50)"),
+    ("O(log_2 n + 1)", "O(log n)"),
+    ("O(n!)", "O(n!)"),
+    ("O(1e5)", "O(1)"),
+    ("O(2.5e3 n)", "O(n)"),
+    ("O(10^400)", "O(1)"),
+    ("O(2^2^2^2^2^2)", "O(1)"),
+])
+def test_parse_to_canonical_form(text, canonical):
+    assert str(parse(text)) == canonical
+
+@pytest.mark.parametrize("text", [
+    "O(?)", "Unknown", "O(n^n)", "O(n / log n)", "O()", "O(n",
+    "O(100000000!)", "O((10^400)^n)", "O(n^(10^400))", "O((2^n)^(10^400))",
+])
+def test_unparsable(text):
+    assert try_parse(text) is None
+
+@pytest.mark.parametrize("smaller,larger", [
+    ("O(1)", "O(log n)"),
+    ("O(log^2 n)", "O(n^0.5)"),
+    ("O(n log n)", "O(n²)"),
+    ("O(n^100)", "O(1.1^n)"),
+    ("O(2^n)", "O(n!)"),
+    ("O(V)", "O(V + E)"),
+])
+def test_dominance(smaller, larger):
+    assert compare(parse(smaller), parse(larger)) == -1
+    assert parse(smaller) < parse(larger)
+    assert parse(smaller) + parse(larger) == parse(larger)
+
+def test_independent_variables_are_incomparable():
+    assert compare(parse("O(n)"), parse("O(m)")) is None
+    assert compare(parse("O(n²)"), parse("O(n m)")) is None
+
+def test_composition():
+    assert parse("O(n)") * parse("O(log n)") == parse("O(n log n)")
+    assert parse("O(V)") * parse("O(V + E)") == parse("O(V² + V E)")
+    assert parse("O(n)") ** 2 == parse("O(n²)")
+
+def test_cost_conversion_matches_format_cost():
+    for cost in [Cost(), Cost(poly=2, log=1), Cost(exp=2), Cost(poly=1.58), Cost(exp=1.62, poly=1), Cost(log=2)]:
+        assert str(BigO.from_cost(cost)) == format_cost(cost)
+
+def test_log2_size_evaluates_the_largest_term():
+    assert log2_size(parse("O(1)"), 1024) == 0
+    assert log2_size(parse("O(n² + n log n)"), 1024) == 20
+    assert log2_size(parse("O(n log n)"), 16) == 6
+    assert log2_size(parse("O(V + E²)"), 8) == 6
+    assert log2_size(parse("O(2^n)"), 1000) == 1000
+
+def test_parse_is_memoized():
+    assert parse("O(n^2 + n)") is parse("O(n^2 + n)")
+
+def test_equivalent_falls_back_to_strings():
+    assert equivalent("O(n^2)", "O(n²)")
+    assert equivalent("Unknown", "Unknown")
+    assert not equivalent("O(n)", "Unknown")
+
+def _combine(llm_time, llm_confidence):
+    class LLM:
+        def analyze_complexity(self, code, ast):
+            return {"time_complexity": llm_time, "space_complexity": "O(1)", "confidence": llm_confidence}
+
+    analyzer = ComplexityAnalyzer(api_key="dummy", confidence_threshold=1.0)
+    analyzer.llm_client = LLM()
+    return analyzer.analyze("def f(xs):\n  for x in xs:\n    for y in xs:\n      pass")["final_analysis"]
+
+def test_combine_recognizes_agreement_across_spellings():
+    final = _combine("O(n**2)", 0.7)
+    assert final["analysis_method"] == "LLM + AST agreement"
+    assert final["confidence"] > 0.9
+
+def test_combine_notes_conflict():
+    final = _combine("O(n log n)", 0.9)
+    assert final["time_complexity"] == "O(n log n)"
+    assert "static analysis estimates O(n²), which is higher than this estimate" in final["explanation"]
+
+def test_combine_prefers_more_confident_static_estimate_on_conflict():
+    final = _combine("O(n)", 0.6)
+    assert final["time_complexity"] == "O(n²)"
+    assert final["analysis_method"] == "AST-based estimation"
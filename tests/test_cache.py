@@ -0,0 +1,67 @@
+import pytest
+from core.cache import ResultCache
+from core.complexity_analyzer import ComplexityAnalyzer
+
+RESULT = {"time_complexity": "O(n)", "space_complexity": "O(1)", "confidence": 0.9}
+
+class CountingLLM:
+    def __init__(self):
+        self.calls = 0
+
+    def analyze_complexity(self, code, ast):
+        self.calls += 1
+        return dict(RESULT)
+
+def test_cache_ignores_whitespace_and_comments(tmp_path):
+    cache = ResultCache(str(tmp_path), model="m")
+    cache.set("for i in range(10):\n    pass", RESULT)
+    assert cache.get("for i in range(10):   # loop\n        pass\n") == RESULT
+    assert cache.stats()["hits"] == 1
+
+def test_cache_key_depends_on_model_and_prompt_version(tmp_path):
+    ResultCache(str(tmp_path), model="m", prompt_version=1).set("x = 1", RESULT)
+    assert ResultCache(str(tmp_path), model="m", prompt_version=2).get("x = 1") is None
+    assert ResultCache(str(tmp_path), model="other", prompt_version=1).get("x = 1") is None
+    assert ResultCache(str(tmp_path), model="m", prompt_version=1).get("x = 1") == RESULT
+
+def test_cache_lru_evicts_to_disk(tmp_path):
+    cache = ResultCache(str(tmp_path), model="m", max_memory_entries=2)
+    for i in range(3):
+        cache.set(f"x = {i}", RESULT)
+    assert cache.stats()["memory_entries"] == 2
+    assert cache.get("x = 0") == RESULT
+    assert cache.disk_hits == 1
+
+def test_cache_ttl_expiry(tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path), model="m", ttl=10)
+    cache.set("x = 1", RESULT)
+    fresh = ResultCache(str(tmp_path), model="m", ttl=10)
+    monkeypatch.setattr("core.cache.time.time", lambda: 10**12)
+    assert fresh.get("x = 1") is None
+    assert fresh.misses == 1
+
+def test_cache_ttl_applies_to_memory_entries(tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path), model="m", ttl=10)
+    cache.set("x = 1", RESULT)
+    assert cache.get("x = 1") == RESULT
+    monkeypatch.setattr("core.cache.time.time", lambda: 10**12)
+    assert cache.get("x = 1") is None
+    assert cache.stats()["memory_entries"] == 0
+
+def test_cache_hits_are_independent_copies(tmp_path):
+    cache = ResultCache(str(tmp_path), model="m")
+    value = {"time_complexity": "O(n)", "details": {"loops": [1]}}
+    cache.set("x = 1", value)
+    value["details"]["loops"].append(2)
+    cache.get("x = 1")["details"]["loops"].append(3)
+    assert cache.get("x = 1")["details"] == {"loops": [1]}
+
+def test_analyzer_skips_llm_on_cache_hit(tmp_path):
+    analyzer = ComplexityAnalyzer(api_key="dummy", cache=ResultCache(str(tmp_path), model="m"))
+    llm = CountingLLM()
+    analyzer.llm_client = llm
+    first = analyzer.analyze("for i in range(10): pass")
+    second = analyzer.analyze("for i in range(10):\n    pass")
+    assert llm.calls == 1
+    assert not first["cached"] and second["cached"]
+    assert second["final_analysis"]["time_complexity"] == "O(n)"
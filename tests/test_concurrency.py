@@ -0,0 +1,45 @@
+import asyncio
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from core.cache import ResultCache
+from core.complexity_analyzer import ComplexityAnalyzer
+from core.fake_model import FakeModel
+from core.llm_client import LLMClient
+from examples.benchmark_corpus import BENCHMARK_CORPUS
+
+CODES = [sample["code"] for sample in BENCHMARK_CORPUS.values()]
+
+def make_analyzer(cache=None):
+    # A threshold of 1.0 sends every snippet through the (fake) LLM, cache and combine stages too
+    model = FakeModel.from_corpus(BENCHMARK_CORPUS)
+    return ComplexityAnalyzer(confidence_threshold=1.0, cache=cache, llm_client=LLMClient(model=model))
+
+def comparable(result):
+    return result["ast_analysis"].to_dict(), result["static_analysis"], result["final_analysis"]
+
+@pytest.fixture
+def fast_switching():
+    # Switch threads far more often than the default 5 ms so interleavings actually happen
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+def test_shared_analyzer_matches_serial_results_under_threads_and_tasks(tmp_path, fast_switching):
+    serial = {code: comparable(make_analyzer().analyze(code)) for code in CODES}
+    analyzer = make_analyzer(ResultCache(str(tmp_path)))
+    jobs = CODES * 40
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        threaded = list(pool.map(analyzer.analyze, jobs))
+
+    async def run_tasks():
+        return await asyncio.gather(*(asyncio.to_thread(analyzer.analyze, code) for code in jobs[:1000]))
+
+    tasks = asyncio.run(run_tasks())
+
+    for code, result in zip(jobs + jobs[:1000], threaded + tasks):
+        assert comparable(result) == serial[code]
+    assert analyzer.cache.stats()["hits"] >= len(jobs)
@@ -0,0 +1,72 @@
+import math
+import random
+import pytest
+from core.complexity_analyzer import ComplexityAnalyzer
+from core.empirical import EmpiricalProfiler, fit_complexity
+
+SIZES = [100, 200, 400, 800, 1600, 3200]
+
+@pytest.mark.parametrize("expected,growth", [
+    ("O(1)", lambda n: 1.0),
+    ("O(log n)", lambda n: math.log2(n)),
+    ("O(n)", lambda n: n),
+    ("O(n log n)", lambda n: n * math.log2(n)),
+    ("O(n²)", lambda n: n * n),
+])
+def test_fit_complexity_with_noise(expected, growth):
+    rng = random.Random(0)
+    values = [1e-6 * growth(n) * rng.uniform(0.97, 1.03) + 1e-4 for n in SIZES]
+    assert fit_complexity(SIZES, values)["complexity"] == expected
+
+def test_fit_complexity_needs_three_points():
+    with pytest.raises(ValueError):
+        fit_complexity([10, 20], [1.0, 2.0])
+
+def test_measure_linear_function():
+    source = "def count(xs):\n    c = 0\n    for x in xs:\n        c += 1\n    return c\n"
+    sizes = [20000, 40000, 80000, 160000, 320000]
+    profiler = EmpiricalProfiler(repeats=5)
+
+    # Every size runs in its own interpreter, and on a loaded machine one of
+    # them can come out markedly slower; a few runs are allowed to get a clean fit
+    fits = []
+    for _ in range(5):
+        result = profiler.measure(source, "count", "lambda n: [0] * n", sizes=sizes)
+        fits.append(result["time_fit"]["complexity"])
+        if fits[-1] == "O(n)":
+            break
+
+    assert [m["n"] for m in result["measurements"]] == sizes
+    assert fits[-1] == "O(n)", fits
+    assert result["space_fit"]["complexity"] == "O(1)"
+
+def test_measure_reports_failures():
+    result = EmpiricalProfiler().measure("def f(xs):\n    raise KeyError('boom')\n", "f", "lambda n: n")
+    assert result["measurements"] == []
+    assert "KeyError" in result["stopped"]
+    assert "error" in result
+
+def test_measure_ignores_output_of_the_measured_function():
+    source = "def f(xs):\n    print(len(xs))\n"
+    result = EmpiricalProfiler(repeats=1).measure(source, "f", "lambda n: [0] * n", sizes=[10, 20, 40])
+    assert result["stopped"] is None
+    assert [m["n"] for m in result["measurements"]] == [10, 20, 40]
+
+def test_empirical_fit_overrides_low_confidence_estimate():
+    class UnsureLLM:
+        def analyze_complexity(self, code, ast):
+            return {"time_complexity": "O(n)", "space_complexity": "O(1)", "confidence": 0.3}
+
+    analyzer = ComplexityAnalyzer(api_key="dummy")
+    analyzer.llm_client = UnsureLLM()
+    empirical = {
+        "time_fit": {"complexity": "O(n²)", "r_squared": 0.99, "relative_error": 0.02},
+        "space_fit": {"complexity": "O(1)", "r_squared": 1.0, "relative_error": 0.0},
+    }
+    code = "def f(xs):\n    for x in xs:\n        f(x)"
+    result = analyzer.analyze(code, empirical_analysis=empirical)
+
+    final = result["final_analysis"]
+    assert final["time_complexity"] == "O(n²)"
+    assert final["analysis_method"] == "Empirical measurement"
+    assert final["empirical"]["r_squared"] == 0.99
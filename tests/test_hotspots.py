@@ -0,0 +1,87 @@
+import cProfile
+import importlib.util
+import json
+
+from click.testing import CliRunner
+import main
+from core.complexity_analyzer import ComplexityAnalyzer
+from core.hotspots import HotspotAnalyzer, Profile
+
+MODULE = '''import functools
+
+def dedupe(xs):
+    out = []
+    for x in xs:
+        if x not in out:
+            out.append(x)
+    return out
+
+def total(xs):
+    return sum(xs)
+
+@functools.lru_cache(None)
+def twice(n):
+    return n * 2
+
+def main():
+    for _ in range(3):
+        for work, size in ((dedupe, 1500), (total, 100000)):
+            work(list(range(size)))
+    twice(3)
+'''
+
+def write_module(tmp_path):
+    path = tmp_path / "app" / "work.py"
+    path.parent.mkdir()
+    path.write_text(MODULE)
+    return path
+
+def profile_module(tmp_path):
+    path = write_module(tmp_path)
+    spec = importlib.util.spec_from_file_location("work", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    profiler = cProfile.Profile()
+    profiler.runcall(module.main)
+    profiler.dump_stats(tmp_path / "prof.out")
+    return tmp_path / "prof.out"
+
+def test_pstats_ranks_hot_quadratic_code_first_within_budget(tmp_path):
+    profile = profile_module(tmp_path)
+    hot = HotspotAnalyzer(ComplexityAnalyzer(offline=True), budget=2, min_share=0, jobs=1)
+    records = hot.run(str(profile), [str(tmp_path / "app")])
+
+    # The list search makes dedupe O(n²); main has the most time but is only O(n)
+    assert [record['name'] for record in records] == ['dedupe', 'main']
+    first = records[0]['profile']
+    assert first['rank'] == 1 and first['unit'] == 'seconds' and first['calls'] == 3
+    assert 0.3 < first['time_share'] < 1 and first['priority'] > 100 * records[1]['profile']['priority']
+    # twice is found through its decorator line, then left out by the budget
+    assert hot.profiled_units == 4 and hot.skipped_units == 2
+
+def test_collapsed_stacks_map_by_path_suffix_and_count_samples_once(tmp_path):
+    write_module(tmp_path)
+    stacks = tmp_path / "stacks.txt"
+    # Recorded in another checkout; dedupe recurses through a frame without a location
+    stacks.write_text(
+        "<module> (/srv/app/work.py:1);main (/srv/app/work.py:19);dedupe (/srv/app/work.py:6) 70\n"
+        "main (/srv/app/work.py:19);dedupe (/srv/app/work.py:6);<native>;dedupe (/srv/app/work.py:7) 10\n"
+        "main (/srv/app/work.py:20);total (/srv/app/work.py:11) 20\n"
+    )
+    profile = Profile.load(str(stacks))
+    assert profile.unit == 'samples' and profile.total == 100
+
+    records = HotspotAnalyzer(ComplexityAnalyzer(offline=True), min_share=0, jobs=1).run(
+        str(stacks), [str(tmp_path / "app")])
+    weights = {record['name']: record['profile'] for record in records}
+    assert weights['dedupe']['cumulative'] == 80 and weights['dedupe']['self'] == 80
+    assert weights['main']['time_share'] == 1.0 and weights['main']['self'] == 0
+    assert weights['total']['calls'] is None
+
+def test_hotspots_command_writes_ranked_records(tmp_path):
+    profile = profile_module(tmp_path)
+    result = CliRunner().invoke(main.cli, ['hotspots', str(profile), str(tmp_path / "app"), '--offline',
+                                           '--format', 'ndjson', '--fields', 'name,profile.rank'])
+    assert result.exit_code == 0, result.output
+    assert [json.loads(line) for line in result.output.splitlines()][0] == {'name': 'dedupe', 'profile': {'rank': 1}}
@@ -0,0 +1,120 @@
+import json
+from core.batch import split_units
+from core.complexity_analyzer import ComplexityAnalyzer
+from core.incremental import IncrementalBatchAnalyzer, dependency_keys
+
+SOURCE = '''
+def helper(xs):
+    return sorted(xs)
+
+def caller(xs):
+    return helper(xs)
+
+class Box:
+    def get(self):
+        return self.load()
+
+    def load(self):
+        return 1
+'''
+
+class CountingLLM:
+    def __init__(self):
+        self.calls = 0
+
+    def analyze_complexity(self, code, ast):
+        self.calls += 1
+        return {"time_complexity": "O(n)", "space_complexity": "O(1)", "confidence": 0.9}
+
+def run(project, manifest):
+    analyzer = ComplexityAnalyzer(api_key="dummy", confidence_threshold=1.0)
+    analyzer.llm_client = CountingLLM()
+    batch = IncrementalBatchAnalyzer(analyzer, manifest_path=str(manifest), jobs=1, batch_size=1)
+    records = {r["name"]: r for r in batch.run([str(project)])}
+    return records, analyzer.llm_client.calls
+
+def test_dependency_keys_follow_callees():
+    before = {u.name: k for u, k in zip(*_keyed(SOURCE))}
+    after = {u.name: k for u, k in zip(*_keyed(SOURCE.replace("sorted(xs)", "list(xs)")))}
+
+    assert before["helper"] != after["helper"]
+    assert before["caller"] != after["caller"]
+    assert before["Box.get"] == after["Box.get"]
+
+def test_dependency_keys_ignore_formatting_and_position():
+    moved = "\n\n# comment\n" + SOURCE.replace("return 1", "return  1")
+    assert _keyed(SOURCE)[1] == _keyed(moved)[1]
+
+def test_dependency_keys_resolve_callees_within_module_and_class():
+    other = "def helper(xs):\n    return xs\n\nclass Crate:\n    def load(self):\n        return 2\n"
+    edited = other.replace("return xs", "return xs[:]").replace("return 2", "return 3")
+
+    def keyed(other_source):
+        units = split_units("mod.py", SOURCE) + split_units("other.py", other_source)
+        keys = dependency_keys(units)
+        return {(u.path, u.name): keys[id(u)] for u in units}
+
+    before, after = keyed(other), keyed(edited)
+    assert before[("other.py", "helper")] != after[("other.py", "helper")]
+    # Same-named functions and methods elsewhere are not dependencies
+    assert before[("mod.py", "caller")] == after[("mod.py", "caller")]
+    assert before[("mod.py", "Box.get")] == after[("mod.py", "Box.get")]
+
+def _keyed(source):
+    units = split_units("mod.py", source)
+    keys = dependency_keys(units)
+    return units, [keys[id(u)] for u in units]
+
+def test_incremental_run_only_reanalyzes_changed_units(tmp_path):
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "mod.py").write_text(SOURCE)
+    (project / "other.py").write_text("def other(n):\n    return n\n")
+    manifest = tmp_path / "manifest.json"
+
+    records, calls = run(project, manifest)
+    assert calls == 5
+    assert not any(r.get("reused") for r in records.values())
+
+    records, calls = run(project, manifest)
+    assert calls == 0
+    assert all(r["reused"] for r in records.values())
+    assert records["caller"]["final_analysis"]["time_complexity"] == "O(n)"
+
+    (project / "mod.py").write_text(SOURCE.replace("return 1", "return 2"))
+    records, calls = run(project, manifest)
+    assert calls == 2
+    assert {n for n, r in records.items() if not r.get("reused")} == {"Box.get", "Box.load"}
+
+def test_manifest_forgets_deleted_units(tmp_path):
+    (tmp_path / "mod.py").write_text(SOURCE)
+    manifest = tmp_path / "manifest.json"
+    run(tmp_path / "mod.py", manifest)
+
+    (tmp_path / "mod.py").write_text("def helper(xs):\n    return sorted(xs)\n")
+    records, calls = run(tmp_path / "mod.py", manifest)
+    assert list(records) == ["helper"]
+    assert calls == 0
+    assert "mod.py::caller" not in manifest.read_text()
+
+PROPERTY = """
+class Temp:
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, new):
+        self._value = new
+"""
+
+def test_redefined_units_keep_separate_manifest_entries(tmp_path):
+    (tmp_path / "mod.py").write_text(PROPERTY)
+    manifest = tmp_path / "manifest.json"
+    _, calls = run(tmp_path / "mod.py", manifest)
+    assert calls == 2
+    assert set(json.loads(manifest.read_text())["units"]) == {"mod.py::Temp.value", "mod.py::Temp.value#2"}
+
+    (tmp_path / "mod.py").write_text(PROPERTY.replace("= new", "= new or 0"))
+    _, calls = run(tmp_path / "mod.py", manifest)
+    assert calls == 1
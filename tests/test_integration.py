@@ -11,4 +11,18 @@ def test_complexity_analyzer_integration(monkeypatch):
     code = "for i in range(10): pass"
     result = analyzer.analyze(code)
     assert result["final_analysis"]["time_complexity"] == "O(n)"
-    assert result["final_analysis"]["confidence"] == 0.95 
\ No newline at end of file
+    assert result["final_analysis"]["confidence"] == 0.95
+
+
+def test_result_references_code_by_hash_and_serializes():
+    import hashlib
+    import json
+    from core.serialization import dumps_json
+    code = "def f(xs):\n  return sorted(xs)"
+    result = ComplexityAnalyzer(offline=True).analyze(code)
+    assert "code" not in result
+    assert result["code_hash"] == hashlib.sha256(code.encode("utf-8")).hexdigest()
+    data = json.loads(dumps_json(result))
+    assert data["ast_analysis"]["functions"][0]["name"] == "f"
+    with pytest.raises(TypeError):
+        dumps_json({"value": object()})
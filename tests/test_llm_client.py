@@ -13,4 +13,36 @@ def test_llm_client_parses_json(monkeypatch):
     result = client.analyze_complexity("def f(): pass", {})
     assert result["time_complexity"] == "O(n)"
     assert result["space_complexity"] == "O(1)"
-    assert result["confidence"] == 0.9 
\ No newline at end of file
+    assert result["confidence"] == 0.9
+
+
+class BatchModel:
+    def __init__(self):
+        self.prompts = []
+
+    def generate_content(self, prompt):
+        self.prompts.append(prompt)
+
+        class Response:
+            pass
+        response = Response()
+        if "### SNIPPET" in prompt:
+            response.text = '''```json
+[{"id": "a", "time_complexity": "O(n)", "space_complexity": "O(1)", "confidence": 0.8},
+ {"id": "b", "time_complexity": "fast", "confidence": 0.9}]
+```'''
+        else:
+            response.text = '{"time_complexity": "O(1)", "space_complexity": "O(1)", "confidence": 0.7}'
+        return response
+
+def test_llm_client_batch_retries_only_invalid_items(monkeypatch):
+    client = LLMClient(api_key="dummy")
+    model = BatchModel()
+    monkeypatch.setattr(client, "model", model)
+    items = [(i, f"def {i}(): pass", {}) for i in ("a", "b", "c")]
+    results = client.analyze_batch(items)
+    assert results["a"]["time_complexity"] == "O(n)"
+    assert results["b"]["time_complexity"] == "O(1)"
+    assert results["c"]["time_complexity"] == "O(1)"
+    assert len(model.prompts) == 3
+    assert sum("### SNIPPET" in p for p in model.prompts) == 1
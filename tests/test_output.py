@@ -0,0 +1,61 @@
+import io
+import json
+
+from click.testing import CliRunner
+import main
+from core.ast_parser import ASTParser
+from core.output import NDJSONWriter, SarifWriter, parse_fields, project
+
+SLOW = "def f(queue):\n    while queue:\n        queue.pop(0)\n"
+
+def test_project_keeps_nested_paths_and_reads_records_by_attribute():
+    record = {'file': 'a.py', 'final_analysis': {'time_complexity': 'O(n)', 'explanation': 'long'},
+              'ast_analysis': ASTParser().parse(SLOW)}
+    fields = parse_fields("file, final_analysis.time_complexity,ast_analysis.max_nesting_level,missing.key")
+
+    assert project(record, fields) == {'file': 'a.py', 'final_analysis': {'time_complexity': 'O(n)'},
+                                       'ast_analysis': {'max_nesting_level': 1}}
+
+def test_ndjson_writes_compact_lines_and_never_drops_errors():
+    stream = io.StringIO()
+    writer = NDJSONWriter(stream, ['file'])
+    writer.write({'file': 'a.py', 'ast_analysis': ASTParser().parse(SLOW)})
+    writer.write({'file': 'b.py', 'error': 'Parsing failed'})
+
+    lines = stream.getvalue().splitlines()
+    assert lines[0] == '{"file":"a.py"}'
+    assert json.loads(lines[1]) == {'file': 'b.py', 'error': 'Parsing failed'}
+
+def test_sarif_log_lists_findings_rules_and_errors(tmp_path):
+    stream = io.StringIO()
+    writer = SarifWriter(stream, base_dir=str(tmp_path))
+    writer.write({'file': str(tmp_path / 'pkg' / 'a.py'), 'ast_analysis': ASTParser().parse(SLOW)})
+    writer.write({'file': str(tmp_path / 'b.py'), 'line': 4, 'error': 'Analysis failed'})
+    writer.close()
+
+    run, = json.loads(stream.getvalue())['runs']
+    result, = run['results']
+    location = result['locations'][0]['physicalLocation']
+    assert result['ruleId'] == 'list-front' and result['properties']['total'] == 'O(n²)'
+    assert location == {'artifactLocation': {'uri': 'pkg/a.py', 'uriBaseId': 'SRCROOT'},
+                        'region': {'startLine': 3}}
+    assert [rule['id'] for rule in run['tool']['driver']['rules']] == ['list-front']
+    assert run['invocations'][0]['executionSuccessful'] is False
+    assert run['originalUriBaseIds']['SRCROOT']['uri'].startswith('file://')
+
+def test_cli_streams_projected_ndjson_and_sarif(tmp_path):
+    (tmp_path / 'slow.py').write_text(SLOW)
+    runner = CliRunner()
+
+    result = runner.invoke(main.cli, ['analyze-dir', str(tmp_path), '--offline', '-j', '1', '--format', 'ndjson',
+                                      '--fields', 'name,final_analysis.time_complexity'])
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output) == {'name': 'f', 'final_analysis': {'time_complexity': 'O(n²)'}}
+
+    result = runner.invoke(main.cli, ['lint', str(tmp_path), '--format', 'sarif'])
+    assert result.exit_code == 1
+    assert json.loads(result.output)['runs'][0]['results'][0]['locations'][0]['physicalLocation']['region'] == \
+        {'startLine': 3}
+
+    result = runner.invoke(main.cli, ['analyze', 'x = 1', '--offline', '--fields', 'code_hash'])
+    assert result.exit_code == 2 and '--fields only applies' in result.output
@@ -0,0 +1,110 @@
+import ast
+from dataclasses import asdict
+from core.ast_parser import ASTParser
+from core.fake_model import FakeModel
+from core.llm_client import LLMClient
+from core.prompt_builder import PromptBuilder, compact, estimate_tokens, merge_chunk_results
+
+DOCUMENTED = '''
+def total(xs):
+    """Add everything up.
+
+    A long docstring that is of no use to the model.
+    """
+    s = 0  # running sum
+    for x in xs:
+        s += x
+    return s
+
+def label(kind, size):
+    """Pure bookkeeping."""
+    prefix = kind + ":"
+    return prefix + str
+'''
+
+def module(functions: int) -> str:
+    parts = []
+    for i in range(functions):
+        callee = f"    helper_{i - 1}(xs)\n" if i else ""
+        parts.append(
+            f"def helper_{i}(xs):\n"
+            f'    """Helper number {i} with a docstring padding it out quite a bit."""\n'
+            f"{callee}"
+            f"    return [x * {i} for x in xs if x > {i}]  # a comment\n"
+        )
+    return "\n".join(parts)
+
+def plan(code, builder, client=None):
+    client = client or LLMClient(model=FakeModel({}))
+    return builder.plan(code, asdict(ASTParser().parse(code)), client._render_chunk)
+
+def test_small_code_is_sent_verbatim():
+    [chunk] = plan(DOCUMENTED, PromptBuilder())
+    assert chunk.code == DOCUMENTED and not chunk.compacted
+
+def test_compact_strips_docstrings_comments_and_trivial_bodies():
+    text = compact(ast.parse(DOCUMENTED))
+    assert "docstring" not in text and "running sum" not in text
+    assert "for x in xs" in text
+    assert "summary: 3 lines, no loops or calls, O(1)" in text
+    assert "summary:" not in compact(ast.parse(DOCUMENTED), summarize_trivial=False)
+
+def test_compaction_is_tried_before_chunking():
+    code = module(6)
+    budget = estimate_tokens(LLMClient(model=FakeModel({}))._render_chunk(plan(code, PromptBuilder())[0])) - 10
+    [chunk] = plan(code, PromptBuilder(token_budget=budget))
+    assert chunk.compacted and "docstring" not in chunk.code
+
+def test_large_code_is_chunked_by_function_within_budget():
+    code = module(80)
+    builder = PromptBuilder(token_budget=900, max_code_length=1500)
+    client = LLMClient(model=FakeModel({}))
+    chunks = plan(code, builder, client)
+
+    assert len(chunks) > 2
+    for chunk in chunks:
+        assert estimate_tokens(client._render_chunk(chunk)) <= 900
+        assert len(chunk.code) <= 1500
+    # Every function is analyzed exactly once
+    assert sum(chunk.code.count("def helper_") for chunk in chunks) == 80
+    # The first function of a later chunk calls the last one of the chunk before
+    assert any(line.startswith("helper_") and "static estimate" in line for line in chunks[1].context)
+
+def test_unparsable_oversized_code_is_truncated():
+    code = "x = (\n" + "    1,\n" * 2000
+    client = LLMClient(model=FakeModel({}))
+    [chunk] = PromptBuilder(token_budget=800).plan(code, {}, client._render_chunk)
+    assert "more lines truncated" in chunk.code
+    assert estimate_tokens(client._render_chunk(chunk)) <= 800
+
+def test_chunk_results_are_merged():
+    chunks = plan(module(80), PromptBuilder(token_budget=900))[:3]
+    results = [
+        {"time_complexity": "O(n)", "space_complexity": "O(1)", "confidence": 0.9, "bottlenecks": ["a"]},
+        {"time_complexity": "O(n^2)", "space_complexity": "O(n)", "confidence": 0.7, "bottlenecks": ["a", "b"]},
+        {"error": "boom", "time_complexity": "Unknown", "confidence": 0.0},
+    ]
+    merged = merge_chunk_results(chunks, results)
+    assert (merged["time_complexity"], merged["space_complexity"]) == ("O(n²)", "O(n)")
+    assert merged["confidence"] == round(0.7 * 2 / 3, 2)
+    assert merged["bottlenecks"] == ["a", "b"] and merged["chunks"] == 3
+
+class RecordingModel(FakeModel):
+    def __init__(self):
+        super().__init__({})
+        self.prompts = []
+
+    def generate_content(self, prompt, stream=False):
+        self.prompts.append(prompt)
+        return super().generate_content(prompt, stream)
+
+def test_client_sends_every_chunk_and_reduces():
+    model = RecordingModel()
+    client = LLMClient(model=model)
+    client.prompt_builder = PromptBuilder(token_budget=900)
+    code = module(80)
+    result = client.analyze_complexity(code, asdict(ASTParser().parse(code)))
+
+    assert len(model.prompts) == result["chunks"] > 1
+    assert all(estimate_tokens(prompt) <= 900 for prompt in model.prompts)
+    assert result["time_complexity"] == "O(n)"
@@ -0,0 +1,117 @@
+import ast
+import pytest
+from core.call_graph import CallGraph, strongly_connected_components
+from core.static_estimator import StaticEstimator
+
+MERGE_SORT = '''
+def merge_sort(arr):
+    if len(arr) <= 1:
+        return arr
+    mid = len(arr) // 2
+    return merge(merge_sort(arr[:mid]), merge_sort(arr[mid:]))
+
+def merge(left, right):
+    result = []
+    i = j = 0
+    while i < len(left) and j < len(right):
+        if left[i] <= right[j]:
+            result.append(left[i])
+            i += 1
+        else:
+            result.append(right[j])
+            j += 1
+    return result + left[i:] + right[j:]
+'''
+
+BINARY_SEARCH = '''
+def search(arr, target, lo, hi):
+    if lo > hi:
+        return -1
+    mid = (lo + hi) // 2
+    if arr[mid] == target:
+        return mid
+    if arr[mid] < target:
+        return search(arr, target, mid + 1, hi)
+    return search(arr, target, lo, mid - 1)
+'''
+
+def test_strongly_connected_components_are_callees_first():
+    edges = {"main": ["a", "print"], "a": ["b"], "b": ["a", "leaf"], "leaf": []}
+    components = strongly_connected_components(edges)
+    assert components[0] == ["leaf"]
+    assert sorted(components[1]) == ["a", "b"]
+    assert components[2] == ["main"]
+
+def test_call_graph_resolves_scopes_and_methods():
+    code = (
+        "def helper(): pass\n"
+        "class Box:\n"
+        "    def helper(self): pass\n"
+        "    def run(self):\n"
+        "        def inner(): return helper()\n"
+        "        return self.helper(), inner()\n"
+    )
+    graph = CallGraph(ast.parse(code))
+    assert sorted(graph.calls["Box.run"]) == ["Box.helper", "Box.run.inner"]
+    assert graph.calls["Box.run.inner"] == ["helper"]
+
+@pytest.mark.parametrize("code,time,space", [
+    (MERGE_SORT, "O(n log n)", "O(n)"),
+    (BINARY_SEARCH, "O(log n)", "O(log n)"),
+    ("def fact(n):\n    return 1 if n < 2 else n * fact(n - 1)", "O(n)", "O(n)"),
+    ("def total(xs):\n    return xs[0] + total(xs[1:]) if xs else 0", "O(n²)", "O(n)"),
+    ("def hanoi(n):\n    if n:\n        hanoi(n - 1)\n        hanoi(n - 1)", "O(2^n)", "O(n)"),
+    ("def k(n):\n    if n < 2:\n        return 1\n    return k(n // 2) + k(n // 2) + k(n // 2)", "O(n^1.58)", "O(log n)"),
+])
+def test_recurrences_are_solved(code, time, space):
+    result = StaticEstimator().estimate(ast.parse(code))
+    assert (result["time_complexity"], result["space_complexity"]) == (time, space)
+    assert result["confidence"] >= 0.8
+
+@pytest.mark.parametrize("code", [
+    "from functools import lru_cache\n@lru_cache(maxsize=None)\ndef fib(n):\n"
+    "    return n if n < 2 else fib(n - 1) + fib(n - 2)",
+    "import functools\n@functools.cache\ndef fib(n):\n    return n if n < 2 else fib(n - 1) + fib(n - 2)",
+    "def fib(n, memo=None):\n    if memo is None:\n        memo = {}\n    if n <= 1:\n        return n\n"
+    "    if n not in memo:\n        memo[n] = fib(n - 1, memo) + fib(n - 2, memo)\n    return memo[n]",
+    "def fib(n, memo={}):\n    if n < 2:\n        return n\n"
+    "    return memo.get(n) or memo.setdefault(n, fib(n - 1) + fib(n - 2))",
+])
+def test_memoized_recursion_is_not_solved_as_a_call_tree(code):
+    result = StaticEstimator().estimate(ast.parse(code))
+    assert result["time_complexity"] == "O(n)"
+    assert result["confidence"] < 0.7
+    assert any("memoized" in reason for reason in result["uncertainties"])
+
+def test_growing_arguments_are_not_taken_as_shrinking():
+    code = "def f(xs, i):\n    if i == len(xs):\n        return 0\n    return xs[i] + f(xs, i + 1)"
+    result = StaticEstimator().estimate(ast.parse(code))
+    assert result["time_complexity"] == "O(?)"
+
+def test_helper_cost_propagates_into_loops():
+    code = (
+        "def contains(xs, x):\n"
+        "    for y in xs:\n"
+        "        if y == x:\n"
+        "            return True\n"
+        "    return False\n"
+        "def dedupe(xs):\n"
+        "    out = []\n"
+        "    for x in xs:\n"
+        "        if not contains(out, x):\n"
+        "            out.append(x)\n"
+        "    return out\n"
+    )
+    result = StaticEstimator().estimate(ast.parse(code))
+    assert result["time_complexity"] == "O(n²)"
+    assert result["confidence"] >= 0.9
+
+def test_module_summaries_resolve_calls_between_units():
+    tree = ast.parse(MERGE_SORT)
+    estimator = StaticEstimator()
+    summaries = estimator.summarize(tree)
+    with_context = estimator.estimate(tree.body[0], summaries)
+    without_context = estimator.estimate(tree.body[0])
+    assert with_context["time_complexity"] == "O(n log n)"
+    assert "call to unknown function merge()" in without_context["uncertainties"]
+    assert with_context["confidence"] > without_context["confidence"]
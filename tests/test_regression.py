@@ -0,0 +1,81 @@
+import subprocess
+import pytest
+from core.complexity_analyzer import ComplexityAnalyzer
+from core.regression import Allowlist, RegressionGate
+
+BASE = '''
+def total(xs):
+    s = 0
+    for x in xs:
+        s += x
+    return s
+
+def untouched(xs):
+    return len(xs)
+
+def dropped(xs):
+    return xs
+'''
+
+HEAD = '''
+def total(xs):
+    s = 0
+    for x in xs:
+        for y in xs:
+            s += x * y
+    return s
+
+def untouched(xs):
+    return len(xs)
+
+def added(xs):
+    return max(xs)
+'''
+
+def git(repo, *args):
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+@pytest.fixture
+def repo(tmp_path):
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "config", "user.email", "test@example.com")
+    git(tmp_path, "config", "user.name", "test")
+    for message, source in (("base", BASE), ("head", HEAD)):
+        (tmp_path / "algo.py").write_text(source)
+        git(tmp_path, "add", "algo.py")
+        git(tmp_path, "commit", "-q", "-m", message)
+    (tmp_path / "algo.py").write_text("this work-tree edit must be ignored(")
+    return tmp_path
+
+def compare(repo, allowlist=None):
+    analyzer = ComplexityAnalyzer(offline=True)
+    gate = RegressionGate(analyzer, repo=str(repo), allowlist=allowlist)
+    return gate.compare("HEAD~1", "HEAD")
+
+def test_reports_slowdown_and_fails(repo):
+    report = compare(repo)
+    by_name = {change["name"]: change for change in report["changes"]}
+
+    assert by_name["total"]["status"] == "worse"
+    assert (by_name["total"]["base_time"], by_name["total"]["head_time"]) == ("O(n)", "O(n²)")
+    assert by_name["added"]["status"] == "added"
+    assert by_name["dropped"]["status"] == "removed"
+    assert "untouched" not in by_name
+    assert report["functions_unchanged"] == 1
+    assert report["changes"][0]["name"] == "total"
+    assert not report["passed"]
+
+@pytest.mark.parametrize("entry,passed", [
+    ("algo.py::total", True),
+    ("*.py::tot*  O(n^2)", True),
+    ("algo.py::total O(n log n)", False),
+    ("other.py::total", False),
+])
+def test_allowlist(repo, tmp_path_factory, entry, passed):
+    path = tmp_path_factory.mktemp("allow") / "allowlist"
+    path.write_text(f"# reviewed\n{entry}\n")
+    assert compare(repo, Allowlist.load(str(path)))["passed"] is passed
+
+def test_unknown_revision_is_an_error(repo):
+    with pytest.raises(ValueError, match="git"):
+        RegressionGate(ComplexityAnalyzer(offline=True), repo=str(repo)).compare("nope", "HEAD")
@@ -0,0 +1,129 @@
+import json
+import random
+import threading
+import time
+import pytest
+from core.response_parser import (
+    ParseStats, extract_from_prose, json_spans, normalize_complexity, parse_analysis, parse_batch
+)
+
+ANSWER = {"time_complexity": "O(N log N)", "space_complexity": "O(n)", "confidence": 0.9}
+
+@pytest.mark.parametrize("raw, canonical", [
+    ("O(n^2)", "O(n²)"),
+    ("O(n**2)", "O(n²)"),
+    ("O(n * n)", "O(n²)"),
+    ("O(N log N)", "O(n log n)"),
+    ("O(nlogn)", "O(n log n)"),
+    ("Θ(n log(n))", "O(n log n)"),
+    ("O((log n)^2)", "O(log^2 n)"),
+    ("O(V+E)", "O(V + E)"),
+    ("O(2^n)", "O(2^n)"),
+    ("O(1)", "O(1)"),
+    ("O(...)", None),
+    ("fast", None),
+])
+def test_normalize_complexity(raw, canonical):
+    assert normalize_complexity(raw) == canonical
+
+def test_picks_first_valid_object_among_several_blocks():
+    text = (
+        "Using a set {like this} costs O(1) per lookup.\n"
+        'Schema: {"time_complexity": "O(...)", "confidence": 0.0}\n'
+        f"```json\n{json.dumps(ANSWER)}\n```\n"
+        '{"time_complexity": "O(1)", "confidence": 1.0}'
+    )
+    stats = ParseStats()
+    result = parse_analysis(text, stats)
+    assert result["time_complexity"] == "O(n log n)"
+    assert result["confidence"] == 0.9
+    assert stats.stats()["structured"] == 1
+
+def test_unclosed_brace_in_prose_does_not_hide_answer():
+    text = 'Note the { in this sentence, and a "quote.\n' + json.dumps(ANSWER)
+    assert parse_analysis(text)["time_complexity"] == "O(n log n)"
+
+def test_missing_fields_are_defaulted_and_counted():
+    stats = ParseStats()
+    result = parse_analysis('{"time_complexity": "O(n^2)", "confidence": "80%", "bottlenecks": "nested loop"}', stats)
+    assert result["space_complexity"] == "O(?)"
+    assert result["confidence"] == 0.8
+    assert result["bottlenecks"] == ["nested loop"]
+    assert stats.stats()["repaired"] == 1
+    assert stats.stats()["invalid_fields"] == {"space_complexity": 1, "bottlenecks": 1}
+
+def test_prose_fallback_attributes_labels():
+    result = extract_from_prose(
+        "The space complexity is O(n) because of the list, while the time complexity is O(n^2). "
+        "Confidence: 0.7"
+    )
+    assert result["time_complexity"] == "O(n²)"
+    assert result["space_complexity"] == "O(n)"
+    assert result["confidence"] == 0.7
+
+def test_unparsable_response_is_an_error():
+    stats = ParseStats()
+    assert "error" in parse_analysis("I cannot analyze this.", stats)
+    assert stats.stats()["failure_rate"] == 1.0
+
+def test_batch_accepts_array_or_loose_objects():
+    text = '[{"id": "a", "time_complexity": "O(n)", "confidence": 0.8}, {"id": "b", "time_complexity": "fast"}]'
+    text += '\n{"id": "c", "time_complexity": "O(1)", "confidence": 0.9}'
+    results = parse_batch(text, {"a", "b", "c"})
+    assert set(results) == {"a", "c"}
+    assert "id" not in results["a"]
+
+def test_spans_match_json_for_random_nesting():
+    rng = random.Random(1)
+
+    def value(depth):
+        kind = rng.choice(["obj", "arr", "str", "num"] if depth < 4 else ["str", "num"])
+        if kind == "obj":
+            return {f"k{i}": value(depth + 1) for i in range(rng.randint(0, 3))}
+        if kind == "arr":
+            return [value(depth + 1) for _ in range(rng.randint(0, 3))]
+        if kind == "str":
+            return rng.choice(['{', '}]', '"', '\\', 'x'])
+        return rng.random()
+
+    for _ in range(200):
+        document = json.dumps({"v": value(0)})
+        text = f"prose ] {{ with noise\n```json\n{document}\n```"
+        (start, end), = [span for span in json_spans(text) if text[span[0]] == '{' and span[1] - span[0] > 2]
+        assert json.loads(text[start:end]) == json.loads(document)
+
+PATHOLOGICAL = {
+    "open_braces": "{" * 1_000_000,
+    "deep_nesting": "[" * 300 + "]" * 300 + "[{" * 500_000,
+    "unterminated_string": '{"a": "' + "\\" * 1_000_000,
+    "big_o_prefixes": "O(" * 500_000,
+    "labels_then_answer": "time complexity " * 60_000 + json.dumps(ANSWER),
+    "overflowing_big_o": "time complexity O(100000000!) space O(2^2^2^2^2^2) " * 20_000,
+}
+
+@pytest.mark.parametrize("name", PATHOLOGICAL)
+def test_pathological_megabyte_responses_are_linear(name):
+    start = time.perf_counter()
+    result = parse_analysis(PATHOLOGICAL[name])
+    assert time.perf_counter() - start < 5.0
+    if name == "labels_then_answer":
+        assert result["confidence"] == 0.9
+
+# Big-O strings that used to overflow or hang the parser; they must come back promptly
+HOSTILE_COMPLEXITIES = {
+    "O(10^400)": "O(1)",
+    "O(2^2^2^2^2^2)": "O(1)",
+    "O(100000000!)": "O(100000000!)",
+    "O((10^400)^n)": "O((10^400)^n)",
+    "O(1e5)": "O(1)",
+}
+
+@pytest.mark.parametrize("raw", HOSTILE_COMPLEXITIES)
+def test_hostile_complexities_parse_without_hanging(raw):
+    response = json.dumps(dict(ANSWER, time_complexity=raw))
+    results = []
+    worker = threading.Thread(target=lambda: results.append(parse_analysis(response)), daemon=True)
+    worker.start()
+    worker.join(timeout=5.0)
+    assert not worker.is_alive(), f"parsing {raw} did not finish"
+    assert results[0]["time_complexity"] == HOSTILE_COMPLEXITIES[raw]
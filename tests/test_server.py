@@ -0,0 +1,142 @@
+import asyncio
+import hashlib
+import json
+import threading
+from core.complexity_analyzer import ComplexityAnalyzer
+from core.server import AnalysisServer
+
+class GatedLLM:
+    """Fake model that blocks until released, so requests overlap deterministically."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = 0
+
+    def analyze_complexity(self, code, ast):
+        self.calls += 1
+        self.release.wait(5)
+        return {"time_complexity": "O(n)", "space_complexity": "O(1)", "confidence": 0.9}
+
+async def request(address, method, path, payload=None):
+    reader, writer = await asyncio.open_connection(*address[:2])
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\n"
+        f"Connection: close\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+def run_server(test, llm=None, **kwargs):
+    async def main():
+        analyzer = ComplexityAnalyzer(api_key="dummy", confidence_threshold=1.0)
+        analyzer.llm_client = llm or GatedLLM()
+        server = AnalysisServer(analyzer, **kwargs)
+        await server.start("127.0.0.1", 0)
+        try:
+            return await test(server)
+        finally:
+            await server.close()
+    return asyncio.run(main())
+
+async def wait_until(condition):
+    for _ in range(200):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+def test_health_and_analyze():
+    llm = GatedLLM()
+    llm.release.set()
+
+    async def test(server):
+        status, health = await request(server.address, "GET", "/health")
+        assert status == 200 and health["status"] == "ok"
+        # The fake model keeps no parse stats
+        assert server.analyzer.parse_stats() is None and "llm_parsing" not in health
+
+        status, result = await request(server.address, "POST", "/analyze", {"code": "for x in xs:\n  pass"})
+        assert status == 200
+        assert result["final_analysis"]["time_complexity"] == "O(n)"
+
+        status, result = await request(server.address, "POST", "/analyze", {"code": "def f(:"})
+        assert status == 422 and "syntax" in result["error"]
+        assert (await request(server.address, "POST", "/analyze", {}))[0] == 400
+        assert (await request(server.address, "GET", "/missing"))[0] == 404
+
+    run_server(test, llm)
+
+def test_negative_content_length_is_rejected():
+    async def test(server):
+        reader, writer = await asyncio.open_connection(*server.address[:2])
+        writer.write(b"POST /analyze HTTP/1.1\r\nHost: test\r\nContent-Length: -1\r\nConnection: close\r\n\r\n")
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        assert response.split()[1] == b"400"
+
+    run_server(test)
+
+def test_identical_concurrent_requests_share_one_analysis():
+    llm = GatedLLM()
+
+    async def test(server):
+        codes = ["for x in xs:\n  pass", "for x in xs:   # same AST\n    pass"]
+        pending = [asyncio.create_task(request(server.address, "POST", "/analyze", {"code": code}))
+                   for code in codes * 3]
+        await wait_until(lambda: server.requests == 6)
+        llm.release.set()
+
+        responses = await asyncio.gather(*pending)
+        assert [status for status, _ in responses] == [200] * 6
+        assert llm.calls == 1
+        assert server.coalesced == 5
+        # Each caller gets the hash of the code it sent, not the leader's
+        assert [result["code_hash"] for _, result in responses] == \
+            [hashlib.sha256(code.encode()).hexdigest() for code in codes * 3]
+
+    run_server(test, llm)
+
+def test_full_queue_rejects_with_503():
+    llm = GatedLLM()
+
+    async def test(server):
+        first = asyncio.create_task(request(server.address, "POST", "/analyze", {"code": "a = [x for x in xs]"}))
+        await wait_until(lambda: llm.calls == 1)
+        second = asyncio.create_task(request(server.address, "POST", "/analyze", {"code": "b = sorted(ys)"}))
+        await wait_until(lambda: server.requests == 2)
+
+        status, result = await request(server.address, "POST", "/analyze", {"code": "c = set(zs)"})
+        assert status == 503
+        _, health = await request(server.address, "GET", "/health")
+        assert health["rejected"] == 1 and health["queued"] == 1
+
+        llm.release.set()
+        assert [r[0] for r in await asyncio.gather(first, second)] == [200, 200]
+
+    run_server(test, llm, workers=1, queue_size=1)
+
+def test_close_fails_queued_and_running_analyses():
+    llm = GatedLLM()
+
+    async def test(server):
+        pending = [asyncio.create_task(server.analyze(code)) for code in ("a = sorted(xs)", "b = sorted(ys)")]
+        await wait_until(lambda: llm.calls == 1 and server.requests == 2)
+        await server.close()
+
+        for status, result in await asyncio.wait_for(asyncio.gather(*pending), 5):
+            assert status == 422 and "shut down" in result["error"]
+        llm.release.set()
+
+    async def main():
+        analyzer = ComplexityAnalyzer(api_key="dummy", confidence_threshold=1.0)
+        analyzer.llm_client = llm
+        server = AnalysisServer(analyzer, workers=1)
+        await server.start("127.0.0.1", 0)
+        await test(server)
+
+    asyncio.run(main())
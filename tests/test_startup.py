@@ -0,0 +1,20 @@
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["rich", "google.generativeai", "asyncio", "multiprocessing", "sqlite3"]
+
+def test_offline_json_run_skips_heavy_imports():
+    script = (
+        "import sys\n"
+        "from click.testing import CliRunner\n"
+        "import main\n"
+        "result = CliRunner().invoke(main.cli, ['analyze', 'for x in xs: pass', '--offline', '--format', 'json'])\n"
+        "assert result.exit_code == 0, result.output\n"
+        f"loaded = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+        "assert not loaded, loaded\n"
+    )
+    subprocess.run([sys.executable, "-c", script], check=True, cwd=REPO_ROOT,
+                   env={**os.environ, "GEMINI_API_KEY": ""})
@@ -0,0 +1,108 @@
+import ast
+import os
+import subprocess
+import sys
+import pytest
+from config import Config
+from core.bigo import equivalent
+from core.complexity_analyzer import ComplexityAnalyzer
+from core.static_estimator import StaticEstimator
+from examples.benchmark_corpus import BENCHMARK_CORPUS
+from examples.sample_codes import SAMPLE_CODES
+
+@pytest.mark.parametrize("name,expected", [
+    ("linear_search", "O(n)"),
+    ("bubble_sort", "O(n²)"),
+    ("binary_search", "O(log n)"),
+    ("matrix_multiplication", "O(n³)"),
+])
+def test_static_estimator_on_samples(name, expected):
+    result = StaticEstimator().estimate(ast.parse(SAMPLE_CODES[name]["code"]))
+    assert result["time_complexity"] == expected
+    assert result["confidence"] >= 0.9
+
+@pytest.mark.parametrize("code,expected,max_confidence", [
+    ("def f(xs):\n  for x in xs:\n    ys = sorted(xs)", "O(n² log n)", 1.0),
+    ("def f(n):\n  i = 1\n  while i < n:\n    i *= 2", "O(log n)", 1.0),
+    ("for i in range(10): pass", "O(1)", 0.7),
+    ("def f(xs):\n  for x in xs:\n    helper(x)", "O(n)", 0.8),
+    ("def f(n):\n  return f(n - 1) if n else 0", "O(n)", 1.0),
+    ("def f(xs):\n  for x in xs:\n    f(x)", "O(?)", 0.2),
+    ("def f(n):\n  return g(n - 1)\ndef g(n):\n  return f(n)", "O(?)", 0.2),
+])
+def test_static_estimator_confidence(code, expected, max_confidence):
+    result = StaticEstimator().estimate(ast.parse(code))
+    assert result["time_complexity"] == expected
+    assert result["confidence"] <= max_confidence
+
+def test_analyzer_skips_llm_when_static_estimate_is_conclusive():
+    class FailingLLM:
+        def analyze_complexity(self, code, ast):
+            raise AssertionError("LLM should not be called")
+
+    analyzer = ComplexityAnalyzer(api_key="dummy")
+    analyzer.llm_client = FailingLLM()
+    result = analyzer.analyze(SAMPLE_CODES["linear_search"]["code"])
+    assert result["llm_analysis"] is None
+    assert result["final_analysis"]["time_complexity"] == "O(n)"
+    assert result["final_analysis"]["analysis_method"] == "Static analysis (high confidence)"
+
+def test_offline_mode_never_loads_gemini_sdk():
+    script = (
+        "import sys\n"
+        "from core import ComplexityAnalyzer\n"
+        "result = ComplexityAnalyzer(offline=True).analyze('def f(xs):\\n  for x in xs:\\n    f(x)')\n"
+        "assert result['final_analysis']['analysis_method'] == 'Static analysis (offline)'\n"
+        "assert 'google.generativeai' not in sys.modules\n"
+    )
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, "-c", script], check=True, cwd=repo_root,
+                   env={**os.environ, "GEMINI_API_KEY": ""})
+
+@pytest.mark.parametrize("name", [
+    "heap_sort", "counting_sort", "fibonacci_memo", "longest_common_subsequence", "edit_distance",
+    "longest_increasing_subsequence", "max_subarray", "topological_sort", "monotonic_stack",
+    "early_exit_first_pair", "list_membership_in_loop", "string_concatenation", "power_set", "is_prime_trial",
+])
+def test_static_estimator_is_never_confidently_wrong_on_the_corpus(name):
+    sample = BENCHMARK_CORPUS[name]
+    result = StaticEstimator().estimate(ast.parse(sample["code"]))
+    assert (equivalent(result["time_complexity"], sample["expected_complexity"])
+            or result["confidence"] < Config.CONFIDENCE_THRESHOLD), result
+
+@pytest.mark.parametrize("code,expected", [
+    ("def f(a, b):\n  for i in range(a):\n    x = max(a, b)", "O(n)"),
+    ("def f(xs):\n  for i, x in enumerate(xs, 1):\n    pass", "O(n)"),
+    ("def f(xs):\n  for x, y in zip(xs, 'abc'):\n    pass", "O(n)"),
+    ("def f(xs):\n  q = list(xs)\n  while q:\n    q.pop(0)", "O(n²)"),
+    ("def f(xs):\n  q = list(xs)\n  while q:\n    q.pop()", "O(n)"),
+    ("def f(xs):\n  seen = []\n  for x in xs:\n    if x not in seen:\n      seen.append(x)", "O(n²)"),
+    ("def f(xs):\n  seen = set()\n  for x in xs:\n    if x not in seen:\n      seen.add(x)", "O(n)"),
+    ("def f(xs):\n  s = ''\n  for x in xs:\n    s += x", "O(n²)"),
+    ("def f(xs):\n  heap = []\n  for x in xs:\n    heapq.heappush(heap, x)", "O(n log n)"),
+    ("def f(n):\n  for i in range(n * n):\n    pass", "O(n²)"),
+    ("def f(xs):\n  for i in range(len(xs) ** 2):\n    pass", "O(n²)"),
+    ("def f(n):\n  for i in range(2 ** n):\n    pass", "O(2^n)"),
+    ("def f(n):\n  for i in range(1 << n):\n    pass", "O(2^n)"),
+    ("def f(n):\n  i = 0\n  while i < n * n:\n    i += 1", "O(n²)"),
+    ("def f(n):\n  i = 0\n  while i < 2 ** n:\n    i += 1", "O(2^n)"),
+    ("def f(n):\n  i = 1\n  while i * i <= n:\n    i += 1", "O(n^0.50)"),
+    ("def f(n):\n  return n * 'a'", "O(n)"),
+])
+def test_static_estimator_costs_calls_and_operators(code, expected):
+    result = StaticEstimator().estimate(ast.parse(code))
+    assert result["time_complexity"] == expected
+    assert result["confidence"] >= Config.CONFIDENCE_THRESHOLD
+
+def test_static_estimator_doubts_membership_in_untyped_containers():
+    result = StaticEstimator().estimate(ast.parse("def f(xs, ys):\n  for x in xs:\n    if x in ys:\n      pass"))
+    assert result["confidence"] < Config.CONFIDENCE_THRESHOLD
+    assert "membership test on ys of unknown type" in result["uncertainties"]
+
+@pytest.mark.parametrize("code", [
+    "def f(n):\n  for i in range(g(n)):\n    pass",
+    "def f(s, n):\n  return s * n",
+])
+def test_static_estimator_doubts_bounds_and_repetitions_it_cannot_size(code):
+    result = StaticEstimator().estimate(ast.parse(code))
+    assert result["confidence"] < Config.CONFIDENCE_THRESHOLD
@@ -0,0 +1,90 @@
+import json
+import random
+from core.complexity_analyzer import ComplexityAnalyzer
+from core.llm_client import LLMClient
+from core.streaming import JSONFieldStream
+
+RESPONSE = '''Here is the analysis:
+```json
+{
+    "time_complexity": "O(n log n)",
+    "space_complexity": "O(n)",
+    "confidence": 0.85,
+    "explanation": "Splits in half, merges in \\"linear\\" time {not a brace}",
+    "bottlenecks": ["merge", {"nested": [1, 2]}],
+    "reasoning": null
+}
+```'''
+
+class Chunk:
+    def __init__(self, text):
+        self.text = text
+
+class StreamingModel:
+    """Fake model that streams RESPONSE a few characters at a time."""
+
+    def __init__(self, size=8):
+        self.size = size
+        self.consumed = 0
+        self.cancelled = False
+
+    def generate_content(self, prompt, stream=False):
+        model = self
+
+        class Response:
+            def __iter__(self):
+                for start in range(0, len(RESPONSE), model.size):
+                    model.consumed += 1
+                    yield Chunk(RESPONSE[start:start + model.size])
+
+        response = Response()
+        response._iterator = self
+        return response
+
+    def cancel(self):
+        self.cancelled = True
+
+def test_stream_extracts_fields_for_any_chunking():
+    expected = json.loads(RESPONSE[RESPONSE.index('{'):RESPONSE.rindex('}') + 1])
+    rng = random.Random(0)
+    for _ in range(200):
+        stream = JSONFieldStream()
+        completed = []
+        position = 0
+        while position < len(RESPONSE):
+            size = rng.randint(1, 7)
+            completed.extend(stream.feed(RESPONSE[position:position + size]))
+            position += size
+        assert stream.done
+        assert dict(completed) == expected
+        assert [key for key, _ in completed] == list(expected)
+
+def test_stream_reports_fields_in_order():
+    client = LLMClient(api_key="dummy")
+    client.model = StreamingModel()
+    seen = []
+    result = client.analyze_complexity_stream("def f(): pass", {}, on_field=lambda k, v: seen.append(k))
+    assert seen[:3] == ["time_complexity", "space_complexity", "confidence"]
+    assert result["time_complexity"] == "O(n log n)"
+    assert result["bottlenecks"][0] == "merge"
+    assert "truncated" not in result
+
+def test_fast_verdict_stops_early():
+    client = LLMClient(api_key="dummy")
+    client.model = model = StreamingModel()
+    result = client.analyze_complexity_stream("def f(): pass", {}, fast_verdict=True)
+    assert result["truncated"] is True
+    assert result["confidence"] == 0.85
+    assert model.cancelled
+    assert model.consumed < len(RESPONSE) // model.size
+
+def test_truncated_results_are_not_cached(tmp_path):
+    from core.cache import ResultCache
+    analyzer = ComplexityAnalyzer(api_key="dummy", cache=ResultCache(tmp_path), confidence_threshold=1.0)
+    client = LLMClient(api_key="dummy")
+    client.model = StreamingModel()
+    analyzer.llm_client = client
+    code = "def f(xs):\n    return sorted(xs)\n"
+    result = analyzer.analyze(code, fast_verdict=True)
+    assert result["llm_analysis"]["truncated"]
+    assert analyzer.cache.get(code) is None
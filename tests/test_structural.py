@@ -0,0 +1,88 @@
+import pytest
+from core.complexity_analyzer import ComplexityAnalyzer
+from core.fake_model import FakeModel
+from core.llm_client import LLMClient
+from core.structural import StructuralIndex, structural_hash
+
+TOTAL = '''def total(items):
+    """Add everything up."""
+    acc = 0
+    for item in items:
+        acc += item * 2
+    return acc
+'''
+
+REPORT = '''def report(rows, limit):
+    totals = {}
+    for row in rows:
+        key = row.name
+        if key not in totals:
+            totals[key] = 0
+        totals[key] += row.amount
+    ordered = sorted(totals.items())
+    lines = []
+    for name, amount in ordered[:limit]:
+        lines.append(name + ": " + str(amount))
+    return "\\n".join(lines)
+'''
+
+def test_structural_hash_ignores_names_constants_and_docstrings():
+    renamed = "def summed(values):\n    r = 10\n    for v in values:\n        r += v * 3\n    return r\n"
+    assert structural_hash(TOTAL) == structural_hash(renamed)
+
+    # Free names, attributes and shape still matter: they change the cost
+    assert structural_hash("def f(xs):\n    return sorted(xs)") != structural_hash("def f(xs):\n    return len(xs)")
+    assert structural_hash("def f(xs):\n    xs.pop(0)") != structural_hash("def f(xs):\n    xs.append(0)")
+    nested = TOTAL.replace("    for item in items:\n", "    for item in items:\n      for other in items:\n")
+    assert structural_hash(TOTAL) != structural_hash(nested)
+
+def test_index_persists_and_finds_exact_and_near_duplicates(tmp_path):
+    path = str(tmp_path / "index")
+    index = StructuralIndex(path)
+    index.add(index.fingerprint(TOTAL), {"time_complexity": "O(n)"}, "hash-total", "O(n)")
+    index.save()
+    index.add(index.fingerprint(REPORT), {"time_complexity": "O(n log n)"}, "hash-report", "O(n log n)")
+    index.close()
+
+    # Reopened from the memory-mapped file, with the second save merged in
+    index = StructuralIndex(path)
+    assert len(index) == 2
+    match = index.lookup(index.fingerprint(TOTAL.replace("items", "rows")))
+    assert (match.kind, match.entry["code_hash"]) == ("exact", "hash-total")
+    # Exact duplicates, stored or pending, are also skipped when the estimates differ
+    assert index.lookup(index.fingerprint(TOTAL), "O(n²)") is None
+    pending = index.fingerprint(TOTAL.replace("acc = 0", "acc = [0] * len(items)"))
+    index.add(pending, {"time_complexity": "O(n)"}, "hash-pending", "O(n)")
+    assert index.lookup(pending, "O(n)").kind == "exact"
+    assert index.lookup(pending, "O(n²)") is None
+
+    near = index.fingerprint(REPORT.replace("totals[key] += row.amount", "totals[key] -= row.amount"))
+    match = index.lookup(near, "O(n log n)")
+    assert match.kind == "similar" and match.similarity >= 0.8
+    assert match.llm_analysis()["duplicate_of"]["code_hash"] == "hash-report"
+    # A near duplicate whose own estimate differs is analyzed on its own
+    assert index.lookup(near, "O(n²)") is None
+    assert index.fingerprint("def broken(:") is None
+
+    with pytest.raises(ValueError, match="not a compatible structural index"):
+        StructuralIndex(path, permutations=32, bands=8)
+
+def test_analyzer_reuses_results_within_and_across_runs(tmp_path):
+    codes = [TOTAL.replace("total", f"total_{i}").replace("items", f"items_{i}") for i in range(5)]
+    path = str(tmp_path / "index")
+
+    def analyzer():
+        return ComplexityAnalyzer(confidence_threshold=1.0, llm_client=LLMClient(model=FakeModel()),
+                                  dedup_index=StructuralIndex(path))
+
+    first = analyzer()
+    results = first.analyze_many(codes)
+    assert first.llm_client.usage()["calls"] == 1
+    assert [bool(r["llm_analysis"].get("duplicate_of")) for r in results] == [False, True, True, True, True]
+    assert results[1]["llm_analysis"]["duplicate_of"]["code_hash"] == results[0]["code_hash"]
+    first.dedup_index.close()
+
+    second = analyzer()
+    result = second.analyze(codes[3])
+    assert second._llm_client.usage()["calls"] == 0 and result["cached"]
+    assert result["llm_analysis"]["duplicate_of"]["kind"] == "exact"
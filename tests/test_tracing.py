@@ -0,0 +1,81 @@
+import asyncio
+import io
+import json
+import pytest
+from core import tracing
+from core.complexity_analyzer import ComplexityAnalyzer
+from core.fake_model import FakeModel
+from core.llm_client import LLMClient
+
+CODE = "def f(xs):\n    for x in xs:\n        for y in xs:\n            pass"
+
+@pytest.fixture
+def tracer():
+    output = io.StringIO()
+    tracer = tracing.enable(output)
+    yield tracer, output
+    tracing.disable()
+
+def records(output):
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+def test_disabled_spans_are_shared_noops():
+    assert not tracing.enabled()
+    with tracing.span("stage", size=1) as first:
+        first.set(more=2)
+    assert tracing.span("other") is first
+
+def test_analyze_records_nested_stages(tracer):
+    tracer, output = tracer
+    analyzer = ComplexityAnalyzer(confidence_threshold=1.0, llm_client=LLMClient(model=FakeModel({})))
+    analyzer.analyze(CODE)
+
+    spans = {record["name"]: record for record in records(output)}
+    assert {"analyze", "ast.parse", "ast.analyze", "static.estimate", "llm.analyze",
+            "llm.prompt", "llm.generate", "llm.parse", "combine"} <= set(spans)
+    root = spans["analyze"]
+    assert root["parent_id"] is None and root["attributes"]["outcome"] == "llm"
+    assert spans["llm.analyze"]["parent_id"] == root["span_id"]
+    assert spans["llm.generate"]["parent_id"] == spans["llm.analyze"]["span_id"]
+    assert {record["trace_id"] for record in records(output)} == {root["trace_id"]}
+    assert spans["llm.generate"]["attributes"]["prompt_tokens"] > 0
+
+    summary = {row["stage"]: row for row in tracer.summary()}
+    assert summary["analyze"]["share"] == 1.0
+    assert summary["llm.generate"]["totals"]["response_chars"] > 0
+
+def test_otel_records_and_errors():
+    output = io.StringIO()
+    tracing.enable(output, format="otel")
+    try:
+        with pytest.raises(KeyError):
+            with tracing.span("outer", retries=2, cached=False):
+                with tracing.span("inner"):
+                    raise KeyError("x")
+    finally:
+        tracing.disable()
+
+    inner, outer = records(output)
+    assert inner["parentSpanId"] == outer["spanId"] and outer["parentSpanId"] == ""
+    assert outer["status"] == {"code": 2}
+    assert {"key": "retries", "value": {"intValue": "2"}} in outer["attributes"]
+    assert {"key": "cached", "value": {"boolValue": False}} in outer["attributes"]
+    assert int(outer["endTimeUnixNano"]) >= int(inner["endTimeUnixNano"])
+
+def test_concurrent_tasks_get_separate_traces(tracer):
+    tracer, output = tracer
+
+    async def task(name):
+        with tracing.span(name):
+            await asyncio.sleep(0.01)
+            with tracing.span(f"{name}.child"):
+                await asyncio.sleep(0)
+
+    async def main():
+        await asyncio.gather(task("a"), task("b"))
+
+    asyncio.run(main())
+    spans = {record["name"]: record for record in records(output)}
+    for name in ("a", "b"):
+        assert spans[f"{name}.child"]["parent_id"] == spans[name]["span_id"]
+    assert spans["a"]["trace_id"] != spans["b"]["trace_id"]